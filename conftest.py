@@ -0,0 +1,24 @@
+"""Repository-level pytest configuration.
+
+Command-line options must be registered in a conftest.py that pytest loads
+before collection, whatever the paths given on the command line (e.g.
+``pytest tests --benchmark``), hence at the repository root.
+"""
+
+import pytest
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register benchmark options (see tests/balatrobench/benchmarks)."""
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        help="Run performance benchmarks (skipped by default)",
+    )
+    group.addoption(
+        "--benchmark-save",
+        metavar="NAME",
+        default="latest",
+        help="Save benchmark results to .benchmarks/NAME.json (default: latest)",
+    )
@@ -1483,6 +1483,53 @@ class RequestCache {
 
 const requestContentCache = new RequestCache(20);
 
+// ===== Delta-encoded run context (context.json, see balatrobench/delta.py) =====
+// Stores gamestate/memory of a whole run as keyframes and line deltas.
+// Caches the fetch promise per run (resolving to null for runs without one).
+const runContextCache = new RequestCache(5);
+
+function loadRunContext(runBase) {
+  const url = `${runBase.slice(0, runBase.lastIndexOf('/'))}/context.json`;
+  if (!runContextCache.has(url)) {
+    runContextCache.set(url, fetchJsonSafe(url));
+  }
+  return runContextCache.get(url);
+}
+
+function splitContextLines(text) {
+  const lines = text.split('\n');
+  const last = lines.pop();
+  const result = lines.map((line) => line + '\n');
+  if (last) result.push(last);
+  return result;
+}
+
+function applyContextDelta(previous, ops) {
+  const old = splitContextLines(previous);
+  return ops
+    .map((op) => (typeof op === 'string' ? op : old.slice(op[0], op[1]).join('')))
+    .join('');
+}
+
+function decodeContextEntry(entries, index) {
+  let start = index;
+  while (typeof entries[start] !== 'string') start--;
+  let text = entries[start];
+  for (let i = start + 1; i <= index; i++) {
+    text = applyContextDelta(text, entries[i]);
+  }
+  return text;
+}
+
+function decodeRunContext(context, reqId) {
+  const index = context.requests.indexOf(reqId);
+  if (index < 0) return null;
+  return {
+    gamestate: decodeContextEntry(context.gamestate, index),
+    memory: decodeContextEntry(context.memory, index)
+  };
+}
+
 function openRunViewer({
   basePath,
   vendor,
@@ -1595,12 +1642,14 @@ async function loadAndRenderRequest(state, prefetch = false) {
   if (cached) {
     content = cached;
   } else {
+    const runContext = await loadRunContext(runBase);
+    const context = runContext ? decodeRunContext(runContext, reqId) : null;
     const [reasoning, toolcall, strategyMd, gamestateMd, memoryMd, metadata] = await Promise.all([
       fetchTextSafe(`${runBase}/reasoning.md`),
       fetchJsonSafe(`${runBase}/tool_call.json`),
       fetchTextSafe(`${runBase}/strategy.md`),
-      fetchTextSafe(`${runBase}/gamestate.md`),
-      fetchTextSafe(`${runBase}/memory.md`),
+      context ? context.gamestate : fetchTextSafe(`${runBase}/gamestate.md`),
+      context ? context.memory : fetchTextSafe(`${runBase}/memory.md`),
       fetchJsonSafe(`${runBase}/metadata.json`)
     ]);
     content = {
@@ -1660,6 +1709,12 @@ async function loadAndRenderRequest(state, prefetch = false) {
     const completionCost = metadata.cost_out || 0;
 
     title += ` • ${tokensIcon} in/out ${promptTokens}/${completionTokens}`;
+    if (metadata.tokens_cached) {
+      title += ` (${metadata.tokens_cached} cached)`;
+    }
+    if (metadata.tokens_reasoning) {
+      title += ` (${metadata.tokens_reasoning} reasoning)`;
+    }
     title += ` • $ in/out ${promptCost.toFixed(4)}/${completionCost.toFixed(4)}`;
   }
 
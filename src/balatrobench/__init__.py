@@ -1,5 +1,6 @@
 """BalatroBench - Benchmark analysis for BalatroLLM."""
 
+from . import tracing
 from .analyzer import BenchmarkAnalyzer
 from .enums import Deck, Stake
 from .extractor import (
@@ -10,19 +11,32 @@ from .extractor import (
 from .models import (
     Config,
     LeaderboardEntry,
+    LeaderboardSlice,
     Manifest,
     Model,
     ModelsLeaderboard,
     ModelsLeaderboardEntry,
+    ModelsLeaderboardSlices,
+    ModelsPairedComparison,
+    PairedComparison,
+    Percentiles,
+    ProvidersLeaderboard,
+    ProvidersLeaderboardEntry,
     Request,
     Run,
     Runs,
     Stats,
+    StatsPercentiles,
     StrategiesLeaderboard,
     StrategiesLeaderboardEntry,
+    StrategiesLeaderboardSlices,
+    StrategiesPairedComparison,
     Strategy,
     Version,
 )
+from .pipeline import BenchmarkPipeline, RequestRecord
+from .profiling import BuildProfiler
+from .scope import BuildScope
 from .source import (
     SourceModel,
     SourceStats,
@@ -34,36 +48,45 @@ from .writer import BenchmarkWriter
 __version__ = "1.4.0"
 
 __all__ = [
-    # Version
-    "__version__",
-    # Enums
-    "Deck",
-    "Stake",
-    # Output Models
+    "BenchmarkAnalyzer",
+    "BenchmarkPipeline",
+    "BenchmarkWriter",
+    "BuildProfiler",
+    "BuildScope",
     "Config",
+    "Deck",
     "LeaderboardEntry",
+    "LeaderboardSlice",
     "Manifest",
     "Model",
     "ModelsLeaderboard",
     "ModelsLeaderboardEntry",
+    "ModelsLeaderboardSlices",
+    "ModelsPairedComparison",
+    "PairedComparison",
+    "Percentiles",
+    "ProvidersLeaderboard",
+    "ProvidersLeaderboardEntry",
     "Request",
+    "RequestRecord",
     "Run",
     "Runs",
+    "SourceModel",
+    "SourceStats",
+    "SourceStrategy",
+    "SourceTask",
+    "Stake",
     "Stats",
+    "StatsPercentiles",
     "StrategiesLeaderboard",
     "StrategiesLeaderboardEntry",
+    "StrategiesLeaderboardSlices",
+    "StrategiesPairedComparison",
     "Strategy",
     "Version",
-    # Source Models
-    "SourceModel",
-    "SourceStats",
-    "SourceStrategy",
-    "SourceTask",
-    # Classes
-    "BenchmarkAnalyzer",
-    "BenchmarkWriter",
-    # Functions
+    "__version__",
     "extract_request_content",
     "extract_request_metadata",
     "extract_response_data",
+    "tracing",
 ]
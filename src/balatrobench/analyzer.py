@@ -1,32 +1,49 @@
 """Benchmark analysis for BalatroLLM runs."""
 
 import json
-import statistics
 import time
 from collections import defaultdict
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator, Mapping
 from pathlib import Path
 
+from . import tracing
+from .cube import AggregationCube
 from .enums import Deck, Stake
+from .extractor import summarize_run
 from .models import (
     Config,
     LeaderboardEntry,
+    LeaderboardSlice,
     Model,
     ModelsLeaderboard,
     ModelsLeaderboardEntry,
+    ModelsLeaderboardSlices,
+    ModelsPairedComparison,
+    ProvidersLeaderboard,
     Run,
     Runs,
     Stats,
     StrategiesLeaderboard,
     StrategiesLeaderboardEntry,
+    StrategiesLeaderboardSlices,
+    StrategiesPairedComparison,
     Strategy,
 )
+from .moments import merge_runs
+from .paired import SeedIndex
+from .providers import ProviderPartial, merge_providers
+from .scope import FULL_SCOPE, BuildScope
 from .source import SourceStats, SourceStrategy, SourceTask
+from .summary import RequestSummary
 
 
 def _subdirs(path: Path) -> Iterator[Path]:
-    """Yield only subdirectories of a path."""
-    return (p for p in path.iterdir() if p.is_dir())
+    """Yield only subdirectories of a path, in name order.
+
+    Sorting keeps the output independent of the filesystem's (or the
+    archive's) listing order.
+    """
+    return (p for p in sorted(path.iterdir()) if p.is_dir())
 
 
 class BenchmarkAnalyzer:
@@ -40,24 +57,34 @@ class BenchmarkAnalyzer:
         self.runs_dir = runs_dir
         self.output_dir = output_dir
 
-    def analyze_models(self, version_dir: Path) -> dict[str, list[Runs]]:
+    def analyze_models(
+        self, version_dir: Path, scope: BuildScope = FULL_SCOPE
+    ) -> dict[str, list[Runs]]:
         """Analyze a version by comparing models within each strategy.
 
-        Returns a dict mapping strategy_name to list of Runs.
+        Returns a dict mapping strategy_name to list of Runs. With a partial
+        scope, only strategies with selected models are included.
         """
         if not version_dir.is_dir():
             raise FileNotFoundError(f"Version directory not found: {version_dir}")
 
         result: dict[str, list[Runs]] = {}
-        for strategy_dir in _subdirs(version_dir):
-            result[strategy_dir.name] = self._analyze_strategy(strategy_dir)
+        with tracing.span("analyzer.analyze_models", version=version_dir.name) as attrs:
+            for strategy_dir in _subdirs(version_dir):
+                runs_list = self._analyze_strategy(strategy_dir, scope)
+                if runs_list or scope.is_full:
+                    result[strategy_dir.name] = runs_list
+            attrs["strategies"] = len(result)
 
         return result
 
-    def analyze_strategies(self, version_dir: Path) -> dict[str, list[Runs]]:
+    def analyze_strategies(
+        self, version_dir: Path, scope: BuildScope = FULL_SCOPE
+    ) -> dict[str, list[Runs]]:
         """Analyze a version by comparing strategies for each model.
 
         Returns a dict mapping "vendor/model" to list of Runs (one per strategy).
+        With a partial scope, only selected model directories are included.
         """
         if not version_dir.is_dir():
             raise FileNotFoundError(f"Version directory not found: {version_dir}")
@@ -68,35 +95,84 @@ class BenchmarkAnalyzer:
         for strategy_dir in _subdirs(version_dir):
             for vendor_dir in _subdirs(strategy_dir):
                 for model_dir in _subdirs(vendor_dir):
-                    model_key = f"{vendor_dir.name}/{model_dir.name}"
-                    models_by_key[model_key].append(model_dir)
+                    if scope.selects(model_dir):
+                        model_key = f"{vendor_dir.name}/{model_dir.name}"
+                        models_by_key[model_key].append(model_dir)
 
         # Analyze each model across strategies
         result: dict[str, list[Runs]] = {}
-        for model_key, model_dirs in models_by_key.items():
-            runs_list = []
-            for model_dir in model_dirs:
-                runs = self._compute_runs(model_dir)
-                if runs:
-                    runs_list.append(runs)
-            result[model_key] = runs_list
+        with tracing.span(
+            "analyzer.analyze_strategies", version=version_dir.name
+        ) as attrs:
+            for model_key, model_dirs in models_by_key.items():
+                runs_list = []
+                for model_dir in model_dirs:
+                    runs = self._compute_runs(
+                        model_dir, self._summarize_runs(model_dir)
+                    )
+                    if runs:
+                        runs_list.append(runs)
+                result[model_key] = runs_list
+            attrs["models"] = len(result)
 
         return result
 
-    def _analyze_strategy(self, strategy_dir: Path) -> list[Runs]:
-        """Analyze all models within a strategy directory."""
+    def _analyze_strategy(
+        self, strategy_dir: Path, scope: BuildScope = FULL_SCOPE
+    ) -> list[Runs]:
+        """Analyze the (selected) models within a strategy directory."""
         runs_list: list[Runs] = []
 
         for vendor_dir in _subdirs(strategy_dir):
             for model_dir in _subdirs(vendor_dir):
-                runs = self._compute_runs(model_dir)
+                if not scope.selects(model_dir):
+                    continue
+                runs = self._compute_runs(model_dir, self._summarize_runs(model_dir))
                 if runs:
                     runs_list.append(runs)
 
         return runs_list
 
-    def _compute_runs(self, model_dir: Path) -> Runs | None:
-        """Compute Runs from a model's run directories."""
+    def _summarize_runs(
+        self, model_dir: Path, cache: bool = False, skip: Iterable[str] = ()
+    ) -> dict[str, RequestSummary]:
+        """Request summaries of a model's complete runs, by run directory name.
+
+        Args:
+            model_dir: Model directory of a strategy
+            cache: Use the summary cache (see extractor.summarize_run)
+            skip: Names of run directories not to summarize
+        """
+        skip = set(skip)
+        return {
+            run_dir.name: summarize_run(run_dir, cache)
+            for run_dir in _subdirs(model_dir)
+            if run_dir.name not in skip
+            and (run_dir / "stats.json").exists()
+            and (run_dir / "task.json").exists()
+        }
+
+    @tracing.traced(
+        "analyzer.compute_runs",
+        attributes=lambda self, model_dir, summaries: {
+            "strategy": model_dir.parent.parent.name,
+            "model": f"{model_dir.parent.name}/{model_dir.name}",
+        },
+        result_attributes=lambda runs: {"runs": len(runs.runs) if runs else 0},
+    )
+    def _compute_runs(
+        self, model_dir: Path, summaries: Mapping[str, RequestSummary]
+    ) -> Runs | None:
+        """Compute Runs from a model's run directories.
+
+        Only stats.json, task.json and strategy.json are read here; request
+        figures come from the given summaries (see _summarize_runs).
+
+        Args:
+            model_dir: Model directory of a strategy
+            summaries: Request summaries of the runs, by run directory name;
+                runs without one get empty request figures
+        """
         run_list: list[Run] = []
         strategy_obj: Strategy | None = None
         model_obj: Model | None = None
@@ -155,6 +231,11 @@ class BenchmarkAnalyzer:
                 stake=Stake(source_task["stake"]),
             )
 
+            # Percentiles, cache, reasoning and per-provider figures are not
+            # in stats.json: they come from the summary of the request metadata
+            summary = summaries.get(run_dir.name, RequestSummary())
+            cache, decode = summary.cache, summary.decode
+
             # Stats - direct 1:1 mapping (no flattening needed)
             stats = Stats(
                 calls_total=source_stats["calls_total"],
@@ -173,6 +254,20 @@ class BenchmarkAnalyzer:
                 cost_total=source_stats["cost_total"],
                 cost_avg=source_stats["cost_avg"],
                 cost_std=source_stats["cost_std"],
+                tokens_cached_total=cache.tokens_cached,
+                cache_hit_ratio=cache.hit_ratio(source_stats["tokens_in_total"]),
+                calls_cached=cache.time_cached.n,
+                calls_uncached=cache.time_uncached.n,
+                time_cached_avg_ms=cache.time_cached.avg,
+                time_uncached_avg_ms=cache.time_uncached.avg,
+                calls_reasoning=decode.tokens_reasoning.n,
+                tokens_reasoning_total=decode.tokens_reasoning.total,
+                tokens_reasoning_avg=decode.tokens_reasoning.avg,
+                tokens_reasoning_std=decode.tokens_reasoning.std(),
+                calls_measured=decode.tokens_out_per_s.n,
+                tokens_out_per_s_avg=decode.tokens_out_per_s.avg,
+                tokens_out_per_s_std=decode.tokens_out_per_s.std(),
+                percentiles=summary.sketches.to_percentiles(),
             )
 
             # Run - direct field mapping
@@ -187,6 +282,8 @@ class BenchmarkAnalyzer:
                 final_round=source_stats["final_round"],
                 providers=tuple(source_stats["providers"].items()),
                 stats=stats,
+                sketches=summary.sketches,
+                provider_partials=summary.providers,
             )
             run_list.append(run)
 
@@ -205,113 +302,13 @@ class BenchmarkAnalyzer:
         )
 
     def _compute_leaderboard_entry(self, runs: tuple[Run, ...]) -> LeaderboardEntry:
-        """Aggregate Runs into a LeaderboardEntry (base stats only)."""
-        n_runs = len(runs)
-
-        # Round statistics
-        rounds = [r.final_round for r in runs]
-        avg_round = sum(rounds) / n_runs
-        std_round = statistics.stdev(rounds) if n_runs > 1 else 0.0
-
-        # Call statistics (sum across runs)
-        calls_total = sum(r.stats.calls_total for r in runs)
-        calls_success = sum(r.stats.calls_success for r in runs)
-        calls_error = sum(r.stats.calls_error for r in runs)
-        calls_failed = sum(r.stats.calls_failed for r in runs)
-
-        # Token totals
-        tokens_in_total = sum(r.stats.tokens_in_total for r in runs)
-        tokens_out_total = sum(r.stats.tokens_out_total for r in runs)
-
-        # Time and cost totals
-        time_total_ms = sum(r.stats.time_total_ms for r in runs)
-        cost_total = sum(r.stats.cost_total for r in runs)
-
-        # Per-call averages (pooled across all runs)
-        if calls_total > 0:
-            tokens_in_avg = tokens_in_total / calls_total
-            tokens_out_avg = tokens_out_total / calls_total
-            time_avg_ms = time_total_ms / calls_total
-            cost_avg = cost_total / calls_total
-        else:
-            tokens_in_avg = tokens_out_avg = time_avg_ms = cost_avg = 0.0
-
-        # Pooled standard deviations (computed from per-run stats)
-        tokens_in_std = self._pooled_std_dev_from_runs(
-            runs, "tokens_in_std", "tokens_in_avg", tokens_in_avg, calls_total
-        )
-        tokens_out_std = self._pooled_std_dev_from_runs(
-            runs, "tokens_out_std", "tokens_out_avg", tokens_out_avg, calls_total
-        )
-        time_std_ms = self._pooled_std_dev_from_runs(
-            runs, "time_std_ms", "time_avg_ms", time_avg_ms, calls_total
-        )
-        cost_std = self._pooled_std_dev_from_runs(
-            runs, "cost_std", "cost_avg", cost_avg, calls_total
-        )
-
-        # Create aggregated Stats
-        aggregated_stats = Stats(
-            calls_total=calls_total,
-            calls_success=calls_success,
-            calls_error=calls_error,
-            calls_failed=calls_failed,
-            tokens_in_total=tokens_in_total,
-            tokens_out_total=tokens_out_total,
-            tokens_in_avg=tokens_in_avg,
-            tokens_out_avg=tokens_out_avg,
-            tokens_in_std=tokens_in_std,
-            tokens_out_std=tokens_out_std,
-            time_total_ms=time_total_ms,
-            time_avg_ms=time_avg_ms,
-            time_std_ms=time_std_ms,
-            cost_total=cost_total,
-            cost_avg=cost_avg,
-            cost_std=cost_std,
-        )
+        """Aggregate Runs into a LeaderboardEntry (base stats only).
 
-        return LeaderboardEntry(
-            run_count=n_runs,
-            run_wins=sum(1 for r in runs if r.run_won),
-            run_completed=sum(1 for r in runs if r.run_completed),
-            avg_round=avg_round,
-            std_round=std_round,
-            stats=aggregated_stats,
-        )
-
-    def _pooled_std_dev_from_runs(
-        self,
-        runs: tuple[Run, ...],
-        std_attr: str,
-        avg_attr: str,
-        overall_mean: float,
-        total_n: int,
-    ) -> float:
-        """Compute pooled standard deviation across multiple runs.
-
-        Uses the formula for pooled variance when combining samples with
-        different means and standard deviations.
-
-        Args:
-            runs: Tuple of Run objects
-            std_attr: Attribute name for std dev on Run.stats (e.g., "tokens_in_std")
-            avg_attr: Attribute name for average on Run.stats (e.g., "tokens_in_avg")
-            overall_mean: The overall mean across all runs
-            total_n: Total number of observations (calls) across all runs
+        Runs are merged as moment partials (see moments.py): counts and
+        totals are summed, averages and standard deviations are pooled.
         """
-        if total_n <= 1:
-            return 0.0
-
-        numerator = 0.0
-        for run in runs:
-            s_i = getattr(run.stats, std_attr)
-            mean_i = getattr(run.stats, avg_attr)
-            n_i = run.stats.calls_total
-
-            numerator += (n_i - 1) * (s_i**2) + n_i * ((mean_i - overall_mean) ** 2)
-
-        pooled_var = numerator / (total_n - 1)
-        return pooled_var**0.5
+        with tracing.span("analyzer.leaderboard_entry", runs=len(runs)):
+            return merge_runs(runs).to_entry()
 
     def create_models_leaderboard(
         self, strategy: Strategy, runs_list: list[Runs]
@@ -374,3 +371,155 @@ class BenchmarkAnalyzer:
             model=model,
             entries=tuple(e[0] for e in entries_with_avg),
         )
+
+    def create_models_slices(
+        self, strategy: Strategy, runs_list: list[Runs]
+    ) -> ModelsLeaderboardSlices:
+        """Create the models leaderboard of a strategy per deck and/or stake.
+
+        Each slice merges the cells of an AggregationCube of the runs, so
+        the runs are only visited once for every slice.
+        """
+        cube = AggregationCube.from_runs(run for runs in runs_list for run in runs.runs)
+        slices = []
+        for deck, stake in cube.slices():
+            entries = []
+            for (vendor, name), partial in cube.rollup(
+                ("vendor", "model"), deck=deck, stake=stake
+            ).items():
+                entry = partial.to_entry()
+                entries.append(
+                    ModelsLeaderboardEntry(
+                        run_count=entry.run_count,
+                        run_wins=entry.run_wins,
+                        run_completed=entry.run_completed,
+                        avg_round=entry.avg_round,
+                        std_round=entry.std_round,
+                        stats=entry.stats,
+                        model=Model(vendor=vendor, name=name),
+                    )
+                )
+            entries.sort(key=lambda e: e.avg_round, reverse=True)
+            slices.append(
+                LeaderboardSlice(deck=deck, stake=stake, entries=tuple(entries))
+            )
+
+        return ModelsLeaderboardSlices(
+            generated_at=int(time.time()),
+            strategy=strategy,
+            slices=tuple(slices),
+        )
+
+    def create_strategies_slices(
+        self, model: Model, runs_list: list[Runs]
+    ) -> StrategiesLeaderboardSlices:
+        """Create the strategies leaderboard of a model per deck and/or stake.
+
+        See create_models_slices.
+        """
+        strategies = {runs.strategy.key: runs.strategy for runs in runs_list}
+        cube = AggregationCube.from_runs(run for runs in runs_list for run in runs.runs)
+        slices = []
+        for deck, stake in cube.slices():
+            entries = []
+            for (key,), partial in cube.rollup(
+                ("strategy",), deck=deck, stake=stake
+            ).items():
+                entry = partial.to_entry()
+                entries.append(
+                    StrategiesLeaderboardEntry(
+                        run_count=entry.run_count,
+                        run_wins=entry.run_wins,
+                        run_completed=entry.run_completed,
+                        avg_round=entry.avg_round,
+                        std_round=entry.std_round,
+                        stats=entry.stats,
+                        strategy=strategies[key],
+                    )
+                )
+            entries.sort(key=lambda e: e.avg_round, reverse=True)
+            slices.append(
+                LeaderboardSlice(deck=deck, stake=stake, entries=tuple(entries))
+            )
+
+        return StrategiesLeaderboardSlices(
+            generated_at=int(time.time()),
+            model=model,
+            slices=tuple(slices),
+        )
+
+    def create_models_paired(
+        self, strategy: Strategy, runs_list: list[Runs]
+    ) -> ModelsPairedComparison:
+        """Create the paired comparison of the models of a strategy.
+
+        Models are compared on the (seed, deck, stake) configurations both
+        have played (see paired.py).
+        """
+        index = SeedIndex.from_runs_list(runs_list, lambda runs: runs.model)
+        return ModelsPairedComparison(
+            generated_at=int(time.time()),
+            strategy=strategy,
+            models=index.competitors,
+            comparison=index.compare(),
+        )
+
+    def create_strategies_paired(
+        self, model: Model, runs_list: list[Runs]
+    ) -> StrategiesPairedComparison:
+        """Create the paired comparison of the strategies of a model.
+
+        See create_models_paired.
+        """
+        index = SeedIndex.from_runs_list(runs_list, lambda runs: runs.strategy)
+        return StrategiesPairedComparison(
+            generated_at=int(time.time()),
+            model=model,
+            strategies=index.competitors,
+            comparison=index.compare(),
+        )
+
+    def create_providers_leaderboard(
+        self, runs_list: list[Runs]
+    ) -> ProvidersLeaderboard:
+        """Create a ProvidersLeaderboard from the Runs of a version.
+
+        Compares providers (and each provider x model) across every run,
+        most used first. Runs without provider partials are skipped.
+        """
+        by_model: dict[Model, dict[str, ProviderPartial]] = {}
+        for runs in runs_list:
+            partials = [run.provider_partials for run in runs.runs]
+            by_model[runs.model] = merge_providers(
+                [by_model.get(runs.model, {}), *(p for p in partials if p is not None)]
+            )
+
+        providers = merge_providers(by_model.values())
+        provider_entries = sorted(
+            (
+                partial.to_entry(provider, None)
+                for provider, partial in providers.items()
+            ),
+            key=lambda e: (-e.calls_total, e.provider),
+        )
+        model_partials = sorted(
+            (
+                (provider, model, partial)
+                for model, grouped in by_model.items()
+                for provider, partial in grouped.items()
+            ),
+            key=lambda item: (
+                item[0],
+                -item[2].calls_total,
+                item[1].vendor,
+                item[1].name,
+            ),
+        )
+        return ProvidersLeaderboard(
+            generated_at=int(time.time()),
+            providers=tuple(provider_entries),
+            models=tuple(
+                partial.to_entry(provider, model)
+                for provider, model, partial in model_partials
+            ),
+        )
@@ -0,0 +1,403 @@
+"""Read run directories directly from tar archives.
+
+An archive given as --input-dir/--runs-dir is exposed as an ArchivePath,
+a read-only path supporting the subset of pathlib used by the analyzer,
+the extractor and the writer (iterdir, is_dir, exists, open, read_bytes,
+stat, ...). Members are read from the archive without extracting it:
+
+    runs-v1.0.0.tar             seek + read (true random access)
+    runs-v1.0.0.tar.gz/.bz2/.xz decompressed stream, seeking forward
+    runs-v1.0.0.tar.zst         same; needs the zstandard package
+                                (or compression.zstd on Python 3.14+)
+
+The first pass over an archive builds an index of its members (offset in
+the uncompressed tar stream, size, mtime). Like the JSONL indexes, it is
+saved in the temp directory, never next to the input archive:
+
+    runs.tar.gz  →  {INDEX_DIR}/{sha1 of the path}.runs.tar.gz.index.json
+
+It is reused while the archive's size and mtime are unchanged, so worker
+processes load it instead of scanning the archive again.
+
+Compressed streams can only seek forward cheaply: reading members in
+archive order is a single decompression pass, going back restarts it.
+A read therefore spools the members that follow it in its directory
+(e.g. the other files of a run) in the same forward pass, so later reads
+of them, in any order, do not restart the stream. Spooled members are
+kept up to SPOOL_BYTES per archive. Plain .tar archives have no such cost.
+"""
+
+import bisect
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import os
+import posixpath
+import stat
+import tarfile
+import tempfile
+import threading
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
+from typing import IO, Any
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+INDEX_DIR = Path(tempfile.gettempdir()) / "balatrobench" / "archives"
+INDEX_SUFFIX = ".index.json"
+INDEX_FORMAT = 2
+
+# Members read ahead from compressed streams are kept up to this size
+SPOOL_BYTES = 64 * 1024 * 1024
+
+# Supported archive suffixes
+ARCHIVE_SUFFIXES = (
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tar.xz",
+    ".tar.zst",
+    ".tzst",
+)
+
+
+def is_archive(path: Path) -> bool:
+    """Check whether a path names a supported tar archive."""
+    return path.is_file() and path.name.endswith(ARCHIVE_SUFFIXES)
+
+
+def index_path(path: Path) -> Path:
+    """Member index path of an archive (in INDEX_DIR)."""
+    digest = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+    return INDEX_DIR / f"{digest}.{path.name}{INDEX_SUFFIX}"
+
+
+def open_archive(path: Path) -> "ArchivePath":
+    """Return the root of an archive as an ArchivePath.
+
+    Archives are cached per process, so their index is loaded once.
+    """
+    path = path.resolve()
+    with _archives_lock:
+        archive = _archives.get(path)
+        if archive is None:
+            archive = _archives[path] = Archive(path)
+    return ArchivePath(path, archive=archive)
+
+
+_archives: dict[Path, "Archive"] = {}
+_archives_lock = threading.Lock()
+
+
+class Archive:
+    """Member index and reader of a tar archive."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.compressed = not path.name.endswith(".tar")
+        self.files: dict[str, tuple[int, int, float]] = {}  # offset, size, mtime
+        self.dirs: dict[str, list[str]] = {"": []}  # member dir → child names
+        self._lock = threading.Lock()
+        self._stream: IO[bytes] | None = None
+        self._fd: int | None = None
+        self._offsets: list[tuple[int, int, str]] | None = None  # sorted files
+        self._spool: dict[str, bytes] = {}  # member → content read ahead
+        self._spool_bytes = 0
+        self._load_index()
+
+    ############################################################################
+    # Index
+    ############################################################################
+
+    def _load_index(self) -> None:
+        """Load the cached index if it is current, otherwise build it."""
+        st = self.path.stat()
+        index_file = index_path(self.path)
+        try:
+            data = json.loads(index_file.read_text())
+            if (
+                data["format"] == INDEX_FORMAT
+                and data["size"] == st.st_size
+                and data["mtime_ns"] == st.st_mtime_ns
+            ):
+                for name, entry in data["files"].items():
+                    self._add_file(name, *entry)
+                for name in data["dirs"]:
+                    self._add_dir(name)
+                return
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        self._build_index()
+        data = {
+            "format": INDEX_FORMAT,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "files": self.files,
+            "dirs": [name for name in self.dirs if name],
+        }
+        try:
+            index_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                dir=index_file.parent, prefix=index_file.name, suffix=".tmp"
+            )
+        except OSError:
+            return  # Unwritable temp directory: the index is not cached
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_name, index_file)
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def _build_index(self) -> None:
+        """Index every member in one pass over the (decompressed) stream."""
+        with (
+            self._open_stream() as stream,
+            tarfile.open(fileobj=stream, mode="r|") as tar,
+        ):
+            for member in tar:
+                name = posixpath.normpath(member.name).lstrip("/")
+                if name == ".":
+                    continue
+                if member.isfile():
+                    self._add_file(name, member.offset_data, member.size, member.mtime)
+                elif member.isdir():
+                    self._add_dir(name)
+
+    def _add_file(self, name: str, offset: int, size: int, mtime: float) -> None:
+        self.files[name] = (offset, size, mtime)
+        self._add_child(name)
+
+    def _add_dir(self, name: str) -> None:
+        if name and name not in self.dirs:
+            self.dirs[name] = []
+            self._add_child(name)
+
+    def _add_child(self, name: str) -> None:
+        """Register a member in its parent directory (creating implicit dirs)."""
+        parent, _, child = name.rpartition("/")
+        self._add_dir(parent)
+        if child not in self.dirs[parent]:
+            self.dirs[parent].append(child)
+
+    ############################################################################
+    # Reading
+    ############################################################################
+
+    def read(self, name: str) -> bytes:
+        """Read the content of a file member."""
+        offset, size, _ = self.files[name]
+        if not self.compressed:
+            with self._lock:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDONLY)
+            return os.pread(self._fd, size, offset)
+
+        with self._lock:
+            data = self._spool.pop(name, None)
+            if data is not None:
+                self._spool_bytes -= len(data)
+                return data
+
+            if self._stream is None or self._stream.tell() > offset:
+                if self._stream is not None:
+                    self._stream.close()
+                self._stream = self._open_stream()
+            for member, member_offset, member_size in self._span(name):
+                self._stream.seek(member_offset)
+                content = self._stream.read(member_size)
+                if member == name:
+                    data = content
+                elif member not in self._spool:
+                    self._spool_add(member, content)
+            assert data is not None
+            return data
+
+    def _span(self, name: str) -> list[tuple[str, int, int]]:
+        """Members from name to the end of the last file after it in its directory.
+
+        Returns (member, offset, size) in archive order, starting with name.
+        """
+        if self._offsets is None:
+            self._offsets = sorted(
+                (offset, size, member)
+                for member, (offset, size, _) in self.files.items()
+            )
+        offset, size, _ = self.files[name]
+        parent = posixpath.dirname(name)
+        end = offset + size
+        for child in self.dirs[parent]:
+            sibling = self.files.get(posixpath.join(parent, child))
+            if sibling is not None and sibling[0] > offset:
+                end = max(end, sibling[0] + sibling[1])
+        start = bisect.bisect_left(self._offsets, (offset, size, name))
+        span = []
+        for member_offset, member_size, member in self._offsets[start:]:
+            if member_offset >= end:
+                break
+            span.append((member, member_offset, member_size))
+        return span
+
+    def _spool_add(self, name: str, data: bytes) -> None:
+        """Keep a member read ahead, evicting the oldest beyond SPOOL_BYTES."""
+        if len(data) > SPOOL_BYTES:
+            return
+        self._spool[name] = data
+        self._spool_bytes += len(data)
+        while self._spool_bytes > SPOOL_BYTES:
+            evicted = self._spool.pop(next(iter(self._spool)))
+            self._spool_bytes -= len(evicted)
+
+    def _open_stream(self) -> IO[bytes]:
+        """Open the uncompressed tar stream of the archive."""
+        name = self.path.name
+        if name.endswith(".tar"):
+            return self.path.open("rb")
+        if name.endswith((".tar.gz", ".tgz")):
+            return gzip.open(self.path, "rb")
+        if name.endswith(".tar.bz2"):
+            return bz2.open(self.path, "rb")
+        if name.endswith(".tar.xz"):
+            return lzma.open(self.path, "rb")
+        if zstd is not None:
+            return zstd.open(self.path, "rb")
+        if zstandard is not None:
+            return _ZstandardReader(self.path)
+        raise ImportError(
+            f"Reading {name} requires the zstandard package (pip install zstandard)"
+        )
+
+
+class _ZstandardReader(io.RawIOBase):
+    """Forward-seekable decompressed stream of a .zst file (zstandard)."""
+
+    def __init__(self, path: Path) -> None:
+        self._file = path.open("rb")
+        self._reader = zstandard.ZstdDecompressor().stream_reader(self._file)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        while size < 0 or size > 0:
+            chunk = self._reader.read(size if size > 0 else 1 << 20)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            self._pos += len(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
+
+    def readinto(self, buffer: Any) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence != io.SEEK_SET or offset < self._pos:
+            raise io.UnsupportedOperation("zstd streams only seek forward")
+        while self._pos < offset:
+            if not self.read(min(offset - self._pos, 1 << 20)):
+                break
+        return self._pos
+
+    def close(self) -> None:
+        self._reader.close()
+        self._file.close()
+        super().close()
+
+
+class ArchivePath(PurePosixPath):
+    """A path inside a tar archive, e.g. runs-v1.tar.zst/v1.0.0/default.
+
+    The archive file itself is the root directory. Supports the read-only
+    subset of pathlib.Path used by balatrobench.
+    """
+
+    def __init__(self, *args: Any, archive: Archive) -> None:
+        super().__init__(*args)
+        self.archive = archive
+
+    def with_segments(self, *pathsegments: Any) -> "ArchivePath":
+        return type(self)(*pathsegments, archive=self.archive)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Worker processes reopen the archive through their own cache
+        return (_unpickle, (self.archive.path, self._member))
+
+    @property
+    def _member(self) -> str:
+        """Member name relative to the archive root ("" for the root)."""
+        rel = self.relative_to(self.archive.path).as_posix()
+        return "" if rel == "." else rel
+
+    def exists(self) -> bool:
+        return self.is_dir() or self.is_file()
+
+    def is_dir(self) -> bool:
+        return self._is_inside() and self._member in self.archive.dirs
+
+    def is_file(self) -> bool:
+        return self._is_inside() and self._member in self.archive.files
+
+    def _is_inside(self) -> bool:
+        return self.is_relative_to(self.archive.path)
+
+    def iterdir(self) -> Iterator["ArchivePath"]:
+        if not self.is_dir():
+            raise NotADirectoryError(str(self))
+        for child in self.archive.dirs[self._member]:
+            yield self / child
+
+    def stat(self) -> os.stat_result:
+        if self.is_file():
+            _, size, mtime = self.archive.files[self._member]
+            return os.stat_result(
+                (stat.S_IFREG | 0o444, 0, 0, 1, 0, 0, size, 0, int(mtime), 0)
+            )
+        if self.is_dir():
+            return os.stat_result((stat.S_IFDIR | 0o555, 0, 0, 1, 0, 0, 0, 0, 0, 0))
+        raise FileNotFoundError(str(self))
+
+    def read_bytes(self) -> bytes:
+        if not self.is_file():
+            raise FileNotFoundError(str(self))
+        return self.archive.read(self._member)
+
+    def read_text(self, encoding: str | None = None) -> str:
+        return self.read_bytes().decode(encoding or "utf-8")
+
+    def open(self, mode: str = "r", encoding: str | None = None) -> IO[Any]:
+        if mode not in ("r", "rt", "rb"):
+            raise io.UnsupportedOperation(f"Archive members are read-only: {mode}")
+        data = io.BytesIO(self.read_bytes())
+        if mode == "rb":
+            return data
+        return io.TextIOWrapper(data, encoding=encoding or "utf-8")
+
+    def resolve(self) -> "ArchivePath":
+        return self
+
+
+def _unpickle(archive_path: Path, member: str) -> ArchivePath:
+    root = open_archive(archive_path)
+    return root / member if member else root
@@ -0,0 +1,732 @@
+"""Benchmark build expressed as a task graph.
+
+The build of a version is planned as a DAG of tasks (see scheduler.py):
+
+    extract:{strategy}/{vendor}/{model}/{run}   cpu   parse JSONL → RunExtract
+                                                      (#{shard} for large runs)
+    summary:{...}/{run}                         io    needs the extracts of the run
+                                                      (RequestSummary, cached)
+    scan:{strategy}/{vendor}/{model}            cpu   parse run stats → Runs
+                                                      (needs the summaries of
+                                                      its extracted runs)
+    requests:{...}/{run}                        io    write request files to
+                                                      both output trees (and
+                                                      convert screenshots to WebP)
+    models-leaderboard:{strategy}               io    needs every scan of the strategy
+                                                      (also slices.json, paired.json)
+    models-runs:{strategy}/{vendor}/{model}     io    needs its scan
+    strategies-leaderboard:{vendor}/{model}     io    needs every scan of the model
+                                                      (also slices.json, paired.json)
+    strategies-runs:{...}                       io    needs its scan
+    providers-leaderboard                       io    needs every scan
+    manifests                                   io    needs everything above
+
+Several versions can share one graph (build_versions): their tasks run
+on the same pools and the manifests are written once at the end.
+
+Each model directory is scanned once and each run extracted once, even
+though the results feed both the models/ and strategies/ output trees.
+responses.jsonl is decoded once per extracted run: scans take the request
+summaries of extracted runs from their extraction and load those of other
+runs from the summary cache (see summary.py).
+The output layout is identical to the original sequential build.
+
+Completed units (runs files, leaderboards, request files of a run per
+output tree) are recorded in a journal (see journal.py), so an
+interrupted build can be resumed.
+"""
+
+import re
+import shutil
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import replace
+from functools import partial
+from pathlib import Path
+
+from .analyzer import BenchmarkAnalyzer, _subdirs
+from .extractor import RunExtract, extract_run, merge_run_extracts
+from .journal import NULL_JOURNAL, BuildJournal, NullJournal
+from .jsonl import shard_ids
+from .models import Model, Runs
+from .profiling import NULL_PROFILER, BuildProfiler
+from .scheduler import TaskGraph
+from .scope import FULL_SCOPE, BuildScope
+from .summary import RequestSummary, save_summary
+from .writer import BenchmarkWriter
+
+# Module-level compiled regex patterns for version strings
+VERSION_PATTERN = re.compile(r"^v\d+\.\d+\.\d+$")
+VERSION_PARTS_PATTERN = re.compile(r"^v(\d+)\.(\d+)\.(\d+)$")
+
+# Runs with larger requests.jsonl + responses.jsonl are extracted in shards
+# of this size
+SHARD_BYTES = 32 * 1024 * 1024
+
+# Output trees under the base output directory
+MODELS_DIRNAME = "models"
+STRATEGIES_DIRNAME = "strategies"
+PROVIDERS_DIRNAME = "providers"
+
+
+def build_version(
+    input_dir: Path,
+    output_dir: Path,
+    version: str,
+    *,
+    webp: bool = False,
+    delta_context: bool = False,
+    scope: BuildScope = FULL_SCOPE,
+    resume: bool = False,
+    cpu_workers: int | None = None,
+    io_workers: int | None = None,
+    profiler: BuildProfiler = NULL_PROFILER,
+) -> None:
+    """Build the models/ and strategies/ trees of a version and the manifests.
+
+    Args:
+        input_dir: Version directory with run data (e.g., runs/v1.0.0)
+        output_dir: Base output directory (e.g., site/benchmarks)
+        version: Version string for output paths
+        webp: Convert PNG screenshots to WebP
+        delta_context: Write gamestate/memory as one delta-encoded
+            context.json per run
+        scope: Subtree to rebuild (default: everything)
+        resume: Skip units completed by an interrupted build
+        cpu_workers: Worker processes for parsing (0 = inline)
+        io_workers: Worker threads for writing
+        profiler: Receives per-stage timings
+    """
+    build_versions(
+        {version: input_dir},
+        output_dir,
+        webp=webp,
+        delta_context=delta_context,
+        scope=scope,
+        resume=resume,
+        cpu_workers=cpu_workers,
+        io_workers=io_workers,
+        profiler=profiler,
+    )
+
+
+def build_versions(
+    version_dirs: Mapping[str, Path],
+    output_dir: Path,
+    *,
+    webp: bool = False,
+    delta_context: bool = False,
+    scope: BuildScope = FULL_SCOPE,
+    resume: bool = False,
+    cpu_workers: int | None = None,
+    io_workers: int | None = None,
+    profiler: BuildProfiler = NULL_PROFILER,
+) -> None:
+    """Build several versions on shared worker pools.
+
+    All versions are planned into one task graph, so runs of different
+    versions are parsed and written concurrently. The manifests are
+    written once, after every version is built, with the highest built
+    version as latest.
+
+    Args:
+        version_dirs: Version string → version directory with run data
+        output_dir: Base output directory (e.g., site/benchmarks)
+        webp: Convert PNG screenshots to WebP
+        delta_context: Write gamestate/memory as one delta-encoded
+            context.json per run
+        scope: Subtree to rebuild (default: everything)
+        resume: Skip units completed by an interrupted build
+        cpu_workers: Worker processes for parsing (0 = inline)
+        io_workers: Worker threads for writing
+        profiler: Receives per-stage timings
+    """
+    if not version_dirs:
+        raise FileNotFoundError("No versions to build")
+    for input_dir in version_dirs.values():
+        if not input_dir.is_dir():
+            raise FileNotFoundError(f"Version directory not found: {input_dir}")
+
+    if webp and shutil.which("cwebp") is None:
+        print("Warning: cwebp not found, keeping PNG format")
+        webp = False
+
+    if delta_context and scope.requests:
+        # context.json encodes whole runs, so selected runs are rewritten whole
+        print("Warning: request filters are ignored with delta context files")
+        scope = replace(scope, requests=())
+
+    journal = BuildJournal(
+        output_dir,
+        resume=resume,
+        options={"webp": webp, "delta_context": delta_context},
+    )
+    graph = TaskGraph()
+    deps: list[str] = []
+    for version, input_dir in version_dirs.items():
+        deps += plan_version(
+            graph,
+            input_dir,
+            output_dir,
+            version,
+            webp=webp,
+            delta_context=delta_context,
+            scope=scope,
+            journal=journal,
+            profiler=profiler,
+        )
+
+    versions = sorted(version_dirs, key=_version_sort_key, reverse=True)
+    graph.add(
+        "manifests",
+        partial(_write_manifests, output_dir, versions, versions[0], profiler),
+        deps,
+        stage="manifests",
+        count=int,
+    )
+    if resume:
+        print(f"Resuming build: {len(graph.tasks) - 1} tasks left")
+    try:
+        with profiler.profile("build"):
+            graph.run(cpu_workers=cpu_workers, io_workers=io_workers, profiler=profiler)
+    except BaseException:
+        journal.close()
+        raise
+    journal.close(completed=True)
+
+
+def find_version_dirs(
+    runs_dir: Path, versions: Sequence[str] | None = None
+) -> dict[str, Path]:
+    """Find the version directories of a runs root (e.g., runs/).
+
+    Args:
+        runs_dir: Directory containing version directories (v1.0.0, ...)
+        versions: Versions to select (default: every version found)
+
+    Returns a version → directory mapping, oldest version first.
+    Raises FileNotFoundError if a selected version does not exist.
+    """
+    found = {version: runs_dir / version for version in _find_versions(runs_dir)}
+    if versions is not None:
+        missing = [version for version in versions if version not in found]
+        if missing:
+            raise FileNotFoundError(
+                f"Version directories not found in {runs_dir}: {', '.join(missing)}"
+            )
+        found = {version: found[version] for version in versions}
+    return dict(sorted(found.items(), key=lambda item: _version_sort_key(item[0])))
+
+
+def plan_version(
+    graph: TaskGraph,
+    input_dir: Path,
+    output_dir: Path,
+    version: str,
+    *,
+    webp: bool = False,
+    delta_context: bool = False,
+    scope: BuildScope = FULL_SCOPE,
+    journal: BuildJournal | NullJournal = NULL_JOURNAL,
+    profiler: BuildProfiler = NULL_PROFILER,
+) -> list[str]:
+    """Add the tasks building one version to a graph.
+
+    Task names are prefixed with the version so several versions can share
+    a graph. Returns the names of the tasks a manifest must wait for.
+
+    With a partial scope, only the selected model directories get their runs
+    and request files rewritten (request files only for selected runs).
+    The leaderboards they appear in are rebuilt from a scan of all siblings;
+    the providers leaderboard covers every run, so every model directory is
+    scanned. Scans of runs that are not extracted load their request
+    summaries from the cache rather than decoding responses.jsonl.
+
+    Units already complete in the journal are not planned; a model directory
+    is only scanned if one of the units depending on it is still pending.
+    """
+    analyzer = BenchmarkAnalyzer(runs_dir=input_dir.parent, output_dir=output_dir)
+    models_writer = BenchmarkWriter(
+        output_dir / MODELS_DIRNAME, profiler=profiler, delta_context=delta_context
+    )
+    strategies_writer = BenchmarkWriter(
+        output_dir / STRATEGIES_DIRNAME, profiler=profiler, delta_context=delta_context
+    )
+    providers_writer = BenchmarkWriter(
+        output_dir / PROVIDERS_DIRNAME, profiler=profiler
+    )
+
+    # Leaderboards containing a selected model are rebuilt, which needs the
+    # Runs of every sibling; siblings are scanned but not rewritten.
+    model_dirs = [
+        model_dir
+        for strategy_dir in _subdirs(input_dir)
+        for vendor_dir in _subdirs(strategy_dir)
+        for model_dir in _subdirs(vendor_dir)
+    ]
+    selected = {model_dir for model_dir in model_dirs if scope.selects(model_dir)}
+    affected_strategies = {
+        strategy_dir.name
+        for strategy_dir in _subdirs(input_dir)
+        if scope.is_full
+        or any(model_dir.parent.parent == strategy_dir for model_dir in selected)
+    }
+    affected_models = {_model_key(model_dir) for model_dir in selected}
+    # Runs partially rewritten (selected requests only) are not journaled
+    requests_journal = NULL_JOURNAL if scope.requests else journal
+
+    # Leaderboards still to write
+    models_leaderboards = {
+        strategy_name: f"{version}:models-leaderboard:{strategy_name}"
+        for strategy_name in affected_strategies
+    }
+    strategies_leaderboards = {
+        model_key: f"{version}:strategies-leaderboard:{model_key}"
+        for model_key in affected_models
+    }
+    for pending in (models_leaderboards, strategies_leaderboards):
+        for key, unit in list(pending.items()):
+            if journal.is_complete(unit):
+                del pending[key]
+
+    scans_by_strategy: dict[str, list[str]] = {name: [] for name in models_leaderboards}
+    scans_by_model: dict[str, list[str]] = {key: [] for key in strategies_leaderboards}
+    providers_leaderboard: str | None = f"{version}:providers-leaderboard"
+    if journal.is_complete(providers_leaderboard):
+        providers_leaderboard = None
+    scans: list[str] = []
+    outputs: list[str] = []
+
+    for model_dir in model_dirs:
+        strategy_name = model_dir.parent.parent.name
+        model_key = _model_key(model_dir)
+        rel = f"{strategy_name}/{model_key}"
+
+        # Units of this model directory still to write
+        units: list[tuple[str, Callable[..., list[Path]], str | None]] = []
+        if model_dir in selected:
+            units += [
+                (
+                    f"{version}:models-runs:{rel}",
+                    partial(_write_model_runs, models_writer, version),
+                    "runs",
+                ),
+                (
+                    f"{version}:strategies-runs:{rel}",
+                    partial(_write_strategy_runs, strategies_writer, version),
+                    "runs",
+                ),
+            ]
+        units = [unit for unit in units if not journal.is_complete(unit[0])]
+
+        run_units: list[tuple[Path, dict[str, str]]] = []
+        if model_dir in selected:
+            for run_dir in _subdirs(model_dir):
+                if not scope.matches_run(run_dir.name):
+                    continue
+                trees = {
+                    tree: f"{version}:{tree}-requests:{rel}/{run_dir.name}"
+                    for tree in (MODELS_DIRNAME, STRATEGIES_DIRNAME)
+                }
+                trees = {
+                    tree: unit
+                    for tree, unit in trees.items()
+                    if not requests_journal.is_complete(unit)
+                }
+                if trees:
+                    run_units.append((run_dir, trees))
+
+        if not (
+            units
+            or run_units
+            or strategy_name in models_leaderboards
+            or model_key in strategies_leaderboards
+            or providers_leaderboard
+        ):
+            continue
+
+        # Extract selected runs first: the scan reuses their request summaries
+        run_extracts: list[tuple[Path, dict[str, str], list[str]]] = []
+        summaries: list[str] = []
+        for run_dir, trees in run_units:
+            shards = [list(scope.requests)] if scope.requests else _run_shards(run_dir)
+            extracts = [
+                graph.add(
+                    f"{version}:extract:{rel}/{run_dir.name}"
+                    + (f"#{i}" if len(shards) > 1 else ""),
+                    partial(extract_complete_run, run_dir, ids),
+                    pool="cpu",
+                    stage="extract",
+                )
+                for i, ids in enumerate(shards)
+            ]
+            run_extracts.append((run_dir, trees, extracts))
+            # Filtered extracts only hold some requests of the run
+            if not scope.requests:
+                summaries.append(
+                    graph.add(
+                        f"{version}:summary:{rel}/{run_dir.name}",
+                        partial(summarize_extracts, run_dir),
+                        extracts,
+                    )
+                )
+
+        scan = graph.add(
+            f"{version}:scan:{rel}",
+            partial(compute_runs, model_dir),
+            summaries,
+            pool="cpu",
+            stage="scan",
+            count=lambda runs: len(runs.runs) if runs else 0,
+        )
+        if strategy_name in scans_by_strategy:
+            scans_by_strategy[strategy_name].append(scan)
+        if model_key in scans_by_model:
+            scans_by_model[model_key].append(scan)
+        scans.append(scan)
+
+        for unit, write, stage in units:
+            outputs.append(
+                graph.add(
+                    unit,
+                    partial(_journaled, journal, unit, write),
+                    [scan],
+                    stage=stage,
+                    count=len,
+                )
+            )
+
+        for run_dir, trees, extracts in run_extracts:
+            outputs.append(
+                graph.add(
+                    f"{version}:requests:{rel}/{run_dir.name}",
+                    partial(
+                        _write_requests,
+                        models_writer,
+                        strategies_writer,
+                        version,
+                        strategy_name,
+                        trees,
+                        requests_journal,
+                        webp,
+                        not scope.requests,
+                    ),
+                    [scan, *extracts],
+                )
+            )
+
+    for strategy_name, unit in models_leaderboards.items():
+        write = partial(
+            _write_models_leaderboard, analyzer, models_writer, version, strategy_name
+        )
+        outputs.append(
+            graph.add(
+                unit,
+                partial(_journaled, journal, unit, write),
+                scans_by_strategy[strategy_name],
+                stage="leaderboards",
+                count=len,
+            )
+        )
+
+    for model_key, unit in strategies_leaderboards.items():
+        write = partial(
+            _write_strategies_leaderboard,
+            analyzer,
+            strategies_writer,
+            version,
+            model_key,
+        )
+        outputs.append(
+            graph.add(
+                unit,
+                partial(_journaled, journal, unit, write),
+                scans_by_model[model_key],
+                stage="leaderboards",
+                count=len,
+            )
+        )
+
+    if providers_leaderboard:
+        write = partial(
+            _write_providers_leaderboard, analyzer, providers_writer, version
+        )
+        outputs.append(
+            graph.add(
+                providers_leaderboard,
+                partial(_journaled, journal, providers_leaderboard, write),
+                scans,
+                stage="leaderboards",
+                count=len,
+            )
+        )
+
+    return outputs
+
+
+def _run_shards(run_dir: Path) -> list[list[str] | None]:
+    """Split a large run into request shards extracted in parallel.
+
+    Runs up to SHARD_BYTES of requests.jsonl and responses.jsonl are
+    extracted as a whole.
+    """
+    files = [run_dir / "requests.jsonl", run_dir / "responses.jsonl"]
+    if sum(f.stat().st_size for f in files if f.is_file()) <= SHARD_BYTES:
+        return [None]
+    return list(shard_ids(files, SHARD_BYTES))
+
+
+def _model_key(model_dir: Path) -> str:
+    """Return "vendor/model" of a model directory."""
+    return f"{model_dir.parent.name}/{model_dir.name}"
+
+
+################################################################################
+# CPU tasks (run in worker processes, must be picklable)
+################################################################################
+
+
+def compute_runs(
+    model_dir: Path, *summaries: tuple[str, RequestSummary] | None
+) -> Runs | None:
+    """Compute Runs from a model's run directories.
+
+    summaries are the (run directory name, summary) of its extracted runs;
+    the other runs are summarized through the summary cache.
+    """
+    analyzer = BenchmarkAnalyzer()
+    extracted = dict(summary for summary in summaries if summary is not None)
+    cached = analyzer._summarize_runs(model_dir, cache=True, skip=extracted)
+    return analyzer._compute_runs(model_dir, cached | extracted)
+
+
+def extract_complete_run(
+    run_dir: Path, ids: list[str] | None = None
+) -> RunExtract | None:
+    """Extract a run (or the requests ids of it), skipping incomplete runs."""
+    if not (run_dir / "stats.json").exists() or not (run_dir / "task.json").exists():
+        return None
+    return extract_run(run_dir, ids)
+
+
+################################################################################
+# I/O tasks
+################################################################################
+
+
+def summarize_extracts(
+    run_dir: Path, *shards: RunExtract | None
+) -> tuple[str, RequestSummary] | None:
+    """Summarize the request metadata of an extracted run and cache it.
+
+    Returns (run directory name, summary), or None for an incomplete run.
+    """
+    if not shards or None in shards:
+        return None
+    summary = shards[0].summary if len(shards) == 1 else None
+    if summary is None:
+        summary = RequestSummary.from_requests(
+            request for shard in shards for request in shard.metadata.values()
+        )
+    save_summary(run_dir / "responses.jsonl", summary)
+    return run_dir.name, summary
+
+
+def _journaled(
+    journal: BuildJournal | NullJournal,
+    unit: str,
+    write: Callable[..., list[Path]],
+    *args: object,
+) -> list[Path]:
+    """Run a write task and record its files in the journal."""
+    written = write(*args)
+    journal.record(unit, written)
+    return written
+
+
+def _write_model_runs(
+    writer: BenchmarkWriter, version: str, runs: Runs | None
+) -> list[Path]:
+    """Write {strategy}/{vendor}/{model}.json."""
+    if runs is None:
+        return []
+    return [writer.write_runs(runs, version, runs.strategy.key)]
+
+
+def _write_strategy_runs(
+    writer: BenchmarkWriter, version: str, runs: Runs | None
+) -> list[Path]:
+    """Write {vendor}/{model}/{strategy}/runs.json."""
+    if runs is None:
+        return []
+    return [
+        writer.write_strategy_runs(runs, version, runs.model.vendor, runs.model.name)
+    ]
+
+
+def _write_requests(
+    models_writer: BenchmarkWriter,
+    strategies_writer: BenchmarkWriter,
+    version: str,
+    strategy_name: str,
+    trees: dict[str, str],
+    journal: BuildJournal | NullJournal,
+    webp: bool,
+    series: bool,
+    runs: Runs | None,
+    *shards: RunExtract | None,
+) -> list[Path]:
+    """Write the request files of an extracted run to the given output trees.
+
+    Each tree is journaled as its own unit (trees maps tree → unit), with
+    screenshots already converted to WebP if enabled. series is False when
+    only some requests were extracted (request filter), so the series.json
+    of the full run is kept.
+    """
+    if runs is None or None in shards:
+        return []
+
+    run = merge_run_extracts(shards)
+    strategy_key = runs.strategy.key
+    vendor, model_name = runs.model.vendor, runs.model.name
+    output_bases = {
+        MODELS_DIRNAME: models_writer.output_dir
+        / version
+        / strategy_key
+        / vendor
+        / model_name,
+        STRATEGIES_DIRNAME: strategies_writer.output_dir
+        / version
+        / vendor
+        / model_name
+        / strategy_key,
+    }
+
+    written: list[Path] = []
+    for tree, unit in trees.items():
+        # The strategies tree locates runs by strategy key rather than directory name
+        if tree == STRATEGIES_DIRNAME and strategy_key != strategy_name:
+            files = []
+        else:
+            files = models_writer.write_run_requests(
+                run, [output_bases[tree]], series=series
+            )
+        if webp:
+            files = models_writer.convert_screenshots_to_webp(files)
+        journal.record(unit, files)
+        written += files
+    return written
+
+
+def _write_models_leaderboard(
+    analyzer: BenchmarkAnalyzer,
+    writer: BenchmarkWriter,
+    version: str,
+    strategy_name: str,
+    *scanned: Runs | None,
+) -> list[Path]:
+    """Write the models leaderboard of a strategy."""
+    runs_list = [runs for runs in scanned if runs is not None]
+    print(f"  Strategy '{strategy_name}': {len(runs_list)} models")
+    if not runs_list:
+        return []
+
+    strategy = runs_list[0].strategy
+    leaderboard = analyzer.create_models_leaderboard(strategy, runs_list)
+    slices = analyzer.create_models_slices(strategy, runs_list)
+    paired = analyzer.create_models_paired(strategy, runs_list)
+    return [
+        writer.write_models_leaderboard(leaderboard, version, strategy.key),
+        writer.write_models_slices(slices, version, strategy.key),
+        writer.write_models_paired(paired, version, strategy.key),
+    ]
+
+
+def _write_strategies_leaderboard(
+    analyzer: BenchmarkAnalyzer,
+    writer: BenchmarkWriter,
+    version: str,
+    model_key: str,
+    *scanned: Runs | None,
+) -> list[Path]:
+    """Write the strategies leaderboard of a model."""
+    runs_list = [runs for runs in scanned if runs is not None]
+    print(f"  Model '{model_key}': {len(runs_list)} strategies")
+    if not runs_list:
+        return []
+
+    vendor, model_name = model_key.split("/", 1)
+    model = Model(vendor=vendor, name=model_name)
+    leaderboard = analyzer.create_strategies_leaderboard(model, runs_list)
+    slices = analyzer.create_strategies_slices(model, runs_list)
+    paired = analyzer.create_strategies_paired(model, runs_list)
+    return [
+        writer.write_strategies_leaderboard(leaderboard, version, model_key),
+        writer.write_strategies_slices(slices, version, model_key),
+        writer.write_strategies_paired(paired, version, model_key),
+    ]
+
+
+def _write_providers_leaderboard(
+    analyzer: BenchmarkAnalyzer,
+    writer: BenchmarkWriter,
+    version: str,
+    *scanned: Runs | None,
+) -> list[Path]:
+    """Write the providers leaderboard of a version."""
+    runs_list = [runs for runs in scanned if runs is not None]
+    if not runs_list:
+        return []
+
+    leaderboard = analyzer.create_providers_leaderboard(runs_list)
+    print(f"  Providers: {len(leaderboard.providers)}")
+    return [writer.write_providers_leaderboard(leaderboard, version)]
+
+
+def _write_manifests(
+    output_dir: Path,
+    versions: list[str],
+    latest_version: str,
+    profiler: BuildProfiler,
+    *_: object,
+) -> int:
+    """Write manifest.json of every output tree.
+
+    Built versions are merged with the versions already present on disk.
+    """
+    print("\nGenerating manifests...")
+    models_output_dir = output_dir / MODELS_DIRNAME
+    existing_versions = _find_versions(models_output_dir)
+    for version in versions:
+        if version not in existing_versions:
+            existing_versions.append(version)
+    existing_versions.sort(key=_version_sort_key, reverse=True)
+
+    for dirname in (MODELS_DIRNAME, STRATEGIES_DIRNAME, PROVIDERS_DIRNAME):
+        writer = BenchmarkWriter(output_dir / dirname, profiler=profiler)
+        writer.write_manifest(existing_versions, latest_version)
+    return 3
+
+
+################################################################################
+# Versions
+################################################################################
+
+
+def _find_versions(base_dir: Path) -> list[str]:
+    """Find existing version directories."""
+    if not base_dir.exists():
+        return []
+
+    return [
+        item.name
+        for item in base_dir.iterdir()
+        if item.is_dir() and VERSION_PATTERN.match(item.name)
+    ]
+
+
+def _version_sort_key(version: str) -> tuple[int, int, int]:
+    """Convert version string to sortable tuple."""
+    match = VERSION_PARTS_PATTERN.match(version)
+    if match:
+        return (int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    return (0, 0, 0)
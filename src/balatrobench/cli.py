@@ -1,18 +1,24 @@
 """CLI entry point for balatrobench command."""
 
 import argparse
-import re
 import sys
 from pathlib import Path
 
-from . import __version__
-from .analyzer import BenchmarkAnalyzer
-from .models import Model
-from .writer import BenchmarkWriter
-
-# Module-level compiled regex patterns for version strings
-VERSION_PATTERN = re.compile(r"^v\d+\.\d+\.\d+$")
-VERSION_PARTS_PATTERN = re.compile(r"^v(\d+)\.(\d+)\.(\d+)$")
+from . import __version__, tracing
+from .archive import ArchivePath, is_archive, open_archive
+from .build import (
+    VERSION_PATTERN,
+    _find_versions,
+    _version_sort_key,
+    build_versions,
+    find_version_dirs,
+)
+from .decoding import get_decoder
+from .export import EXPORT_FORMATS, export_version, require_pyarrow
+from .profiling import BuildProfiler
+from .scheduler import DEFAULT_IO_WORKERS
+from .scope import BuildScope
+from .store import load_version, open_store
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -22,11 +28,18 @@ def create_parser() -> argparse.ArgumentParser:
         description="Analyze BalatroLLM runs and generate benchmark data",
     )
 
-    parser.add_argument(
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument(
         "--input-dir",
         type=Path,
-        required=True,
-        help="Input directory with run data (e.g., runs/v1.0.0)",
+        help="Input directory with run data (e.g., runs/v1.0.0), "
+        "or a .tar/.tar.gz/.tar.zst archive of it",
+    )
+    inputs.add_argument(
+        "--runs-dir",
+        type=Path,
+        help="Runs root with version directories (e.g., runs, or an archive "
+        "of it); builds every version (or those given by --versions) in one batch",
     )
     parser.add_argument(
         "--output-dir",
@@ -39,11 +52,103 @@ def create_parser() -> argparse.ArgumentParser:
         type=str,
         help="Version string for output paths (default: inferred from input-dir)",
     )
+    parser.add_argument(
+        "--versions",
+        nargs="+",
+        metavar="VERSION",
+        help="With --runs-dir, only build these versions (e.g., v1.0.0 v1.1.0)",
+    )
+    scope = parser.add_argument_group(
+        "partial rebuild",
+        "Only rewrite the selected subtree; leaderboards containing it are "
+        "rebuilt from all siblings",
+    )
+    scope.add_argument("--strategy", nargs="+", metavar="NAME", help="Strategies")
+    scope.add_argument("--vendor", nargs="+", metavar="NAME", help="Vendors")
+    scope.add_argument(
+        "--model", nargs="+", metavar="NAME", help="Models (name or vendor/name)"
+    )
+    scope.add_argument(
+        "--run", nargs="+", metavar="ID", help="Run directories (request files)"
+    )
+    scope.add_argument(
+        "--request",
+        nargs="+",
+        metavar="ID",
+        help="Request ids within the selected runs, e.g. request-00213",
+    )
     parser.add_argument(
         "--webp",
         action="store_true",
         help="Enable PNG to WebP conversion",
     )
+    parser.add_argument(
+        "--delta-context",
+        action="store_true",
+        help="Store gamestate/memory of each run in one delta-encoded "
+        "context.json instead of per-request .md files",
+    )
+    parser.add_argument(
+        "--export",
+        choices=sorted(EXPORT_FORMATS),
+        help="Also export the runs and requests of each version as columnar "
+        "tables (parquet or arrow IPC; requires pyarrow)",
+    )
+    parser.add_argument(
+        "--export-dir",
+        type=Path,
+        default=Path("exports"),
+        metavar="DIR",
+        help="Base directory for --export tables (default: exports)",
+    )
+    parser.add_argument(
+        "--sqlite",
+        type=Path,
+        metavar="FILE",
+        help="Also load the runs and requests of each version into the "
+        "SQLite database FILE (created if missing)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted build, skipping units whose outputs are "
+        "recorded in the build journal, unchanged and built with the same options",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Worker processes for parsing runs (default: CPU count; 0 parses inline)",
+    )
+    parser.add_argument(
+        "--io-workers",
+        type=int,
+        default=DEFAULT_IO_WORKERS,
+        metavar="N",
+        help=f"Worker threads for writing output (default: {DEFAULT_IO_WORKERS})",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        nargs="?",
+        const=Path("."),
+        metavar="DIR",
+        help="Record per-stage timings and write build-report.json to DIR "
+        "(default: current directory)",
+    )
+    parser.add_argument(
+        "--pstats",
+        action="store_true",
+        help="With --profile, also dump cProfile stats of the build process "
+        "(build.pstats) and of each stage run in worker processes",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        metavar="FILE",
+        help="Record tracing spans to FILE (.jsonl for JSON lines, "
+        "otherwise Chrome trace_event JSON)",
+    )
 
     return parser
 
@@ -65,150 +170,165 @@ def main() -> None:
     parser = create_parser()
     args = parser.parse_args()
 
+    if args.runs_dir is not None and args.version:
+        parser.error("--version cannot be used with --runs-dir")
+    if args.runs_dir is None and args.versions:
+        parser.error("--versions requires --runs-dir")
+    if args.export:
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
     # Determine input directory
-    input_dir = args.input_dir.resolve()
+    input_dir = (args.input_dir or args.runs_dir).resolve()
 
     if not input_dir.exists():
         print(f"Error: Input directory not found: {input_dir}")
         sys.exit(1)
 
-    # Determine version
-    version = args.version or infer_version(input_dir)
-    if not version.startswith("v"):
-        version = f"v{version}"
+    if is_archive(input_dir):
+        try:
+            input_dir = _archive_input_dir(
+                open_archive(input_dir), single_version=args.runs_dir is None
+            )
+        except (ImportError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    # Determine versions
+    if args.runs_dir is not None:
+        versions = [_normalize_version(v) for v in args.versions or ()] or None
+        try:
+            version_dirs = find_version_dirs(input_dir, versions)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    else:
+        version = _normalize_version(args.version or infer_version(input_dir))
+        version_dirs = {version: input_dir}
+
+    scope = BuildScope(
+        strategies=tuple(args.strategy or ()),
+        vendors=tuple(args.vendor or ()),
+        models=tuple(args.model or ()),
+        runs=tuple(args.run or ()),
+        requests=tuple(args.request or ()),
+    )
 
     output_dir = args.output_dir.resolve()
     print(f"Analyzing runs from: {input_dir}")
     print(f"Output directory: {output_dir}")
-    print(f"Version: {version}")
+    if args.runs_dir is None:
+        print(f"Version: {version}")
+    else:
+        print(f"Versions: {', '.join(version_dirs) or 'none found'}")
+    if not scope.is_full:
+        print(f"Scope: {_describe_scope(scope)}")
+
+    profiler = BuildProfiler(
+        enabled=args.profile is not None,
+        pstats_dir=args.profile if args.profile is not None and args.pstats else None,
+    )
+    exporter = tracing.exporter_for_path(args.trace.resolve()) if args.trace else None
+    if exporter is not None:
+        tracing.add_exporter(exporter)
 
     try:
-        analyzer = BenchmarkAnalyzer(runs_dir=input_dir.parent, output_dir=output_dir)
-
-        # --- Models analysis ---
-        print("\n=== Analyzing models within strategies ===")
-        models_output_dir = output_dir / "models"
-        models_writer = BenchmarkWriter(models_output_dir)
-
-        models_by_strategy = analyzer.analyze_models(input_dir)
-
-        for strategy_name, runs_list in models_by_strategy.items():
-            print(f"  Strategy '{strategy_name}': {len(runs_list)} models")
-
-            if not runs_list:
-                continue
-
-            # Get strategy from first Runs
-            strategy = runs_list[0].strategy
-            strategy_key = strategy.key
-
-            # Write leaderboard
-            leaderboard = analyzer.create_models_leaderboard(strategy, runs_list)
-            models_writer.write_models_leaderboard(leaderboard, version, strategy_key)
-
-            # Write model runs and request files
-            for runs in runs_list:
-                models_writer.write_runs(runs, version, strategy_key)
-
-                # Write per-request files for each run
-                for run in runs.runs:
-                    run_dir = (
-                        input_dir
-                        / strategy_name
-                        / runs.model.vendor
-                        / runs.model.name
-                        / run.id
-                    )
-                    if run_dir.exists():
-                        output_base = (
-                            models_output_dir
-                            / version
-                            / strategy_key
-                            / runs.model.vendor
-                            / runs.model.name
-                        )
-                        models_writer.write_request_files(run_dir, output_base)
-
-        # --- Strategies analysis ---
-        print("\n=== Analyzing strategies for each model ===")
-        strategies_output_dir = output_dir / "strategies"
-        strategies_writer = BenchmarkWriter(strategies_output_dir)
-
-        strategies_by_model = analyzer.analyze_strategies(input_dir)
-
-        for model_key, runs_list in strategies_by_model.items():
-            print(f"  Model '{model_key}': {len(runs_list)} strategies")
-
-            if not runs_list:
-                continue
-
-            vendor, model_name = model_key.split("/", 1)
-            model = Model(vendor=vendor, name=model_name)
-
-            # Create leaderboard for this model (comparing strategies)
-            leaderboard = analyzer.create_strategies_leaderboard(model, runs_list)
-            strategies_writer.write_strategies_leaderboard(
-                leaderboard, version, model_key
-            )
-
-            # Write strategy runs and request files
-            for runs in runs_list:
-                strategies_writer.write_strategy_runs(runs, version, vendor, model_name)
-
-                # Write per-request files for each run
-                strategy_key = runs.strategy.key
-                for run in runs.runs:
-                    # Find run directory in input
-                    run_dir = input_dir / strategy_key / vendor / model_name / run.id
-                    if run_dir.exists():
-                        strategies_writer.write_strategy_request_files(
-                            run_dir, version, vendor, model_name, strategy_key, run.id
-                        )
-
-        # Convert PNGs to WebP if enabled
-        if args.webp:
-            print("\nConverting PNG screenshots to WebP format...")
-            models_writer.convert_pngs_to_webp(models_output_dir / version)
-            strategies_writer.convert_pngs_to_webp(strategies_output_dir / version)
-
-        # Generate manifests
-        print("\nGenerating manifests...")
-        existing_versions = _find_versions(models_output_dir)
-        if version not in existing_versions:
-            existing_versions.append(version)
-        existing_versions.sort(key=_version_sort_key, reverse=True)
-
-        models_writer.write_manifest(existing_versions, version)
-        strategies_writer.write_manifest(existing_versions, version)
+        print("\n=== Building models, strategies and providers leaderboards ===")
+        build_versions(
+            version_dirs,
+            output_dir,
+            webp=args.webp,
+            delta_context=args.delta_context,
+            scope=scope,
+            resume=args.resume,
+            cpu_workers=args.workers,
+            io_workers=args.io_workers,
+            profiler=profiler,
+        )
 
         print(f"\nBenchmark analysis complete. Results saved to {output_dir}")
 
+        if args.export:
+            export_dir = args.export_dir.resolve()
+            print(f"\n=== Exporting {args.export} tables ===")
+            for version_dir in version_dirs.values():
+                export_version(version_dir, export_dir, args.export, scope)
+            print(f"Tables exported to {export_dir}")
+
+        if args.sqlite:
+            print("\n=== Loading SQLite store ===")
+            conn = open_store(args.sqlite.resolve())
+            try:
+                for version_dir in version_dirs.values():
+                    load_version(conn, version_dir, scope)
+            finally:
+                conn.close()
+            print(f"Runs and requests loaded into {args.sqlite}")
+
+        if args.profile is not None:
+            profiler.print_summary()
+            report_path = profiler.write_report(
+                args.profile.resolve(),
+                version=max(version_dirs, key=_version_sort_key),
+                versions=list(version_dirs),
+                input_dir=str(input_dir),
+                json_backend=get_decoder().backend,
+            )
+            print(f"Build report written to {report_path}")
+
     except FileNotFoundError as e:
         print(f"Error: {e}")
         sys.exit(1)
     except Exception as e:
         print(f"Benchmark analysis failed: {e}")
         raise
+    finally:
+        if exporter is not None:
+            tracing.remove_exporter(exporter)
+            print(f"Trace written to {args.trace}")
 
 
-def _find_versions(base_dir: Path) -> list[str]:
-    """Find existing version directories."""
-    if not base_dir.exists():
-        return []
+def _archive_input_dir(root: ArchivePath, single_version: bool) -> ArchivePath:
+    """Locate the runs root or the version directory inside an archive.
 
-    return [
-        item.name
-        for item in base_dir.iterdir()
-        if item.is_dir() and VERSION_PATTERN.match(item.name)
-    ]
+    Version directories may be at the top level of the archive or under
+    runs/. An archive without version directories is a version itself.
+    """
+    runs_dir = root / "runs" if (root / "runs").is_dir() else root
+    if not single_version:
+        return runs_dir
+
+    versions = _find_versions(runs_dir)
+    if not versions:
+        return root
+    if len(versions) > 1:
+        raise ValueError(
+            f"{root.name} contains several versions ({', '.join(sorted(versions))}), "
+            "use --runs-dir"
+        )
+    return runs_dir / versions[0]
+
+
+def _describe_scope(scope: BuildScope) -> str:
+    """Describe the filters of a partial scope."""
+    filters = {
+        "strategy": scope.strategies,
+        "vendor": scope.vendors,
+        "model": scope.models,
+        "run": scope.runs,
+        "request": scope.requests,
+    }
+    return ", ".join(
+        f"{name}={','.join(values)}" for name, values in filters.items() if values
+    )
 
 
-def _version_sort_key(version: str) -> tuple[int, int, int]:
-    """Convert version string to sortable tuple."""
-    match = VERSION_PARTS_PATTERN.match(version)
-    if match:
-        return (int(match.group(1)), int(match.group(2)), int(match.group(3)))
-    return (0, 0, 0)
+def _normalize_version(version: str) -> str:
+    """Add the 'v' prefix to a version string if missing."""
+    return version if version.startswith("v") else f"v{version}"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""Aggregation cube of runs over strategy, model, deck and stake.
+
+Leaderboards aggregate every run of a strategy (or model), whatever its
+Config. The cube keeps one mergeable partial (moments.EntryMoments, with
+the request sketches) per leaf cell:
+
+    (strategy, vendor, model, deck, stake) → EntryMoments
+
+Any slice or roll-up is the merge of the matching cells, so per-deck,
+per-stake and per-deck x stake leaderboards come from the same single
+pass over the runs (see analyzer.create_models_slices). Cubes of
+disjoint runs merge cell by cell.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .enums import Deck, Stake
+from .models import Run
+from .moments import EntryMoments
+
+# Dimensions of a cell key, in order
+DIMENSIONS = ("strategy", "vendor", "model", "deck", "stake")
+
+CellKey = tuple[str, str, str, Deck, Stake]
+
+
+@dataclass(frozen=True)
+class AggregationCube:
+    """Mergeable partials of runs, per (strategy, vendor, model, deck, stake)."""
+
+    cells: dict[CellKey, EntryMoments] = field(default_factory=dict)
+
+    @classmethod
+    def from_runs(cls, runs: Iterable[Run]) -> "AggregationCube":
+        """Cube of runs (one partial per run, merged into its cell)."""
+        cells: dict[CellKey, EntryMoments] = {}
+        for run in runs:
+            key = (
+                run.strategy.key,
+                run.model.vendor,
+                run.model.name,
+                run.config.deck,
+                run.config.stake,
+            )
+            partial = EntryMoments.from_run(run)
+            cells[key] = cells[key].merge(partial) if key in cells else partial
+        return cls(cells)
+
+    def merge(self, other: "AggregationCube") -> "AggregationCube":
+        """Combine the cubes of two sets of runs."""
+        cells = dict(self.cells)
+        for key, partial in other.cells.items():
+            cells[key] = cells[key].merge(partial) if key in cells else partial
+        return AggregationCube(cells)
+
+    def rollup(
+        self, by: tuple[str, ...], **fixed: Any
+    ) -> dict[tuple[Any, ...], EntryMoments]:
+        """Merge the cells matching fixed values, per value of the by dimensions.
+
+        Args:
+            by: Dimensions to group by, e.g. ("vendor", "model")
+            **fixed: Dimension values to match; None matches every value
+
+        Raises:
+            ValueError: If a dimension is unknown
+        """
+        unknown = set(by).union(fixed) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions: {', '.join(sorted(unknown))}")
+        group_index = [DIMENSIONS.index(name) for name in by]
+        match = [
+            (DIMENSIONS.index(name), value)
+            for name, value in fixed.items()
+            if value is not None
+        ]
+
+        groups: dict[tuple[Any, ...], EntryMoments] = {}
+        for key, partial in self.cells.items():
+            if any(key[i] != value for i, value in match):
+                continue
+            group = tuple(key[i] for i in group_index)
+            groups[group] = groups[group].merge(partial) if group in groups else partial
+        return dict(sorted(groups.items()))
+
+    def slices(self) -> list[tuple[Deck | None, Stake | None]]:
+        """(deck, stake) slices with runs: each deck, each stake, each pair.
+
+        None stands for every value. Decks and stakes follow enum order.
+        """
+        decks = sorted({key[3] for key in self.cells}, key=list(Deck).index)
+        stakes = sorted({key[4] for key in self.cells}, key=list(Stake).index)
+        pairs = {(key[3], key[4]) for key in self.cells}
+        return [
+            *((deck, None) for deck in decks),
+            *((None, stake) for stake in stakes),
+            *(
+                (deck, stake)
+                for deck in decks
+                for stake in stakes
+                if (deck, stake) in pairs
+            ),
+        ]
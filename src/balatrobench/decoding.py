@@ -0,0 +1,410 @@
+"""Typed decoding of requests.jsonl and responses.jsonl lines.
+
+The extractor only reads a few fields of each line (the prompt text parts
+of a request; choices, usage and timestamps of a response). Lines are
+decoded into the frozen dataclasses below by the fastest installed
+backend:
+
+    msgspec  decodes straight into the dataclasses, skipping other fields;
+             lines that do not match the field types (null lists or ids,
+             float token counts, string status codes, ...) are decoded
+             again by the stdlib backend, which accepts them
+    orjson   fast dict decoding, then converted to the dataclasses
+    json     stdlib fallback, same conversion as orjson; request lines
+             only decode body.messages (tools, extra_body, ... are
+             skipped, see _key_value_start)
+
+All backends produce equal objects. The benchmarks (decode stage) report
+the MB/s of each installed backend on the synthetic corpora.
+
+When only the custom_id is needed (e.g. to index a file), use
+decode_custom_id(): it reads the key from the line head and never decodes
+the messages.
+"""
+
+import json
+import mmap
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Backends in order of preference
+BACKENDS = ("msgspec", "orjson", "json")
+
+# custom_id is the first or second key of batch API lines; it is read from
+# the line head and verified to be a top-level key
+_CUSTOM_ID_PATTERN = re.compile(rb'"custom_id":\s*"([^"\\]*)"')
+_HEAD_BYTES = 512
+
+# JSON tokens that matter for locating a key: strings (keys when followed
+# by a colon) and brackets. Other values hold no quotes or brackets.
+_TOKEN_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"(\s*:\s*)?|[{}\[\]]')
+
+_json_decoder = json.JSONDecoder()
+
+
+################################################################################
+# requests.jsonl
+################################################################################
+
+
+@dataclass(frozen=True)
+class ContentPart:
+    """A part of a multi-part message content."""
+
+    type: str = ""
+    text: str | None = None
+
+
+@dataclass(frozen=True)
+class RequestMessage:
+    """A chat message of a request body."""
+
+    content: str | list[ContentPart] | None = ""
+
+
+@dataclass(frozen=True)
+class RequestBody:
+    """Request body: only the messages (tools, extra_body, ... are skipped)."""
+
+    messages: list[RequestMessage] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class RequestLine:
+    """A line of requests.jsonl."""
+
+    custom_id: str = ""
+    body: RequestBody | None = None
+
+
+################################################################################
+# responses.jsonl
+################################################################################
+
+
+@dataclass(frozen=True)
+class ResponseMessage:
+    """Assistant message of the first choice."""
+
+    reasoning: str | None = ""
+    tool_calls: list[dict[str, Any]] | None = None
+
+
+@dataclass(frozen=True)
+class Choice:
+    """A completion choice."""
+
+    message: ResponseMessage = field(default_factory=ResponseMessage)
+
+
+@dataclass(frozen=True)
+class CostDetails:
+    """Upstream cost breakdown of a response."""
+
+    upstream_inference_prompt_cost: int | float | None = 0
+    upstream_inference_completions_cost: int | float | None = 0
+
+
+@dataclass(frozen=True)
+class PromptTokensDetails:
+    """Breakdown of the prompt tokens of a response."""
+
+    cached_tokens: int | None = 0
+
+
+@dataclass(frozen=True)
+class CompletionTokensDetails:
+    """Breakdown of the completion tokens of a response."""
+
+    reasoning_tokens: int | None = 0
+
+
+@dataclass(frozen=True)
+class Usage:
+    """Token usage and cost of a response."""
+
+    prompt_tokens: int | None = 0
+    completion_tokens: int | None = 0
+    cost: int | float | None = 0
+    cost_details: CostDetails | None = None
+    prompt_tokens_details: PromptTokensDetails | None = None
+    completion_tokens_details: CompletionTokensDetails | None = None
+
+
+@dataclass(frozen=True)
+class ResponseBody:
+    """Response body (chat completion)."""
+
+    choices: list[Choice] = field(default_factory=list)
+    usage: Usage | None = None
+    provider: str | None = None
+    error: Any = None  # Error body of a failed request
+
+
+@dataclass(frozen=True)
+class Response:
+    """Response envelope: status, request timestamp and body."""
+
+    status_code: int | None = None
+    request_id: str | int | None = None
+    body: ResponseBody | None = None
+
+
+@dataclass(frozen=True)
+class ResponseLine:
+    """A line of responses.jsonl."""
+
+    custom_id: str = ""
+    id: str | int | None = None  # Response timestamp (ms)
+    error: Any = None
+    response: Response | None = None
+
+
+################################################################################
+# Decoders
+################################################################################
+
+
+@dataclass(frozen=True)
+class LineDecoder:
+    """Decoders of request and response lines for one backend."""
+
+    backend: str
+    request: Callable[[bytes], RequestLine]
+    response: Callable[[bytes], ResponseLine]
+
+
+def available_backends() -> list[str]:
+    """Installed backends, fastest first."""
+    installed = {"msgspec": msgspec, "orjson": orjson, "json": json}
+    return [name for name in BACKENDS if installed[name] is not None]
+
+
+def get_decoder(backend: str | None = None) -> LineDecoder:
+    """Return the line decoder of a backend (default: the fastest installed).
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    backend = backend or available_backends()[0]
+    if backend not in available_backends():
+        raise ValueError(f"JSON backend not available: {backend}")
+    if backend == "msgspec":
+        return LineDecoder(
+            backend,
+            _lenient(msgspec.json.Decoder(RequestLine).decode, _select_request_line),
+            _lenient(
+                msgspec.json.Decoder(ResponseLine).decode,
+                lambda line: _response_line(json.loads(line)),
+            ),
+        )
+    if backend == "orjson":
+        return LineDecoder(
+            backend,
+            lambda line: _request_line(orjson.loads(line)),
+            lambda line: _response_line(orjson.loads(line)),
+        )
+    return LineDecoder(
+        backend, _select_request_line, lambda line: _response_line(json.loads(line))
+    )
+
+
+def decode_custom_id(
+    data: bytes | mmap.mmap, start: int = 0, stop: int | None = None
+) -> str | None:
+    """Read the top-level custom_id of a line without decoding the rest.
+
+    Args:
+        data: Line, or content of a JSONL file (e.g. an mmap)
+        start: Offset of the line in data
+        stop: End of the line in data (default: end of data)
+    """
+    stop = len(data) if stop is None else stop
+    head = data[start : min(stop, start + _HEAD_BYTES)]
+    match = _CUSTOM_ID_PATTERN.search(head)
+    # Top level: no nested object or array opened before the key
+    if (
+        match
+        and b"{" not in head[1 : match.start()]
+        and b"[" not in head[: match.start()]
+    ):
+        return match.group(1).decode()
+    # custom_id further in the line: locate it without decoding other values
+    text = data[start:stop].decode()
+    value_start = _key_value_start(text, ("custom_id",))
+    if value_start is None:
+        return None
+    custom_id, _ = _json_decoder.raw_decode(text, value_start)
+    return custom_id or None
+
+
+def _lenient(
+    decode: Callable[[bytes], Any], fallback: Callable[[bytes], Any]
+) -> Callable[[bytes], Any]:
+    """Decode with msgspec, falling back for lines that fail validation."""
+
+    def decode_line(line: bytes) -> Any:
+        try:
+            return decode(line)
+        except msgspec.ValidationError:
+            return fallback(line)
+
+    return decode_line
+
+
+def _select_request_line(line: bytes) -> RequestLine:
+    """Decode body.messages and custom_id only (stdlib backend)."""
+    text = line.decode()
+    start = _key_value_start(text, ("body", "messages"))
+    if start is None:
+        return _request_line(json.loads(text))
+    messages, _ = _json_decoder.raw_decode(text, start)
+    return RequestLine(
+        custom_id=decode_custom_id(line) or "",
+        body=RequestBody(messages=_messages(messages)),
+    )
+
+
+def _key_value_start(text: str, path: tuple[str, ...]) -> int | None:
+    """Offset of the value at a key path of a JSON object, or None.
+
+    Only the tokens before the value are scanned, so the fields after it
+    (e.g. tools after messages) are never decoded.
+    """
+    keys: list[str | None] = []  # Key of every open container
+    key = None
+    for match in _TOKEN_PATTERN.finditer(text):
+        token = match.group()
+        if match.group(2) is not None:
+            key = match.group(1)
+            if (
+                len(keys) == len(path)
+                and key == path[-1]
+                and keys[1:] == list(path[:-1])
+            ):
+                return match.end()
+        elif token in ("{", "["):
+            keys.append(key)
+            key = None
+        elif token in ("}", "]"):
+            if not keys:
+                return None
+            keys.pop()
+            key = None
+    return None
+
+
+def _request_line(data: dict[str, Any]) -> RequestLine:
+    body = data.get("body")
+    return RequestLine(
+        custom_id=data.get("custom_id") or "",
+        body=None
+        if body is None
+        else RequestBody(messages=_messages(body.get("messages"))),
+    )
+
+
+def _messages(messages: list[dict[str, Any]] | None) -> list[RequestMessage]:
+    return [
+        RequestMessage(content=_content(message.get("content", "")))
+        for message in messages or []
+    ]
+
+
+def _content(content: Any) -> str | list[ContentPart] | None:
+    if not isinstance(content, list):
+        return content
+    return [
+        ContentPart(type=part.get("type", ""), text=part.get("text"))
+        for part in content
+    ]
+
+
+def _response_line(data: dict[str, Any]) -> ResponseLine:
+    response = data.get("response")
+    return ResponseLine(
+        custom_id=data.get("custom_id") or "",
+        id=data.get("id"),
+        error=data.get("error"),
+        response=None
+        if response is None
+        else Response(
+            status_code=response.get("status_code"),
+            request_id=response.get("request_id"),
+            body=_response_body(response.get("body")),
+        ),
+    )
+
+
+def _response_body(body: dict[str, Any] | None) -> ResponseBody | None:
+    if body is None:
+        return None
+    usage = body.get("usage")
+    return ResponseBody(
+        choices=[
+            Choice(message=_response_message(choice.get("message") or {}))
+            for choice in body.get("choices") or []
+        ],
+        usage=None
+        if usage is None
+        else Usage(
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            cost=usage.get("cost", 0),
+            cost_details=_cost_details(usage.get("cost_details")),
+            prompt_tokens_details=_prompt_tokens_details(
+                usage.get("prompt_tokens_details")
+            ),
+            completion_tokens_details=_completion_tokens_details(
+                usage.get("completion_tokens_details")
+            ),
+        ),
+        provider=body.get("provider"),
+        error=body.get("error"),
+    )
+
+
+def _response_message(message: dict[str, Any]) -> ResponseMessage:
+    return ResponseMessage(
+        reasoning=message.get("reasoning", ""),
+        tool_calls=message.get("tool_calls"),
+    )
+
+
+def _cost_details(details: dict[str, Any] | None) -> CostDetails | None:
+    if details is None:
+        return None
+    return CostDetails(
+        upstream_inference_prompt_cost=details.get("upstream_inference_prompt_cost", 0),
+        upstream_inference_completions_cost=details.get(
+            "upstream_inference_completions_cost", 0
+        ),
+    )
+
+
+def _prompt_tokens_details(
+    details: dict[str, Any] | None,
+) -> PromptTokensDetails | None:
+    if details is None:
+        return None
+    return PromptTokensDetails(cached_tokens=details.get("cached_tokens", 0))
+
+
+def _completion_tokens_details(
+    details: dict[str, Any] | None,
+) -> CompletionTokensDetails | None:
+    if details is None:
+        return None
+    return CompletionTokensDetails(reasoning_tokens=details.get("reasoning_tokens", 0))
@@ -0,0 +1,134 @@
+"""Delta encoding of request context files across a run.
+
+Consecutive requests of a run share most of their gamestate and all of
+the previous memory (memory only grows). Instead of a gamestate.md and
+memory.md per request, a run can store them once in {run}/context.json:
+
+    {
+      "format": 1,
+      "keyframe_interval": 16,
+      "requests": ["00001", "00002", ...],
+      "gamestate": [<entry>, ...],
+      "memory": [<entry>, ...]
+    }
+
+Each entry is either a keyframe (the full text, a string) or a delta
+against the previous request's text (a list of ops). An op is either a
+[start, stop] range of lines copied from the previous text or a string
+of new lines. Lines keep their trailing "\\n", so joining the ops
+reproduces the text exactly.
+
+A keyframe is written every keyframe_interval requests (and whenever a
+delta would not be smaller), so any request is rebuilt by applying at most
+keyframe_interval - 1 deltas. The site implements the same decoding.
+"""
+
+import difflib
+from collections.abc import Sequence
+from typing import Any
+
+CONTEXT_FILENAME = "context.json"
+CONTEXT_FORMAT = 1
+DEFAULT_KEYFRAME_INTERVAL = 16
+
+# Request content fields stored in context.json instead of {field}.md
+DELTA_FIELDS = ("gamestate", "memory")
+
+Entry = str | list[Any]
+
+
+def split_lines(text: str) -> list[str]:
+    """Split text into lines, keeping the trailing "\\n" of each line."""
+    lines = text.split("\n")
+    last = lines.pop()
+    return [line + "\n" for line in lines] + ([last] if last else [])
+
+
+def encode_delta(previous: str, text: str) -> list[Any]:
+    """Encode text as line ops against the previous text."""
+    old = split_lines(previous)
+    new = split_lines(text)
+    ops: list[Any] = []
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            inserted = "".join(new[j1:j2])
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += inserted
+            else:
+                ops.append(inserted)
+    return ops
+
+
+def apply_delta(previous: str, ops: list[Any]) -> str:
+    """Rebuild a text from the previous text and its delta ops."""
+    old = split_lines(previous)
+    parts = [op if isinstance(op, str) else "".join(old[op[0] : op[1]]) for op in ops]
+    return "".join(parts)
+
+
+def encode_chain(
+    texts: Sequence[str], keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL
+) -> list[Entry]:
+    """Encode consecutive texts as keyframes and deltas."""
+    entries: list[Entry] = []
+    for i, text in enumerate(texts):
+        if i % keyframe_interval == 0:
+            entries.append(text)
+            continue
+        ops = encode_delta(texts[i - 1], text)
+        # Copy ops cost a few bytes each; literals cost their length
+        delta_size = sum(len(op) if isinstance(op, str) else 12 for op in ops)
+        entries.append(ops if delta_size < len(text) else text)
+    return entries
+
+
+def decode_entry(entries: Sequence[Entry], index: int) -> str:
+    """Rebuild the text at index from the nearest keyframe at or before it."""
+    start = index
+    while not isinstance(entries[start], str):
+        start -= 1
+    text = entries[start]
+    for ops in entries[start + 1 : index + 1]:
+        text = apply_delta(text, ops)
+    return text
+
+
+def decode_chain(entries: Sequence[Entry]) -> list[str]:
+    """Rebuild every text of a chain."""
+    texts: list[str] = []
+    for entry in entries:
+        texts.append(entry if isinstance(entry, str) else apply_delta(texts[-1], entry))
+    return texts
+
+
+def encode_context(
+    request_ids: Sequence[str],
+    contents: Sequence[dict[str, str]],
+    keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+) -> dict[str, Any]:
+    """Build the context.json data of a run.
+
+    Args:
+        request_ids: Request ids in request order (e.g., "00001")
+        contents: Content dicts of the requests (see extract_request_content)
+        keyframe_interval: Requests between two keyframes
+    """
+    data: dict[str, Any] = {
+        "format": CONTEXT_FORMAT,
+        "keyframe_interval": keyframe_interval,
+        "requests": list(request_ids),
+    }
+    for field in DELTA_FIELDS:
+        data[field] = encode_chain(
+            [content[field] for content in contents], keyframe_interval
+        )
+    return data
+
+
+def decode_context(data: dict[str, Any], request_id: str) -> dict[str, str]:
+    """Rebuild the delta-encoded fields of one request of a context.json."""
+    index = data["requests"].index(request_id)
+    return {field: decode_entry(data[field], index) for field in DELTA_FIELDS}
@@ -0,0 +1,239 @@
+"""Columnar export of runs and requests (Parquet or Arrow IPC).
+
+The output trees store one metadata.json per request, which is slow to
+load for analysis. --export writes two flat tables per version instead,
+partitioned by strategy and vendor (hive-style directories, so
+pyarrow.dataset and most query engines read the partitions as columns):
+
+    {export-dir}/{version}/
+    ├── runs/strategy={strategy}/vendor={vendor}/part-0.parquet
+    │       one row per Run: model, run id, Config, outcome, flattened Stats
+    └── requests/strategy={strategy}/vendor={vendor}/part-0.parquet
+            one row per Request, with the model, run id and Config of its run
+
+Rows are written in row groups of ROW_GROUP_SIZE rows, and requests are
+extracted one run at a time, so memory stays bounded whatever the size of
+a partition. Arrow IPC files (.arrow) have the same layout and columns.
+
+Needs the pyarrow package (pip install pyarrow).
+"""
+
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import fields
+from pathlib import Path
+from typing import Any
+
+from . import tracing
+from .extractor import extract_request_metadata
+from .models import Percentiles, Request, Run, Stats, StatsPercentiles
+from .pipeline import BenchmarkPipeline
+from .scope import FULL_SCOPE, BuildScope
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Format → file suffix
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+ROW_GROUP_SIZE = 65536
+
+# Column → pyarrow type factory. Columns shared by both tables: the model,
+# run and Config of a row (strategy and vendor are partition columns, stored
+# in the directory names)
+RUN_KEY_COLUMNS = {
+    "model": "string",
+    "run_id": "string",
+    "seed": "string",
+    "deck": "string",
+    "stake": "string",
+}
+
+RUN_COLUMNS = {
+    **RUN_KEY_COLUMNS,
+    "run_won": "bool_",
+    "run_completed": "bool_",
+    "final_ante": "int64",
+    "final_round": "int64",
+    "providers": "string",  # JSON object of provider → calls
+    **{
+        f.name: "int64" if f.type is int else "float64"
+        for f in fields(Stats)
+        if f.name != "percentiles"
+    },
+    # Stats.percentiles, e.g. time_ms_p50 (null without responses)
+    **{
+        f"{metric.name}_{q.name}": "float64"
+        for metric in fields(StatsPercentiles)
+        for q in fields(Percentiles)
+    },
+}
+
+REQUEST_COLUMNS = {
+    **RUN_KEY_COLUMNS,
+    "request_id": "string",
+    **{
+        f.name: "int64" if f.type is int else "float64" if f.type is float else "string"
+        for f in fields(Request)
+        if f.name != "id"
+    },
+}
+
+
+def require_pyarrow() -> None:
+    """Raise ImportError if pyarrow is not installed."""
+    if pyarrow is None:
+        raise ImportError("--export requires the pyarrow package (pip install pyarrow)")
+
+
+def run_row(run: Run) -> dict[str, Any]:
+    """Flatten a Run into a row of the runs table."""
+    row = {
+        **_run_key(run),
+        "run_won": run.run_won,
+        "run_completed": run.run_completed,
+        "final_ante": run.final_ante,
+        "final_round": run.final_round,
+        "providers": json.dumps(dict(run.providers)),
+    }
+    stats = run.stats
+    for f in fields(Stats):
+        if f.name != "percentiles":
+            row[f.name] = getattr(stats, f.name)
+    for metric in fields(StatsPercentiles):
+        values = getattr(stats.percentiles, metric.name, None)
+        for q in fields(Percentiles):
+            row[f"{metric.name}_{q.name}"] = getattr(values, q.name, None)
+    return row
+
+
+def request_row(run: Run, request: Request) -> dict[str, Any]:
+    """Flatten a Request into a row of the requests table."""
+    row = {**_run_key(run), "request_id": request.id}
+    for f in fields(Request):
+        if f.name != "id":
+            row[f.name] = getattr(request, f.name)
+    return row
+
+
+def _run_key(run: Run) -> dict[str, Any]:
+    return {
+        "model": run.model.name,
+        "run_id": run.id,
+        "seed": run.config.seed,
+        "deck": str(run.config.deck),
+        "stake": str(run.config.stake),
+    }
+
+
+def export_version(
+    version_dir: Path,
+    export_dir: Path,
+    fmt: str = "parquet",
+    scope: BuildScope = FULL_SCOPE,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> list[Path]:
+    """Export the runs and requests of a version as partitioned tables.
+
+    Args:
+        version_dir: Version directory with run data (e.g., runs/v1.0.0)
+        export_dir: Base export directory ({export_dir}/{version}/...)
+        fmt: "parquet" or "arrow" (Arrow IPC file)
+        scope: Runs to export (default: everything). Partition files are
+            shared by every run of a strategy x vendor, so the partitions of
+            the selected runs are rewritten whole (every run and request)
+        row_group_size: Maximum number of rows per row group (record batch)
+
+    Returns:
+        Paths of the written files.
+
+    Raises:
+        ImportError: If pyarrow is not installed
+        ValueError: If the format is unknown
+    """
+    require_pyarrow()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    pipeline = BenchmarkPipeline(version_dir)
+    partitions: dict[tuple[str, str], list[tuple[Path, Run]]] = {}
+    selected: set[tuple[str, str]] = set()
+    for run_dir, run in pipeline.iter_runs():
+        key = (run.strategy.key, run.model.vendor)
+        partitions.setdefault(key, []).append((run_dir, run))
+        if scope.selects(run_dir.parent) and scope.matches_run(run.id):
+            selected.add(key)
+
+    base = export_dir / pipeline.version
+    written = []
+    for (strategy, vendor), runs in sorted(partitions.items()):
+        if (strategy, vendor) not in selected:
+            continue
+        partition = Path(f"strategy={strategy}") / f"vendor={vendor}"
+        with tracing.span("export.partition", strategy=strategy, vendor=vendor):
+            written.append(
+                _write_table(
+                    base / "runs" / partition,
+                    fmt,
+                    RUN_COLUMNS,
+                    (run_row(run) for _, run in runs),
+                    row_group_size,
+                )
+            )
+            written.append(
+                _write_table(
+                    base / "requests" / partition,
+                    fmt,
+                    REQUEST_COLUMNS,
+                    _iter_request_rows(runs),
+                    row_group_size,
+                )
+            )
+    return written
+
+
+def _iter_request_rows(runs: list[tuple[Path, Run]]) -> Iterator[dict[str, Any]]:
+    """Request rows of runs, extracting the metadata of one run at a time."""
+    for run_dir, run in runs:
+        responses_file = run_dir / "responses.jsonl"
+        if not responses_file.exists():
+            continue
+        metadata = extract_request_metadata(responses_file)
+        for custom_id in sorted(metadata):
+            yield request_row(run, metadata[custom_id])
+
+
+def _write_table(
+    partition_dir: Path,
+    fmt: str,
+    columns: dict[str, str],
+    rows: Iterable[dict[str, Any]],
+    row_group_size: int,
+) -> Path:
+    """Write rows to {partition_dir}/part-0{suffix}, one row group at a time."""
+    schema = pyarrow.schema(
+        [(name, getattr(pyarrow, type_name)()) for name, type_name in columns.items()]
+    )
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    path = partition_dir / f"part-0{EXPORT_FORMATS[fmt]}"
+    tmp_path = path.with_name(f"{path.name}.tmp")
+
+    if fmt == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(tmp_path, schema)
+    else:
+        writer = pyarrow.ipc.new_file(tmp_path, schema)
+    with writer:
+        batch: list[dict[str, Any]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == row_group_size:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+    tmp_path.replace(path)
+    return path
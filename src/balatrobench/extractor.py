@@ -1,96 +1,148 @@
 """Extract data from requests/responses JSONL files."""
 
 import json
-from collections.abc import Iterator
+from collections.abc import Collection, Iterator, Sequence
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Literal
 
+from . import tracing
+from .decoding import (
+    CompletionTokensDetails,
+    CostDetails,
+    PromptTokensDetails,
+    Response,
+    ResponseBody,
+    ResponseLine,
+    Usage,
+    get_decoder,
+)
+from .jsonl import JsonlFile
 from .models import Request
+from .summary import RequestSummary, load_summary, save_summary
 
 # Default value for unknown provider
 DEFAULT_PROVIDER = "unknown"
 
+# Line decoder of the fastest installed JSON backend (see decoding.py)
+_decoder = get_decoder()
 
-def _iter_jsonl(file: Path) -> Iterator[tuple[str, dict[str, Any]]]:
-    """Yield (custom_id, data) pairs from a JSONL file.
 
-    Skips entries without a custom_id.
+def _iter_lines(file: Path, ids: Collection[str] | None = None) -> Iterator[bytes]:
+    """Yield the raw non-empty lines of a JSONL file.
+
+    With ids, only those lines are read, located through the file's offset
+    index (see jsonl.py).
     """
     if not file.exists():
         return
-    with file.open() as f:
+    if ids is not None:
+        wanted = set(ids)
+        with JsonlFile(file) as jsonl:
+            for _, line in jsonl.iter_lines(wanted):
+                yield line
+        return
+    with file.open("rb") as f:
         for line in f:
-            data = json.loads(line.strip())
-            if custom_id := data.get("custom_id"):
-                yield custom_id, data
+            if line.strip():
+                yield line
+
+
+def _iter_jsonl(
+    file: Path, ids: Collection[str] | None = None
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yield (custom_id, data) pairs from a JSONL file.
+
+    Skips entries without a custom_id. See _iter_lines() for ids.
+    """
+    for line in _iter_lines(file, ids):
+        data = json.loads(line)
+        if custom_id := data.get("custom_id"):
+            yield custom_id, data
 
 
-def extract_request_content(requests_file: Path) -> dict[str, dict[str, str]]:
+def extract_request_content(
+    requests_file: Path, ids: Collection[str] | None = None
+) -> dict[str, dict[str, str]]:
     """Extract strategy/gamestate/memory from requests.jsonl.
 
-    Returns a dict mapping custom_id to content dict with keys:
+    Returns a dict mapping custom_id (all, or only ids) to content dict
+    with keys:
     - strategy: The strategy prompt text
     - gamestate: The gamestate prompt text
     - memory: The memory prompt text
     """
     content_by_id: dict[str, dict[str, str]] = {}
 
-    for custom_id, data in _iter_jsonl(requests_file):
-        body = data.get("body", {})
-        messages = body.get("messages", [])
-        if not messages:
-            continue
-
-        content = messages[0].get("content", "")
-        if isinstance(content, list):
-            # Content is array of text parts
-            text_parts = [item.get("text", "") for item in content if "text" in item]
-            content_by_id[custom_id] = {
-                "strategy": text_parts[0] if len(text_parts) > 0 else "",
-                "gamestate": text_parts[1] if len(text_parts) > 1 else "",
-                "memory": text_parts[2] if len(text_parts) > 2 else "",
-            }
-        else:
-            # Content is a single string
-            content_by_id[custom_id] = {
-                "strategy": content or "",
-                "gamestate": "",
-                "memory": "",
-            }
+    with tracing.span("extractor.request_content", file=str(requests_file)) as attrs:
+        for line in _iter_lines(requests_file, ids):
+            request = _decoder.request(line)
+            custom_id = request.custom_id
+            if not custom_id or request.body is None or not request.body.messages:
+                continue
+
+            content = request.body.messages[0].content
+            if isinstance(content, list):
+                # Content is array of text parts
+                text_parts = [part.text for part in content if part.text is not None]
+                content_by_id[custom_id] = {
+                    "strategy": text_parts[0] if len(text_parts) > 0 else "",
+                    "gamestate": text_parts[1] if len(text_parts) > 1 else "",
+                    "memory": text_parts[2] if len(text_parts) > 2 else "",
+                }
+            else:
+                # Content is a single string
+                content_by_id[custom_id] = {
+                    "strategy": content or "",
+                    "gamestate": "",
+                    "memory": "",
+                }
+
+        attrs["requests"] = len(content_by_id)
+        if tracing.is_enabled():
+            attrs["bytes"] = tracing.file_size(requests_file)
 
     return content_by_id
 
 
-def extract_response_data(responses_file: Path) -> dict[str, dict[str, Any]]:
+def extract_response_data(
+    responses_file: Path, ids: Collection[str] | None = None
+) -> dict[str, dict[str, Any]]:
     """Extract reasoning and tool_call from responses.jsonl.
 
-    Returns a dict mapping custom_id to:
+    Returns a dict mapping custom_id (all, or only ids) to:
     - reasoning: The LLM's reasoning text
     - tool_call: The tool calls array
     """
     response_by_id: dict[str, dict[str, Any]] = {}
 
-    for custom_id, data in _iter_jsonl(responses_file):
-        response = data.get("response") or {}
-        body = response.get("body") or {}
-        choices = body.get("choices", [])
-        if not choices:
-            continue
+    with tracing.span("extractor.response_data", file=str(responses_file)) as attrs:
+        for line in _iter_lines(responses_file, ids):
+            data = _decoder.response(line)
+            if (response := _response_data(data)) is not None:
+                response_by_id[data.custom_id] = response
 
-        message = choices[0].get("message", {})
-        tool_calls = message.get("tool_calls") or []
+        attrs["requests"] = len(response_by_id)
+        if tracing.is_enabled():
+            attrs["bytes"] = tracing.file_size(responses_file)
 
-        # Try to get reasoning from message field first, then from tool calls
-        reasoning = message.get("reasoning", "") or _extract_reasoning_from_tool_calls(
-            tool_calls
-        )
+    return response_by_id
 
-        response_by_id[custom_id] = {
-            "reasoning": reasoning,
-            "tool_call": tool_calls,
-        }
 
-    return response_by_id
+def _response_data(data: ResponseLine) -> dict[str, Any] | None:
+    """Reasoning and tool calls of a decoded response line, if it has any."""
+    body = data.response.body if data.response else None
+    if not data.custom_id or body is None or not body.choices:
+        return None
+
+    message = body.choices[0].message
+    tool_calls = message.tool_calls or []
+
+    # Try to get reasoning from message field first, then from tool calls
+    reasoning = message.reasoning
+    reasoning = reasoning or _extract_reasoning_from_tool_calls(tool_calls)
+
+    return {"reasoning": reasoning, "tool_call": tool_calls}
 
 
 def _extract_reasoning_from_tool_calls(tool_calls: list[dict]) -> str:
@@ -103,52 +155,193 @@ def _extract_reasoning_from_tool_calls(tool_calls: list[dict]) -> str:
                 args = (
                     json.loads(arguments) if isinstance(arguments, str) else arguments
                 )
-                if "reasoning" in args and args["reasoning"]:
-                    return args["reasoning"]
-            except (json.JSONDecodeError, TypeError):
+                if reasoning := args.get("reasoning"):
+                    return reasoning
+            except (json.JSONDecodeError, TypeError, AttributeError):
                 continue
     return ""
 
 
-def extract_request_metadata(responses_file: Path) -> dict[str, Request]:
+def extract_request_metadata(
+    responses_file: Path, ids: Collection[str] | None = None
+) -> dict[str, Request]:
     """Extract Request metadata from responses.jsonl.
 
-    Returns a dict mapping custom_id to Request.
+    Returns a dict mapping custom_id (all, or only ids) to Request.
     """
     requests_by_id: dict[str, Request] = {}
 
-    for custom_id, data in _iter_jsonl(responses_file):
-        response = data.get("response") or {}
-        body = response.get("body") or {}
-        usage = body.get("usage") or {}
-        cost_details = usage.get("cost_details", {})
-
-        # Determine status
-        status_code = response.get("status_code")
-        has_error = data.get("error") is not None
-        status: Literal["success", "error"] = (
-            "success" if status_code == 200 and not has_error else "error"
-        )
+    with tracing.span("extractor.request_metadata", file=str(responses_file)) as attrs:
+        for line in _iter_lines(responses_file, ids):
+            data = _decoder.response(line)
+            if data.custom_id:
+                requests_by_id[data.custom_id] = _request_metadata(data)
 
-        # Calculate time from timestamps if available
-        # response_id and request_id are timestamps in the data
-        response_ts = int(data.get("id", 0))
-        request_ts = int(response.get("request_id", 0))
-        time_ms = response_ts - request_ts if response_ts and request_ts else 0
-
-        # Get provider (default to DEFAULT_PROVIDER if not available)
-        provider = body.get("provider") or DEFAULT_PROVIDER
-
-        requests_by_id[custom_id] = Request(
-            id=custom_id,
-            status=status,
-            provider=provider,
-            tokens_in=usage.get("prompt_tokens", 0),
-            tokens_out=usage.get("completion_tokens", 0),
-            time_ms=time_ms,
-            cost_in=cost_details.get("upstream_inference_prompt_cost", 0) or 0,
-            cost_out=cost_details.get("upstream_inference_completions_cost", 0) or 0,
-            cost_total=usage.get("cost", 0) or 0,
-        )
+        attrs["requests"] = len(requests_by_id)
+        if tracing.is_enabled():
+            attrs["bytes"] = tracing.file_size(responses_file)
 
     return requests_by_id
+
+
+def _request_metadata(data: ResponseLine) -> Request:
+    """Request metadata of a decoded response line (with a custom_id)."""
+    response = data.response or Response()
+    body = response.body or ResponseBody()
+    usage = body.usage or Usage()
+    cost_details = usage.cost_details or CostDetails()
+    prompt_details = usage.prompt_tokens_details or PromptTokensDetails()
+    completion_details = usage.completion_tokens_details or CompletionTokensDetails()
+
+    # Determine status
+    status_code = response.status_code
+    has_error = data.error is not None
+    status: Literal["success", "error"] = (
+        "success" if status_code == 200 and not has_error else "error"
+    )
+
+    # Calculate time from timestamps if available
+    # response_id and request_id are timestamps in the data
+    response_ts = int(data.id or 0)
+    request_ts = int(response.request_id or 0)
+    time_ms = response_ts - request_ts if response_ts and request_ts else 0
+
+    # Usage fields may be explicit nulls: normalize them once
+    tokens_in = usage.prompt_tokens or 0
+    tokens_out = usage.completion_tokens or 0
+
+    # Provider that served the request; failed requests have no body.provider,
+    # but routing errors name the upstream provider that failed
+    provider = (
+        body.provider
+        or _error_provider(body.error)
+        or _error_provider(data.error)
+        or DEFAULT_PROVIDER
+    )
+
+    return Request(
+        id=data.custom_id,
+        status=status,
+        provider=provider,
+        tokens_in=tokens_in,
+        tokens_out=tokens_out,
+        time_ms=time_ms,
+        cost_in=cost_details.upstream_inference_prompt_cost or 0,
+        cost_out=cost_details.upstream_inference_completions_cost or 0,
+        cost_total=usage.cost or 0,
+        tokens_cached=prompt_details.cached_tokens or 0,
+        tokens_reasoning=completion_details.reasoning_tokens or 0,
+        tokens_out_per_s=tokens_out / (time_ms / 1000) if time_ms > 0 else 0.0,
+    )
+
+
+def _error_provider(error: Any) -> str | None:
+    """Provider named by an error (OpenRouter: error.metadata.provider_name)."""
+    if not isinstance(error, dict):
+        return None
+    metadata = error.get("metadata")
+    if not isinstance(metadata, dict):
+        return None
+    provider = metadata.get("provider_name")
+    return provider if isinstance(provider, str) and provider else None
+
+
+@dataclass(frozen=True)
+class RunExtract:
+    """Everything extracted from the JSONL files of a run directory."""
+
+    run_id: str
+    content: dict[str, dict[str, str]]  # extract_request_content()
+    responses: dict[str, dict[str, Any]]  # extract_response_data()
+    metadata: dict[str, Request]  # extract_request_metadata()
+    screenshots_dir: Path
+    # Partials of the metadata of the whole run (None for a subset of its requests)
+    summary: RequestSummary | None = field(default=None, compare=False, repr=False)
+
+    @property
+    def custom_ids(self) -> set[str]:
+        """Ids of all requests with content or response data."""
+        return set(self.content) | set(self.responses)
+
+
+def extract_run(run_dir: Path, ids: Collection[str] | None = None) -> RunExtract:
+    """Extract request content, response data and metadata of a run directory.
+
+    responses.jsonl is decoded once for both its response data and its
+    metadata. When the whole run is extracted, the metadata is also
+    summarized (see summary.py).
+
+    With ids, only those requests are extracted (e.g., a shard of a large run).
+    """
+    # Archive order (requests.jsonl first) keeps reads from archives forward
+    content = extract_request_content(run_dir / "requests.jsonl", ids)
+    responses, metadata = extract_responses(run_dir / "responses.jsonl", ids)
+    return RunExtract(
+        run_id=run_dir.name,
+        content=content,
+        responses=responses,
+        metadata=metadata,
+        screenshots_dir=run_dir / "screenshots",
+        summary=(
+            RequestSummary.from_requests(metadata.values()) if ids is None else None
+        ),
+    )
+
+
+def extract_responses(
+    responses_file: Path, ids: Collection[str] | None = None
+) -> tuple[dict[str, dict[str, Any]], dict[str, Request]]:
+    """Extract response data and metadata in one pass over responses.jsonl.
+
+    Returns the results of extract_response_data() and
+    extract_request_metadata(), decoding each line once.
+    """
+    response_by_id: dict[str, dict[str, Any]] = {}
+    requests_by_id: dict[str, Request] = {}
+
+    with tracing.span("extractor.responses", file=str(responses_file)) as attrs:
+        for line in _iter_lines(responses_file, ids):
+            data = _decoder.response(line)
+            if not data.custom_id:
+                continue
+            if (response := _response_data(data)) is not None:
+                response_by_id[data.custom_id] = response
+            requests_by_id[data.custom_id] = _request_metadata(data)
+
+        attrs["requests"] = len(requests_by_id)
+        if tracing.is_enabled():
+            attrs["bytes"] = tracing.file_size(responses_file)
+
+    return response_by_id, requests_by_id
+
+
+def summarize_run(run_dir: Path, cache: bool = False) -> RequestSummary:
+    """Summary of the request metadata of a run.
+
+    Args:
+        run_dir: Run directory
+        cache: Load the cached summary of the run's responses.jsonl if it is
+            current, and cache a newly extracted one (see summary.SUMMARY_DIR)
+    """
+    responses_file = run_dir / "responses.jsonl"
+    summary = load_summary(responses_file) if cache else None
+    if summary is None:
+        summary = RequestSummary.from_requests(
+            extract_request_metadata(responses_file).values()
+        )
+        if cache:
+            save_summary(responses_file, summary)
+    return summary
+
+
+def merge_run_extracts(parts: Sequence[RunExtract]) -> RunExtract:
+    """Combine the extracts of the shards of a run, in shard order."""
+    if len(parts) == 1:
+        return parts[0]
+    return RunExtract(
+        run_id=parts[0].run_id,
+        content={k: v for part in parts for k, v in part.content.items()},
+        responses={k: v for part in parts for k, v in part.responses.items()},
+        metadata={k: v for part in parts for k, v in part.metadata.items()},
+        screenshots_dir=parts[0].screenshots_dir,
+    )
@@ -0,0 +1,139 @@
+"""Write journal for resumable builds.
+
+The journal is a JSON lines file in JOURNAL_DIR, keyed by the path of the
+output directory, so it is never part of the published tree. Every
+completed unit of work (request files of a run in one output tree, a runs
+file, a leaderboard, ...) appends one line with a digest of the build
+options that shape the output and the sizes of the files it wrote:
+
+    {"unit": "v1.0.0:models-requests:default/openai/gpt-oss-120b/20260109_...",
+     "options": "5f1c0a9e2b7d4c13",
+     "files": {"models/v1.0.0/default/.../20260109_.../00001/reasoning.md": 5231,
+               ...}}
+
+With --resume, units recorded with the same options whose files all still
+exist with the recorded sizes are skipped. The journal is removed once a
+build completes.
+"""
+
+import hashlib
+import json
+import tempfile
+import threading
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+JOURNAL_DIR = Path(tempfile.gettempdir()) / "balatrobench" / "journals"
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+def journal_path(output_dir: Path) -> Path:
+    """Journal path of an output directory (in JOURNAL_DIR)."""
+    digest = hashlib.sha1(str(output_dir.resolve()).encode()).hexdigest()[:16]
+    return JOURNAL_DIR / f"{digest}{JOURNAL_SUFFIX}"
+
+
+def options_digest(options: Mapping[str, Any]) -> str:
+    """Digest of build options (e.g. webp, delta_context)."""
+    encoded = json.dumps(dict(options), sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()[:16]
+
+
+class BuildJournal:
+    """Append-only record of completed build units.
+
+    Args:
+        output_dir: Output directory of the build
+        resume: Keep the units recorded by a previous build
+        options: Build options that change the output; units recorded with
+            other options are not complete
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        resume: bool = False,
+        options: Mapping[str, Any] | None = None,
+    ) -> None:
+        self.output_dir = output_dir
+        self.path = journal_path(output_dir)
+        self.options = options_digest(options or {})
+        self._lock = threading.Lock()
+        self._units: dict[str, dict[str, int]] = {}
+
+        if resume and self.path.exists():
+            self._units = _load(self.path, self.options)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Rewrite the loaded entries, dropping a partially written last line
+        with self.path.open("w") as f:
+            for unit, files in self._units.items():
+                f.write(self._line(unit, files))
+        self._file = self.path.open("a")
+
+    def _line(self, unit: str, files: dict[str, int]) -> str:
+        return (
+            json.dumps({"unit": unit, "options": self.options, "files": files}) + "\n"
+        )
+
+    def is_complete(self, unit: str) -> bool:
+        """Check that a unit was recorded and its files are unchanged."""
+        files = self._units.get(unit)
+        if files is None:
+            return False
+        for rel, size in files.items():
+            path = self.output_dir / rel
+            if not path.is_file() or path.stat().st_size != size:
+                return False
+        return True
+
+    def record(self, unit: str, paths: Iterable[Path]) -> None:
+        """Record a unit as complete with the files it wrote."""
+        files = {
+            str(path.relative_to(self.output_dir)): path.stat().st_size
+            for path in paths
+        }
+        line = self._line(unit, files)
+        with self._lock:
+            self._units[unit] = files
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self, completed: bool = False) -> None:
+        """Close the journal, removing it if the build completed."""
+        self._file.close()
+        if completed:
+            self.path.unlink(missing_ok=True)
+
+
+class NullJournal:
+    """Journal that records nothing (builds without resume support)."""
+
+    def is_complete(self, unit: str) -> bool:
+        return False
+
+    def record(self, unit: str, paths: Iterable[Path]) -> None:
+        pass
+
+    def close(self, completed: bool = False) -> None:
+        pass
+
+
+NULL_JOURNAL = NullJournal()
+
+
+def _load(path: Path, options: str) -> dict[str, dict[str, int]]:
+    """Load the journal entries recorded with the given options digest.
+
+    A partially written last line is ignored.
+    """
+    units: dict[str, dict[str, int]] = {}
+    with path.open() as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if entry.get("options") == options:
+                units[entry["unit"]] = entry["files"]
+    return units
@@ -0,0 +1,209 @@
+"""Memory-mapped JSONL files with a custom_id offset index.
+
+requests.jsonl and responses.jsonl hold one request per line. Reading a
+single request (or a shard of a large run) should not decode the whole
+file, so each file gets a sidecar index mapping custom_id to the byte
+offset and length of its line:
+
+    .../requests.jsonl  →  {INDEX_DIR}/{sha1 of the path}.requests.jsonl.idx.json
+    {"size": 3145728, "mtime_ns": 1767974279186000000,
+     "ids": [["request-00001", 0, 52311], ...]}
+
+Indexes live in the temp directory, never in the input tree. They are
+built on first use (a newline scan that only decodes the custom_id, see
+decoding.decode_custom_id), rebuilt whenever the file's size or mtime
+changes, and replaced atomically so concurrent builds never read a
+partial index. Lines are read through mmap.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from collections.abc import Collection, Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Self
+
+from .decoding import decode_custom_id
+
+INDEX_DIR = Path(tempfile.gettempdir()) / "balatrobench" / "jsonl"
+INDEX_SUFFIX = ".idx.json"
+
+
+@dataclass(frozen=True)
+class JsonlIndex:
+    """Offsets of the lines of a JSONL file by custom_id, in file order.
+
+    If a custom_id appears on several lines, the last line wins (as when
+    decoding the whole file into a dict).
+    """
+
+    size: int
+    mtime_ns: int
+    lines: dict[str, tuple[int, int]]  # custom_id → (offset, length)
+
+
+def index_path(path: Path) -> Path:
+    """Sidecar index path of a JSONL file (in INDEX_DIR)."""
+    digest = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+    return INDEX_DIR / f"{digest}.{path.name}{INDEX_SUFFIX}"
+
+
+def load_index(path: Path, data: bytes | mmap.mmap | None = None) -> JsonlIndex:
+    """Load the sidecar index of a JSONL file, (re)building it if stale.
+
+    Args:
+        path: JSONL file
+        data: Content of the file, if already mapped
+    """
+    st = path.stat()
+    mtime_ns = getattr(st, "st_mtime_ns", int(st.st_mtime * 1e9))
+    if not isinstance(path, Path):
+        # Archive member: keep the index in memory
+        if data is None:
+            data = path.read_bytes()
+        return JsonlIndex(size=st.st_size, mtime_ns=mtime_ns, lines=scan_lines(data))
+
+    sidecar = index_path(path)
+    try:
+        cached = json.loads(sidecar.read_text())
+        if cached["size"] == st.st_size and cached["mtime_ns"] == mtime_ns:
+            return JsonlIndex(
+                size=st.st_size,
+                mtime_ns=mtime_ns,
+                lines={cid: (offset, length) for cid, offset, length in cached["ids"]},
+            )
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    if data is None:
+        data = path.read_bytes()
+    index = JsonlIndex(size=st.st_size, mtime_ns=mtime_ns, lines=scan_lines(data))
+    _save_index(sidecar, index)
+    return index
+
+
+def _save_index(sidecar: Path, index: JsonlIndex) -> None:
+    """Write an index through a temp file and an atomic rename."""
+    content = {
+        "size": index.size,
+        "mtime_ns": index.mtime_ns,
+        "ids": [[cid, *span] for cid, span in index.lines.items()],
+    }
+    try:
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=sidecar.parent, prefix=sidecar.name, suffix=".tmp"
+        )
+    except OSError:
+        return  # Unwritable cache: keep the index in memory
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(content, f)
+        os.replace(tmp_name, sidecar)
+    except OSError:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+def scan_lines(data: bytes | mmap.mmap) -> dict[str, tuple[int, int]]:
+    """Map custom_id → (offset, length) for every line of JSONL content."""
+    lines: dict[str, tuple[int, int]] = {}
+    start = 0
+    end = len(data)
+    while start < end:
+        stop = data.find(b"\n", start)
+        if stop < 0:
+            stop = end
+        if custom_id := decode_custom_id(data, start, stop):
+            lines[custom_id] = (start, stop - start)
+        start = stop + 1
+    return lines
+
+
+class JsonlFile:
+    """A JSONL file mapped in memory, with random access by custom_id.
+
+    Archive members (see archive.py) cannot be mapped and are read into
+    memory instead; their index is not saved.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._mmap: mmap.mmap | None = None
+        if isinstance(path, Path) and path.stat().st_size > 0:
+            with path.open("rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.data: bytes | mmap.mmap = self._mmap
+        else:
+            self.data = path.read_bytes()
+        self.index = load_index(path, self.data)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def ids(self) -> list[str]:
+        """custom_ids of the file, in file order."""
+        return list(self.index.lines)
+
+    def raw(self, custom_id: str) -> bytes:
+        """Return the raw line of a request."""
+        offset, length = self.index.lines[custom_id]
+        return self.data[offset : offset + length]
+
+    def get(self, custom_id: str) -> dict[str, Any]:
+        """Decode the line of a request."""
+        return json.loads(self.raw(custom_id))
+
+    def iter_lines(
+        self, ids: Collection[str] | None = None
+    ) -> Iterator[tuple[str, bytes]]:
+        """Yield (custom_id, raw line) pairs in file order.
+
+        Args:
+            ids: Only yield these custom_ids (missing ids are skipped)
+        """
+        for custom_id, (offset, length) in self.index.lines.items():
+            if ids is None or custom_id in ids:
+                yield custom_id, self.data[offset : offset + length]
+
+
+def shard_ids(paths: Sequence[Path], max_bytes: int) -> list[list[str]]:
+    """Split the custom_ids of JSONL files into shards of about max_bytes.
+
+    Every id of any file is in exactly one shard (e.g. responses without a
+    request line), sized by the total length of its lines. Ids are ordered
+    by first appearance, files in the given order, and shards are
+    contiguous in that order.
+
+    Args:
+        paths: JSONL files of a run (missing files are skipped)
+        max_bytes: Target shard size
+    """
+    lengths: dict[str, int] = {}
+    for path in paths:
+        if not path.is_file():
+            continue
+        with JsonlFile(path) as jsonl:
+            for custom_id, (_, length) in jsonl.index.lines.items():
+                lengths[custom_id] = lengths.get(custom_id, 0) + length
+
+    shards: list[list[str]] = [[]]
+    shard_bytes = 0
+    for custom_id, length in lengths.items():
+        if shards[-1] and shard_bytes + length > max_bytes:
+            shards.append([])
+            shard_bytes = 0
+        shards[-1].append(custom_id)
+        shard_bytes += length
+    return shards
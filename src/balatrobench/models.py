@@ -10,19 +10,30 @@ site/benchmarks/
 │   ├── manifest.json                               → Manifest
 │   └── {version}/{strategy}/
 │       ├── leaderboard.json                        → ModelsLeaderboard
+│       ├── slices.json                             → ModelsLeaderboardSlices
+│       ├── paired.json                             → ModelsPairedComparison
 │       └── {vendor}/
 │           ├── {model}.json                        → Runs
-│           └── {model}/{run}/{request}/
-│               └── metadata.json                   → Request
+│           └── {model}/{run}/
+│               ├── series.json                     → per-call columns (series.py)
+│               └── {request}/metadata.json         → Request
 │
-└── strategies/                                     # Compare STRATEGIES (same model)
+├── strategies/                                     # Compare STRATEGIES (same model)
+│   ├── manifest.json                               → Manifest
+│   └── {version}/{vendor}/{model}/
+│       ├── leaderboard.json                        → StrategiesLeaderboard
+│       ├── slices.json                             → StrategiesLeaderboardSlices
+│       ├── paired.json                             → StrategiesPairedComparison
+│       └── {strategy}/
+│           ├── runs.json                           → Runs
+│           └── {run}/
+│               ├── series.json                     → per-call columns (series.py)
+│               └── {request}/metadata.json         → Request
+│
+└── providers/                                      # Compare PROVIDERS (all runs)
     ├── manifest.json                               → Manifest
-    └── {version}/{vendor}/{model}/
-        ├── leaderboard.json                        → StrategiesLeaderboard
-        └── {strategy}/
-            ├── runs.json                           → Runs
-            └── {run}/{request}/
-                └── metadata.json                   → Request
+    └── {version}/
+        └── leaderboard.json                        → ProvidersLeaderboard
 
 ================================================================================
 Dataclass Hierarchy
@@ -32,7 +43,7 @@ Building Blocks (reusable components):
     Strategy    - Strategy metadata (name, description, author, version, tags)
     Model       - Model identification (vendor, name)
     Config      - Run configuration (seed, deck, stake)
-    Stats       - Call/token/time/cost statistics (total, avg, std)
+    Stats       - Call/token/time/cost statistics (total, avg, std, percentiles)
 
 Output Files:
     Manifest                        - List of available versions
@@ -47,6 +58,17 @@ Output Files:
     │       ├── LeaderboardEntry    - run counts, round stats, Stats
     │       └── strategy: Strategy
     │
+    ├── ModelsLeaderboardSlices     - Models leaderboard per deck and/or stake
+    ├── StrategiesLeaderboardSlices - Strategies leaderboard per deck and/or stake
+    │   └── LeaderboardSlice        - deck, stake, entries
+    │
+    ├── ModelsPairedComparison      - Models of a strategy on shared seeds
+    ├── StrategiesPairedComparison  - Strategies of a model on shared seeds
+    │   └── PairedComparison        - win/loss/tie and round difference matrices
+    │
+    ├── ProvidersLeaderboard        - Ranking providers (and provider x model)
+    │   └── ProvidersLeaderboardEntry
+    │
     ├── Runs                        - Collection of benchmark runs
     │   └── Run                     - Single run with Model, Strategy, Config, Stats
     │
@@ -54,11 +76,15 @@ Output Files:
 
 """
 
-from dataclasses import dataclass
-from typing import Literal
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Literal
 
 from .enums import Deck, Stake
 
+if TYPE_CHECKING:
+    from .providers import ProviderPartial
+    from .sketch import RequestSketches
+
 ################################################################################
 # Version, Manifest, Strategy, Model & Config
 ################################################################################
@@ -113,6 +139,28 @@ class Config:
 ################################################################################
 
 
+@dataclass(frozen=True)
+class Percentiles:
+    """Percentiles of a per-call metric (estimated, see sketch.py)."""
+
+    p50: float
+    p90: float
+    p99: float
+
+
+@dataclass(frozen=True)
+class StatsPercentiles:
+    """Percentiles of the per-call metrics of successful calls."""
+
+    time_ms: Percentiles
+    tokens_in: Percentiles
+    tokens_out: Percentiles
+    cost: Percentiles
+    tokens_reasoning: Percentiles
+    # Measured calls only (see Stats.calls_measured)
+    tokens_out_per_s: Percentiles
+
+
 @dataclass(frozen=True)
 class Stats:
     """Statistics computed for a single run or aggregated across runs."""
@@ -141,6 +189,30 @@ class Stats:
     cost_avg: float
     cost_std: float
 
+    # Prompt cache (from the responses; 0 if they are not available)
+    tokens_cached_total: int = 0
+    cache_hit_ratio: float = 0.0  # tokens_cached_total / tokens_in_total
+    calls_cached: int = 0  # Successful calls with cached prompt tokens
+    calls_uncached: int = 0  # Successful calls without
+    time_cached_avg_ms: float = 0.0
+    time_uncached_avg_ms: float = 0.0
+
+    # Reasoning tokens, per successful call (from the responses; 0 if they
+    # are not available)
+    calls_reasoning: int = 0
+    tokens_reasoning_total: int = 0
+    tokens_reasoning_avg: float = 0.0
+    tokens_reasoning_std: float = 0.0
+
+    # Decode throughput, per measured call (successful calls with timestamps
+    # in the responses; 0 if they are not available)
+    calls_measured: int = 0
+    tokens_out_per_s_avg: float = 0.0
+    tokens_out_per_s_std: float = 0.0
+
+    # Percentiles (None if the responses are not available)
+    percentiles: StatsPercentiles | None = None
+
 
 ################################################################################
 # Leaderboards
@@ -196,6 +268,103 @@ class StrategiesLeaderboard:
     entries: tuple[StrategiesLeaderboardEntry, ...]
 
 
+@dataclass(frozen=True)
+class LeaderboardSlice:
+    """Leaderboard entries of the runs of a deck and/or stake (see cube.py)."""
+
+    deck: Deck | None  # None for every deck
+    stake: Stake | None  # None for every stake
+    entries: tuple[LeaderboardEntry, ...]  # Models or strategies entries
+
+
+@dataclass(frozen=True)
+class ModelsLeaderboardSlices:
+    """Models leaderboard of a strategy, per deck, stake and deck x stake."""
+
+    generated_at: int  # Unix timestamp
+    strategy: Strategy
+    slices: tuple[LeaderboardSlice, ...]  # Entries are ModelsLeaderboardEntry
+
+
+@dataclass(frozen=True)
+class StrategiesLeaderboardSlices:
+    """Strategies leaderboard of a model, per deck, stake and deck x stake."""
+
+    generated_at: int  # Unix timestamp
+    model: Model
+    slices: tuple[LeaderboardSlice, ...]  # Entries are StrategiesLeaderboardEntry
+
+
+@dataclass(frozen=True)
+class PairedComparison:
+    """Paired comparison matrices over shared (seed, deck, stake) configs.
+
+    Matrices are indexed [row][column] by competitor: the row competitor
+    compared with the column competitor (see paired.py).
+    """
+
+    pairs: tuple[tuple[int, ...], ...]  # Shared configurations
+    wins: tuple[tuple[int, ...], ...]  # Row reached a later final round
+    losses: tuple[tuple[int, ...], ...]
+    ties: tuple[tuple[int, ...], ...]
+    mean_round_diff: tuple[tuple[float, ...], ...]  # Mean of row - column
+    std_round_diff: tuple[tuple[float, ...], ...]
+
+
+@dataclass(frozen=True)
+class ModelsPairedComparison:
+    """Paired comparison of the models of a strategy."""
+
+    generated_at: int  # Unix timestamp
+    strategy: Strategy
+    models: tuple[Model, ...]  # Rows and columns of the matrices
+    comparison: PairedComparison
+
+
+@dataclass(frozen=True)
+class StrategiesPairedComparison:
+    """Paired comparison of the strategies of a model."""
+
+    generated_at: int  # Unix timestamp
+    model: Model
+    strategies: tuple[Strategy, ...]  # Rows and columns of the matrices
+    comparison: PairedComparison
+
+
+@dataclass(frozen=True)
+class ProvidersLeaderboardEntry:
+    """Entry in providers leaderboard - a provider, or a provider x model."""
+
+    provider: str
+    model: Model | None  # None for the entry of all models of the provider
+
+    # Calls
+    calls_total: int
+    calls_error: int
+    error_rate: float
+
+    # Tokens and throughput (output tokens per second of successful calls)
+    tokens_in_total: int
+    tokens_out_total: int
+    tokens_out_per_s: float
+
+    # Cost
+    cost_total: float
+    cost_per_1k_tokens: float
+
+    # Latency of successful calls (None without successful calls)
+    time_ms: Percentiles | None
+
+
+@dataclass(frozen=True)
+class ProvidersLeaderboard:
+    """Providers leaderboard - comparing providers across all runs of a version."""
+
+    generated_at: int  # Unix timestamp
+    providers: tuple[ProvidersLeaderboardEntry, ...]
+    models: tuple[ProvidersLeaderboardEntry, ...]  # Per provider x model
+
+
 ################################################################################
 # Runs
 ################################################################################
@@ -225,6 +394,16 @@ class Run:
     # Per-call statistics within this run
     stats: Stats
 
+    # Per-call sketches, merged into leaderboard percentiles (not written)
+    sketches: "RequestSketches | None" = field(
+        default=None, compare=False, repr=False, metadata={"output": False}
+    )
+
+    # Per-provider partials, merged into the providers leaderboard (not written)
+    provider_partials: "dict[str, ProviderPartial] | None" = field(
+        default=None, compare=False, repr=False, metadata={"output": False}
+    )
+
 
 @dataclass(frozen=True)
 class Runs:
@@ -260,3 +439,8 @@ class Request:
     cost_in: float
     cost_out: float
     cost_total: float
+
+    # Cache, reasoning and decode throughput (0 if the response lacks them)
+    tokens_cached: int = 0  # Prompt tokens served from the provider's cache
+    tokens_reasoning: int = 0  # Completion tokens spent on hidden reasoning
+    tokens_out_per_s: float = 0.0  # Decode throughput (0.0 without timestamps)
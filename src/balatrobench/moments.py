@@ -0,0 +1,333 @@
+"""Mergeable moment accumulators for Stats aggregation.
+
+Leaderboard statistics are built by merging per-run partials instead of
+re-deriving pooled variances from every run for each grouping. Merging
+is associative, so partials can be combined in any grouping (per shard,
+in parallel, incrementally as runs arrive) with the same result, up to
+floating-point rounding.
+
+Each metric is a Moments(n, mean, m2, total) in Chan/Welford form:
+
+    n      number of observations (calls, or runs for rounds)
+    mean   weighted mean of the merged means
+    m2     sum of squared deviations from mean
+    total  reported total; the pooled average is total / n
+
+Runs report their own total, average and standard deviation, and the
+average is not always total / n exactly. The pooled standard deviation
+is therefore taken about total / n, which gives the pooled-variance
+formula:
+
+    sum((n_i - 1) * s_i^2 + n_i * (mean_i - total / n)^2) / (n - 1)
+      = (m2 + n * (mean - total / n)^2) / (n - 1)
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field, replace
+from functools import reduce
+
+from .models import LeaderboardEntry, Request, Run, Stats
+from .sketch import RequestSketches
+
+
+@dataclass(frozen=True)
+class Moments:
+    """Count, mean and M2 of a metric, plus its reported total."""
+
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    total: float = 0  # Keeps int totals (tokens, time) as int
+
+    @classmethod
+    def from_summary(cls, n: int, avg: float, std: float, total: float) -> "Moments":
+        """Moments of a sample given by its size, mean and standard deviation."""
+        return cls(n=n, mean=avg, m2=(n - 1) * std**2, total=total)
+
+    @classmethod
+    def from_values(cls, values: Iterable[float]) -> "Moments":
+        """Moments of individual observations (Welford's algorithm)."""
+        n, mean, m2, total = 0, 0.0, 0.0, 0
+        for value in values:
+            n += 1
+            delta = value - mean
+            mean += delta / n
+            m2 += delta * (value - mean)
+            total += value
+        return cls(n=n, mean=mean, m2=m2, total=total)
+
+    def merge(self, other: "Moments") -> "Moments":
+        """Combine two partials (Chan et al. parallel update)."""
+        if self.n == 0 or other.n == 0:
+            base = other if self.n == 0 else self
+            return Moments(
+                n=base.n,
+                mean=base.mean,
+                m2=self.m2 + other.m2,
+                total=self.total + other.total,
+            )
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        return Moments(
+            n=n,
+            mean=self.mean + delta * other.n / n,
+            m2=self.m2 + other.m2 + delta**2 * self.n * other.n / n,
+            total=self.total + other.total,
+        )
+
+    @property
+    def avg(self) -> float:
+        """Pooled average: total / n (0.0 without observations)."""
+        return self.total / self.n if self.n > 0 else 0.0
+
+    def std(self, center: float | None = None) -> float:
+        """Sample standard deviation about center (default: avg)."""
+        if self.n <= 1:
+            return 0.0
+        center = self.avg if center is None else center
+        variance = (self.m2 + self.n * (self.mean - center) ** 2) / (self.n - 1)
+        return max(variance, 0.0) ** 0.5
+
+
+@dataclass(frozen=True)
+class CacheMoments:
+    """Mergeable partial of the prompt-cache statistics."""
+
+    tokens_cached: int = 0
+    time_cached: Moments = field(default_factory=Moments)  # Per cached call
+    time_uncached: Moments = field(default_factory=Moments)  # Per uncached call
+
+    @classmethod
+    def from_requests(cls, requests: Iterable[Request]) -> "CacheMoments":
+        """Partial of the requests of a run (latency of successful calls)."""
+        requests = list(requests)
+        successful = [r for r in requests if r.status == "success"]
+        return cls(
+            tokens_cached=sum(r.tokens_cached for r in requests),
+            time_cached=Moments.from_values(
+                r.time_ms for r in successful if r.tokens_cached > 0
+            ),
+            time_uncached=Moments.from_values(
+                r.time_ms for r in successful if r.tokens_cached == 0
+            ),
+        )
+
+    @classmethod
+    def from_stats(cls, stats: Stats) -> "CacheMoments":
+        """Partial of the cache statistics of one run."""
+        return cls(
+            tokens_cached=stats.tokens_cached_total,
+            time_cached=Moments.from_summary(
+                stats.calls_cached,
+                stats.time_cached_avg_ms,
+                0.0,
+                stats.time_cached_avg_ms * stats.calls_cached,
+            ),
+            time_uncached=Moments.from_summary(
+                stats.calls_uncached,
+                stats.time_uncached_avg_ms,
+                0.0,
+                stats.time_uncached_avg_ms * stats.calls_uncached,
+            ),
+        )
+
+    def merge(self, other: "CacheMoments") -> "CacheMoments":
+        """Combine two partials."""
+        return CacheMoments(
+            tokens_cached=self.tokens_cached + other.tokens_cached,
+            time_cached=self.time_cached.merge(other.time_cached),
+            time_uncached=self.time_uncached.merge(other.time_uncached),
+        )
+
+    def hit_ratio(self, tokens_in_total: int) -> float:
+        """Share of the prompt tokens served from the cache."""
+        return self.tokens_cached / tokens_in_total if tokens_in_total > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class DecodeMoments:
+    """Mergeable partial of reasoning tokens and decode throughput.
+
+    Reasoning tokens are taken over the successful calls, throughput over
+    the measured calls only: successful calls with timestamps.
+    """
+
+    tokens_reasoning: Moments = field(default_factory=Moments)
+    tokens_out_per_s: Moments = field(default_factory=Moments)
+
+    @classmethod
+    def from_requests(cls, requests: Iterable[Request]) -> "DecodeMoments":
+        """Partial of the requests of a run."""
+        success = [r for r in requests if r.status == "success"]
+        return cls(
+            tokens_reasoning=Moments.from_values(r.tokens_reasoning for r in success),
+            tokens_out_per_s=Moments.from_values(
+                r.tokens_out_per_s for r in success if r.time_ms > 0
+            ),
+        )
+
+    @classmethod
+    def from_stats(cls, stats: Stats) -> "DecodeMoments":
+        """Partial of the reasoning and throughput statistics of one run."""
+        n = stats.calls_measured
+        return cls(
+            tokens_reasoning=Moments.from_summary(
+                stats.calls_reasoning,
+                stats.tokens_reasoning_avg,
+                stats.tokens_reasoning_std,
+                stats.tokens_reasoning_total,
+            ),
+            tokens_out_per_s=Moments.from_summary(
+                n,
+                stats.tokens_out_per_s_avg,
+                stats.tokens_out_per_s_std,
+                stats.tokens_out_per_s_avg * n,
+            ),
+        )
+
+    def merge(self, other: "DecodeMoments") -> "DecodeMoments":
+        """Combine two partials."""
+        return DecodeMoments(
+            tokens_reasoning=self.tokens_reasoning.merge(other.tokens_reasoning),
+            tokens_out_per_s=self.tokens_out_per_s.merge(other.tokens_out_per_s),
+        )
+
+
+@dataclass(frozen=True)
+class StatsMoments:
+    """Mergeable partial of Stats: call counts and per-call metric moments."""
+
+    calls_total: int = 0
+    calls_success: int = 0
+    calls_error: int = 0
+    calls_failed: int = 0
+    tokens_in: Moments = field(default_factory=Moments)
+    tokens_out: Moments = field(default_factory=Moments)
+    time_ms: Moments = field(default_factory=Moments)
+    cost: Moments = field(default_factory=Moments)
+    cache: CacheMoments = field(default_factory=CacheMoments)
+    decode: DecodeMoments = field(default_factory=DecodeMoments)
+
+    @classmethod
+    def from_stats(cls, stats: Stats) -> "StatsMoments":
+        """Partial of the per-call statistics of one run."""
+        n = stats.calls_total
+        return cls(
+            calls_total=n,
+            calls_success=stats.calls_success,
+            calls_error=stats.calls_error,
+            calls_failed=stats.calls_failed,
+            tokens_in=Moments.from_summary(
+                n, stats.tokens_in_avg, stats.tokens_in_std, stats.tokens_in_total
+            ),
+            tokens_out=Moments.from_summary(
+                n, stats.tokens_out_avg, stats.tokens_out_std, stats.tokens_out_total
+            ),
+            time_ms=Moments.from_summary(
+                n, stats.time_avg_ms, stats.time_std_ms, stats.time_total_ms
+            ),
+            cost=Moments.from_summary(
+                n, stats.cost_avg, stats.cost_std, stats.cost_total
+            ),
+            cache=CacheMoments.from_stats(stats),
+            decode=DecodeMoments.from_stats(stats),
+        )
+
+    def merge(self, other: "StatsMoments") -> "StatsMoments":
+        """Combine two partials."""
+        return StatsMoments(
+            calls_total=self.calls_total + other.calls_total,
+            calls_success=self.calls_success + other.calls_success,
+            calls_error=self.calls_error + other.calls_error,
+            calls_failed=self.calls_failed + other.calls_failed,
+            tokens_in=self.tokens_in.merge(other.tokens_in),
+            tokens_out=self.tokens_out.merge(other.tokens_out),
+            time_ms=self.time_ms.merge(other.time_ms),
+            cost=self.cost.merge(other.cost),
+            cache=self.cache.merge(other.cache),
+            decode=self.decode.merge(other.decode),
+        )
+
+    def to_stats(self) -> Stats:
+        """Aggregated Stats with pooled averages and standard deviations."""
+        return Stats(
+            calls_total=self.calls_total,
+            calls_success=self.calls_success,
+            calls_error=self.calls_error,
+            calls_failed=self.calls_failed,
+            tokens_in_total=self.tokens_in.total,
+            tokens_out_total=self.tokens_out.total,
+            tokens_in_avg=self.tokens_in.avg,
+            tokens_out_avg=self.tokens_out.avg,
+            tokens_in_std=self.tokens_in.std(),
+            tokens_out_std=self.tokens_out.std(),
+            time_total_ms=self.time_ms.total,
+            time_avg_ms=self.time_ms.avg,
+            time_std_ms=self.time_ms.std(),
+            cost_total=self.cost.total,
+            cost_avg=self.cost.avg,
+            cost_std=self.cost.std(),
+            tokens_cached_total=self.cache.tokens_cached,
+            cache_hit_ratio=self.cache.hit_ratio(self.tokens_in.total),
+            calls_cached=self.cache.time_cached.n,
+            calls_uncached=self.cache.time_uncached.n,
+            time_cached_avg_ms=self.cache.time_cached.avg,
+            time_uncached_avg_ms=self.cache.time_uncached.avg,
+            calls_reasoning=self.decode.tokens_reasoning.n,
+            tokens_reasoning_total=self.decode.tokens_reasoning.total,
+            tokens_reasoning_avg=self.decode.tokens_reasoning.avg,
+            tokens_reasoning_std=self.decode.tokens_reasoning.std(),
+            calls_measured=self.decode.tokens_out_per_s.n,
+            tokens_out_per_s_avg=self.decode.tokens_out_per_s.avg,
+            tokens_out_per_s_std=self.decode.tokens_out_per_s.std(),
+        )
+
+
+@dataclass(frozen=True)
+class EntryMoments:
+    """Mergeable partial of a LeaderboardEntry over a set of runs."""
+
+    run_wins: int = 0
+    run_completed: int = 0
+    rounds: Moments = field(default_factory=Moments)  # One observation per run
+    stats: StatsMoments = field(default_factory=StatsMoments)
+    sketches: RequestSketches = field(default_factory=RequestSketches)
+
+    @classmethod
+    def from_run(cls, run: Run) -> "EntryMoments":
+        """Partial of a single run."""
+        return cls(
+            run_wins=int(run.run_won),
+            run_completed=int(run.run_completed),
+            rounds=Moments.from_values([run.final_round]),
+            stats=StatsMoments.from_stats(run.stats),
+            sketches=run.sketches or RequestSketches(),
+        )
+
+    def merge(self, other: "EntryMoments") -> "EntryMoments":
+        """Combine two partials."""
+        return EntryMoments(
+            run_wins=self.run_wins + other.run_wins,
+            run_completed=self.run_completed + other.run_completed,
+            rounds=self.rounds.merge(other.rounds),
+            stats=self.stats.merge(other.stats),
+            sketches=self.sketches.merge(other.sketches),
+        )
+
+    def to_entry(self) -> LeaderboardEntry:
+        """Leaderboard entry of the merged runs."""
+        return LeaderboardEntry(
+            run_count=self.rounds.n,
+            run_wins=self.run_wins,
+            run_completed=self.run_completed,
+            avg_round=self.rounds.avg,
+            std_round=self.rounds.std(),
+            stats=replace(
+                self.stats.to_stats(), percentiles=self.sketches.to_percentiles()
+            ),
+        )
+
+
+def merge_runs(runs: Iterable[Run]) -> EntryMoments:
+    """Merge the partials of runs into one EntryMoments."""
+    return reduce(EntryMoments.merge, map(EntryMoments.from_run, runs), EntryMoments())
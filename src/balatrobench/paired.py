@@ -0,0 +1,115 @@
+"""Paired comparison of runs sharing a game configuration.
+
+Runs with the same (seed, deck, stake) play the same game, whatever the
+model or strategy. Comparing two models on the configurations both have
+played removes the variance between games, which the unpaired avg_round
+ranking of the leaderboards carries.
+
+SeedIndex is a hash index from (seed, deck, stake) to the final round of
+each competitor (model or strategy), averaged over repeated runs of a
+configuration. Two competitors are joined by probing the index of one
+with the keys of the other (a hash join, linear in the number of
+configurations), and each shared configuration is one pair:
+
+    win    the row competitor reached a later final round
+    loss   an earlier one
+    tie    the same one
+
+The result is a set of competitor x competitor matrices indexed
+[row][column] (see models.PairedComparison). Cell (j, i) mirrors cell
+(i, j), so each pair of competitors is joined once.
+"""
+
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass, field
+
+from .enums import Deck, Stake
+from .models import PairedComparison, Run, Runs
+
+ConfigKey = tuple[str, Deck, Stake]  # seed, deck, stake
+
+
+def config_key(run: Run) -> ConfigKey:
+    """(seed, deck, stake) of a run."""
+    return (run.config.seed, run.config.deck, run.config.stake)
+
+
+@dataclass(frozen=True)
+class SeedIndex[T: Hashable]:
+    """Final round of each competitor per (seed, deck, stake)."""
+
+    rounds: dict[T, dict[ConfigKey, float]] = field(default_factory=dict)
+
+    @classmethod
+    def from_runs_list(
+        cls, runs_list: Iterable[Runs], competitor: Callable[[Runs], T]
+    ) -> "SeedIndex[T]":
+        """Index runs by configuration, per competitor.
+
+        Args:
+            runs_list: Runs of each model (or strategy)
+            competitor: Competitor of a Runs, e.g. lambda runs: runs.model
+        """
+        final_rounds: dict[T, dict[ConfigKey, list[int]]] = {}
+        for runs in runs_list:
+            by_config = final_rounds.setdefault(competitor(runs), {})
+            for run in runs.runs:
+                by_config.setdefault(config_key(run), []).append(run.final_round)
+        return cls(
+            {
+                name: {
+                    key: sum(values) / len(values) for key, values in by_config.items()
+                }
+                for name, by_config in final_rounds.items()
+            }
+        )
+
+    @property
+    def competitors(self) -> tuple[T, ...]:
+        """Indexed competitors, in insertion order."""
+        return tuple(self.rounds)
+
+    def compare(self) -> PairedComparison:
+        """Win/loss/tie and round difference matrices of every competitor pair."""
+        n = len(self.rounds)
+        pairs = [[0] * n for _ in range(n)]
+        wins = [[0] * n for _ in range(n)]
+        losses = [[0] * n for _ in range(n)]
+        ties = [[0] * n for _ in range(n)]
+        mean_diff = [[0.0] * n for _ in range(n)]
+        std_diff = [[0.0] * n for _ in range(n)]
+
+        columns = list(self.rounds.values())
+        for i, a in enumerate(columns):
+            for j in range(i + 1, n):
+                b = columns[j]
+                diffs = [a[key] - b[key] for key in a if key in b]
+                count = len(diffs)
+                if not count:
+                    continue
+                won = sum(d > 0 for d in diffs)
+                lost = sum(d < 0 for d in diffs)
+                mean = sum(diffs) / count
+                m2 = sum((d - mean) ** 2 for d in diffs)
+
+                pairs[i][j] = pairs[j][i] = count
+                wins[i][j] = losses[j][i] = won
+                losses[i][j] = wins[j][i] = lost
+                ties[i][j] = ties[j][i] = count - won - lost
+                mean_diff[i][j] = mean
+                mean_diff[j][i] = -mean
+                std_diff[i][j] = std_diff[j][i] = (
+                    (m2 / (count - 1)) ** 0.5 if count > 1 else 0.0
+                )
+
+        def freeze(matrix: list[list]) -> tuple[tuple, ...]:
+            return tuple(tuple(row) for row in matrix)
+
+        return PairedComparison(
+            pairs=freeze(pairs),
+            wins=freeze(wins),
+            losses=freeze(losses),
+            ties=freeze(ties),
+            mean_round_diff=freeze(mean_diff),
+            std_round_diff=freeze(std_diff),
+        )
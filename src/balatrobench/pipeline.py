@@ -0,0 +1,199 @@
+"""In-memory benchmark pipeline for library use.
+
+The CLI build writes everything to disk. BenchmarkPipeline exposes the
+same results as objects, without writing output files:
+
+    pipeline = BenchmarkPipeline(Path("runs/v1.0.0"))
+    pipeline.models_leaderboards()["default"]        # ModelsLeaderboard
+    pipeline.strategies_leaderboards()["openai/gpt-oss-120b"]
+    pipeline.providers_leaderboard()                  # ProvidersLeaderboard
+    pipeline.models_slices()["default"]               # Per deck and/or stake
+    pipeline.models_paired()["default"]               # On shared seeds
+    for record in pipeline.iter_requests():           # Lazily extracted
+        print(record.run.id, record.id, record.metadata.tokens_in)
+
+Run directories are scanned once, on first access. Request records are
+extracted one run at a time while iterating. The only files written are
+the JSONL offset indexes cached in the temp directory (see jsonl.INDEX_DIR);
+run summaries are computed without the summary cache.
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+from .analyzer import BenchmarkAnalyzer
+from .extractor import extract_run
+from .models import (
+    Model,
+    ModelsLeaderboard,
+    ModelsLeaderboardSlices,
+    ModelsPairedComparison,
+    ProvidersLeaderboard,
+    Request,
+    Run,
+    Runs,
+    StrategiesLeaderboard,
+    StrategiesLeaderboardSlices,
+    StrategiesPairedComparison,
+)
+from .scope import FULL_SCOPE, BuildScope
+from .writer import BenchmarkWriter
+
+
+@dataclass(frozen=True)
+class RequestRecord:
+    """A request of a run: prompt content, response and metadata.
+
+    Holds the data of the request files of the output trees (strategy.md,
+    gamestate.md, memory.md, reasoning.md, tool_call.json, metadata.json);
+    as in tool_call.json, reasoning is stripped from the tool call arguments.
+    Fields are empty if the request has no content or response.
+    """
+
+    run: Run
+    id: str  # custom_id, e.g. "request-00042"
+    strategy_text: str
+    gamestate: str
+    memory: str
+    reasoning: str
+    tool_calls: list[dict[str, Any]]
+    metadata: Request | None
+    screenshot: Path | None  # Source PNG, if present
+
+
+class BenchmarkPipeline:
+    """Leaderboards, runs and requests of a version as in-memory objects.
+
+    Args:
+        version_dir: Version directory with run data (e.g., runs/v1.0.0)
+        scope: Subtree to analyze (default: everything)
+    """
+
+    def __init__(self, version_dir: Path, scope: BuildScope = FULL_SCOPE) -> None:
+        if not version_dir.is_dir():
+            raise FileNotFoundError(f"Version directory not found: {version_dir}")
+        self.version_dir = version_dir
+        self.version = version_dir.name
+        self.scope = scope
+        self.analyzer = BenchmarkAnalyzer(runs_dir=version_dir.parent)
+
+    @cached_property
+    def models(self) -> dict[str, list[Runs]]:
+        """Strategy directory name → Runs of each model (one scan)."""
+        return self.analyzer.analyze_models(self.version_dir, self.scope)
+
+    @cached_property
+    def strategies(self) -> dict[str, list[Runs]]:
+        """Model key ("vendor/model") → Runs of each strategy, from models."""
+        result: dict[str, list[Runs]] = {}
+        for runs_list in self.models.values():
+            for runs in runs_list:
+                key = f"{runs.model.vendor}/{runs.model.name}"
+                result.setdefault(key, []).append(runs)
+        return result
+
+    def models_leaderboards(self) -> dict[str, ModelsLeaderboard]:
+        """Strategy key → leaderboard comparing the models of the strategy."""
+        return {
+            runs_list[0].strategy.key: self.analyzer.create_models_leaderboard(
+                runs_list[0].strategy, runs_list
+            )
+            for runs_list in self.models.values()
+            if runs_list
+        }
+
+    def strategies_leaderboards(self) -> dict[str, StrategiesLeaderboard]:
+        """Model key → leaderboard comparing the strategies of the model."""
+        leaderboards = {}
+        for model_key, runs_list in self.strategies.items():
+            vendor, name = model_key.split("/", 1)
+            leaderboards[model_key] = self.analyzer.create_strategies_leaderboard(
+                Model(vendor=vendor, name=name), runs_list
+            )
+        return leaderboards
+
+    def models_slices(self) -> dict[str, ModelsLeaderboardSlices]:
+        """Strategy key → models leaderboards per deck and/or stake."""
+        return {
+            runs_list[0].strategy.key: self.analyzer.create_models_slices(
+                runs_list[0].strategy, runs_list
+            )
+            for runs_list in self.models.values()
+            if runs_list
+        }
+
+    def strategies_slices(self) -> dict[str, StrategiesLeaderboardSlices]:
+        """Model key → strategies leaderboards per deck and/or stake."""
+        slices = {}
+        for model_key, runs_list in self.strategies.items():
+            vendor, name = model_key.split("/", 1)
+            slices[model_key] = self.analyzer.create_strategies_slices(
+                Model(vendor=vendor, name=name), runs_list
+            )
+        return slices
+
+    def models_paired(self) -> dict[str, ModelsPairedComparison]:
+        """Strategy key → paired comparison of the models of the strategy."""
+        return {
+            runs_list[0].strategy.key: self.analyzer.create_models_paired(
+                runs_list[0].strategy, runs_list
+            )
+            for runs_list in self.models.values()
+            if runs_list
+        }
+
+    def strategies_paired(self) -> dict[str, StrategiesPairedComparison]:
+        """Model key → paired comparison of the strategies of the model."""
+        paired = {}
+        for model_key, runs_list in self.strategies.items():
+            vendor, name = model_key.split("/", 1)
+            paired[model_key] = self.analyzer.create_strategies_paired(
+                Model(vendor=vendor, name=name), runs_list
+            )
+        return paired
+
+    def providers_leaderboard(self) -> ProvidersLeaderboard:
+        """Leaderboard comparing the providers of every selected run."""
+        return self.analyzer.create_providers_leaderboard(
+            [runs for runs_list in self.models.values() for runs in runs_list]
+        )
+
+    def iter_runs(self) -> Iterator[tuple[Path, Run]]:
+        """Yield (run directory, Run) of every selected run."""
+        for strategy_name, runs_list in self.models.items():
+            for runs in runs_list:
+                model_dir = (
+                    self.version_dir
+                    / strategy_name
+                    / runs.model.vendor
+                    / runs.model.name
+                )
+                for run in runs.runs:
+                    if self.scope.matches_run(run.id):
+                        yield model_dir / run.id, run
+
+    def iter_requests(self) -> Iterator[RequestRecord]:
+        """Yield the requests of every selected run, extracting runs lazily."""
+        ids = self.scope.requests or None
+        for run_dir, run in self.iter_runs():
+            extract = extract_run(run_dir, ids)
+            for custom_id in sorted(extract.custom_ids):
+                content = extract.content.get(custom_id, {})
+                response = extract.responses.get(custom_id, {})
+                screenshot = extract.screenshots_dir / f"{custom_id}.png"
+                yield RequestRecord(
+                    run=run,
+                    id=custom_id,
+                    strategy_text=content.get("strategy", ""),
+                    gamestate=content.get("gamestate", ""),
+                    memory=content.get("memory", ""),
+                    reasoning=response.get("reasoning", ""),
+                    tool_calls=BenchmarkWriter._strip_reasoning_from_tool_calls(
+                        response.get("tool_call", [])
+                    ),
+                    metadata=extract.metadata.get(custom_id),
+                    screenshot=screenshot if screenshot.exists() else None,
+                )
@@ -0,0 +1,271 @@
+"""Stage-level profiling for benchmark builds."""
+
+import cProfile
+import json
+import pstats
+import resource
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+# File naming constants
+BUILD_REPORT_FILENAME = "build-report.json"
+PROC_IO_FILE = Path("/proc/thread-self/io")
+
+
+@dataclass
+class StageStats:
+    """Accumulated measurements for a build stage (summed over all entries)."""
+
+    name: str
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    cpu_children_s: float = 0.0
+    files: int = 0  # Files written, or run directories for the scan stage
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+
+@dataclass
+class Measurement:
+    """Measurements of one call, taken in the thread that made it.
+
+    Worker processes return it with the task result (see scheduler), so it
+    stays picklable: cProfile data is kept as a pstats stats dict.
+    """
+
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    cpu_children_s: float = 0.0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    peak_rss_mb: float = 0.0  # Of the process that made the call
+    profile: dict | None = None  # cProfile stats, if profiled
+
+
+def _read_proc_io() -> tuple[int, int]:
+    """Return (bytes read, bytes written) by this thread, or zeros if unknown.
+
+    Uses the rchar/wchar counters of /proc/thread-self/io, which are Linux
+    only. They are per thread, so I/O done concurrently by other threads is
+    not counted.
+    """
+    try:
+        fields = dict(
+            line.split(": ", 1) for line in PROC_IO_FILE.read_text().splitlines()
+        )
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def _peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB.
+
+    The peak is process-wide and never decreases, so it is only meaningful
+    for the build as a whole, not for the stage that happened to observe it.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return peak / divisor
+
+
+def _children_cpu_s() -> float:
+    """Return CPU time consumed by waited-for child processes (e.g. cwebp)."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+@contextmanager
+def measure(profile: bool = False) -> Iterator[Measurement]:
+    """Measure the enclosed block in the calling thread.
+
+    Yields the Measurement, which is filled in when the block exits. With
+    profile, the block runs under cProfile, which allows one active profiler
+    per process.
+    """
+    measurement = Measurement()
+    profiler = cProfile.Profile() if profile else None
+    read_0, written_0 = _read_proc_io()
+    cpu_0 = time.thread_time()
+    children_0 = _children_cpu_s()
+    wall_0 = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield measurement
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.create_stats()
+            measurement.profile = profiler.stats
+        read_1, written_1 = _read_proc_io()
+        measurement.wall_s = time.perf_counter() - wall_0
+        measurement.cpu_s = time.thread_time() - cpu_0
+        measurement.cpu_children_s = _children_cpu_s() - children_0
+        measurement.bytes_read = read_1 - read_0
+        measurement.bytes_written = written_1 - written_0
+        measurement.peak_rss_mb = _peak_rss_mb()
+
+
+class _ProfileData:
+    """A cProfile stats dict in the form pstats.Stats loads."""
+
+    def __init__(self, stats: dict) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class BuildProfiler:
+    """Records wall time, CPU time and I/O per named build stage.
+
+    A disabled profiler is a no-op, so callers can wrap stages
+    unconditionally. Entering the same stage several times accumulates
+    into a single entry of the report. Stages may run concurrently in
+    worker threads or processes, in which case their times are summed
+    across workers. I/O is counted per thread, so each stage only gets the
+    I/O of its own calls.
+
+    cProfile sees every thread of a process, so stages of this process
+    cannot be profiled apart: the build as a whole is profiled (see
+    profile), and calls made in worker processes are profiled per stage.
+    """
+
+    def __init__(self, enabled: bool = True, pstats_dir: Path | None = None) -> None:
+        self.enabled = enabled
+        self.pstats_dir = pstats_dir
+        self.stages: dict[str, StageStats] = {}
+        self._profiles: dict[str, pstats.Stats] = {}
+        self._lock = threading.Lock()
+        self._peak_rss_mb = 0.0  # Largest of the recorded measurements
+        self._started = time.perf_counter()
+
+    @property
+    def profiles_calls(self) -> bool:
+        """Return True if calls are run under cProfile (see write_report)."""
+        return self.enabled and self.pstats_dir is not None
+
+    def _stats(self, name: str) -> StageStats:
+        with self._lock:
+            return self.stages.setdefault(name, StageStats(name=name))
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """Measure the enclosed block as part of stage `name`.
+
+        Yields the StageStats entry so the block can add to `files`.
+        """
+        if not self.enabled:
+            yield StageStats(name=name)
+            return
+
+        with measure() as measurement:
+            yield self._stats(name)
+        self.record(name, measurement)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """Run the enclosed block under cProfile, dumped as {name}.pstats.
+
+        Covers every thread of this process (Python 3.12+); calls made in
+        worker processes are not included.
+        """
+        if not self.profiles_calls:
+            yield
+            return
+
+        with measure(profile=True) as measurement:
+            yield
+        assert measurement.profile is not None
+        self._add_profile(name, measurement.profile)
+
+    def _add_profile(self, name: str, profile: dict) -> None:
+        """Merge cProfile stats into those dumped as {name}.pstats."""
+        if not profile:
+            return
+        data = _ProfileData(profile)
+        with self._lock:
+            if name in self._profiles:
+                self._profiles[name].add(data)
+            else:
+                self._profiles[name] = pstats.Stats(data)
+
+    def record(
+        self, name: str, measurement: Measurement | None = None, files: int = 0
+    ) -> None:
+        """Add a measured call (e.g. from a worker process) or files to a stage."""
+        if not self.enabled:
+            return
+        stats = self._stats(name)
+        with self._lock:
+            stats.files += files
+            if measurement is None:
+                return
+            stats.calls += 1
+            stats.wall_s += measurement.wall_s
+            stats.cpu_s += measurement.cpu_s
+            stats.cpu_children_s += measurement.cpu_children_s
+            stats.bytes_read += measurement.bytes_read
+            stats.bytes_written += measurement.bytes_written
+            self._peak_rss_mb = max(self._peak_rss_mb, measurement.peak_rss_mb)
+        if measurement.profile:
+            self._add_profile(name, measurement.profile)
+
+    def report(self) -> dict[str, object]:
+        """Build the machine-readable report as a dict.
+
+        Memory is reported once for the whole build (`peak_rss_mb`): the peak
+        of the largest build process, this one or a worker process.
+        """
+        stages = [asdict(s) for s in self.stages.values()]
+        return {
+            "generated_at": int(time.time()),
+            "wall_s": time.perf_counter() - self._started,
+            "peak_rss_mb": max(_peak_rss_mb(), self._peak_rss_mb),
+            "stages": stages,
+        }
+
+    def write_report(self, output_dir: Path, **extra: object) -> Path:
+        """Write build-report.json (and per-stage .pstats files if enabled).
+
+        Args:
+            output_dir: Directory for the report and pstats dumps
+            **extra: Additional top-level fields (e.g. version, input_dir)
+
+        Returns the path to the written report.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        report_path = output_dir / BUILD_REPORT_FILENAME
+        with report_path.open("w") as f:
+            json.dump({**extra, **self.report()}, f, indent=2)
+
+        if self.pstats_dir is not None:
+            self.pstats_dir.mkdir(parents=True, exist_ok=True)
+            for name, profile in self._profiles.items():
+                profile.dump_stats(self.pstats_dir / f"{name}.pstats")
+
+        return report_path
+
+    def print_summary(self) -> None:
+        """Print a human-readable per-stage summary table."""
+        print(
+            f"\n{'Stage':<22}{'Wall s':>9}{'CPU s':>9}{'Files':>9}"
+            f"{'MB in':>9}{'MB out':>9}"
+        )
+        for s in self.stages.values():
+            print(
+                f"{s.name:<22}{s.wall_s:>9.2f}{s.cpu_s:>9.2f}{s.files:>9}"
+                f"{s.bytes_read / 1e6:>9.1f}{s.bytes_written / 1e6:>9.1f}"
+            )
+
+
+# Shared disabled instance used when no profiler is configured
+NULL_PROFILER = BuildProfiler(enabled=False)
@@ -0,0 +1,114 @@
+"""Per-provider aggregation of request metadata.
+
+stats.json only counts the calls of each provider. Every response of
+responses.jsonl names the provider that served it, with its usage, cost
+and timestamps, so the summary of a run (see summary.py) also groups
+its requests by provider into mergeable partials, alongside the
+sketches of the run's percentiles.
+
+Failed requests have no body naming a provider. They are attributed to
+the upstream provider named by the routing error
+(error.metadata.provider_name); errors that name no provider are counted
+under "unknown" (see extractor.DEFAULT_PROVIDER), so the error_rate of a
+provider only counts the errors it is known to have caused.
+
+The providers leaderboard merges the partials of every run of a version,
+per provider and per provider x model.
+"""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+
+from .models import Model, ProvidersLeaderboardEntry, Request
+from .sketch import DDSketch
+
+
+@dataclass(frozen=True)
+class ProviderPartial:
+    """Mergeable aggregate of the requests served by a provider."""
+
+    calls_total: int = 0
+    calls_error: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+    cost: float = 0.0
+    # Successful calls with a measured time, for throughput
+    timed_ms: int = 0
+    timed_tokens_out: int = 0
+    latency: DDSketch = field(default_factory=DDSketch)  # Successful calls
+
+    def merge(self, other: "ProviderPartial") -> "ProviderPartial":
+        """Combine two partials."""
+        return ProviderPartial(
+            calls_total=self.calls_total + other.calls_total,
+            calls_error=self.calls_error + other.calls_error,
+            tokens_in=self.tokens_in + other.tokens_in,
+            tokens_out=self.tokens_out + other.tokens_out,
+            cost=self.cost + other.cost,
+            timed_ms=self.timed_ms + other.timed_ms,
+            timed_tokens_out=self.timed_tokens_out + other.timed_tokens_out,
+            latency=self.latency.merge(other.latency),
+        )
+
+    def to_entry(self, provider: str, model: Model | None) -> ProvidersLeaderboardEntry:
+        """Leaderboard entry of the merged requests."""
+        tokens = self.tokens_in + self.tokens_out
+        return ProvidersLeaderboardEntry(
+            provider=provider,
+            model=model,
+            calls_total=self.calls_total,
+            calls_error=self.calls_error,
+            error_rate=self.calls_error / self.calls_total if self.calls_total else 0.0,
+            tokens_in_total=self.tokens_in,
+            tokens_out_total=self.tokens_out,
+            tokens_out_per_s=(
+                self.timed_tokens_out / (self.timed_ms / 1000) if self.timed_ms else 0.0
+            ),
+            cost_total=self.cost,
+            cost_per_1k_tokens=self.cost / tokens * 1000 if tokens else 0.0,
+            time_ms=self.latency.percentiles() if self.latency.count else None,
+        )
+
+
+def group_by_provider(requests: Iterable[Request]) -> dict[str, ProviderPartial]:
+    """Aggregate requests into one partial per provider."""
+    grouped: dict[str, list[Request]] = {}
+    for request in requests:
+        grouped.setdefault(request.provider, []).append(request)
+    return {
+        provider: _partial(provider_requests)
+        for provider, provider_requests in sorted(grouped.items())
+    }
+
+
+def merge_providers(
+    partials: Iterable[Mapping[str, ProviderPartial]],
+) -> dict[str, ProviderPartial]:
+    """Merge provider → partial mappings (e.g. of several runs)."""
+    merged: dict[str, ProviderPartial] = {}
+    for mapping in partials:
+        for provider, partial in mapping.items():
+            merged[provider] = merged.get(provider, ProviderPartial()).merge(partial)
+    return merged
+
+
+def _partial(requests: list[Request]) -> ProviderPartial:
+    latency = DDSketch()
+    timed_ms = timed_tokens_out = 0
+    for request in requests:
+        if request.status != "success":
+            continue
+        latency.add(request.time_ms)
+        if request.time_ms > 0:
+            timed_ms += request.time_ms
+            timed_tokens_out += request.tokens_out
+    return ProviderPartial(
+        calls_total=len(requests),
+        calls_error=sum(1 for request in requests if request.status != "success"),
+        tokens_in=sum(request.tokens_in for request in requests),
+        tokens_out=sum(request.tokens_out for request in requests),
+        cost=sum(request.cost_total for request in requests),
+        timed_ms=timed_ms,
+        timed_tokens_out=timed_tokens_out,
+        latency=latency,
+    )
@@ -0,0 +1,229 @@
+"""Task-graph scheduler with separate CPU and I/O worker pools.
+
+A TaskGraph is a DAG of named tasks. Each task receives the results of
+its dependencies as positional arguments, in the order they were
+declared. Tasks run as soon as their dependencies are done:
+
+    cpu tasks   - ProcessPoolExecutor (functions and arguments must be
+                  picklable); with cpu_workers=0 they run inline instead
+    io tasks    - ThreadPoolExecutor
+
+Worker processes measure their tasks and record their tracing spans
+themselves; both come back with the results and are passed to the
+profiler and the span exporters of this process.
+
+Results are released once every dependent task has started, so large
+intermediate values (e.g. extracted request content) do not accumulate.
+"""
+
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from . import tracing
+from .profiling import NULL_PROFILER, BuildProfiler, Measurement, measure
+from .tracing import Span
+
+Pool = Literal["cpu", "io"]
+
+# Default size of the I/O thread pool
+DEFAULT_IO_WORKERS = 16
+
+
+@dataclass
+class Task:
+    """A node of the task graph."""
+
+    name: str
+    fn: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+    pool: Pool = "io"
+    stage: str | None = None  # Profiler stage the task is accounted to
+    count: Callable[[Any], int] | None = None  # Files counted from the result
+    dependents: list[str] = field(default_factory=list)
+
+
+class TaskGraph:
+    """A DAG of tasks executed by a two-pool scheduler."""
+
+    def __init__(self) -> None:
+        self.tasks: dict[str, Task] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        deps: tuple[str, ...] | list[str] = (),
+        *,
+        pool: Pool = "io",
+        stage: str | None = None,
+        count: Callable[[Any], int] | None = None,
+    ) -> str:
+        """Add a task and return its name.
+
+        Dependencies must already be in the graph, which keeps it acyclic.
+        """
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        for dep in deps:
+            if dep not in self.tasks:
+                raise ValueError(f"Unknown dependency {dep!r} of task {name!r}")
+            self.tasks[dep].dependents.append(name)
+        self.tasks[name] = Task(
+            name=name, fn=fn, deps=tuple(deps), pool=pool, stage=stage, count=count
+        )
+        return name
+
+    def run(
+        self,
+        cpu_workers: int | None = None,
+        io_workers: int | None = None,
+        profiler: BuildProfiler = NULL_PROFILER,
+    ) -> dict[str, Any]:
+        """Execute all tasks, respecting dependencies.
+
+        Args:
+            cpu_workers: Worker processes for cpu tasks (None = CPU count,
+                0 = run cpu tasks inline in the calling thread)
+            io_workers: Worker threads for io tasks (None = DEFAULT_IO_WORKERS)
+            profiler: Receives per-stage timings of the tasks
+
+        Returns the results of the sink tasks (tasks without dependents).
+        Raises the first task exception after cancelling pending work.
+        """
+        if not self.tasks:
+            return {}
+
+        if cpu_workers is None:
+            cpu_workers = os.cpu_count() or 1
+        io_pool = ThreadPoolExecutor(io_workers or DEFAULT_IO_WORKERS)
+        cpu_pool = (
+            ProcessPoolExecutor(cpu_workers, mp_context=_mp_context())
+            if cpu_workers > 0
+            else None
+        )
+
+        pending_deps = {name: len(t.deps) for name, t in self.tasks.items()}
+        remaining_uses = {name: len(t.dependents) for name, t in self.tasks.items()}
+        results: dict[str, Any] = {}
+        # Ready tasks start last in, first out, so dependents run as soon as
+        # their inputs are done; initial tasks are reversed to start in the
+        # order they were added (e.g. archive order for archive inputs)
+        ready = [name for name, n in pending_deps.items() if n == 0][::-1]
+        running: dict[Future, str] = {}
+        # Options of worker-side measurements, fixed for the whole run
+        profile, trace = profiler.profiles_calls, tracing.is_enabled()
+
+        def start(name: str) -> None:
+            task = self.tasks[name]
+            args = [results[dep] for dep in task.deps]
+            for dep in task.deps:
+                remaining_uses[dep] -= 1
+                if remaining_uses[dep] == 0:
+                    del results[dep]
+            if task.pool == "cpu" and cpu_pool is not None:
+                future = cpu_pool.submit(_measured_call, profile, trace, task.fn, *args)
+            elif task.pool == "cpu":
+                # Inline cpu tasks are measured like io tasks, in this thread
+                future = Future()
+                try:
+                    result = _staged_call(profiler, task.stage, task.fn, *args)
+                except Exception as e:
+                    e.add_note(f"In task {name}")
+                    raise
+                future.set_result(result)
+            else:
+                future = io_pool.submit(
+                    _staged_call, profiler, task.stage, task.fn, *args
+                )
+            running[future] = name
+
+        def finish(future: Future, name: str) -> None:
+            task = self.tasks[name]
+            try:
+                result = future.result()
+            except Exception as e:
+                e.add_note(f"In task {name}")
+                raise
+            if task.pool == "cpu" and cpu_pool is not None:
+                result, measurement, spans = result
+                tracing.export_spans(spans)
+                if task.stage:
+                    profiler.record(task.stage, measurement)
+            if task.stage and task.count is not None:
+                profiler.record(task.stage, files=task.count(result))
+            if task.dependents:
+                results[name] = result
+            else:
+                sinks[name] = result
+            for dependent in task.dependents:
+                pending_deps[dependent] -= 1
+                if pending_deps[dependent] == 0:
+                    ready.append(dependent)
+
+        sinks: dict[str, Any] = {}
+        try:
+            while ready or running:
+                while ready:
+                    start(ready.pop())
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future, running.pop(future))
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+        finally:
+            io_pool.shutdown(wait=True, cancel_futures=True)
+            if cpu_pool is not None:
+                cpu_pool.shutdown(wait=True, cancel_futures=True)
+
+        return sinks
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """Start method for worker processes.
+
+    The I/O pool's threads already exist when workers start, so plain fork
+    is avoided.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def _measured_call(
+    profile: bool, trace: bool, fn: Callable[..., Any], *args: Any
+) -> tuple[Any, Measurement, list[Span]]:
+    """Call fn and return (result, measurement, finished spans).
+
+    Runs in worker processes, where the parent's profiler and span
+    exporters are not reachable.
+
+    Args:
+        profile: Run fn under cProfile
+        trace: Record the spans of fn
+    """
+    with tracing.collect(trace) as spans, measure(profile) as measurement:
+        result = fn(*args)
+    return result, measurement, spans
+
+
+def _staged_call(
+    profiler: BuildProfiler, stage: str | None, fn: Callable[..., Any], *args: Any
+) -> Any:
+    """Call fn inside a profiler stage (if any)."""
+    if stage is None:
+        return fn(*args)
+    with profiler.stage(stage):
+        return fn(*args)
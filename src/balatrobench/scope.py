@@ -0,0 +1,62 @@
+"""Build scope: the subtree of a version selected for a partial rebuild."""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class BuildScope:
+    """Filters on the strategy/vendor/model/run layout of a version.
+
+    Each field lists accepted directory names (or request ids); an empty
+    tuple accepts everything. Models match either by name or by
+    "vendor/name".
+    """
+
+    strategies: tuple[str, ...] = ()
+    vendors: tuple[str, ...] = ()
+    models: tuple[str, ...] = ()
+    runs: tuple[str, ...] = ()
+    requests: tuple[str, ...] = ()  # custom_ids, e.g. "request-00213"
+
+    @property
+    def is_full(self) -> bool:
+        """True if the scope selects the whole version."""
+        return not (
+            self.strategies or self.vendors or self.models or self.runs or self.requests
+        )
+
+    def matches_model(self, strategy: str, vendor: str, model: str) -> bool:
+        """Check whether a {strategy}/{vendor}/{model} directory is selected.
+
+        Run filters are not considered here, see matches_run().
+        """
+        if self.strategies and strategy not in self.strategies:
+            return False
+        if self.vendors and vendor not in self.vendors:
+            return False
+        return not self.models or (
+            model in self.models or f"{vendor}/{model}" in self.models
+        )
+
+    def matches_run(self, run_id: str) -> bool:
+        """Check whether a run directory is selected."""
+        return not self.runs or run_id in self.runs
+
+    def selects(self, model_dir: Path) -> bool:
+        """Check whether a {strategy}/{vendor}/{model} directory is selected.
+
+        With run filters, the model directory must contain a selected run.
+        """
+        vendor_dir = model_dir.parent
+        if not self.matches_model(
+            vendor_dir.parent.name, vendor_dir.name, model_dir.name
+        ):
+            return False
+        return not self.runs or any(
+            (model_dir / run_id).is_dir() for run_id in self.runs
+        )
+
+
+# Scope selecting everything
+FULL_SCOPE = BuildScope()
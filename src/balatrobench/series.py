@@ -0,0 +1,80 @@
+"""Columnar per-call time series of a run.
+
+Charting a run from the per-request metadata.json files takes one fetch
+per request. The writer also stores the per-call metrics of each run in
+a single {run}/series.json, one array per column, in request order:
+
+    {
+      "format": 1,
+      "providers": ["Groq", "Cerebras"],
+      "request": [1, 2, 3, ...],
+      "tokens_in": [...],
+      "tokens_out": [...],
+      "tokens_cached": [...],
+      "time_ms": [...],
+      "cost": [...],
+      "provider": [0, 0, 1, ...]
+    }
+
+request is the request number (request-00042 → 42) and provider indexes
+the providers list. The file is built from the metadata of the
+extraction pass, so no extra read of responses.jsonl is needed.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+
+from .models import Request
+
+SERIES_FILENAME = "series.json"
+SERIES_FORMAT = 1
+
+# Column → Request attribute
+SERIES_COLUMNS = {
+    "tokens_in": "tokens_in",
+    "tokens_out": "tokens_out",
+    "tokens_cached": "tokens_cached",
+    "time_ms": "time_ms",
+    "cost": "cost_total",
+}
+
+
+def encode_series(metadata: Mapping[str, Request]) -> dict[str, Any]:
+    """Build the series.json data of a run.
+
+    Args:
+        metadata: custom_id → Request of the run (see extract_request_metadata)
+    """
+    custom_ids = sorted(metadata)
+    requests = [metadata[custom_id] for custom_id in custom_ids]
+    providers = list(dict.fromkeys(request.provider for request in requests))
+    codes = {provider: code for code, provider in enumerate(providers)}
+
+    data: dict[str, Any] = {
+        "format": SERIES_FORMAT,
+        "providers": providers,
+        "request": [_request_number(custom_id) for custom_id in custom_ids],
+    }
+    for column, attr in SERIES_COLUMNS.items():
+        data[column] = [getattr(request, attr) for request in requests]
+    data["provider"] = [codes[request.provider] for request in requests]
+    return data
+
+
+def decode_series(data: dict[str, Any]) -> list[dict[str, Any]]:
+    """Rows of a series.json, one dict per call with the provider name."""
+    providers = data["providers"]
+    return [
+        {
+            "request": number,
+            **{column: data[column][i] for column in SERIES_COLUMNS},
+            "provider": providers[data["provider"][i]],
+        }
+        for i, number in enumerate(data["request"])
+    ]
+
+
+def _request_number(custom_id: str) -> int:
+    """Number of a request id (e.g. "request-00042" → 42), else 0."""
+    digits = custom_id.rpartition("-")[2]
+    return int(digits) if digits.isdigit() else 0
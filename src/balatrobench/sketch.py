@@ -0,0 +1,160 @@
+"""Mergeable quantile sketches of per-call metrics.
+
+stats.json only reports the average and standard deviation of each
+per-call metric. Percentiles (p50/p90/p99) are estimated from the
+per-request metadata of responses.jsonl with a DDSketch:
+
+    Values are counted in logarithmic buckets of width gamma, where
+    gamma = (1 + a) / (1 - a) for a relative accuracy a. Any quantile
+    is estimated within a relative error of a of the exact value.
+
+Two sketches with the same accuracy merge by adding their bucket
+counts, which is exact: the sketch of all runs of a model is the merge
+of the per-run sketches (see moments.EntryMoments), whatever the order.
+
+Values <= 0 (e.g. calls without timestamps) are counted in a zero
+bucket and estimated as 0.
+"""
+
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from .models import Percentiles, Request, StatsPercentiles
+
+# Estimated quantiles are within 1% of the exact values
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Quantiles reported in the output (see models.Percentiles)
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+class DDSketch:
+    """Quantile sketch with relative accuracy guarantees.
+
+    Args:
+        relative_accuracy: Maximum relative error of estimated quantiles
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(
+                f"Relative accuracy must be in (0, 1): {relative_accuracy}"
+            )
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Count a value (count times)."""
+        if value > 0:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        """Return the sketch of the values of both sketches.
+
+        Raises:
+            ValueError: If the sketches have different accuracies
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                "Cannot merge sketches with different accuracies: "
+                f"{self.relative_accuracy} and {other.relative_accuracy}"
+            )
+        merged = DDSketch(self.relative_accuracy)
+        merged.bins = dict(self.bins)
+        for key, count in other.bins.items():
+            merged.bins[key] = merged.bins.get(key, 0) + count
+        merged.zero_count = self.zero_count + other.zero_count
+        merged.count = self.count + other.count
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        return merged
+
+    def quantile(self, q: float) -> float:
+        """Estimated q-quantile (0 <= q <= 1), or 0.0 for an empty sketch."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.gamma**key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentiles(self) -> Percentiles:
+        """The reported quantiles of the sketch."""
+        return Percentiles(**{name: self.quantile(q) for name, q in QUANTILES.items()})
+
+
+@dataclass(frozen=True)
+class RequestSketches:
+    """Sketches of the per-call metrics of successful requests."""
+
+    time_ms: DDSketch = field(default_factory=DDSketch)
+    tokens_in: DDSketch = field(default_factory=DDSketch)
+    tokens_out: DDSketch = field(default_factory=DDSketch)
+    cost: DDSketch = field(default_factory=DDSketch)
+    tokens_reasoning: DDSketch = field(default_factory=DDSketch)
+    tokens_out_per_s: DDSketch = field(default_factory=DDSketch)
+
+    @classmethod
+    def from_requests(cls, requests: Iterable[Request]) -> "RequestSketches":
+        """Sketch the metrics of requests (failed requests are skipped)."""
+        sketches = cls()
+        for request in requests:
+            if request.status != "success":
+                continue
+            sketches.time_ms.add(request.time_ms)
+            sketches.tokens_in.add(request.tokens_in)
+            sketches.tokens_out.add(request.tokens_out)
+            sketches.cost.add(request.cost_total)
+            sketches.tokens_reasoning.add(request.tokens_reasoning)
+            # Throughput needs timestamps
+            if request.time_ms > 0:
+                sketches.tokens_out_per_s.add(request.tokens_out_per_s)
+        return sketches
+
+    @property
+    def count(self) -> int:
+        """Number of sketched requests."""
+        return self.time_ms.count
+
+    def merge(self, other: "RequestSketches") -> "RequestSketches":
+        """Combine the sketches of two sets of requests."""
+        return RequestSketches(
+            time_ms=self.time_ms.merge(other.time_ms),
+            tokens_in=self.tokens_in.merge(other.tokens_in),
+            tokens_out=self.tokens_out.merge(other.tokens_out),
+            cost=self.cost.merge(other.cost),
+            tokens_reasoning=self.tokens_reasoning.merge(other.tokens_reasoning),
+            tokens_out_per_s=self.tokens_out_per_s.merge(other.tokens_out_per_s),
+        )
+
+    def to_percentiles(self) -> StatsPercentiles | None:
+        """Percentiles of every metric, or None without sketched requests."""
+        if self.count == 0:
+            return None
+        return StatsPercentiles(
+            time_ms=self.time_ms.percentiles(),
+            tokens_in=self.tokens_in.percentiles(),
+            tokens_out=self.tokens_out.percentiles(),
+            cost=self.cost.percentiles(),
+            tokens_reasoning=self.tokens_reasoning.percentiles(),
+            tokens_out_per_s=self.tokens_out_per_s.percentiles(),
+        )
@@ -0,0 +1,412 @@
+"""SQLite analytical store of runs and requests.
+
+--sqlite loads every Run (with its Config and Stats) and every Request of
+the built versions into a SQLite database, for ad-hoc queries such as
+"p95 latency of model X on GOLD stake":
+
+    strategies  one row per strategy of a version (Strategy)
+    runs        one row per Run: the columns of the runs export table
+    requests    one row per Request: the columns of the requests export
+                table (with the model, run id and Config of its run)
+
+runs and requests also carry version, strategy and vendor, and are
+indexed on (strategy, vendor, model) and (deck, stake); requests also on
+provider. Rows are inserted with executemany, one transaction per run.
+
+The query helpers rebuild leaderboards with SQL aggregates: per group,
+the sums of n, n * avg and (n - 1) * std^2 + n * avg^2 of each metric
+give its moments.Moments, merged exactly like the analyzer merges runs:
+
+    conn = open_store(Path("benchmarks.db"))
+    models_leaderboard(conn, "v1.0.0", "default", stake="GOLD")
+    request_quantile(conn, "v1.0.0", "time_ms", 0.95, model="gpt-oss-120b")
+"""
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from . import tracing
+from .export import REQUEST_COLUMNS, RUN_COLUMNS, request_row, run_row
+from .extractor import extract_request_metadata
+from .models import (
+    Model,
+    ModelsLeaderboard,
+    ModelsLeaderboardEntry,
+    StrategiesLeaderboard,
+    StrategiesLeaderboardEntry,
+    Strategy,
+)
+from .moments import CacheMoments, DecodeMoments, EntryMoments, Moments, StatsMoments
+from .pipeline import BenchmarkPipeline
+from .scope import FULL_SCOPE, BuildScope
+
+# Export column type → SQLite column type
+SQL_TYPES = {
+    "string": "TEXT",
+    "int64": "INTEGER",
+    "float64": "REAL",
+    "bool_": "INTEGER",
+}
+
+# Columns of runs and requests before the export columns
+KEY_COLUMNS = ("version", "strategy", "vendor")
+
+# Columns accepted as query filters
+FILTER_COLUMNS = ("strategy", "vendor", "model", "deck", "stake", "seed")
+
+# Metric → (count, avg, std, total) columns of runs (see moments.StatsMoments)
+METRICS = {
+    "tokens_in": ("calls_total", "tokens_in_avg", "tokens_in_std", "tokens_in_total"),
+    "tokens_out": (
+        "calls_total",
+        "tokens_out_avg",
+        "tokens_out_std",
+        "tokens_out_total",
+    ),
+    "time_ms": ("calls_total", "time_avg_ms", "time_std_ms", "time_total_ms"),
+    "cost": ("calls_total", "cost_avg", "cost_std", "cost_total"),
+    "time_cached": ("calls_cached", "time_cached_avg_ms", None, None),
+    "time_uncached": ("calls_uncached", "time_uncached_avg_ms", None, None),
+    "tokens_reasoning": (
+        "calls_reasoning",
+        "tokens_reasoning_avg",
+        "tokens_reasoning_std",
+        "tokens_reasoning_total",
+    ),
+    "tokens_out_per_s": (
+        "calls_measured",
+        "tokens_out_per_s_avg",
+        "tokens_out_per_s_std",
+        None,
+    ),
+    "rounds": ("1", "final_round", None, "final_round"),  # One observation per run
+}
+
+# Batch size of executemany for requests
+BATCH_SIZE = 10000
+
+
+def _schema() -> str:
+    """CREATE statements of the tables and indexes."""
+
+    def columns(spec: dict[str, str]) -> str:
+        return ", ".join(
+            [f"{name} TEXT NOT NULL" for name in KEY_COLUMNS]
+            + [f"{name} {SQL_TYPES[type_name]}" for name, type_name in spec.items()]
+        )
+
+    return f"""
+        CREATE TABLE IF NOT EXISTS strategies (
+            version TEXT NOT NULL, key TEXT NOT NULL, name TEXT, description TEXT,
+            author TEXT, strategy_version TEXT, tags TEXT,
+            PRIMARY KEY (version, key)
+        );
+        CREATE TABLE IF NOT EXISTS runs (
+            {columns(RUN_COLUMNS)},
+            PRIMARY KEY (version, strategy, vendor, model, run_id)
+        );
+        CREATE TABLE IF NOT EXISTS requests (
+            {columns(REQUEST_COLUMNS)},
+            PRIMARY KEY (version, strategy, vendor, model, run_id, request_id)
+        );
+        CREATE INDEX IF NOT EXISTS runs_model ON runs (strategy, vendor, model);
+        CREATE INDEX IF NOT EXISTS runs_config ON runs (deck, stake);
+        CREATE INDEX IF NOT EXISTS requests_model
+            ON requests (strategy, vendor, model);
+        CREATE INDEX IF NOT EXISTS requests_config ON requests (deck, stake);
+        CREATE INDEX IF NOT EXISTS requests_provider ON requests (provider);
+    """
+
+
+def open_store(path: Path | str) -> sqlite3.Connection:
+    """Open (or create) a store database with its tables and indexes."""
+    conn = sqlite3.connect(path)
+    conn.executescript(_schema())
+    return conn
+
+
+################################################################################
+# Loading
+################################################################################
+
+
+def load_version(
+    conn: sqlite3.Connection,
+    version_dir: Path,
+    scope: BuildScope = FULL_SCOPE,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """Load the runs and requests of a version into the store.
+
+    A full scope replaces every row of the version; a partial scope
+    replaces the rows of the selected runs (with a request filter, only the
+    selected requests of those runs).
+
+    Args:
+        conn: Connection of open_store
+        version_dir: Version directory with run data (e.g., runs/v1.0.0)
+        scope: Runs to load (default: everything)
+        batch_size: Number of request rows per executemany
+
+    Returns:
+        Number of loaded runs.
+    """
+    pipeline = BenchmarkPipeline(version_dir, scope)
+    version = pipeline.version
+    ids = scope.requests or None
+
+    if scope.is_full:
+        with conn:
+            for table in ("strategies", "runs", "requests"):
+                conn.execute(f"DELETE FROM {table} WHERE version = ?", (version,))
+
+    run_sql = _insert_sql("runs", RUN_COLUMNS)
+    request_sql = _insert_sql("requests", REQUEST_COLUMNS)
+    # Requests no longer in a reloaded run must not survive the reload
+    delete_sql = (
+        "DELETE FROM requests WHERE version = ? AND strategy = ? AND vendor = ?"
+        " AND model = ? AND run_id = ?"
+    )
+    if ids:
+        delete_sql += f" AND request_id IN ({', '.join('?' * len(ids))})"
+    strategies: dict[str, Strategy] = {}
+    count = 0
+    for run_dir, run in pipeline.iter_runs():
+        strategies.setdefault(run.strategy.key, run.strategy)
+        key = (version, run.strategy.key, run.model.vendor)
+        with tracing.span("store.run", run=run.id), conn:
+            conn.execute(run_sql, (*key, *run_row(run).values()))
+            conn.execute(delete_sql, (*key, run.model.name, run.id, *(ids or ())))
+            responses_file = run_dir / "responses.jsonl"
+            if responses_file.exists():
+                metadata = extract_request_metadata(responses_file, ids)
+                rows = [
+                    (*key, *request_row(run, metadata[custom_id]).values())
+                    for custom_id in sorted(metadata)
+                ]
+                for start in range(0, len(rows), batch_size):
+                    conn.executemany(request_sql, rows[start : start + batch_size])
+        count += 1
+
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO strategies VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    version,
+                    strategy.key,
+                    strategy.name,
+                    strategy.description,
+                    strategy.author,
+                    strategy.version,
+                    json.dumps(strategy.tags),
+                )
+                for strategy in strategies.values()
+            ],
+        )
+    return count
+
+
+def _insert_sql(table: str, columns: dict[str, str]) -> str:
+    placeholders = ", ".join("?" * (len(KEY_COLUMNS) + len(columns)))
+    return f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})"
+
+
+################################################################################
+# Queries
+################################################################################
+
+
+def models_leaderboard(
+    conn: sqlite3.Connection, version: str, strategy: str, **filters: str
+) -> ModelsLeaderboard:
+    """Models leaderboard of a strategy, over the runs matching filters.
+
+    Equal to the built leaderboard for the same runs, except that Stats
+    percentiles (sketched from the responses) are None.
+
+    Args:
+        conn: Connection of open_store
+        version: Version, e.g. "v1.0.0"
+        strategy: Strategy key
+        **filters: Column values to match (deck, stake, vendor, model, seed)
+    """
+    entries = [
+        ModelsLeaderboardEntry(
+            **vars(entry), model=Model(vendor=group["vendor"], name=group["model"])
+        )
+        for group, entry in _entries(
+            conn, version, ("vendor", "model"), {**filters, "strategy": strategy}
+        )
+    ]
+    return ModelsLeaderboard(
+        generated_at=int(time.time()),
+        strategy=_strategy(conn, version, strategy),
+        entries=tuple(sorted(entries, key=lambda e: e.avg_round, reverse=True)),
+    )
+
+
+def strategies_leaderboard(
+    conn: sqlite3.Connection, version: str, vendor: str, model: str, **filters: str
+) -> StrategiesLeaderboard:
+    """Strategies leaderboard of a model, over the runs matching filters.
+
+    See models_leaderboard.
+    """
+    entries = [
+        StrategiesLeaderboardEntry(
+            **vars(entry), strategy=_strategy(conn, version, group["strategy"])
+        )
+        for group, entry in _entries(
+            conn, version, ("strategy",), {**filters, "vendor": vendor, "model": model}
+        )
+    ]
+    return StrategiesLeaderboard(
+        generated_at=int(time.time()),
+        model=Model(vendor=vendor, name=model),
+        entries=tuple(sorted(entries, key=lambda e: e.avg_round, reverse=True)),
+    )
+
+
+def request_quantile(
+    conn: sqlite3.Connection,
+    version: str,
+    column: str = "time_ms",
+    q: float = 0.5,
+    provider: str | None = None,
+    **filters: str,
+) -> float | None:
+    """Exact q-quantile of a request column over successful requests.
+
+    Uses the lower rank q * (n - 1), like sketch.DDSketch.quantile.
+
+    Args:
+        conn: Connection of open_store
+        version: Version, e.g. "v1.0.0"
+        column: Numeric column of the requests table
+        q: Quantile (0 <= q <= 1)
+        provider: Only requests served by this provider
+        **filters: Column values to match (strategy, vendor, model, deck, ...)
+
+    Returns:
+        The quantile, or None without matching requests.
+    """
+    if REQUEST_COLUMNS.get(column) not in ("int64", "float64"):
+        raise ValueError(f"Not a numeric request column: {column}")
+    if provider is not None:
+        filters = {**filters, "provider": provider}
+    where, params = _where(version, {**filters, "status": "success"})
+    (count,) = conn.execute(f"SELECT COUNT(*) FROM requests {where}", params).fetchone()
+    if count == 0:
+        return None
+    row = conn.execute(
+        f"SELECT {column} FROM requests {where} ORDER BY {column} LIMIT 1 OFFSET ?",
+        (*params, int(q * (count - 1))),
+    ).fetchone()
+    return row[0]
+
+
+def _where(version: str, filters: dict[str, str]) -> tuple[str, list[Any]]:
+    """WHERE clause matching a version and column filters."""
+    clauses, params = ["version = ?"], [version]
+    for name, value in filters.items():
+        if name not in (*FILTER_COLUMNS, "provider", "status"):
+            raise ValueError(f"Unknown filter: {name}")
+        clauses.append(f"{name} = ?")
+        params.append(str(value))
+    return "WHERE " + " AND ".join(clauses), params
+
+
+def _entries(
+    conn: sqlite3.Connection,
+    version: str,
+    group_by: tuple[str, ...],
+    filters: dict[str, str],
+) -> Iterable[tuple[dict[str, str], Any]]:
+    """(group, LeaderboardEntry) of the runs matching filters, per group."""
+    sums = []
+    for metric, (n, avg, std, total) in METRICS.items():
+        m2 = f"({n} - 1) * {std} * {std} + " if std else ""
+        sums += [
+            f"SUM({n}) AS {metric}_n",
+            f"SUM({n} * {avg}) AS {metric}_s1",
+            f"SUM({m2}{n} * {avg} * {avg}) AS {metric}_s2",
+            f"SUM({total or f'{n} * {avg}'}) AS {metric}_total",
+        ]
+    where, params = _where(version, filters)
+    groups = ", ".join(group_by)
+    cursor = conn.execute(
+        f"SELECT {groups}, SUM(run_won), SUM(run_completed), SUM(calls_success), "
+        f"SUM(calls_error), SUM(calls_failed), SUM(tokens_cached_total), "
+        f"{', '.join(sums)} FROM runs {where} GROUP BY {groups} ORDER BY {groups}",
+        params,
+    )
+    for row in cursor:
+        group = dict(zip(group_by, row, strict=False))
+        counts, values = (
+            row[len(group_by) : -4 * len(METRICS)],
+            row[-4 * len(METRICS) :],
+        )
+        wins, completed, success, error, failed, cached = counts
+        moments = {
+            metric: _moments(*values[4 * i : 4 * i + 4])
+            for i, metric in enumerate(METRICS)
+        }
+        stats = StatsMoments(
+            calls_total=moments["time_ms"].n,
+            calls_success=success,
+            calls_error=error,
+            calls_failed=failed,
+            tokens_in=moments["tokens_in"],
+            tokens_out=moments["tokens_out"],
+            time_ms=moments["time_ms"],
+            cost=moments["cost"],
+            cache=CacheMoments(
+                tokens_cached=cached,
+                time_cached=moments["time_cached"],
+                time_uncached=moments["time_uncached"],
+            ),
+            decode=DecodeMoments(
+                tokens_reasoning=moments["tokens_reasoning"],
+                tokens_out_per_s=moments["tokens_out_per_s"],
+            ),
+        )
+        entry = EntryMoments(
+            run_wins=wins,
+            run_completed=completed,
+            rounds=moments["rounds"],
+            stats=stats,
+        ).to_entry()
+        yield group, entry
+
+
+def _moments(n: int, s1: float, s2: float, total: float) -> Moments:
+    """Moments of merged runs from SUM(n), SUM(n * avg) and the SUM of
+    (n - 1) * std^2 + n * avg^2 (so that m2 = s2 - n * mean^2)."""
+    if not n:
+        return Moments()
+    mean = s1 / n
+    return Moments(n=n, mean=mean, m2=max(s2 - n * mean**2, 0.0), total=total)
+
+
+def _strategy(conn: sqlite3.Connection, version: str, key: str) -> Strategy:
+    row = conn.execute(
+        "SELECT name, description, author, strategy_version, tags FROM strategies "
+        "WHERE version = ? AND key = ?",
+        (version, key),
+    ).fetchone()
+    if row is None:
+        raise KeyError(f"Unknown strategy: {key}")
+    name, description, author, strategy_version, tags = row
+    return Strategy(
+        name=name,
+        key=key,
+        description=description,
+        author=author,
+        version=strategy_version,
+        tags=tuple(json.loads(tags)),
+    )
@@ -0,0 +1,213 @@
+"""Per-run partials of the request metadata, cached per run.
+
+Percentiles, prompt-cache, reasoning and per-provider figures are not in
+stats.json: they are derived from the metadata of every response of a
+run. Decoding responses.jsonl is by far the most expensive part of
+reading a run, so its result is summarized once into mergeable partials:
+
+    sketches   RequestSketches  (sketch.py)
+    cache      CacheMoments     (moments.py)
+    decode     DecodeMoments    (moments.py)
+    providers  provider → ProviderPartial (providers.py)
+
+The extraction pass of a build computes the summary from the metadata it
+decodes anyway (see extractor.extract_run). Summaries are saved as JSON
+in SUMMARY_DIR, keyed by the path of responses.jsonl and valid while its
+size and mtime are unchanged, so scans of runs that are not extracted
+(e.g. siblings in a scoped build, or analyze_models) load them instead of
+decoding the responses again.
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+from collections.abc import Iterable
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any
+
+from .models import Request
+from .moments import CacheMoments, DecodeMoments, Moments
+from .providers import ProviderPartial, group_by_provider
+from .sketch import DDSketch, RequestSketches
+
+SUMMARY_DIR = Path(tempfile.gettempdir()) / "balatrobench" / "summaries"
+SUMMARY_SUFFIX = ".summary.json"
+SUMMARY_FORMAT = 1
+
+
+@dataclass(frozen=True)
+class RequestSummary:
+    """Mergeable partials of the request metadata of a run."""
+
+    sketches: RequestSketches = field(default_factory=RequestSketches)
+    cache: CacheMoments = field(default_factory=CacheMoments)
+    decode: DecodeMoments = field(default_factory=DecodeMoments)
+    providers: dict[str, ProviderPartial] = field(default_factory=dict)
+
+    @classmethod
+    def from_requests(cls, requests: Iterable[Request]) -> "RequestSummary":
+        """Summary of the requests of a run (one pass per partial)."""
+        requests = list(requests)
+        return cls(
+            sketches=RequestSketches.from_requests(requests),
+            cache=CacheMoments.from_requests(requests),
+            decode=DecodeMoments.from_requests(requests),
+            providers=group_by_provider(requests),
+        )
+
+
+################################################################################
+# Cache
+################################################################################
+
+
+def summary_path(responses_file: Path) -> Path:
+    """Cached summary path of a responses.jsonl (in SUMMARY_DIR)."""
+    digest = hashlib.sha1(str(responses_file.resolve()).encode()).hexdigest()[:16]
+    return SUMMARY_DIR / f"{digest}{SUMMARY_SUFFIX}"
+
+
+def load_summary(responses_file: Path) -> RequestSummary | None:
+    """Load the cached summary of a responses.jsonl, or None if stale/missing."""
+    if not responses_file.is_file():
+        return None
+    size, mtime_ns = _file_key(responses_file)
+    try:
+        data = json.loads(summary_path(responses_file).read_text())
+        if (
+            data["format"] != SUMMARY_FORMAT
+            or data["size"] != size
+            or data["mtime_ns"] != mtime_ns
+        ):
+            return None
+        return _decode_summary(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_summary(responses_file: Path, summary: RequestSummary) -> None:
+    """Cache the summary of a responses.jsonl (temp file + atomic rename).
+
+    Summaries of a missing file, or to an unwritable SUMMARY_DIR, are not
+    cached.
+    """
+    if not responses_file.is_file():
+        return
+    size, mtime_ns = _file_key(responses_file)
+    data = {
+        "format": SUMMARY_FORMAT,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        **_encode_summary(summary),
+    }
+    path = summary_path(responses_file)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=path.parent, prefix=path.name, suffix=".tmp"
+        )
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_name, path)
+    except OSError:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+def _file_key(path: Path) -> tuple[int, int]:
+    """(size, mtime in ns) identifying the content of a file."""
+    st = path.stat()
+    return st.st_size, getattr(st, "st_mtime_ns", None) or int(st.st_mtime * 1e9)
+
+
+################################################################################
+# Encoding
+################################################################################
+
+
+def _encode_summary(summary: RequestSummary) -> dict[str, Any]:
+    return {
+        "sketches": {
+            f.name: _encode_sketch(getattr(summary.sketches, f.name))
+            for f in fields(RequestSketches)
+        },
+        "cache": {
+            "tokens_cached": summary.cache.tokens_cached,
+            "time_cached": _encode_moments(summary.cache.time_cached),
+            "time_uncached": _encode_moments(summary.cache.time_uncached),
+        },
+        "decode": {
+            "tokens_reasoning": _encode_moments(summary.decode.tokens_reasoning),
+            "tokens_out_per_s": _encode_moments(summary.decode.tokens_out_per_s),
+        },
+        "providers": {
+            provider: {
+                f.name: _encode_sketch(partial.latency)
+                if f.name == "latency"
+                else getattr(partial, f.name)
+                for f in fields(ProviderPartial)
+            }
+            for provider, partial in summary.providers.items()
+        },
+    }
+
+
+def _decode_summary(data: dict[str, Any]) -> RequestSummary:
+    cache = data["cache"]
+    decode = data["decode"]
+    return RequestSummary(
+        sketches=RequestSketches(
+            **{name: _decode_sketch(value) for name, value in data["sketches"].items()}
+        ),
+        cache=CacheMoments(
+            tokens_cached=cache["tokens_cached"],
+            time_cached=_decode_moments(cache["time_cached"]),
+            time_uncached=_decode_moments(cache["time_uncached"]),
+        ),
+        decode=DecodeMoments(
+            tokens_reasoning=_decode_moments(decode["tokens_reasoning"]),
+            tokens_out_per_s=_decode_moments(decode["tokens_out_per_s"]),
+        ),
+        providers={
+            provider: ProviderPartial(
+                **{**partial, "latency": _decode_sketch(partial["latency"])}
+            )
+            for provider, partial in data["providers"].items()
+        },
+    )
+
+
+def _encode_moments(moments: Moments) -> list[float]:
+    return [moments.n, moments.mean, moments.m2, moments.total]
+
+
+def _decode_moments(values: list[float]) -> Moments:
+    n, mean, m2, total = values
+    return Moments(n=n, mean=mean, m2=m2, total=total)
+
+
+def _encode_sketch(sketch: DDSketch) -> dict[str, Any]:
+    # min/max are infinite for an empty sketch, which JSON cannot hold
+    return {
+        "relative_accuracy": sketch.relative_accuracy,
+        "bins": sorted(sketch.bins.items()),
+        "zero_count": sketch.zero_count,
+        "count": sketch.count,
+        "min": sketch.min if sketch.count else None,
+        "max": sketch.max if sketch.count else None,
+    }
+
+
+def _decode_sketch(data: dict[str, Any]) -> DDSketch:
+    sketch = DDSketch(data["relative_accuracy"])
+    sketch.bins = {key: count for key, count in data["bins"]}
+    sketch.zero_count = data["zero_count"]
+    sketch.count = data["count"]
+    sketch.min = math.inf if data["min"] is None else data["min"]
+    sketch.max = -math.inf if data["max"] is None else data["max"]
+    return sketch
@@ -0,0 +1,555 @@
+"""Synthetic run corpus generator for scale testing.
+
+Produces runs/ trees with the same layout and file shapes as balatrollm:
+
+    {root}/{version}/{strategy}/{vendor}/{model}/{run}/
+        ├── task.json
+        ├── strategy.json
+        ├── stats.json
+        ├── requests.jsonl
+        ├── responses.jsonl
+        └── screenshots/request-XXXXX.png   (optional)
+
+Output is deterministic for a given CorpusSpec. Runs with the same index
+share their seed, deck and stake across models and strategies, like real
+benchmark runs do.
+
+Usage:
+    python -m balatrobench.synthetic runs --vendors 4 --models-per-vendor 5 \
+        --runs-per-model 50 --requests-per-run 200
+"""
+
+import argparse
+import json
+import random
+import statistics
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .enums import Deck, Stake
+
+VENDORS = (
+    "openai",
+    "anthropic",
+    "google",
+    "meta-llama",
+    "mistralai",
+    "qwen",
+    "deepseek",
+    "x-ai",
+)
+PROVIDERS = ("Groq", "Cerebras", "DeepInfra", "Together", "Fireworks")
+TOOL_NAMES = ("play", "discard", "rearrange", "sell", "use")
+WORDS = (
+    "joker",
+    "chips",
+    "mult",
+    "ante",
+    "blind",
+    "hand",
+    "discard",
+    "flush",
+    "straight",
+    "pair",
+    "shop",
+    "money",
+    "planet",
+    "tarot",
+    "spectral",
+    "voucher",
+    "boss",
+    "score",
+    "round",
+    "deck",
+    "stake",
+    "seed",
+    "card",
+    "rank",
+    "suit",
+    "level",
+    "interest",
+    "reroll",
+    "booster",
+    "pack",
+    "consumable",
+    "synergy",
+    "scaling",
+)
+
+# Base timestamp for generated run ids and request/response ids (ms)
+BASE_TIMESTAMP_MS = 1_767_974_273_970
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """Knobs for the size and shape of a synthetic corpus."""
+
+    version: str = "v1.0.0"
+    strategies: int = 1
+    vendors: int = 2
+    models_per_vendor: int = 2
+    runs_per_model: int = 3
+    requests_per_run: int = 10
+
+    # Prompt sizes (characters)
+    strategy_chars: int = 42_000
+    gamestate_chars: int = 4_800
+    memory_chars_per_request: int = 250  # memory grows every request
+
+    # Response shape
+    reasoning_chars: int = 1_500
+    error_rate: float = 0.02
+
+    # Mix of game configurations (runs sharing an index share the config)
+    decks: tuple[Deck, ...] = (Deck.RED,)
+    stakes: tuple[Stake, ...] = (Stake.WHITE,)
+
+    screenshots: bool = False
+    seed: int = 0
+
+
+def strategy_keys(spec: CorpusSpec) -> list[str]:
+    """Return the strategy directory names of a corpus."""
+    return ["default"] + [f"strategy-{i}" for i in range(1, spec.strategies)]
+
+
+def model_keys(spec: CorpusSpec) -> list[tuple[str, str]]:
+    """Return the (vendor, model) pairs of a corpus."""
+    pairs = []
+    for v in range(spec.vendors):
+        vendor = VENDORS[v % len(VENDORS)]
+        if v >= len(VENDORS):
+            vendor = f"{vendor}-{v // len(VENDORS)}"
+        for m in range(spec.models_per_vendor):
+            pairs.append((vendor, f"model-{m}"))
+    return pairs
+
+
+def run_configs(spec: CorpusSpec) -> list[tuple[str, Deck, Stake]]:
+    """Return the (seed, deck, stake) of each run index, shared across models."""
+    rng = random.Random(spec.seed)
+    configs = []
+    for i in range(spec.runs_per_model):
+        seed = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(7))
+        configs.append(
+            (seed, spec.decks[i % len(spec.decks)], spec.stakes[i % len(spec.stakes)])
+        )
+    return configs
+
+
+def generate_corpus(root: Path, spec: CorpusSpec | None = None) -> Path:
+    """Generate a synthetic runs tree under root.
+
+    Returns the version directory (root / spec.version).
+    """
+    spec = spec or CorpusSpec()
+    version_dir = root / spec.version
+    rng = random.Random(spec.seed)
+    filler = _filler_text(
+        rng, max(spec.strategy_chars, spec.gamestate_chars, 2_048) * 2
+    )
+    configs = run_configs(spec)
+
+    for s, strategy in enumerate(strategy_keys(spec)):
+        strategy_text = _sized(
+            f"# Strategy {strategy}\n\n", filler, spec.strategy_chars
+        )
+        source_strategy = {
+            "name": strategy.replace("-", " ").title(),
+            "description": f"Synthetic strategy {strategy}",
+            "author": "balatrobench",
+            "version": "1.0.0",
+            "tags": ["synthetic"],
+        }
+        for m, (vendor, model) in enumerate(model_keys(spec)):
+            model_dir = version_dir / strategy / vendor / model
+            for r, (seed, deck, stake) in enumerate(configs):
+                run_rng = random.Random(f"{spec.seed}/{s}/{m}/{r}")
+                run_id = _run_id(r, seed, deck, stake)
+                _write_run(
+                    model_dir / run_id,
+                    spec,
+                    run_rng,
+                    filler,
+                    strategy_text,
+                    source_strategy,
+                    task={
+                        "model": {"vendor": vendor, "name": model},
+                        "seed": seed,
+                        "deck": str(deck),
+                        "stake": str(stake),
+                        "strategy": strategy,
+                    },
+                    skill=(m + 1) / (len(model_keys(spec)) + 1),
+                )
+
+    return version_dir
+
+
+def _write_run(
+    run_dir: Path,
+    spec: CorpusSpec,
+    rng: random.Random,
+    filler: str,
+    strategy_text: str,
+    source_strategy: dict[str, Any],
+    task: dict[str, Any],
+    skill: float,
+) -> None:
+    """Write a single run directory."""
+    run_dir.mkdir(parents=True, exist_ok=True)
+    vendor, model = task["model"]["vendor"], task["model"]["name"]
+    price_in = rng.uniform(0.05, 3.0) / 1e6
+    price_out = price_in * 4
+
+    tokens_in: list[int] = []
+    tokens_out: list[int] = []
+    times: list[int] = []
+    costs: list[float] = []
+    providers: dict[str, int] = {}
+    calls_error = 0
+    memory = "# Memory & Previous Actions\n\n## Recent Decision History\n\n"
+    timestamp = BASE_TIMESTAMP_MS
+
+    with (
+        (run_dir / "requests.jsonl").open("w") as requests_f,
+        (run_dir / "responses.jsonl").open("w") as responses_f,
+    ):
+        for i in range(1, spec.requests_per_run + 1):
+            custom_id = f"request-{i:05d}"
+            offset = rng.randrange(len(filler) - spec.gamestate_chars)
+            gamestate = _sized(
+                f"# Current Game State\n\n- **Round**: {1 + i // 4}\n"
+                f"- **Money**: ${rng.randint(0, 60)}\n\n",
+                filler[offset:],
+                spec.gamestate_chars,
+            )
+            requests_f.write(
+                json.dumps(
+                    _request_line(
+                        custom_id, vendor, model, strategy_text, gamestate, memory
+                    )
+                )
+                + "\n"
+            )
+
+            # Response
+            tool = rng.choice(TOOL_NAMES)
+            reasoning = filler[offset : offset + spec.reasoning_chars]
+            is_error = rng.random() < spec.error_rate
+            provider = rng.choice(PROVIDERS)
+            prompt_tokens = (len(strategy_text) + len(gamestate) + len(memory)) // 4
+            completion_tokens = 0 if is_error else rng.randint(100, 3000)
+            time_ms = rng.randint(400, 2_000) + int(completion_tokens * (1.5 - skill))
+            cost_in = 0 if is_error else prompt_tokens * price_in
+            cost_out = completion_tokens * price_out
+            request_ts = timestamp
+            timestamp += time_ms
+            responses_f.write(
+                json.dumps(
+                    _response_line(
+                        custom_id,
+                        request_ts,
+                        timestamp,
+                        is_error,
+                        provider,
+                        f"{vendor}/{model}",
+                        tool,
+                        reasoning,
+                        prompt_tokens,
+                        completion_tokens,
+                        rng.choice((0, 512, prompt_tokens // 2)),
+                        cost_in,
+                        cost_out,
+                    )
+                )
+                + "\n"
+            )
+            timestamp += rng.randint(200, 1_000)
+
+            memory += (
+                f"**{i}.** `{tool}(...)` - "
+                + filler[offset : offset + max(spec.memory_chars_per_request - 20, 0)]
+                + "\n"
+            )
+
+            if spec.screenshots:
+                screenshots_dir = run_dir / "screenshots"
+                screenshots_dir.mkdir(exist_ok=True)
+                (screenshots_dir / f"{custom_id}.png").write_bytes(_DUMMY_PNG)
+
+            if is_error:
+                calls_error += 1
+            else:
+                providers[provider] = providers.get(provider, 0) + 1
+            tokens_in.append(prompt_tokens if not is_error else 0)
+            tokens_out.append(completion_tokens)
+            times.append(time_ms)
+            costs.append(cost_in + cost_out)
+
+    final_round = max(1, min(24, int(rng.gauss(4 + 16 * skill, 3))))
+    stats = {
+        "run_won": final_round >= 24,
+        "run_completed": rng.random() > 0.05,
+        "final_ante": min(8, (final_round + 2) // 3),
+        "final_round": final_round,
+        "providers": providers,
+        "calls_total": spec.requests_per_run,
+        "calls_success": spec.requests_per_run - calls_error,
+        "calls_error": calls_error,
+        "calls_failed": 0,
+        "tokens_in_total": sum(tokens_in),
+        "tokens_out_total": sum(tokens_out),
+        "tokens_in_avg": _mean(tokens_in),
+        "tokens_out_avg": _mean(tokens_out),
+        "tokens_in_std": _stdev(tokens_in),
+        "tokens_out_std": _stdev(tokens_out),
+        "time_total_ms": sum(times),
+        "time_avg_ms": _mean(times),
+        "time_std_ms": _stdev(times),
+        "cost_total": sum(costs),
+        "cost_avg": _mean(costs),
+        "cost_std": _stdev(costs),
+    }
+
+    for name, data in (
+        ("task.json", task),
+        ("strategy.json", source_strategy),
+        ("stats.json", stats),
+    ):
+        with (run_dir / name).open("w") as f:
+            json.dump(data, f, indent=2)
+
+
+def _request_line(
+    custom_id: str,
+    vendor: str,
+    model: str,
+    strategy_text: str,
+    gamestate: str,
+    memory: str,
+) -> dict[str, Any]:
+    """Build a requests.jsonl line in the OpenAI batch format."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": f"{vendor}/{model}",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": strategy_text},
+                        {"type": "text", "text": gamestate},
+                        {"type": "text", "text": memory},
+                    ],
+                }
+            ],
+            "tools": _TOOLS,
+            "seed": 1,
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "extra_headers": {"X-Title": "BalatroLLM"},
+            "extra_body": {"usage": {"include": True}},
+        },
+    }
+
+
+def _response_line(
+    custom_id: str,
+    request_ts: int,
+    response_ts: int,
+    is_error: bool,
+    provider: str,
+    model: str,
+    tool: str,
+    reasoning: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cached_tokens: int,
+    cost_in: float,
+    cost_out: float,
+) -> dict[str, Any]:
+    """Build a responses.jsonl line in the OpenAI batch format."""
+    if is_error:
+        body: dict[str, Any] = {
+            "error": {
+                "message": "Provider returned error",
+                "code": 502,
+                "metadata": {"provider_name": provider},
+            }
+        }
+        status_code = 502
+    else:
+        status_code = 200
+        arguments = json.dumps({"cards": [0, 1], "reasoning": reasoning[:200]})
+        body = {
+            "id": f"gen-{response_ts}",
+            "choices": [
+                {
+                    "finish_reason": "tool_calls",
+                    "index": 0,
+                    "message": {
+                        "content": "",
+                        "role": "assistant",
+                        "tool_calls": [
+                            {
+                                "id": f"call_{custom_id}",
+                                "function": {"arguments": arguments, "name": tool},
+                                "type": "function",
+                                "index": 0,
+                            }
+                        ],
+                        "reasoning": reasoning,
+                    },
+                }
+            ],
+            "created": response_ts // 1000,
+            "model": model,
+            "object": "chat.completion",
+            "usage": {
+                "completion_tokens": completion_tokens,
+                "prompt_tokens": prompt_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "completion_tokens_details": {
+                    "reasoning_tokens": int(completion_tokens * 0.8)
+                },
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+                "cost": cost_in + cost_out,
+                "cost_details": {
+                    "upstream_inference_cost": None,
+                    "upstream_inference_prompt_cost": cost_in,
+                    "upstream_inference_completions_cost": cost_out,
+                },
+            },
+            "provider": provider,
+        }
+    return {
+        "id": str(response_ts),
+        "custom_id": custom_id,
+        "response": {
+            "request_id": str(request_ts),
+            "status_code": status_code,
+            "body": body,
+        },
+        "error": None,
+    }
+
+
+def _run_id(index: int, seed: str, deck: Deck, stake: Stake) -> str:
+    """Build a run directory name like 20260109_165752_472_RED_WHITE_BBBBBBB."""
+    seconds = index * 17
+    return (
+        f"20260109_{16 + seconds // 3600 % 8:02d}{seconds // 60 % 60:02d}"
+        f"{seconds % 60:02d}_{index % 1000:03d}_{deck}_{stake}_{seed}"
+    )
+
+
+def _filler_text(rng: random.Random, size: int) -> str:
+    """Build markdown-ish filler text of at least `size` characters."""
+    lines = []
+    length = 0
+    while length < size:
+        line = "- " + " ".join(rng.choice(WORDS) for _ in range(12)) + "\n"
+        lines.append(line)
+        length += len(line)
+    return "".join(lines)
+
+
+def _sized(header: str, filler: str, size: int) -> str:
+    """Pad header with filler text up to `size` characters."""
+    return header + filler[: max(size - len(header), 0)]
+
+
+def _mean(values: list[int] | list[float]) -> float:
+    return statistics.fmean(values) if values else 0.0
+
+
+def _stdev(values: list[int] | list[float]) -> float:
+    return statistics.stdev(values) if len(values) > 1 else 0.0
+
+
+def _png(width: int, height: int) -> bytes:
+    """Build a valid blank grayscale PNG."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    pixels = zlib.compress(b"\x00" * (width + 1) * height)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", pixels)
+        + chunk(b"IEND", b"")
+    )
+
+
+_DUMMY_PNG = _png(64, 36)
+_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": f"Synthetic {name} tool.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "cards": {"type": "array", "items": {"type": "integer"}},
+                    "reasoning": {"type": "string"},
+                },
+                "required": ["cards", "reasoning"],
+            },
+        },
+    }
+    for name in TOOL_NAMES
+]
+
+
+def main() -> None:
+    """Generate a synthetic corpus from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m balatrobench.synthetic",
+        description="Generate a synthetic BalatroLLM runs tree for scale testing",
+    )
+    parser.add_argument("root", type=Path, help="Runs root directory (e.g., runs)")
+    defaults = CorpusSpec()
+    parser.add_argument("--version", default=defaults.version)
+    parser.add_argument("--strategies", type=int, default=defaults.strategies)
+    parser.add_argument("--vendors", type=int, default=defaults.vendors)
+    parser.add_argument(
+        "--models-per-vendor", type=int, default=defaults.models_per_vendor
+    )
+    parser.add_argument("--runs-per-model", type=int, default=defaults.runs_per_model)
+    parser.add_argument(
+        "--requests-per-run", type=int, default=defaults.requests_per_run
+    )
+    parser.add_argument("--strategy-chars", type=int, default=defaults.strategy_chars)
+    parser.add_argument("--gamestate-chars", type=int, default=defaults.gamestate_chars)
+    parser.add_argument("--screenshots", action="store_true")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    spec = CorpusSpec(
+        version=args.version,
+        strategies=args.strategies,
+        vendors=args.vendors,
+        models_per_vendor=args.models_per_vendor,
+        runs_per_model=args.runs_per_model,
+        requests_per_run=args.requests_per_run,
+        strategy_chars=args.strategy_chars,
+        gamestate_chars=args.gamestate_chars,
+        screenshots=args.screenshots,
+        seed=args.seed,
+    )
+    version_dir = generate_corpus(args.root, spec)
+    print(f"Generated synthetic corpus at {version_dir}")
+
+
+if __name__ == "__main__":
+    main()
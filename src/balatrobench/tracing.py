@@ -0,0 +1,269 @@
+"""Lightweight tracing hooks for analyzer, extractor and writer hot paths.
+
+Spans are no-ops until an exporter is registered with `add_exporter`, so
+instrumented code pays only for a list lookup by default. Two local
+exporters are provided:
+
+    JsonLinesExporter   - one JSON object per finished span
+    ChromeTraceExporter - Chrome `trace_event` JSON (chrome://tracing, Perfetto)
+
+Custom tooling can register any object implementing the SpanExporter
+protocol. Worker processes have no exporters of their own: they record
+their spans with `collect` and the parent passes them to `export_spans`.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, replace
+from functools import wraps
+from pathlib import Path
+from typing import Any, Protocol
+
+################################################################################
+# Spans & Exporters
+################################################################################
+
+
+@dataclass
+class Span:
+    """A finished unit of work with timing and attributes."""
+
+    name: str
+    span_id: int
+    parent_id: int | None
+    start_ns: int  # time.perf_counter_ns() at start (system-wide on Linux)
+    end_ns: int
+    thread_id: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+    process_id: int = field(default_factory=os.getpid)
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+class SpanExporter(Protocol):
+    """Receives finished spans."""
+
+    def export(self, span: Span) -> None: ...
+
+    def close(self) -> None: ...
+
+
+_exporters: list[SpanExporter] = []
+_current_span_id: ContextVar[int | None] = ContextVar("span_id", default=None)
+_span_ids = itertools.count(1)
+
+
+def add_exporter(exporter: SpanExporter) -> None:
+    """Register an exporter; spans are recorded while any is registered."""
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter: SpanExporter) -> None:
+    """Unregister an exporter and close it."""
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+    exporter.close()
+
+
+def is_enabled() -> bool:
+    """Return True if spans are being recorded.
+
+    Use to guard attributes that are costly to compute (e.g. file sizes).
+    """
+    return bool(_exporters)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+    """Record the enclosed block as a span.
+
+    Yields the attribute dict so the block can add attributes known only
+    after the work is done (e.g. number of requests extracted).
+    """
+    if not _exporters:
+        yield attributes
+        return
+
+    span_id = next(_span_ids)
+    parent_id = _current_span_id.get()
+    token = _current_span_id.set(span_id)
+    start_ns = time.perf_counter_ns()
+    try:
+        yield attributes
+    finally:
+        end_ns = time.perf_counter_ns()
+        _current_span_id.reset(token)
+        finished = Span(
+            name=name,
+            span_id=span_id,
+            parent_id=parent_id,
+            start_ns=start_ns,
+            end_ns=end_ns,
+            thread_id=threading.get_ident(),
+            attributes=attributes,
+        )
+        for exporter in _exporters:
+            exporter.export(finished)
+
+
+def traced[**P, R](
+    name: str,
+    attributes: Callable[P, dict[str, Any]] | None = None,
+    result_attributes: Callable[[R], dict[str, Any]] | None = None,
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorator recording each call of a function as a span.
+
+    Args:
+        name: Span name
+        attributes: Attributes from the call arguments
+        result_attributes: Attributes from the return value
+    """
+
+    def decorate(fn: Callable[P, R]) -> Callable[P, R]:
+        @wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if not _exporters:
+                return fn(*args, **kwargs)
+            initial = attributes(*args, **kwargs) if attributes else {}
+            with span(name, **initial) as attrs:
+                result = fn(*args, **kwargs)
+                if result_attributes is not None:
+                    attrs.update(result_attributes(result))
+                return result
+
+        return wrapper
+
+    return decorate
+
+
+@contextmanager
+def collect(enabled: bool = True) -> Iterator[list[Span]]:
+    """Record the spans finished in the enclosed block into a list.
+
+    Used in worker processes, whose spans are sent back to the parent and
+    exported there (see export_spans). Yields an empty list if not enabled.
+    """
+    collector = CollectingExporter()
+    if not enabled:
+        yield collector.spans
+        return
+    add_exporter(collector)
+    try:
+        yield collector.spans
+    finally:
+        remove_exporter(collector)
+
+
+def export_spans(spans: Iterable[Span]) -> None:
+    """Export spans recorded in another process (see collect).
+
+    Span ids are reassigned so they cannot collide with this process's;
+    parent links within the spans and their process ids are kept.
+    """
+    if not _exporters:
+        return
+    spans = list(spans)
+    ids = {recorded.span_id: next(_span_ids) for recorded in spans}
+    for recorded in spans:
+        exported = replace(
+            recorded,
+            span_id=ids[recorded.span_id],
+            parent_id=ids.get(recorded.parent_id),
+        )
+        for exporter in _exporters:
+            exporter.export(exported)
+
+
+def file_size(path: Path) -> int:
+    """Return the size of a file in bytes, or 0 if it does not exist."""
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+################################################################################
+# Local Exporters
+################################################################################
+
+
+class CollectingExporter:
+    """Keep finished spans in memory."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesExporter:
+    """Append one JSON object per finished span to a file."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._file = path.open("w")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(asdict(span) | {"duration_ns": span.duration_ns}, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class ChromeTraceExporter:
+    """Collect spans as Chrome `trace_event` complete events.
+
+    The file is written on close and can be opened in chrome://tracing or
+    https://ui.perfetto.dev.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._events: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        event = {
+            "name": span.name,
+            "cat": span.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": span.start_ns / 1000,  # microseconds
+            "dur": span.duration_ns / 1000,
+            "pid": span.process_id,
+            "tid": span.thread_id,
+            "args": span.attributes,
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def close(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, self.path.open("w") as f:
+            json.dump(
+                {"traceEvents": self._events, "displayTimeUnit": "ms"}, f, default=str
+            )
+
+
+def exporter_for_path(path: Path) -> SpanExporter:
+    """Pick an exporter from the file suffix (.jsonl → JSON lines, else Chrome)."""
+    if path.suffix == ".jsonl":
+        return JsonLinesExporter(path)
+    return ChromeTraceExporter(path)
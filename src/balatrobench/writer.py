@@ -2,37 +2,58 @@
 
 import json
 import subprocess
+from collections.abc import Sequence
 from concurrent.futures import ThreadPoolExecutor
-from dataclasses import asdict
+from dataclasses import fields, is_dataclass
 from pathlib import Path
 from typing import Any
 
 from tqdm import tqdm
 
-from .extractor import (
-    extract_request_content,
-    extract_request_metadata,
-    extract_response_data,
-)
+from . import tracing
+from .delta import CONTEXT_FILENAME, DELTA_FIELDS, encode_context
+from .extractor import RunExtract, extract_run
 from .models import (
     Manifest,
     ModelsLeaderboard,
+    ModelsLeaderboardSlices,
+    ModelsPairedComparison,
+    ProvidersLeaderboard,
+    Request,
     Runs,
     StrategiesLeaderboard,
+    StrategiesLeaderboardSlices,
+    StrategiesPairedComparison,
     Version,
 )
+from .profiling import NULL_PROFILER, BuildProfiler
+from .series import SERIES_FILENAME, encode_series
 
 # File naming constants
 MANIFEST_FILENAME = "manifest.json"
 LEADERBOARD_FILENAME = "leaderboard.json"
+SLICES_FILENAME = "slices.json"
+PAIRED_FILENAME = "paired.json"
 REQUEST_ID_PREFIX = "request-"
 
 
 class BenchmarkWriter:
-    """Writes benchmark data to files."""
+    """Writes benchmark data to files.
+
+    With delta_context, the gamestate and memory of each run are written to
+    a single delta-encoded context.json (see delta.py) instead of
+    per-request gamestate.md and memory.md files.
+    """
 
-    def __init__(self, output_dir: Path) -> None:
+    def __init__(
+        self,
+        output_dir: Path,
+        profiler: BuildProfiler = NULL_PROFILER,
+        delta_context: bool = False,
+    ) -> None:
         self.output_dir = output_dir
+        self.profiler = profiler
+        self.delta_context = delta_context
 
     def _write_json(self, path: Path, data: object) -> Path:
         """Write data to JSON file, creating directories as needed.
@@ -43,9 +64,11 @@ class BenchmarkWriter:
 
         Returns the path to the written file.
         """
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("w") as f:
-            json.dump(self._to_dict(data), f, indent=2)
+        with tracing.span("writer.write_json", path=str(path)) as attrs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("w") as f:
+                json.dump(self._to_dict(data), f, indent=2)
+                attrs["bytes"] = f.tell()
         return path
 
     def write_manifest(self, versions: list[str], latest_version: str) -> Path:
@@ -89,6 +112,66 @@ class BenchmarkWriter:
         output_path = self.output_dir / version / model_key / LEADERBOARD_FILENAME
         return self._write_json(output_path, leaderboard)
 
+    def write_models_slices(
+        self, slices: ModelsLeaderboardSlices, version: str, strategy: str
+    ) -> Path:
+        """Write the per-deck/stake models leaderboards of a strategy.
+
+        Output: {version}/{strategy}/slices.json
+
+        Returns the path to the written file.
+        """
+        output_path = self.output_dir / version / strategy / SLICES_FILENAME
+        return self._write_json(output_path, slices)
+
+    def write_strategies_slices(
+        self, slices: StrategiesLeaderboardSlices, version: str, model_key: str
+    ) -> Path:
+        """Write the per-deck/stake strategies leaderboards of a model.
+
+        Output: {version}/{vendor}/{model}/slices.json
+
+        Returns the path to the written file.
+        """
+        output_path = self.output_dir / version / model_key / SLICES_FILENAME
+        return self._write_json(output_path, slices)
+
+    def write_models_paired(
+        self, paired: ModelsPairedComparison, version: str, strategy: str
+    ) -> Path:
+        """Write the paired comparison of the models of a strategy.
+
+        Output: {version}/{strategy}/paired.json
+
+        Returns the path to the written file.
+        """
+        output_path = self.output_dir / version / strategy / PAIRED_FILENAME
+        return self._write_json(output_path, paired)
+
+    def write_strategies_paired(
+        self, paired: StrategiesPairedComparison, version: str, model_key: str
+    ) -> Path:
+        """Write the paired comparison of the strategies of a model.
+
+        Output: {version}/{vendor}/{model}/paired.json
+
+        Returns the path to the written file.
+        """
+        output_path = self.output_dir / version / model_key / PAIRED_FILENAME
+        return self._write_json(output_path, paired)
+
+    def write_providers_leaderboard(
+        self, leaderboard: ProvidersLeaderboard, version: str
+    ) -> Path:
+        """Write providers leaderboard.json for a version.
+
+        Output: {version}/leaderboard.json
+
+        Returns the path to the written file.
+        """
+        output_path = self.output_dir / version / LEADERBOARD_FILENAME
+        return self._write_json(output_path, leaderboard)
+
     def write_runs(self, runs: Runs, version: str, strategy: str) -> Path:
         """Write {model}.json for a model.
 
@@ -130,86 +213,182 @@ class BenchmarkWriter:
         model_name: str,
         strategy_key: str,
         run_id: str,
-    ) -> None:
+    ) -> list[Path]:
         """Extract and write per-request files for a strategy run.
 
         Output: {version}/{vendor}/{model}/{strategy_key}/{run_id}/{request_id}/
         Each containing: reasoning.md, tool_call.json, strategy.md, gamestate.md,
         memory.md, metadata.json, and screenshot.png (if available).
+
+        Returns the paths of the written files.
         """
         output_base = self.output_dir / version / vendor / model_name / strategy_key
-        self._write_request_files_impl(run_dir, output_base)
+        return self._write_request_files_impl(run_dir, output_base)
 
     def write_request_files(
         self,
         run_dir: Path,
         output_base: Path,
-    ) -> None:
+    ) -> list[Path]:
         """Extract and write per-request files from a run directory.
 
         Creates directories like: {output_base}/{run_id}/{request_id}/
         Each containing: reasoning.md, tool_call.json, strategy.md, gamestate.md,
         memory.md, metadata.json, and screenshot.webp (if available).
+
+        Returns the paths of the written files.
         """
-        self._write_request_files_impl(run_dir, output_base)
+        return self._write_request_files_impl(run_dir, output_base)
 
     def _write_request_files_impl(
         self,
         run_dir: Path,
         output_base: Path,
-    ) -> None:
+    ) -> list[Path]:
         """Internal implementation for writing per-request files.
 
         Creates directories like: {output_base}/{run_id}/{request_id}/
         Each containing: reasoning.md, tool_call.json, strategy.md, gamestate.md,
         memory.md, metadata.json, and screenshot.png (if available).
+
+        Returns the paths of the written files.
+        """
+        with self.profiler.stage("extract") as stage:
+            run = extract_run(run_dir)
+            stage.files += 2
+        return self.write_run_requests(run, [output_base])
+
+    def write_run_requests(
+        self, run: RunExtract, output_bases: Sequence[Path], series: bool = True
+    ) -> list[Path]:
+        """Write per-request files of an extracted run under each output base.
+
+        Creates directories like: {output_base}/{run_id}/{request_id}/
+        so a run extracted once can be written to both output trees. With
+        delta_context, gamestate and memory go to {run_id}/context.json.
+
+        Args:
+            run: Extracted run
+            output_bases: Directories to write the run directory to
+            series: Also write {run_id}/series.json (see series.py); only
+                meaningful if every request of the run was extracted
+
+        Returns the paths of the written files.
+        """
+        custom_ids = run.custom_ids
+        written: list[Path] = []
+        skip = DELTA_FIELDS if self.delta_context else ()
+
+        with (
+            tracing.span("writer.request_files", run_id=run.run_id) as attrs,
+            self.profiler.stage("write_request_files") as stage,
+        ):
+            for output_base in output_bases:
+                for custom_id in custom_ids:
+                    # Convert "request-00042" to "00042"
+                    request_id = custom_id.replace(REQUEST_ID_PREFIX, "")
+                    request_dir = output_base / run.run_id / request_id
+                    request_dir.mkdir(parents=True, exist_ok=True)
+                    written.extend(
+                        self._write_request_dir(
+                            request_dir,
+                            run.content.get(custom_id),
+                            run.responses.get(custom_id),
+                            run.metadata.get(custom_id),
+                            run.screenshots_dir / f"{custom_id}.png",
+                            skip,
+                        )
+                    )
+                if self.delta_context and run.content:
+                    written.append(self._write_context(run, output_base / run.run_id))
+                if series and run.metadata:
+                    written.append(self._write_series(run, output_base / run.run_id))
+            stage.files += len(written)
+
+            attrs["requests"] = len(custom_ids)
+            attrs["files"] = len(written)
+            if tracing.is_enabled():
+                attrs["bytes"] = sum(tracing.file_size(p) for p in written)
+
+        return written
+
+    def _write_request_dir(
+        self,
+        request_dir: Path,
+        content: dict[str, str] | None,
+        data: dict[str, Any] | None,
+        request: Request | None,
+        png_file: Path,
+        skip: Sequence[str] = (),
+    ) -> list[Path]:
+        """Write the files of a single request directory.
+
+        Args:
+            skip: Content fields not written (stored in context.json)
+
+        Returns the paths of the written files.
         """
-        run_id = run_dir.name
-        requests_file = run_dir / "requests.jsonl"
-        responses_file = run_dir / "responses.jsonl"
-        screenshots_dir = run_dir / "screenshots"
-
-        # Extract data
-        request_content = extract_request_content(requests_file)
-        response_data = extract_response_data(responses_file)
-        requests_by_id = extract_request_metadata(responses_file)
-
-        all_custom_ids = set(request_content.keys()) | set(response_data.keys())
-
-        for custom_id in all_custom_ids:
-            # Convert "request-00042" to "00042"
-            request_id = custom_id.replace(REQUEST_ID_PREFIX, "")
-            request_dir = output_base / run_id / request_id
-            request_dir.mkdir(parents=True, exist_ok=True)
-
-            # Write request content
-            if custom_id in request_content:
-                content = request_content[custom_id]
-                (request_dir / "strategy.md").write_text(content["strategy"])
-                (request_dir / "gamestate.md").write_text(content["gamestate"])
-                (request_dir / "memory.md").write_text(content["memory"])
-
-            # Write response data
-            if custom_id in response_data:
-                data = response_data[custom_id]
-                (request_dir / "reasoning.md").write_text(data["reasoning"])
-
-                # Strip reasoning from tool_call arguments before writing
-                tool_calls = data["tool_call"]
-                cleaned_tool_calls = self._strip_reasoning_from_tool_calls(tool_calls)
-                with (request_dir / "tool_call.json").open("w") as f:
-                    json.dump(cleaned_tool_calls, f, indent=2)
-
-            # Write metadata
-            if custom_id in requests_by_id:
-                request = requests_by_id[custom_id]
-                with (request_dir / "metadata.json").open("w") as f:
-                    json.dump(self._to_dict(request), f, indent=2)
-
-            # Copy screenshot if exists
-            png_file = screenshots_dir / f"{custom_id}.png"
-            if png_file.exists():
-                (request_dir / "screenshot.png").write_bytes(png_file.read_bytes())
+        written: list[Path] = []
+
+        # Write request content
+        if content is not None:
+            for name in ("strategy", "gamestate", "memory"):
+                if name in skip:
+                    continue
+                path = request_dir / f"{name}.md"
+                path.write_text(content[name])
+                written.append(path)
+
+        # Write response data
+        if data is not None:
+            path = request_dir / "reasoning.md"
+            path.write_text(data["reasoning"])
+            written.append(path)
+
+            # Strip reasoning from tool_call arguments before writing
+            cleaned_tool_calls = self._strip_reasoning_from_tool_calls(
+                data["tool_call"]
+            )
+            path = request_dir / "tool_call.json"
+            with path.open("w") as f:
+                json.dump(cleaned_tool_calls, f, indent=2)
+            written.append(path)
+
+        # Write metadata
+        if request is not None:
+            path = request_dir / "metadata.json"
+            with path.open("w") as f:
+                json.dump(self._to_dict(request), f, indent=2)
+            written.append(path)
+
+        # Copy screenshot if exists
+        if png_file.exists():
+            path = request_dir / "screenshot.png"
+            path.write_bytes(png_file.read_bytes())
+            written.append(path)
+
+        return written
+
+    def _write_context(self, run: RunExtract, run_dir: Path) -> Path:
+        """Write the delta-encoded gamestate/memory of a run (see delta.py)."""
+        custom_ids = sorted(run.content)
+        data = encode_context(
+            [custom_id.replace(REQUEST_ID_PREFIX, "") for custom_id in custom_ids],
+            [run.content[custom_id] for custom_id in custom_ids],
+        )
+        path = run_dir / CONTEXT_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        return path
+
+    def _write_series(self, run: RunExtract, run_dir: Path) -> Path:
+        """Write the per-call series of a run (see series.py)."""
+        path = run_dir / SERIES_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            json.dump(encode_series(run.metadata), f, separators=(",", ":"))
+        return path
 
     @staticmethod
     def _strip_reasoning_from_tool_calls(tool_calls: list[dict]) -> list[dict]:
@@ -240,7 +419,10 @@ class BenchmarkWriter:
             if not png_files:
                 return
 
-            with ThreadPoolExecutor() as executor:
+            with (
+                tracing.span("writer.convert_webp", files=len(png_files)),
+                ThreadPoolExecutor() as executor,
+            ):
                 list(
                     tqdm(
                         executor.map(self._convert_single_png_to_webp, png_files),
@@ -253,6 +435,22 @@ class BenchmarkWriter:
         except Exception as e:
             print(f"Warning: cwebp conversion error: {e}")
 
+    def convert_screenshots_to_webp(self, paths: Sequence[Path]) -> list[Path]:
+        """Convert the screenshot.png files among written paths to WebP.
+
+        Returns the paths with converted screenshots replaced by their WebP
+        files. Requires cwebp to be installed.
+        """
+        with self.profiler.stage("webp"):
+            result = []
+            for path in paths:
+                if path.name == "screenshot.png":
+                    self._convert_single_png_to_webp(path)
+                    if not path.exists():
+                        path = path.with_suffix(".webp")
+                result.append(path)
+            return result
+
     def _convert_single_png_to_webp(self, png_file: Path) -> None:
         """Convert a single PNG file to WebP."""
         try:
@@ -271,11 +469,15 @@ class BenchmarkWriter:
 
     @staticmethod
     def _to_dict(obj: object) -> Any:
-        """Convert dataclass to dict, handling nested dataclasses and tuples."""
-        if hasattr(obj, "__dataclass_fields__"):
+        """Convert dataclass to dict, handling nested dataclasses and tuples.
+
+        Fields with metadata {"output": False} (e.g. Run.sketches) are skipped.
+        """
+        if is_dataclass(obj) and not isinstance(obj, type):
             return {
-                k: BenchmarkWriter._to_dict(v)
-                for k, v in asdict(obj).items()  # type: ignore[arg-type]
+                f.name: BenchmarkWriter._to_dict(getattr(obj, f.name))
+                for f in fields(obj)
+                if f.metadata.get("output", True)
             }
         elif isinstance(obj, dict):
             return {k: BenchmarkWriter._to_dict(v) for k, v in obj.items()}
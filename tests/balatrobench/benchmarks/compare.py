@@ -0,0 +1,86 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage:
+    python tests/balatrobench/benchmarks/compare.py \
+        .benchmarks/baseline.json .benchmarks/latest.json --threshold 0.1
+
+Exits with status 1 if any benchmark lost more than `threshold` of its
+throughput or grew its peak memory by more than `threshold`.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    """Return human-readable regression messages (empty if none)."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        cur = current["results"].get(name)
+        if cur is None:
+            continue
+
+        if base["throughput"] > 0:
+            change = cur["throughput"] / base["throughput"] - 1
+            if change < -threshold:
+                regressions.append(
+                    f"{name}: throughput {base['throughput']:.1f} → "
+                    f"{cur['throughput']:.1f} {cur['unit']}/s ({change:+.1%})"
+                )
+
+        if base["peak_mb"] > 0:
+            change = cur["peak_mb"] / base["peak_mb"] - 1
+            if change > threshold:
+                regressions.append(
+                    f"{name}: peak memory {base['peak_mb']:.1f} → "
+                    f"{cur['peak_mb']:.1f} MB ({change:+.1%})"
+                )
+
+    return regressions
+
+
+def print_table(baseline: dict[str, Any], current: dict[str, Any]) -> None:
+    """Print throughput and memory side by side for every benchmark."""
+    print(f"{'Benchmark':<60}{'Throughput Δ':>14}{'Peak MB Δ':>12}")
+    for name, cur in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<60}{'new':>14}{'new':>12}")
+            continue
+        tp = cur["throughput"] / base["throughput"] - 1 if base["throughput"] else 0
+        mem = cur["peak_mb"] / base["peak_mb"] - 1 if base["peak_mb"] else 0
+        print(f"{name:<60}{tp:>+14.1%}{mem:>+12.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare benchmark result files")
+    parser.add_argument("baseline", type=Path, help="Baseline results JSON")
+    parser.add_argument("current", type=Path, help="Current results JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed relative regression (default: 0.1 = 10%%)",
+    )
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+
+    print_table(baseline, current)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for message in regressions:
+            print(f"  - {message}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
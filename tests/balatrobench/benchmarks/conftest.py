@@ -0,0 +1,174 @@
+"""Benchmark harness and synthetic corpora for performance tests.
+
+Each benchmark records median/min wall time, throughput and peak traced
+memory. Results of a session are written to .benchmarks/{NAME}.json
+(NAME from --benchmark-save) and can be compared against a baseline with
+compare.py.
+"""
+
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from balatrobench.synthetic import CorpusSpec, generate_corpus
+
+RESULTS_DIR = Path(".benchmarks")
+DEFAULT_ROUNDS = 5
+
+# Corpus sizes shared by the benchmarks (strategies x models x runs x requests)
+CORPUS_SIZES = {
+    "small": CorpusSpec(
+        vendors=1, models_per_vendor=2, runs_per_model=2, requests_per_run=10
+    ),
+    "medium": CorpusSpec(
+        vendors=2, models_per_vendor=2, runs_per_model=5, requests_per_run=30
+    ),
+    "large": CorpusSpec(
+        strategies=2,
+        vendors=2,
+        models_per_vendor=2,
+        runs_per_model=5,
+        requests_per_run=60,
+    ),
+}
+
+
+@dataclass
+class BenchResult:
+    """Measurements of a single benchmark."""
+
+    name: str
+    rounds: int
+    median_s: float
+    min_s: float
+    items: int  # Work units processed per round (requests, runs, ...)
+    unit: str
+    throughput: float  # items per second (median round)
+    bytes: int  # Input bytes processed per round (0 if not applicable)
+    mb_per_s: float
+    peak_mb: float  # Peak traced Python memory during one (inline) round
+
+
+class BenchmarkSession:
+    """Collects BenchResults and writes them at the end of the session."""
+
+    def __init__(self) -> None:
+        self.results: dict[str, BenchResult] = {}
+
+    def run(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        *,
+        items: int = 1,
+        unit: str = "ops",
+        nbytes: int = 0,
+        rounds: int = DEFAULT_ROUNDS,
+        memory_fn: Callable[[], Any] | None = None,
+    ) -> BenchResult:
+        """Time fn over several rounds and measure its peak memory.
+
+        tracemalloc only sees this process: for work done in worker
+        processes, pass an inline variant of fn as memory_fn.
+        """
+        fn()  # Warm-up (imports, filesystem cache)
+
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+
+        # Memory is measured separately: tracemalloc slows execution down
+        tracemalloc.start()
+        try:
+            (memory_fn or fn)()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        median = statistics.median(timings)
+        result = BenchResult(
+            name=name,
+            rounds=rounds,
+            median_s=median,
+            min_s=min(timings),
+            items=items,
+            unit=unit,
+            throughput=items / median if median else 0.0,
+            bytes=nbytes,
+            mb_per_s=nbytes / 1e6 / median if median else 0.0,
+            peak_mb=peak / 1e6,
+        )
+        self.results[name] = result
+        return result
+
+    def write(self, path: Path) -> None:
+        """Write collected results as JSON."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "generated_at": int(time.time()),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": {name: asdict(r) for name, r in sorted(self.results.items())},
+        }
+        with path.open("w") as f:
+            json.dump(data, f, indent=2)
+
+
+@pytest.fixture(scope="session")
+def benchmark_session(request: pytest.FixtureRequest) -> Iterator[BenchmarkSession]:
+    """Session-wide result collector, saved when the session ends."""
+    session = BenchmarkSession()
+    yield session
+    if session.results:
+        name = request.config.getoption("--benchmark-save")
+        session.write(RESULTS_DIR / f"{name}.json")
+
+
+@pytest.fixture
+def bench(
+    request: pytest.FixtureRequest, benchmark_session: BenchmarkSession
+) -> Callable[..., BenchResult]:
+    """Run a benchmark named after the current test (including its params)."""
+
+    def run(fn: Callable[[], Any], **kwargs: Any) -> BenchResult:
+        return benchmark_session.run(request.node.name, fn, **kwargs)
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def corpora(tmp_path_factory: pytest.TempPathFactory) -> dict[str, Path]:
+    """Synthetic version directories for every corpus size (built lazily)."""
+    return _LazyCorpora(tmp_path_factory)
+
+
+class _LazyCorpora(dict):
+    """Generate each corpus the first time it is requested."""
+
+    def __init__(self, tmp_path_factory: pytest.TempPathFactory) -> None:
+        super().__init__()
+        self._factory = tmp_path_factory
+
+    def __missing__(self, size: str) -> Path:
+        root = self._factory.mktemp(f"corpus-{size}")
+        version_dir = generate_corpus(root / "runs", CORPUS_SIZES[size])
+        self[size] = version_dir
+        return version_dir
+
+
+def largest_run_dir(version_dir: Path) -> Path:
+    """Return the run directory with the largest requests.jsonl."""
+    return max(
+        (p.parent for p in version_dir.rglob("requests.jsonl")),
+        key=lambda d: (d / "requests.jsonl").stat().st_size,
+    )
@@ -0,0 +1,248 @@
+"""Performance benchmarks for the analysis pipeline.
+
+Run with: pytest tests/balatrobench/benchmarks --benchmark
+"""
+
+import json
+import sys
+from collections import deque
+from collections.abc import Callable
+from dataclasses import replace
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from balatrobench.analyzer import BenchmarkAnalyzer
+from balatrobench.decoding import (
+    _request_line,
+    available_backends,
+    decode_custom_id,
+    get_decoder,
+)
+from balatrobench.extractor import (
+    _iter_lines,
+    extract_request_content,
+    extract_request_metadata,
+    extract_response_data,
+)
+from balatrobench.writer import BenchmarkWriter
+
+from .conftest import BenchResult, largest_run_dir
+
+SIZES = ["small", "medium", "large"]
+
+
+def _model_dirs(version_dir: Path) -> list[Path]:
+    return sorted(p for p in version_dir.glob("*/*/*") if p.is_dir())
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_read_requests(
+    size: str, corpora: dict[str, Path], bench: Callable[..., BenchResult]
+) -> None:
+    """Line reading + typed decoding of requests.jsonl (the extractor's path)."""
+    requests_file = largest_run_dir(corpora[size]) / "requests.jsonl"
+    n_lines = len(requests_file.read_bytes().splitlines())
+    decoder = get_decoder()
+
+    result = bench(
+        lambda: deque(map(decoder.request, _iter_lines(requests_file)), maxlen=0),
+        items=n_lines,
+        unit="lines",
+        nbytes=requests_file.stat().st_size,
+    )
+
+    assert result.throughput > 0
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("filename", ["requests.jsonl", "responses.jsonl"])
+@pytest.mark.parametrize("backend", available_backends())
+def test_decode(
+    size: str,
+    filename: str,
+    backend: str,
+    corpora: dict[str, Path],
+    bench: Callable[..., BenchResult],
+) -> None:
+    """Typed line decoding throughput (MB/s) of every installed JSON backend."""
+    source = largest_run_dir(corpora[size]) / filename
+    lines = source.read_bytes().splitlines()
+    decoder = get_decoder(backend)
+    decode = decoder.request if filename == "requests.jsonl" else decoder.response
+
+    result = bench(
+        lambda: deque(map(decode, lines), maxlen=0),
+        items=len(lines),
+        unit="lines",
+        nbytes=source.stat().st_size,
+    )
+
+    assert result.mb_per_s > 0
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize(
+    "decode",
+    [
+        lambda line: _request_line(json.loads(line)),
+        get_decoder("json").request,
+        decode_custom_id,
+    ],
+    ids=["full", "selective", "ids"],
+)
+def test_decode_request_fields(
+    size: str,
+    decode: Callable[[bytes], object],
+    corpora: dict[str, Path],
+    bench: Callable[..., BenchResult],
+) -> None:
+    """Stdlib request decoding: every field, body.messages only, custom_id only."""
+    source = largest_run_dir(corpora[size]) / "requests.jsonl"
+    lines = source.read_bytes().splitlines()
+
+    result = bench(
+        lambda: deque(map(decode, lines), maxlen=0),
+        items=len(lines),
+        unit="lines",
+        nbytes=source.stat().st_size,
+    )
+
+    assert result.mb_per_s > 0
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize(
+    ("extract", "filename"),
+    [
+        (extract_request_content, "requests.jsonl"),
+        (extract_response_data, "responses.jsonl"),
+        (extract_request_metadata, "responses.jsonl"),
+    ],
+    ids=["request_content", "response_data", "request_metadata"],
+)
+def test_extract(
+    size: str,
+    extract: Callable[[Path], dict],
+    filename: str,
+    corpora: dict[str, Path],
+    bench: Callable[..., BenchResult],
+) -> None:
+    """Per-run extraction throughput of the extract_* functions."""
+    source = largest_run_dir(corpora[size]) / filename
+    n_requests = len(extract(source))
+
+    result = bench(
+        lambda: extract(source),
+        items=n_requests,
+        unit="requests",
+        nbytes=source.stat().st_size,
+    )
+
+    assert result.items > 0
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_compute_runs(
+    size: str, corpora: dict[str, Path], bench: Callable[..., BenchResult]
+) -> None:
+    """Scan and parse of every model directory (stats/task/strategy JSON)."""
+    analyzer = BenchmarkAnalyzer()
+    model_dirs = _model_dirs(corpora[size])
+    n_runs = sum(1 for d in model_dirs for p in d.iterdir() if p.is_dir())
+
+    def compute_all() -> None:
+        for model_dir in model_dirs:
+            analyzer._compute_runs(model_dir, {})
+
+    result = bench(compute_all, items=n_runs, unit="runs")
+
+    assert result.items > 0
+
+
+@pytest.mark.parametrize("n_runs", [100, 10_000])
+def test_compute_leaderboard_entry(
+    n_runs: int, corpora: dict[str, Path], bench: Callable[..., BenchResult]
+) -> None:
+    """Leaderboard aggregation over many runs."""
+    analyzer = BenchmarkAnalyzer()
+    model_dir = _model_dirs(corpora["small"])[0]
+    runs = analyzer._compute_runs(model_dir, analyzer._summarize_runs(model_dir))
+    assert runs is not None
+    many = tuple(
+        replace(runs.runs[i % len(runs.runs)], id=str(i)) for i in range(n_runs)
+    )
+
+    result = bench(
+        lambda: analyzer._compute_leaderboard_entry(many), items=n_runs, unit="runs"
+    )
+
+    assert result.items == n_runs
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_to_dict(
+    size: str, corpora: dict[str, Path], bench: Callable[..., BenchResult]
+) -> None:
+    """Dataclass serialization of every Runs object of a corpus."""
+    analyzer = BenchmarkAnalyzer()
+    all_runs = [
+        runs
+        for runs_list in analyzer.analyze_models(corpora[size]).values()
+        for runs in runs_list
+    ]
+    n_runs = sum(len(runs.runs) for runs in all_runs)
+
+    def to_dict_all() -> None:
+        for runs in all_runs:
+            BenchmarkWriter._to_dict(runs)
+
+    result = bench(to_dict_all, items=n_runs, unit="runs")
+
+    assert result.items > 0
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_cli_end_to_end(
+    size: str,
+    corpora: dict[str, Path],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    bench: Callable[..., BenchResult],
+) -> None:
+    """Full CLI build (models + strategies trees, request files, manifests).
+
+    Timed with the default worker processes; peak memory is measured on an
+    inline build (--workers 0), since tracemalloc cannot see the workers.
+    """
+    from balatrobench.cli import main
+
+    version_dir = corpora[size]
+    n_requests = sum(
+        len(p.read_bytes().splitlines()) for p in version_dir.rglob("requests.jsonl")
+    )
+    nbytes = sum(p.stat().st_size for p in version_dir.rglob("*.jsonl"))
+    argv = [
+        "balatrobench",
+        "--input-dir",
+        str(version_dir),
+        "--output-dir",
+        str(tmp_path / "output"),
+    ]
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: None)
+
+    def run(*options: str) -> None:
+        monkeypatch.setattr(sys, "argv", [*argv, *options])
+        main()
+
+    result = bench(
+        run,
+        items=n_requests,
+        unit="requests",
+        nbytes=nbytes,
+        rounds=3,
+        memory_fn=partial(run, "--workers", "0"),
+    )
+
+    assert result.items > 0
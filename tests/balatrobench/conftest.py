@@ -5,6 +5,7 @@ from pathlib import Path
 import pytest
 
 from balatrobench.models import Model, Stats, Strategy
+from balatrobench.synthetic import CorpusSpec, generate_corpus
 
 
 @pytest.fixture
@@ -76,10 +77,28 @@ def version_dir(fixtures_dir: Path) -> Path:
     return fixtures_dir / "runs" / "v1.0.0"
 
 
-def pytest_collection_modifyitems(items):
-    """Auto-assign unit/integration markers based on test path."""
+@pytest.fixture
+def synthetic_version_dir(tmp_path: Path) -> Path:
+    """Small synthetic version directory (2 strategies x 4 models x 3 runs)."""
+    spec = CorpusSpec(
+        strategies=2,
+        runs_per_model=3,
+        requests_per_run=6,
+        strategy_chars=2_000,
+        gamestate_chars=500,
+    )
+    return generate_corpus(tmp_path / "runs", spec)
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items):
+    """Auto-assign unit/integration/benchmark markers based on test path."""
+    skip_benchmark = pytest.mark.skip(reason="use --benchmark to run benchmarks")
     for item in items:
         if "/unit/" in item.nodeid:
             item.add_marker(pytest.mark.unit)
         elif "/integration/" in item.nodeid:
             item.add_marker(pytest.mark.integration)
+        elif "/benchmarks/" in item.nodeid:
+            item.add_marker(pytest.mark.benchmark)
+            if not config.getoption("--benchmark"):
+                item.add_marker(skip_benchmark)
@@ -15,6 +15,7 @@ from balatrobench.models import (
     Stats,
     Strategy,
 )
+from balatrobench.scope import BuildScope
 
 # =============================================================================
 # Fixtures
@@ -152,99 +153,6 @@ def test_subdirs_only_files(tmp_path: Path) -> None:
     assert result == []
 
 
-# =============================================================================
-# _pooled_std_dev_from_runs tests
-# =============================================================================
-
-
-def test_pooled_std_dev_single_run(
-    analyzer: BenchmarkAnalyzer,
-    sample_model_a: Model,
-    simple_strategy: Strategy,
-) -> None:
-    """Single run with any calls_total <= 1 returns 0 for pooled std dev."""
-    # Create a single run with calls_total = 1
-    stats = make_stats(calls_total=1, tokens_in_std=10.0, tokens_in_avg=100.0)
-    run = make_run("run-1", sample_model_a, simple_strategy, stats=stats)
-    runs = (run,)
-
-    result = analyzer._pooled_std_dev_from_runs(
-        runs,
-        std_attr="tokens_in_std",
-        avg_attr="tokens_in_avg",
-        overall_mean=100.0,
-        total_n=1,
-    )
-
-    assert result == pytest.approx(0.0)
-
-
-def test_pooled_std_dev_zero_total_n(
-    analyzer: BenchmarkAnalyzer,
-    sample_model_a: Model,
-    simple_strategy: Strategy,
-) -> None:
-    """total_n = 0 returns 0 for pooled std dev."""
-    stats = make_stats(calls_total=0, tokens_in_std=0.0, tokens_in_avg=0.0)
-    run = make_run("run-1", sample_model_a, simple_strategy, stats=stats)
-    runs = (run,)
-
-    result = analyzer._pooled_std_dev_from_runs(
-        runs,
-        std_attr="tokens_in_std",
-        avg_attr="tokens_in_avg",
-        overall_mean=0.0,
-        total_n=0,
-    )
-
-    assert result == pytest.approx(0.0)
-
-
-def test_pooled_std_dev_multiple_runs(
-    analyzer: BenchmarkAnalyzer,
-    sample_model_a: Model,
-    simple_strategy: Strategy,
-) -> None:
-    """Pooled std dev is calculated correctly for multiple runs.
-
-    Using the formula:
-    pooled_var = sum((n_i - 1) * s_i^2 + n_i * (mean_i - overall_mean)^2) / (total_n - 1)
-
-    Example with known values:
-    - Run 1: n=10, mean=100, std=5
-    - Run 2: n=10, mean=110, std=5
-    - Overall mean = (10*100 + 10*110) / 20 = 105
-    - Numerator = (10-1)*25 + 10*(100-105)^2 + (10-1)*25 + 10*(110-105)^2
-                = 9*25 + 10*25 + 9*25 + 10*25
-                = 225 + 250 + 225 + 250 = 950
-    - Pooled var = 950 / 19 = 50
-    - Pooled std = sqrt(50) ≈ 7.071
-    """
-    # Run 1: n=10, mean=100, std=5
-    stats1 = make_stats(calls_total=10, tokens_in_std=5.0, tokens_in_avg=100.0)
-    run1 = make_run("run-1", sample_model_a, simple_strategy, stats=stats1)
-
-    # Run 2: n=10, mean=110, std=5
-    stats2 = make_stats(calls_total=10, tokens_in_std=5.0, tokens_in_avg=110.0)
-    run2 = make_run("run-2", sample_model_a, simple_strategy, stats=stats2)
-
-    runs = (run1, run2)
-    overall_mean = 105.0
-    total_n = 20
-
-    result = analyzer._pooled_std_dev_from_runs(
-        runs,
-        std_attr="tokens_in_std",
-        avg_attr="tokens_in_avg",
-        overall_mean=overall_mean,
-        total_n=total_n,
-    )
-
-    # Expected: sqrt(950/19) ≈ 7.071
-    expected = (950 / 19) ** 0.5
-    assert abs(result - expected) < 0.001
-
-
 # =============================================================================
 # _compute_leaderboard_entry tests
 # =============================================================================
@@ -483,3 +391,20 @@ def test_create_models_leaderboard_ties(
     assert len(leaderboard.entries) == 2
     assert leaderboard.entries[0].avg_round == pytest.approx(10.0)
     assert leaderboard.entries[1].avg_round == pytest.approx(10.0)
+
+
+def test_analyze_with_scope(
+    analyzer: BenchmarkAnalyzer, synthetic_version_dir: Path
+) -> None:
+    """A partial scope restricts both analyses to the selected models."""
+    scope = BuildScope(vendors=("openai",), models=("model-0",))
+
+    models = analyzer.analyze_models(synthetic_version_dir, scope)
+    strategies = analyzer.analyze_strategies(synthetic_version_dir, scope)
+
+    assert {key: len(v) for key, v in models.items()} == {
+        "default": 1,
+        "strategy-1": 1,
+    }
+    assert list(strategies) == ["openai/model-0"]
+    assert len(strategies["openai/model-0"]) == 2
@@ -0,0 +1,150 @@
+"""Unit tests for balatrobench.archive module."""
+
+import pickle
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from balatrobench.archive import ArchivePath, index_path, is_archive, open_archive
+
+
+def make_archive(version_dir: Path, archive: Path, arcname: str = "runs") -> Path:
+    """Pack the runs root of a version directory into a tar archive."""
+    mode = {".tar": "w", ".gz": "w:gz", ".xz": "w:xz"}[archive.suffix]
+    with tarfile.open(archive, mode) as tar:
+        tar.add(version_dir.parent, arcname=arcname)
+    return archive
+
+
+@pytest.fixture(params=["runs.tar", "runs.tar.gz", "runs.tar.xz"])
+def archive_root(
+    request: pytest.FixtureRequest, version_dir: Path, tmp_path: Path
+) -> ArchivePath:
+    """Root of an archive containing runs/v1.0.0 of the fixtures."""
+    return open_archive(make_archive(version_dir, tmp_path / request.param))
+
+
+def test_is_archive(version_dir: Path, tmp_path: Path) -> None:
+    """Only existing files with a tar suffix are archives."""
+    archive = make_archive(version_dir, tmp_path / "runs.tar")
+
+    assert is_archive(archive)
+    assert not is_archive(tmp_path)
+    assert not is_archive(tmp_path / "missing.tar")
+
+
+def test_directory_listing(archive_root: ArchivePath, version_dir: Path) -> None:
+    """Directories list the same children as the extracted tree."""
+    archived = archive_root / "runs" / "v1.0.0"
+
+    assert archived.is_dir()
+    assert archived.exists()
+    for path in version_dir.rglob("*"):
+        member = archived / path.relative_to(version_dir).as_posix()
+        assert member.is_dir() == path.is_dir()
+        assert member.is_file() == path.is_file()
+        if path.is_dir():
+            assert sorted(p.name for p in member.iterdir()) == sorted(
+                p.name for p in path.iterdir()
+            )
+
+
+def test_file_content(archive_root: ArchivePath, sample_run_dir: Path) -> None:
+    """Files read back with their original content and size."""
+    run_dir = (
+        archive_root
+        / "runs"
+        / sample_run_dir.relative_to(sample_run_dir.parents[4]).as_posix()
+    )
+
+    # Read out of archive order to exercise rewinding compressed streams
+    for name in ("stats.json", "requests.jsonl", "task.json", "responses.jsonl"):
+        member = run_dir / name
+        assert member.read_bytes() == (sample_run_dir / name).read_bytes()
+        assert member.stat().st_size == (sample_run_dir / name).stat().st_size
+        with member.open() as f:
+            assert f.read() == (sample_run_dir / name).read_text()
+
+
+def test_run_members_read_in_one_pass(
+    version_dir: Path, sample_run_dir: Path, tmp_path: Path
+) -> None:
+    """Members after a read in its directory are spooled, not re-decompressed."""
+    root = open_archive(make_archive(version_dir, tmp_path / "runs.tar.gz"))
+    archive = root.archive
+    run_dir = (
+        root / "runs" / sample_run_dir.relative_to(sample_run_dir.parents[4]).as_posix()
+    )
+    opened = []
+    open_stream = archive._open_stream
+
+    def counting_open_stream() -> object:
+        opened.append(True)
+        return open_stream()
+
+    archive._open_stream = counting_open_stream  # type: ignore[method-assign]
+
+    # The extractor reads the JSONL files first, the scan its stats afterwards
+    names = ("requests.jsonl", "responses.jsonl", "task.json", "stats.json")
+    for name in names:
+        assert (run_dir / name).read_bytes() == (sample_run_dir / name).read_bytes()
+
+    assert len(opened) == 1
+    # Spooled members are released once read
+    assert not {(run_dir / name)._member for name in names} & set(archive._spool)
+
+
+def test_missing_member(archive_root: ArchivePath) -> None:
+    """Missing members do not exist and cannot be read."""
+    missing = archive_root / "runs" / "v9.9.9"
+
+    assert not missing.exists()
+    assert not missing.is_dir()
+    with pytest.raises(FileNotFoundError):
+        missing.read_bytes()
+    with pytest.raises(FileNotFoundError):
+        missing.stat()
+
+
+def test_pickle_roundtrip(archive_root: ArchivePath) -> None:
+    """ArchivePaths pickle to worker processes by archive path and member."""
+    member = archive_root / "runs" / "v1.0.0"
+
+    restored = pickle.loads(pickle.dumps(member))
+
+    assert isinstance(restored, ArchivePath)
+    assert restored == member
+    assert restored.is_dir()
+
+
+def test_index_is_saved_and_reused(
+    version_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The member index is cached in INDEX_DIR, not next to the archive."""
+    from balatrobench import archive as archive_module
+
+    monkeypatch.setattr(archive_module, "INDEX_DIR", tmp_path / "indexes")
+    (tmp_path / "archives").mkdir()
+    path = make_archive(version_dir, tmp_path / "archives" / "runs.tar.gz")
+    open_archive(path)
+    assert index_path(path).parent == tmp_path / "indexes"
+    assert index_path(path).exists()
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+    # A fresh process cache loads the index without scanning the archive
+    monkeypatch.setattr(archive_module, "_archives", {})
+    monkeypatch.setattr(
+        archive_module.Archive,
+        "_build_index",
+        lambda self: pytest.fail("index rebuilt"),
+    )
+    root = open_archive(path)
+
+    assert (root / "runs" / "v1.0.0").is_dir()
+
+
+def test_members_are_read_only(archive_root: ArchivePath) -> None:
+    """Archive members cannot be opened for writing."""
+    with pytest.raises(OSError):
+        (archive_root / "runs" / "v1.0.0" / "new.json").open("w")
@@ -0,0 +1,440 @@
+"""Unit tests for balatrobench.build module."""
+
+import json
+import shutil
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from balatrobench import build, extractor, journal, summary
+from balatrobench.analyzer import BenchmarkAnalyzer
+from balatrobench.archive import Archive, open_archive
+from balatrobench.build import build_version, build_versions, find_version_dirs
+from balatrobench.delta import CONTEXT_FILENAME, decode_context
+from balatrobench.journal import journal_path
+from balatrobench.models import Model
+from balatrobench.profiling import BuildProfiler
+from balatrobench.scope import BuildScope
+from balatrobench.writer import BenchmarkWriter
+
+
+@pytest.fixture(autouse=True)
+def journal_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the build journals of a test in its own directory."""
+    path = tmp_path / "journals"
+    monkeypatch.setattr(journal, "JOURNAL_DIR", path)
+    return path
+
+
+def _sequential_build(input_dir: Path, output_dir: Path, version: str) -> None:
+    """Reference build: the analyzer + writer calls of the sequential CLI."""
+    analyzer = BenchmarkAnalyzer(runs_dir=input_dir.parent, output_dir=output_dir)
+
+    models_writer = BenchmarkWriter(output_dir / "models")
+    for strategy_name, runs_list in analyzer.analyze_models(input_dir).items():
+        strategy = runs_list[0].strategy
+        leaderboard = analyzer.create_models_leaderboard(strategy, runs_list)
+        models_writer.write_models_leaderboard(leaderboard, version, strategy.key)
+        slices = analyzer.create_models_slices(strategy, runs_list)
+        models_writer.write_models_slices(slices, version, strategy.key)
+        paired = analyzer.create_models_paired(strategy, runs_list)
+        models_writer.write_models_paired(paired, version, strategy.key)
+        for runs in runs_list:
+            models_writer.write_runs(runs, version, strategy.key)
+            model_dir = input_dir / strategy_name / runs.model.vendor / runs.model.name
+            output_base = (
+                output_dir
+                / "models"
+                / version
+                / strategy.key
+                / runs.model.vendor
+                / runs.model.name
+            )
+            for run in runs.runs:
+                models_writer.write_request_files(model_dir / run.id, output_base)
+
+    strategies_writer = BenchmarkWriter(output_dir / "strategies")
+    for model_key, runs_list in analyzer.analyze_strategies(input_dir).items():
+        vendor, model_name = model_key.split("/", 1)
+        model = Model(vendor=vendor, name=model_name)
+        leaderboard = analyzer.create_strategies_leaderboard(model, runs_list)
+        strategies_writer.write_strategies_leaderboard(leaderboard, version, model_key)
+        slices = analyzer.create_strategies_slices(model, runs_list)
+        strategies_writer.write_strategies_slices(slices, version, model_key)
+        paired = analyzer.create_strategies_paired(model, runs_list)
+        strategies_writer.write_strategies_paired(paired, version, model_key)
+        for runs in runs_list:
+            strategies_writer.write_strategy_runs(runs, version, vendor, model_name)
+            key = runs.strategy.key
+            for run in runs.runs:
+                strategies_writer.write_strategy_request_files(
+                    input_dir / key / vendor / model_name / run.id,
+                    version,
+                    vendor,
+                    model_name,
+                    key,
+                    run.id,
+                )
+
+    providers_writer = BenchmarkWriter(output_dir / "providers")
+    runs_list = [
+        runs
+        for runs_list in analyzer.analyze_models(input_dir).values()
+        for runs in runs_list
+    ]
+    leaderboard = analyzer.create_providers_leaderboard(runs_list)
+    providers_writer.write_providers_leaderboard(leaderboard, version)
+
+    for writer in (models_writer, strategies_writer, providers_writer):
+        writer.write_manifest([version], version)
+
+
+def _snapshot(output_dir: Path) -> dict[str, object]:
+    """Relative path → content of every output file, ignoring timestamps."""
+    snapshot: dict[str, object] = {}
+    for path in sorted(p for p in output_dir.rglob("*") if p.is_file()):
+        rel = str(path.relative_to(output_dir))
+        if path.suffix == ".json":
+            data = json.loads(path.read_text())
+            if isinstance(data, dict):
+                data.pop("generated_at", None)
+            snapshot[rel] = data
+        else:
+            snapshot[rel] = path.read_bytes()
+    return snapshot
+
+
+@pytest.mark.parametrize("cpu_workers", [0, 2])
+def test_build_matches_sequential_output(
+    synthetic_version_dir: Path, tmp_path: Path, cpu_workers: int
+) -> None:
+    """The task graph writes the same files as the sequential build."""
+    version = synthetic_version_dir.name
+    _sequential_build(synthetic_version_dir, tmp_path / "expected", version)
+
+    build_version(
+        synthetic_version_dir,
+        tmp_path / "actual",
+        version,
+        cpu_workers=cpu_workers,
+        io_workers=4,
+    )
+
+    expected = _snapshot(tmp_path / "expected")
+    actual = _snapshot(tmp_path / "actual")
+    assert sorted(actual) == sorted(expected)
+    assert actual == expected
+
+
+def test_build_fixture_version(version_dir: Path, tmp_path: Path) -> None:
+    """The fixture version builds both trees with request files."""
+    build_version(version_dir, tmp_path, "v1.0.0", cpu_workers=0)
+
+    run_id = "20260109_165752_472_RED_WHITE_BBBBBBB"
+    models_base = tmp_path / "models/v1.0.0/default/openai/gpt-oss-120b"
+    strategies_base = tmp_path / "strategies/v1.0.0/openai/gpt-oss-120b/default"
+    assert (models_base.with_suffix(".json")).exists()
+    assert (models_base / run_id).is_dir()
+    assert (strategies_base / "runs.json").exists()
+    assert (strategies_base / run_id).is_dir()
+    assert (tmp_path / "models/manifest.json").exists()
+    assert (tmp_path / "strategies/manifest.json").exists()
+    assert (tmp_path / "providers/v1.0.0/leaderboard.json").exists()
+
+
+def test_build_records_profiler_stages(version_dir: Path, tmp_path: Path) -> None:
+    """Task stages are reported to the profiler."""
+    profiler = BuildProfiler()
+
+    build_version(version_dir, tmp_path, "v1.0.0", cpu_workers=0, profiler=profiler)
+
+    assert {"scan", "extract", "write_request_files", "manifests"} <= set(
+        profiler.stages
+    )
+    assert profiler.stages["scan"].files == 1
+    assert profiler.stages["manifests"].files == 3
+
+
+def test_build_missing_input_dir(tmp_path: Path) -> None:
+    """A missing version directory raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        build_version(tmp_path / "missing", tmp_path / "out", "v1.0.0")
+
+
+@pytest.fixture
+def runs_root(version_dir: Path, tmp_path: Path) -> Path:
+    """Runs root with the fixture version copied as v1.0.0 and v1.1.0."""
+    root = tmp_path / "runs"
+    for version in ("v1.0.0", "v1.1.0"):
+        shutil.copytree(version_dir, root / version)
+    (root / "not-a-version").mkdir()
+    return root
+
+
+def test_find_version_dirs(runs_root: Path) -> None:
+    """Version directories are found oldest first; others are ignored."""
+    assert find_version_dirs(runs_root) == {
+        "v1.0.0": runs_root / "v1.0.0",
+        "v1.1.0": runs_root / "v1.1.0",
+    }
+    assert find_version_dirs(runs_root, ["v1.1.0"]) == {"v1.1.0": runs_root / "v1.1.0"}
+
+
+def test_find_version_dirs_missing_version(runs_root: Path) -> None:
+    """Selecting a version that does not exist raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError, match=r"v9\.9\.9"):
+        find_version_dirs(runs_root, ["v1.0.0", "v9.9.9"])
+
+
+def test_build_versions_writes_manifest_once(
+    runs_root: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Versions share one graph and the manifests are written once."""
+    manifest_calls = []
+    write_manifest = BenchmarkWriter.write_manifest
+
+    def record(self, versions, latest_version):
+        manifest_calls.append((list(versions), latest_version))
+        return write_manifest(self, versions, latest_version)
+
+    monkeypatch.setattr(BenchmarkWriter, "write_manifest", record)
+
+    output_dir = tmp_path / "output"
+    build_versions(find_version_dirs(runs_root), output_dir, cpu_workers=0)
+
+    assert manifest_calls == [(["v1.1.0", "v1.0.0"], "v1.1.0")] * 3
+    for version in ("v1.0.0", "v1.1.0"):
+        assert (output_dir / "models" / version / "default/leaderboard.json").exists()
+        assert (output_dir / "strategies" / version / "openai/gpt-oss-120b").is_dir()
+    manifest = json.loads((output_dir / "models/manifest.json").read_text())
+    assert manifest["versions"] == [
+        {"version": "v1.1.0", "latest": True},
+        {"version": "v1.0.0", "latest": False},
+    ]
+
+
+def test_build_versions_requires_a_version(tmp_path: Path) -> None:
+    """An empty batch raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        build_versions({}, tmp_path)
+
+
+def test_scoped_build_rewrites_only_selected_subtree(
+    synthetic_version_dir: Path, tmp_path: Path
+) -> None:
+    """A scoped build writes the selected model and its leaderboards only."""
+    version = synthetic_version_dir.name
+    build_version(synthetic_version_dir, tmp_path / "full", version, cpu_workers=0)
+    scope = BuildScope(strategies=("default",), models=("openai/model-0",))
+
+    build_version(
+        synthetic_version_dir, tmp_path / "scoped", version, scope=scope, cpu_workers=0
+    )
+
+    full = _snapshot(tmp_path / "full")
+    scoped = _snapshot(tmp_path / "scoped")
+    assert sorted(scoped) == sorted(
+        rel
+        for rel in full
+        if rel.startswith(
+            (
+                f"models/{version}/default/openai/model-0",
+                f"strategies/{version}/openai/model-0/default/",
+            )
+        )
+        or rel
+        in (
+            f"models/{version}/default/leaderboard.json",
+            f"models/{version}/default/slices.json",
+            f"models/{version}/default/paired.json",
+            f"strategies/{version}/openai/model-0/leaderboard.json",
+            f"strategies/{version}/openai/model-0/slices.json",
+            f"strategies/{version}/openai/model-0/paired.json",
+            f"providers/{version}/leaderboard.json",
+            "models/manifest.json",
+            "strategies/manifest.json",
+            "providers/manifest.json",
+        )
+    )
+    # Leaderboards include the unaffected siblings
+    assert all(scoped[rel] == full[rel] for rel in scoped)
+
+
+def test_builds_decode_responses_once(
+    synthetic_version_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Scans reuse the summaries of extracted runs, then of the cache."""
+    monkeypatch.setattr(summary, "SUMMARY_DIR", tmp_path / "summaries")
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("responses.jsonl decoded outside extraction")
+
+    monkeypatch.setattr(extractor, "extract_request_metadata", fail)
+    version = synthetic_version_dir.name
+    build_version(synthetic_version_dir, tmp_path / "full", version, cpu_workers=0)
+
+    # Siblings of the selected model load their cached summaries
+    scope = BuildScope(strategies=("default",), models=("openai/model-0",))
+    build_version(
+        synthetic_version_dir, tmp_path / "scoped", version, scope=scope, cpu_workers=0
+    )
+
+    full = _snapshot(tmp_path / "full")
+    assert all(
+        data == full[rel] for rel, data in _snapshot(tmp_path / "scoped").items()
+    )
+
+
+def test_scoped_build_run_filter(synthetic_version_dir: Path, tmp_path: Path) -> None:
+    """Run filters restrict request files to the selected runs."""
+    version = synthetic_version_dir.name
+    run_dir = next(synthetic_version_dir.glob("default/openai/model-0/*"))
+    scope = BuildScope(models=("openai/model-0",), runs=(run_dir.name,))
+
+    build_version(synthetic_version_dir, tmp_path, version, scope=scope, cpu_workers=0)
+
+    models_base = tmp_path / "models" / version / "default/openai/model-0"
+    assert [p.name for p in models_base.iterdir()] == [run_dir.name]
+    assert models_base.with_suffix(".json").exists()
+
+
+def test_resume_skips_completed_units(
+    synthetic_version_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """An interrupted build resumes without redoing completed units."""
+    version = synthetic_version_dir.name
+    build_version(synthetic_version_dir, tmp_path / "expected", version, cpu_workers=0)
+
+    def interrupted(*args: object) -> None:
+        raise KeyboardInterrupt
+
+    output_dir = tmp_path / "actual"
+    with monkeypatch.context() as m:
+        m.setattr(build, "_write_strategies_leaderboard", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            build_version(synthetic_version_dir, output_dir, version, cpu_workers=0)
+    assert journal_path(output_dir).exists()
+
+    extracted = []
+    extract = build.extract_complete_run
+
+    def counting_extract(run_dir: Path, ids: list[str] | None = None) -> object:
+        extracted.append(run_dir)
+        return extract(run_dir, ids)
+
+    monkeypatch.setattr(build, "extract_complete_run", counting_extract)
+    build_version(
+        synthetic_version_dir, output_dir, version, resume=True, cpu_workers=0
+    )
+
+    n_runs = len(list(synthetic_version_dir.glob("*/*/*/*")))
+    assert len(extracted) < n_runs
+    assert not journal_path(output_dir).exists()
+    assert _snapshot(output_dir) == _snapshot(tmp_path / "expected")
+
+
+def test_build_from_archive_matches_directory(
+    synthetic_version_dir: Path, tmp_path: Path
+) -> None:
+    """Building from an archive writes the same output as the extracted tree."""
+    version = synthetic_version_dir.name
+    archive = tmp_path / "runs.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(synthetic_version_dir, arcname=version)
+    build_version(synthetic_version_dir, tmp_path / "expected", version, cpu_workers=0)
+
+    archived = open_archive(archive) / version
+    build_version(archived, tmp_path / "actual", version, cpu_workers=2)
+
+    assert _snapshot(tmp_path / "actual") == _snapshot(tmp_path / "expected")
+
+
+def test_build_from_archive_reads_forward(
+    synthetic_version_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A build decompresses an archive in one pass (tasks start in plan order)."""
+    version = synthetic_version_dir.name
+    archive = tmp_path / "runs.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(synthetic_version_dir, arcname=version)
+    archived = open_archive(archive) / version
+
+    opened = []
+    open_stream = Archive._open_stream
+
+    def counting_open_stream(self: Archive) -> object:
+        opened.append(True)
+        return open_stream(self)
+
+    monkeypatch.setattr(Archive, "_open_stream", counting_open_stream)
+    build_version(archived, tmp_path / "out", version, cpu_workers=0)
+
+    assert len(opened) == 1
+
+
+def test_sharded_extraction_matches_unsharded(
+    synthetic_version_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Runs larger than SHARD_BYTES are extracted in shards with the same output."""
+    version = synthetic_version_dir.name
+    build_version(synthetic_version_dir, tmp_path / "expected", version, cpu_workers=0)
+
+    monkeypatch.setattr(build, "SHARD_BYTES", 1)
+    profiler = BuildProfiler()
+    build_version(
+        synthetic_version_dir,
+        tmp_path / "actual",
+        version,
+        cpu_workers=0,
+        profiler=profiler,
+    )
+
+    n_runs = len(list(synthetic_version_dir.glob("*/*/*/*")))
+    assert profiler.stages["extract"].calls > 2 * n_runs
+    assert _snapshot(tmp_path / "actual") == _snapshot(tmp_path / "expected")
+
+
+def test_scoped_build_request_filter(
+    synthetic_version_dir: Path, tmp_path: Path
+) -> None:
+    """Request filters rewrite only the selected request directories."""
+    version = synthetic_version_dir.name
+    run_dir = next(synthetic_version_dir.glob("default/openai/model-0/*"))
+    scope = BuildScope(
+        models=("openai/model-0",), runs=(run_dir.name,), requests=("request-00002",)
+    )
+
+    build_version(synthetic_version_dir, tmp_path, version, scope=scope, cpu_workers=0)
+
+    run_base = tmp_path / "models" / version / "default/openai/model-0" / run_dir.name
+    assert [p.name for p in run_base.iterdir()] == ["00002"]
+    assert not journal_path(tmp_path).exists()
+
+
+def test_build_delta_context(synthetic_version_dir: Path, tmp_path: Path) -> None:
+    """Delta context builds replace per-request gamestate/memory files."""
+    version = synthetic_version_dir.name
+    build_version(synthetic_version_dir, tmp_path / "md", version, cpu_workers=0)
+
+    build_version(
+        synthetic_version_dir,
+        tmp_path / "delta",
+        version,
+        delta_context=True,
+        cpu_workers=0,
+    )
+
+    md = _snapshot(tmp_path / "md")
+    delta = _snapshot(tmp_path / "delta")
+    dropped = {rel for rel in md if rel.endswith(("/gamestate.md", "/memory.md"))}
+    added = {rel for rel in delta if rel.endswith("/" + CONTEXT_FILENAME)}
+    assert set(delta) == set(md) - dropped | added
+    assert len(added) == len({str(Path(rel).parent.parent) for rel in dropped})
+    for rel in added:
+        run_dir = Path(rel).parent
+        for request_id in delta[rel]["requests"]:
+            assert decode_context(delta[rel], request_id) == {
+                name: md[str(run_dir / request_id / f"{name}.md")].decode()
+                for name in ("gamestate", "memory")
+            }
@@ -5,14 +5,14 @@ from pathlib import Path
 import pytest
 
 from balatrobench import __version__
-from balatrobench.cli import (
+from balatrobench.build import (
     VERSION_PARTS_PATTERN,
     VERSION_PATTERN,
     _find_versions,
     _version_sort_key,
-    create_parser,
-    infer_version,
 )
+from balatrobench.cli import create_parser, infer_version
+from balatrobench.decoding import available_backends
 
 
 class TestVersionPattern:
@@ -170,6 +170,12 @@ class TestCreateParser:
         assert args.output_dir == Path("site/benchmarks")
         assert args.version is None
         assert args.webp is False
+        assert args.profile is None
+        assert args.pstats is False
+        assert args.trace is None
+        assert args.resume is False
+        assert args.workers is None
+        assert args.io_workers == 16
 
     def test_create_parser_with_arguments(self) -> None:
         """Parser correctly parses all arguments."""
@@ -184,6 +190,21 @@ class TestCreateParser:
                 "--version",
                 "v2.0.0",
                 "--webp",
+                "--workers",
+                "0",
+                "--io-workers",
+                "4",
+                "--run",
+                "run-a",
+                "--request",
+                "request-00001",
+                "request-00213",
+                "--export",
+                "parquet",
+                "--export-dir",
+                "/custom/exports",
+                "--sqlite",
+                "/custom/benchmarks.db",
             ]
         )
 
@@ -191,6 +212,13 @@ class TestCreateParser:
         assert args.output_dir == Path("/custom/output")
         assert args.version == "v2.0.0"
         assert args.webp is True
+        assert args.workers == 0
+        assert args.io_workers == 4
+        assert args.run == ["run-a"]
+        assert args.request == ["request-00001", "request-00213"]
+        assert args.export == "parquet"
+        assert args.export_dir == Path("/custom/exports")
+        assert args.sqlite == Path("/custom/benchmarks.db")
 
 
 # =============================================================================
@@ -343,3 +371,178 @@ class TestMain:
 
         captured = capsys.readouterr()
         assert "Version: v2.5.0" in captured.out
+
+    def test_main_profile_writes_build_report(
+        self, version_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """main() with --profile writes build-report.json with stage entries."""
+        import json
+        import sys
+
+        from balatrobench.cli import main
+
+        profile_dir = tmp_path / "profile"
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "balatrobench",
+                "--input-dir",
+                str(version_dir),
+                "--output-dir",
+                str(tmp_path / "output"),
+                "--profile",
+                str(profile_dir),
+            ],
+        )
+
+        main()
+
+        report = json.loads((profile_dir / "build-report.json").read_text())
+        assert report["version"] == "v1.0.0"
+        assert report["json_backend"] in available_backends()
+        stages = {s["name"] for s in report["stages"]}
+        assert {"scan", "extract", "write_request_files", "manifests"} <= stages
+
+    def test_main_runs_dir_builds_selected_versions(
+        self,
+        version_dir: Path,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        """main() with --runs-dir builds the selected versions in one batch."""
+        import shutil
+        import sys
+
+        from balatrobench.cli import main
+
+        runs_dir = tmp_path / "runs"
+        for version in ("v1.0.0", "v1.1.0", "v1.2.0"):
+            shutil.copytree(version_dir, runs_dir / version)
+        output_dir = tmp_path / "output"
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "balatrobench",
+                "--runs-dir",
+                str(runs_dir),
+                "--output-dir",
+                str(output_dir),
+                "--versions",
+                "1.0.0",
+                "v1.1.0",
+                "--workers",
+                "0",
+            ],
+        )
+
+        main()
+
+        captured = capsys.readouterr()
+        assert "Versions: v1.0.0, v1.1.0" in captured.out
+        assert sorted(p.name for p in (output_dir / "models").iterdir()) == [
+            "manifest.json",
+            "v1.0.0",
+            "v1.1.0",
+        ]
+
+    def test_main_versions_requires_runs_dir(
+        self, version_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """--versions is rejected without --runs-dir."""
+        import sys
+
+        from balatrobench.cli import main
+
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["balatrobench", "--input-dir", str(version_dir), "--versions", "v1.0.0"],
+        )
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 2
+
+    def test_main_scoped_rebuild(
+        self,
+        synthetic_version_dir: Path,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        """main() with scope filters only rebuilds the selected subtree."""
+        import sys
+
+        from balatrobench.cli import main
+
+        output_dir = tmp_path / "output"
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "balatrobench",
+                "--input-dir",
+                str(synthetic_version_dir),
+                "--output-dir",
+                str(output_dir),
+                "--strategy",
+                "default",
+                "--model",
+                "openai/model-0",
+                "--workers",
+                "0",
+            ],
+        )
+
+        main()
+
+        captured = capsys.readouterr()
+        assert "Scope: strategy=default, model=openai/model-0" in captured.out
+        strategy_dir = output_dir / "models" / synthetic_version_dir.name / "default"
+        assert sorted(p.name for p in strategy_dir.iterdir()) == [
+            "leaderboard.json",
+            "openai",
+            "paired.json",
+            "slices.json",
+        ]
+
+    def test_main_reads_archive(
+        self,
+        version_dir: Path,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        """main() accepts an archive of a version as --input-dir."""
+        import sys
+        import tarfile
+
+        from balatrobench.cli import main
+
+        archive = tmp_path / "runs-v1.0.0.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            tar.add(version_dir.parent, arcname="runs")
+        output_dir = tmp_path / "output"
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "balatrobench",
+                "--input-dir",
+                str(archive),
+                "--output-dir",
+                str(output_dir),
+                "--workers",
+                "0",
+            ],
+        )
+
+        main()
+
+        captured = capsys.readouterr()
+        assert "Version: v1.0.0" in captured.out
+        assert (output_dir / "models/v1.0.0/default/leaderboard.json").exists()
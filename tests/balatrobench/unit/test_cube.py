@@ -0,0 +1,141 @@
+"""Unit tests for balatrobench.cube module."""
+
+from pathlib import Path
+
+import pytest
+
+from balatrobench.analyzer import BenchmarkAnalyzer
+from balatrobench.cube import AggregationCube
+from balatrobench.enums import Deck, Stake
+from balatrobench.models import Run, Runs
+from balatrobench.moments import merge_runs
+from balatrobench.synthetic import CorpusSpec, generate_corpus
+
+
+@pytest.fixture
+def runs_list(tmp_path: Path) -> list[Runs]:
+    """Runs of one strategy, 4 models, every pair of 2 decks x 3 stakes."""
+    spec = CorpusSpec(
+        runs_per_model=6,
+        requests_per_run=4,
+        strategy_chars=500,
+        gamestate_chars=200,
+        decks=(Deck.RED, Deck.BLUE),
+        stakes=(Stake.WHITE, Stake.RED, Stake.GOLD),
+    )
+    version_dir = generate_corpus(tmp_path / "runs", spec)
+    return BenchmarkAnalyzer().analyze_models(version_dir)["default"]
+
+
+def all_runs(runs_list: list[Runs]) -> list[Run]:
+    return [run for runs in runs_list for run in runs.runs]
+
+
+# =============================================================================
+# Cube
+# =============================================================================
+
+
+def test_cells_per_leaf_key(runs_list: list[Runs]) -> None:
+    """Each (strategy, vendor, model, deck, stake) gets one cell."""
+    cube = AggregationCube.from_runs(all_runs(runs_list))
+
+    assert len(cube.cells) == len(runs_list) * 6
+    assert ("default", "openai", "model-0", Deck.BLUE, Stake.GOLD) in cube.cells
+
+
+def test_rollup_matches_merged_runs(runs_list: list[Runs]) -> None:
+    """A roll-up equals the merge of the runs it covers."""
+    runs = all_runs(runs_list)
+    cube = AggregationCube.from_runs(runs)
+
+    (total,) = cube.rollup(()).values()
+    assert total.to_entry() == merge_runs(runs).to_entry()
+
+    by_stake = cube.rollup(("stake",), deck=Deck.RED)
+    assert list(by_stake) == [(Stake.GOLD,), (Stake.RED,), (Stake.WHITE,)]
+    expected = merge_runs(
+        r for r in runs if r.config.deck == Deck.RED and r.config.stake == Stake.GOLD
+    ).to_entry()
+    assert by_stake[(Stake.GOLD,)].to_entry() == expected
+
+
+def test_merge_of_split_cubes(runs_list: list[Runs]) -> None:
+    """Cubes of disjoint runs merge into the cube of all runs."""
+    runs = all_runs(runs_list)
+    full = AggregationCube.from_runs(runs)
+    split = AggregationCube.from_runs(runs[::2]).merge(
+        AggregationCube.from_runs(runs[1::2])
+    )
+
+    assert split.cells.keys() == full.cells.keys()
+    for key, partial in full.cells.items():
+        assert split.cells[key].to_entry().run_count == partial.to_entry().run_count
+        assert split.cells[key].to_entry().avg_round == pytest.approx(
+            partial.to_entry().avg_round
+        )
+
+
+def test_slices_in_enum_order(runs_list: list[Runs]) -> None:
+    """Slices are each deck, each stake, then each present pair."""
+    slices = AggregationCube.from_runs(all_runs(runs_list)).slices()
+
+    assert slices[:5] == [
+        (Deck.RED, None),
+        (Deck.BLUE, None),
+        (None, Stake.WHITE),
+        (None, Stake.RED),
+        (None, Stake.GOLD),
+    ]
+    assert len(slices) == 5 + 6
+
+
+def test_unknown_dimension() -> None:
+    """Rolling up by an unknown dimension raises ValueError."""
+    with pytest.raises(ValueError, match="provider"):
+        AggregationCube().rollup(("provider",))
+
+
+# =============================================================================
+# Slices leaderboards
+# =============================================================================
+
+
+def test_models_slices_match_filtered_leaderboards(runs_list: list[Runs]) -> None:
+    """Each slice equals the leaderboard of the runs of its deck/stake."""
+    analyzer = BenchmarkAnalyzer()
+    strategy = runs_list[0].strategy
+    result = analyzer.create_models_slices(strategy, runs_list)
+
+    assert result.strategy == strategy
+    for leaderboard_slice in result.slices:
+        filtered = [
+            Runs(
+                generated_at=0,
+                model=runs.model,
+                strategy=runs.strategy,
+                runs=tuple(
+                    run
+                    for run in runs.runs
+                    if leaderboard_slice.deck in (None, run.config.deck)
+                    and leaderboard_slice.stake in (None, run.config.stake)
+                ),
+            )
+            for runs in runs_list
+        ]
+        expected = analyzer.create_models_leaderboard(strategy, filtered)
+        assert leaderboard_slice.entries == expected.entries
+
+
+def test_strategies_slices(runs_list: list[Runs]) -> None:
+    """Strategies slices rank the strategies of a model per deck/stake."""
+    runs = runs_list[0]
+    result = BenchmarkAnalyzer().create_strategies_slices(runs.model, [runs])
+
+    assert result.model == runs.model
+    for leaderboard_slice in result.slices:
+        (entry,) = leaderboard_slice.entries
+        assert entry.strategy == runs.strategy
+    assert sum(s.entries[0].run_count for s in result.slices if s.stake is None) == len(
+        runs.runs
+    )
@@ -0,0 +1,195 @@
+"""Unit tests for balatrobench.decoding module."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from balatrobench import extractor
+from balatrobench.decoding import (
+    ContentPart,
+    RequestBody,
+    RequestLine,
+    RequestMessage,
+    ResponseLine,
+    _request_line,
+    available_backends,
+    decode_custom_id,
+    get_decoder,
+)
+
+
+def _lines(path: Path) -> list[bytes]:
+    return [line for line in path.read_bytes().splitlines() if line.strip()]
+
+
+def test_stdlib_backend_is_always_available() -> None:
+    """The stdlib json backend is the last fallback."""
+    assert available_backends()[-1] == "json"
+    assert get_decoder().backend == available_backends()[0]
+
+
+def test_unknown_backend() -> None:
+    """Unknown or missing backends raise ValueError."""
+    with pytest.raises(ValueError, match="not available"):
+        get_decoder("simdjson")
+
+
+def test_decode_request_line(sample_run_dir: Path) -> None:
+    """Request lines decode to the message text parts, skipping other fields."""
+    line = _lines(sample_run_dir / "requests.jsonl")[0]
+    data = json.loads(line)
+
+    request = get_decoder("json").request(line)
+
+    assert isinstance(request, RequestLine)
+    assert request.custom_id == data["custom_id"]
+    content = request.body.messages[0].content
+    assert [part.text for part in content] == [
+        part["text"] for part in data["body"]["messages"][0]["content"]
+    ]
+    assert all(isinstance(part, ContentPart) for part in content)
+
+
+def test_decode_response_line(sample_run_dir: Path) -> None:
+    """Response lines decode timestamps, usage and the first choice."""
+    line = _lines(sample_run_dir / "responses.jsonl")[0]
+    data = json.loads(line)
+
+    response = get_decoder("json").response(line)
+
+    assert isinstance(response, ResponseLine)
+    assert response.id == data["id"]
+    assert response.response.request_id == data["response"]["request_id"]
+    body = data["response"]["body"]
+    assert (
+        response.response.body.usage.prompt_tokens == (body["usage"]["prompt_tokens"])
+    )
+    usage = response.response.body.usage
+    assert (
+        usage.prompt_tokens_details.cached_tokens
+        == (body["usage"]["prompt_tokens_details"]["cached_tokens"])
+    )
+    assert (
+        usage.completion_tokens_details.reasoning_tokens
+        == (body["usage"]["completion_tokens_details"]["reasoning_tokens"])
+    )
+    message = response.response.body.choices[0].message
+    assert message.tool_calls == body["choices"][0]["message"]["tool_calls"]
+
+
+def test_decode_missing_fields() -> None:
+    """Missing optional fields decode to their defaults."""
+    decoder = get_decoder("json")
+
+    assert decoder.request(b'{"custom_id": "a"}') == RequestLine(custom_id="a")
+    assert decoder.response(b'{"error": {"code": 500}}') == ResponseLine(
+        error={"code": 500}
+    )
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_decode_equal_lines(sample_run_dir: Path, backend: str) -> None:
+    """Every installed backend produces the same objects as the stdlib."""
+    reference = get_decoder("json")
+    decoder = get_decoder(backend)
+
+    for line in _lines(sample_run_dir / "requests.jsonl"):
+        assert decoder.request(line) == reference.request(line)
+    for line in _lines(sample_run_dir / "responses.jsonl"):
+        assert decoder.response(line) == reference.response(line)
+
+
+EDGE_RESPONSE_LINES = [
+    b'{"custom_id": "request-00001", "response": {"body": {"choices": null}}}',
+    b'{"custom_id": null, "response": {"status_code": 200}}',
+    (
+        b'{"custom_id": "request-00001", "response": {"body": {"usage": '
+        b'{"prompt_tokens": 900.0, "completion_tokens": 12.5, '
+        b'"prompt_tokens_details": {"cached_tokens": 512.0}}}}}'
+    ),
+    b'{"custom_id": "request-00001", "response": {"status_code": "200"}}',
+    (
+        b'{"custom_id": "request-00001", "response": {"status_code": 502, "body": '
+        b'{"error": {"code": 502, "metadata": {"provider_name": "Groq"}}}}}'
+    ),
+]
+
+
+@pytest.mark.parametrize("line", EDGE_RESPONSE_LINES)
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_accept_lenient_response_lines(backend: str, line: bytes) -> None:
+    """Nulls, float token counts and string status codes decode everywhere."""
+    assert get_decoder(backend).response(line) == get_decoder("json").response(line)
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_accept_null_request_custom_id(backend: str) -> None:
+    """A null custom_id of a request line decodes as missing."""
+    line = b'{"custom_id": null, "body": {"messages": [{"content": "hi"}]}}'
+
+    request = get_decoder(backend).request(line)
+
+    assert request == get_decoder("json").request(line)
+    assert request.custom_id == ""
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_extract_equal_data(
+    sample_run_dir: Path, backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Extraction output does not depend on the backend."""
+    monkeypatch.setattr(extractor, "_decoder", get_decoder("json"))
+    expected = extractor.extract_run(sample_run_dir)
+
+    monkeypatch.setattr(extractor, "_decoder", get_decoder(backend))
+
+    assert extractor.extract_run(sample_run_dir) == expected
+
+
+def test_selective_request_skips_other_fields() -> None:
+    """Only body.messages is decoded, wherever it is in the line."""
+    line = {
+        "body": {
+            "tools": [{"parameters": {"messages": {"type": "array"}}}],
+            "extra_body": {"note": 'brackets } ] and "quotes": in strings'},
+            "messages": [{"role": "user", "content": [{"type": "text", "text": "a"}]}],
+            "seed": 1,
+        },
+        "custom_id": "request-00001",
+    }
+    raw = json.dumps(line).encode()
+
+    request = get_decoder("json").request(raw)
+
+    assert request == RequestLine(
+        custom_id="request-00001",
+        body=RequestBody(
+            messages=[RequestMessage(content=[ContentPart(type="text", text="a")])]
+        ),
+    )
+    assert request == _request_line(json.loads(raw))
+
+
+def test_selective_request_without_messages() -> None:
+    """Lines without body.messages fall back to a full decode."""
+    raw = b'{"custom_id": "a", "messages": [], "body": {"model": "m"}}'
+
+    assert get_decoder("json").request(raw) == RequestLine(
+        custom_id="a", body=RequestBody()
+    )
+
+
+@pytest.mark.parametrize(
+    ("line", "expected"),
+    [
+        (b'{"custom_id": "a", "body": {}}', "a"),
+        (b'{"body": {"custom_id": "nested"}, "custom_id": "b"}', "b"),
+        (b'{"x": "' + b"y" * 1000 + b'", "custom_id": "c"}', "c"),
+        (b'{"body": {"custom_id": "nested"}}', None),
+        (b"  ", None),
+    ],
+)
+def test_decode_custom_id(line: bytes, expected: str | None) -> None:
+    """custom_id is read at the top level only, from the head or further."""
+    assert decode_custom_id(line) == expected
@@ -0,0 +1,99 @@
+"""Unit tests for balatrobench.delta module."""
+
+import pytest
+
+from balatrobench.delta import (
+    apply_delta,
+    decode_chain,
+    decode_context,
+    decode_entry,
+    encode_chain,
+    encode_context,
+    encode_delta,
+    split_lines,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "lines"),
+    [
+        ("", []),
+        ("a", ["a"]),
+        ("a\n", ["a\n"]),
+        ("a\n\nb", ["a\n", "\n", "b"]),
+        ("a\r\nb\n", ["a\r\n", "b\n"]),
+    ],
+)
+def test_split_lines(text: str, lines: list[str]) -> None:
+    """Lines keep their newline and join back to the text."""
+    assert split_lines(text) == lines
+    assert "".join(lines) == text
+
+
+@pytest.mark.parametrize(
+    ("previous", "text"),
+    [
+        ("", "a\nb\n"),
+        ("a\nb\n", ""),
+        ("a\nb\nc\n", "a\nX\nc\nd"),
+        ("# Memory\n\n- one\n", "# Memory\n\n- one\n- two\n"),
+        ("same\n", "same\n"),
+    ],
+)
+def test_delta_round_trip(previous: str, text: str) -> None:
+    """Applying a delta rebuilds the text exactly."""
+    assert apply_delta(previous, encode_delta(previous, text)) == text
+
+
+def test_growing_text_delta_copies_previous_lines() -> None:
+    """Appended lines are the only literal of a delta."""
+    previous = "".join(f"- action {i}\n" for i in range(50))
+
+    ops = encode_delta(previous, previous + "- action 50\n")
+
+    assert ops == [[0, 50], "- action 50\n"]
+
+
+def test_chain_keyframes() -> None:
+    """Keyframes are written every interval; deltas in between."""
+    texts = ["".join(f"line {j}\n" for j in range(i + 20)) for i in range(10)]
+
+    entries = encode_chain(texts, keyframe_interval=4)
+
+    assert [isinstance(e, str) for e in entries] == [
+        True,
+        False,
+        False,
+        False,
+    ] * 2 + [True, False]
+    assert decode_chain(entries) == texts
+    assert [decode_entry(entries, i) for i in range(len(texts))] == texts
+
+
+def test_chain_keeps_full_text_when_delta_is_larger() -> None:
+    """Unrelated texts are stored in full rather than as a delta."""
+    entries = encode_chain(["a\nb\n", "c\nd\n"], keyframe_interval=16)
+
+    assert entries == ["a\nb\n", "c\nd\n"]
+
+
+def test_context_round_trip() -> None:
+    """decode_context rebuilds the gamestate and memory of any request."""
+    contents = [
+        {
+            "strategy": "S",
+            "gamestate": f"# Gamestate\n\nround: {i}\nhand: A K Q\n",
+            "memory": "".join(f"- action {j}\n" for j in range(i)),
+        }
+        for i in range(20)
+    ]
+    ids = [f"{i + 1:05d}" for i in range(20)]
+
+    data = encode_context(ids, contents, keyframe_interval=8)
+
+    assert data["requests"] == ids
+    for request_id, content in zip(ids, contents):
+        assert decode_context(data, request_id) == {
+            "gamestate": content["gamestate"],
+            "memory": content["memory"],
+        }
@@ -0,0 +1,149 @@
+"""Unit tests for balatrobench.export module."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from balatrobench import export
+from balatrobench.export import (
+    REQUEST_COLUMNS,
+    RUN_COLUMNS,
+    export_version,
+    request_row,
+    require_pyarrow,
+    run_row,
+)
+from balatrobench.extractor import extract_request_metadata
+from balatrobench.pipeline import BenchmarkPipeline
+from balatrobench.scope import BuildScope
+
+# =============================================================================
+# Rows
+# =============================================================================
+
+
+def test_run_row_flattens_run(version_dir: Path) -> None:
+    """Run rows have exactly the columns of the runs table."""
+    _, run = next(BenchmarkPipeline(version_dir).iter_runs())
+    row = run_row(run)
+
+    assert list(row) == list(RUN_COLUMNS)
+    assert row["run_id"] == run.id
+    assert row["model"] == run.model.name
+    assert row["deck"] == "RED"
+    assert row["stake"] == "WHITE"
+    assert row["calls_total"] == run.stats.calls_total
+    assert json.loads(row["providers"]) == dict(run.providers)
+    assert row["time_ms_p50"] == run.stats.percentiles.time_ms.p50
+
+
+def test_request_row_flattens_request(sample_run_dir: Path, version_dir: Path) -> None:
+    """Request rows carry the keys of their run."""
+    _, run = next(BenchmarkPipeline(version_dir).iter_runs())
+    metadata = extract_request_metadata(sample_run_dir / "responses.jsonl")
+    request = metadata[min(metadata)]
+    row = request_row(run, request)
+
+    assert list(row) == list(REQUEST_COLUMNS)
+    assert row["run_id"] == run.id
+    assert row["seed"] == run.config.seed
+    assert row["request_id"] == request.id
+    assert row["tokens_in"] == request.tokens_in
+
+
+def test_column_types() -> None:
+    """Integer and float fields map to int64 and float64 columns."""
+    assert RUN_COLUMNS["calls_total"] == "int64"
+    assert RUN_COLUMNS["cache_hit_ratio"] == "float64"
+    assert REQUEST_COLUMNS["time_ms"] == "int64"
+    assert REQUEST_COLUMNS["cost_total"] == "float64"
+    assert REQUEST_COLUMNS["status"] == "string"
+
+
+def test_requires_pyarrow(
+    monkeypatch: pytest.MonkeyPatch, version_dir: Path, tmp_path: Path
+) -> None:
+    """Exporting without pyarrow raises an ImportError naming the package."""
+    monkeypatch.setattr(export, "pyarrow", None)
+
+    with pytest.raises(ImportError, match="pyarrow"):
+        require_pyarrow()
+    with pytest.raises(ImportError, match="pyarrow"):
+        export_version(version_dir, tmp_path)
+
+
+# =============================================================================
+# Tables
+# =============================================================================
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_export_partitions(
+    fmt: str, synthetic_version_dir: Path, tmp_path: Path
+) -> None:
+    """Every strategy x vendor partition gets a runs and a requests file."""
+    pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+
+    written = export_version(synthetic_version_dir, tmp_path, fmt, row_group_size=7)
+    base = tmp_path / synthetic_version_dir.name
+    runs = list(BenchmarkPipeline(synthetic_version_dir).iter_runs())
+
+    assert all(path.suffix == f".{fmt}" for path in written)
+    assert {path.parent.relative_to(base / "runs") for path in written[::2]} == {
+        Path(f"strategy={run.strategy.key}") / f"vendor={run.model.vendor}"
+        for _, run in runs
+    }
+
+    file_format = "ipc" if fmt == "arrow" else fmt
+    table = ds.dataset(base / "runs", format=file_format, partitioning="hive")
+    rows = table.to_table().to_pylist()
+    assert sorted(row["run_id"] for row in rows) == sorted(run.id for _, run in runs)
+
+    requests = ds.dataset(base / "requests", format=file_format, partitioning="hive")
+    calls = sum(
+        len(extract_request_metadata(run_dir / "responses.jsonl"))
+        for run_dir, _ in runs
+    )
+    assert requests.count_rows() == calls
+
+
+def test_scoped_export_rewrites_whole_partitions(
+    synthetic_version_dir: Path, tmp_path: Path
+) -> None:
+    """A scoped export keeps every run and request of the partitions it writes."""
+    pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+
+    full = export_version(synthetic_version_dir, tmp_path / "full")
+    scope = BuildScope(models=("openai/model-0",), requests=("missing",))
+    export_dir = tmp_path / "scoped"
+    export_version(synthetic_version_dir, export_dir)
+
+    written = export_version(synthetic_version_dir, export_dir, scope=scope)
+
+    base = export_dir / synthetic_version_dir.name
+    assert {path.parent.name for path in written} == {"vendor=openai"}
+    assert len(written) < len(full)
+    for table in ("runs", "requests"):
+        scoped = ds.dataset(base / table, partitioning="hive").to_table()
+        expected = ds.dataset(
+            tmp_path / "full" / synthetic_version_dir.name / table,
+            partitioning="hive",
+        ).to_table()
+        assert scoped.num_rows == expected.num_rows
+
+
+def test_export_row_groups(synthetic_version_dir: Path, tmp_path: Path) -> None:
+    """Parquet files are written in row groups of at most row_group_size rows."""
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    written = export_version(synthetic_version_dir, tmp_path, row_group_size=5)
+
+    for path in written:
+        metadata = pq.ParquetFile(path).metadata
+        assert all(
+            metadata.row_group(i).num_rows <= 5 for i in range(metadata.num_row_groups)
+        )
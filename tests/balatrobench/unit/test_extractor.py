@@ -6,12 +6,16 @@ from pathlib import Path
 import pytest
 
 from balatrobench.extractor import (
+    DEFAULT_PROVIDER,
     _extract_reasoning_from_tool_calls,
     _iter_jsonl,
     extract_request_content,
     extract_request_metadata,
     extract_response_data,
+    extract_run,
+    merge_run_extracts,
 )
+from balatrobench.sketch import RequestSketches
 
 
 class TestIterJsonl:
@@ -234,6 +238,9 @@ class TestExtractRequestMetadata:
         # Check tokens
         assert req.tokens_in == 12742
         assert req.tokens_out == 780
+        assert req.tokens_cached == 512
+        assert req.tokens_reasoning == 671
+        assert req.tokens_out_per_s == pytest.approx(780 / (req.time_ms / 1000))
 
         # Check cost fields
         assert req.cost_in == pytest.approx(0.0018729, rel=1e-4)
@@ -301,6 +308,68 @@ class TestExtractRequestMetadata:
 
         assert result["request-with-error"].status == "error"
 
+    def test_extract_request_metadata_null_usage(self, tmp_path: Path) -> None:
+        """Explicit null usage fields count as 0."""
+        jsonl_file = tmp_path / "null_usage.jsonl"
+        usage = {
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "cost": None,
+            "cost_details": {"upstream_inference_prompt_cost": None},
+            "prompt_tokens_details": {"cached_tokens": None},
+            "completion_tokens_details": {"reasoning_tokens": None},
+        }
+        line = json.dumps(
+            {
+                "id": "2000",
+                "custom_id": "request-null-usage",
+                "response": {
+                    "request_id": "1000",
+                    "status_code": 200,
+                    "body": {"choices": [{}], "usage": usage},
+                },
+            }
+        )
+        jsonl_file.write_text(line)
+
+        request = extract_request_metadata(jsonl_file)["request-null-usage"]
+
+        assert (request.tokens_in, request.tokens_out) == (0, 0)
+        assert (request.cost_in, request.cost_total) == (0, 0)
+        assert (request.tokens_cached, request.tokens_reasoning) == (0, 0)
+        assert request.tokens_out_per_s == 0.0
+        # Sketches take every successful request
+        sketches = RequestSketches.from_requests([request])
+        assert sketches.tokens_in.count == 1
+
+    def test_extract_request_metadata_error_provider(self, tmp_path: Path) -> None:
+        """Bodiless errors go to the provider their error names, else unknown."""
+        jsonl_file = tmp_path / "error_provider.jsonl"
+        error = {"message": "Provider returned error", "code": 502}
+        lines = [
+            {
+                "custom_id": "request-routed",
+                "response": {"status_code": 502, "body": None},
+                "error": {**error, "metadata": {"provider_name": "Groq"}},
+            },
+            {
+                "custom_id": "request-body-error",
+                "response": {
+                    "status_code": 502,
+                    "body": {"error": {**error, "metadata": {"provider_name": "Groq"}}},
+                },
+            },
+            {"custom_id": "request-anonymous", "error": error},
+        ]
+        jsonl_file.write_text("\n".join(json.dumps(line) for line in lines))
+
+        result = extract_request_metadata(jsonl_file)
+
+        assert result["request-routed"].provider == "Groq"
+        assert result["request-body-error"].provider == "Groq"
+        assert result["request-anonymous"].provider == DEFAULT_PROVIDER
+        assert {request.status for request in result.values()} == {"error"}
+
 
 class TestIterJsonlMalformed:
     """Tests for _iter_jsonl with malformed content."""
@@ -383,3 +452,30 @@ class TestExtractRequestContentEdgeCases:
         assert result["request-002"]["strategy"] == "Strategy text"
         assert result["request-002"]["gamestate"] == "Gamestate text"
         assert result["request-002"]["memory"] == ""
+
+
+def test_extract_with_ids_matches_full_extraction(sample_run_dir: Path) -> None:
+    """Extracting selected ids returns the same entries as a full extraction."""
+    full = extract_run(sample_run_dir)
+    ids = sorted(full.custom_ids)[1:3]
+
+    partial = extract_run(sample_run_dir, ids)
+
+    assert partial.content == {k: full.content[k] for k in ids}
+    assert partial.responses == {k: full.responses[k] for k in ids}
+    assert partial.metadata == {k: full.metadata[k] for k in ids}
+
+
+def test_merge_run_extracts(sample_run_dir: Path) -> None:
+    """Merging the extracts of contiguous shards equals the full extract."""
+    full = extract_run(sample_run_dir)
+    ids = list(full.content)
+    shards = [
+        extract_run(sample_run_dir, ids[:2]),
+        extract_run(sample_run_dir, ids[2:]),
+    ]
+
+    merged = merge_run_extracts(shards)
+
+    assert merged == full
+    assert list(merged.content) == ids
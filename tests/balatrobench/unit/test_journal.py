@@ -0,0 +1,114 @@
+"""Unit tests for balatrobench.journal module."""
+
+from pathlib import Path
+
+import pytest
+
+from balatrobench import journal
+from balatrobench.journal import NULL_JOURNAL, BuildJournal, journal_path
+
+
+@pytest.fixture(autouse=True)
+def journal_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the journals of a test in its own directory."""
+    path = tmp_path / "journals"
+    monkeypatch.setattr(journal, "JOURNAL_DIR", path)
+    return path
+
+
+def _write(path: Path, content: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return path
+
+
+def test_recorded_unit_is_complete(tmp_path: Path) -> None:
+    """A recorded unit is complete while its files are unchanged."""
+    journal = BuildJournal(tmp_path)
+    files = [_write(tmp_path / "models/a.json", "{}")]
+
+    journal.record("unit-a", files)
+
+    assert journal.is_complete("unit-a")
+    assert not journal.is_complete("unit-b")
+
+
+def test_resume_verifies_sizes(tmp_path: Path) -> None:
+    """Resumed units are incomplete if a file is missing or changed size."""
+    journal = BuildJournal(tmp_path)
+    a = _write(tmp_path / "a.json", "{}")
+    b = _write(tmp_path / "b.json", "{}")
+    c = _write(tmp_path / "c.json", "{}")
+    journal.record("a", [a])
+    journal.record("b", [b])
+    journal.record("c", [c])
+    journal.close()
+
+    b.write_text('{"changed": true}')
+    c.unlink()
+    resumed = BuildJournal(tmp_path, resume=True)
+
+    assert resumed.is_complete("a")
+    assert not resumed.is_complete("b")
+    assert not resumed.is_complete("c")
+
+
+def test_resume_ignores_truncated_line(tmp_path: Path) -> None:
+    """A partially written last line (crash mid-write) is dropped."""
+    journal = BuildJournal(tmp_path)
+    journal.record("a", [_write(tmp_path / "a.json", "{}")])
+    journal.close()
+    with journal_path(tmp_path).open("a") as f:
+        f.write('{"unit": "b", "fi')
+
+    resumed = BuildJournal(tmp_path, resume=True)
+
+    assert resumed.is_complete("a")
+    assert not resumed.is_complete("b")
+
+
+def test_without_resume_starts_fresh(tmp_path: Path) -> None:
+    """A new journal discards the entries of a previous build."""
+    journal = BuildJournal(tmp_path)
+    journal.record("a", [_write(tmp_path / "a.json", "{}")])
+    journal.close()
+
+    assert not BuildJournal(tmp_path).is_complete("a")
+
+
+def test_close_completed_removes_journal(tmp_path: Path) -> None:
+    """The journal is removed once the build completed."""
+    journal = BuildJournal(tmp_path)
+    journal.close(completed=True)
+
+    assert not journal_path(tmp_path).exists()
+
+
+def test_journal_is_kept_out_of_output_dir(tmp_path: Path, journal_dir: Path) -> None:
+    """Journals live in JOURNAL_DIR, never in the (published) output tree."""
+    output_dir = tmp_path / "site"
+    journal = BuildJournal(output_dir)
+    journal.record("a", [_write(output_dir / "a.json", "{}")])
+    journal.close()
+
+    assert journal.path.parent == journal_dir
+    assert [p.name for p in output_dir.iterdir()] == ["a.json"]
+
+
+def test_resume_with_other_options_starts_fresh(tmp_path: Path) -> None:
+    """Units recorded with other build options are not complete."""
+    journal = BuildJournal(tmp_path, options={"webp": False})
+    journal.record("a", [_write(tmp_path / "a.json", "{}")])
+    journal.close()
+
+    assert not BuildJournal(tmp_path, resume=True, options={"webp": True}).is_complete(
+        "a"
+    )
+    assert not BuildJournal(tmp_path, resume=True).is_complete("a")
+
+
+def test_null_journal() -> None:
+    """NULL_JOURNAL never reports completed units."""
+    NULL_JOURNAL.record("a", [])
+
+    assert not NULL_JOURNAL.is_complete("a")
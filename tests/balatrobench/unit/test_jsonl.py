@@ -0,0 +1,144 @@
+"""Unit tests for balatrobench.jsonl module."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from balatrobench import jsonl
+from balatrobench.jsonl import JsonlFile, index_path, load_index, scan_lines, shard_ids
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the indexes of a test in its own directory."""
+    path = tmp_path / "index"
+    monkeypatch.setattr(jsonl, "INDEX_DIR", path)
+    return path
+
+
+@pytest.fixture
+def requests_file(sample_run_dir: Path, tmp_path: Path) -> Path:
+    """Writable copy of the fixture requests.jsonl."""
+    path = tmp_path / "requests.jsonl"
+    path.write_bytes((sample_run_dir / "requests.jsonl").read_bytes())
+    return path
+
+
+def _decode_all(path: Path) -> dict[str, dict]:
+    lines = (json.loads(line) for line in path.read_text().splitlines() if line)
+    return {data["custom_id"]: data for data in lines}
+
+
+def test_index_maps_ids_to_lines(requests_file: Path) -> None:
+    """Every custom_id maps to the exact bytes of its line."""
+    expected = _decode_all(requests_file)
+
+    with JsonlFile(requests_file) as f:
+        assert f.ids() == list(expected)
+        for custom_id, data in expected.items():
+            assert f.get(custom_id) == data
+
+
+def test_index_sidecar_is_reused(
+    requests_file: Path, index_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The sidecar index is written once and reused while the file is unchanged."""
+    index = load_index(requests_file)
+    assert index_path(requests_file).exists()
+    assert index_path(requests_file).parent == index_dir
+    assert list(requests_file.parent.glob("*.idx.json")) == []
+    assert list(index_dir.glob("*.tmp")) == []
+
+    monkeypatch.setattr(jsonl, "scan_lines", lambda data: pytest.fail("index rebuilt"))
+    assert load_index(requests_file) == index
+
+
+def test_index_without_writable_cache(
+    requests_file: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """An unwritable index directory keeps the index in memory."""
+    blocker = tmp_path / "blocker"
+    blocker.touch()
+    monkeypatch.setattr(jsonl, "INDEX_DIR", blocker / "index")
+
+    assert list(load_index(requests_file).lines) == list(_decode_all(requests_file))
+
+
+def test_index_is_rebuilt_when_file_changes(requests_file: Path) -> None:
+    """A changed size or mtime invalidates the sidecar index."""
+    load_index(requests_file)
+    with requests_file.open("a") as f:
+        f.write(json.dumps({"custom_id": "request-99999", "body": {}}) + "\n")
+    st = requests_file.stat()
+    os.utime(requests_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+
+    assert "request-99999" in load_index(requests_file).lines
+
+
+def test_iter_lines_selects_ids_in_file_order(requests_file: Path) -> None:
+    """iter_lines(ids) yields only the selected lines, in file order."""
+    with JsonlFile(requests_file) as f:
+        ids = f.ids()
+        selected = [ids[3], ids[1], "request-missing"]
+
+        assert [cid for cid, _ in f.iter_lines(selected)] == [ids[1], ids[3]]
+
+
+def test_scan_lines_custom_id_positions() -> None:
+    """custom_id is found at any top-level position; lines without it are skipped."""
+    lines = [
+        b'{"id": "1", "custom_id": "a", "response": {}}',
+        b'{"body": {"custom_id": "nested"}, "custom_id": "b"}',
+        b"",
+        b'{"body": {}}',
+        b'{"custom_id": "a", "retry": true}',
+    ]
+    data = b"\n".join(lines) + b"\n"
+
+    index = scan_lines(data)
+
+    assert list(index) == ["a", "b"]
+    offset, length = index["a"]
+    assert data[offset : offset + length] == lines[4]  # Last line wins
+
+
+def test_shard_ids(requests_file: Path) -> None:
+    """Shards are contiguous, bounded in size and cover every id."""
+    with JsonlFile(requests_file) as f:
+        ids = f.ids()
+        max_line = max(length for _, length in f.index.lines.values())
+
+    shards = shard_ids([requests_file], max_line * 2)
+
+    assert len(shards) > 1
+    assert [cid for shard in shards for cid in shard] == ids
+
+
+def test_shard_ids_include_response_only_ids(
+    requests_file: Path, tmp_path: Path
+) -> None:
+    """Ids with only a response line are sharded after the request ids."""
+    with JsonlFile(requests_file) as f:
+        ids = f.ids()
+    responses_file = tmp_path / "responses.jsonl"
+    responses_file.write_text(
+        "".join(
+            json.dumps({"custom_id": cid, "response": {}}) + "\n"
+            for cid in [ids[0], "request-99999"]
+        )
+    )
+
+    shards = shard_ids([requests_file, responses_file, tmp_path / "missing"], 1)
+
+    assert [cid for shard in shards for cid in shard] == [*ids, "request-99999"]
+
+
+def test_empty_file(tmp_path: Path) -> None:
+    """Empty files have an empty index."""
+    path = tmp_path / "responses.jsonl"
+    path.touch()
+
+    with JsonlFile(path) as f:
+        assert f.ids() == []
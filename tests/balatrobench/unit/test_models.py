@@ -11,6 +11,7 @@ from balatrobench.models import (
     Model,
     ModelsLeaderboardEntry,
     Stats,
+    StatsPercentiles,
 )
 
 
@@ -60,6 +61,24 @@ def test_stats_fields(sample_stats: Stats) -> None:
         "cost_total": float,
         "cost_avg": float,
         "cost_std": float,
+        # Prompt cache
+        "tokens_cached_total": int,
+        "cache_hit_ratio": float,
+        "calls_cached": int,
+        "calls_uncached": int,
+        "time_cached_avg_ms": float,
+        "time_uncached_avg_ms": float,
+        # Reasoning tokens
+        "calls_reasoning": int,
+        "tokens_reasoning_total": int,
+        "tokens_reasoning_avg": float,
+        "tokens_reasoning_std": float,
+        # Decode throughput
+        "calls_measured": int,
+        "tokens_out_per_s_avg": float,
+        "tokens_out_per_s_std": float,
+        # Percentiles (optional, sketched from responses)
+        "percentiles": StatsPercentiles | None,
     }
 
     # Verify all expected fields exist
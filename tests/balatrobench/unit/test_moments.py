@@ -0,0 +1,317 @@
+"""Unit tests for balatrobench.moments module."""
+
+import statistics
+from dataclasses import replace
+
+import pytest
+
+from balatrobench.enums import Deck, Stake
+from balatrobench.models import Config, Model, Request, Run, Stats, Strategy
+from balatrobench.moments import (
+    CacheMoments,
+    DecodeMoments,
+    EntryMoments,
+    Moments,
+    StatsMoments,
+    merge_runs,
+)
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+MODEL = Model(vendor="openai", name="gpt-4o")
+STRATEGY = Strategy(
+    name="Default",
+    key="default",
+    description="Test strategy",
+    author="Test",
+    version="1.0.0",
+    tags=("test",),
+)
+
+
+def make_run(run_id: str, final_round: int, calls: list[int], won: bool) -> Run:
+    """Run whose per-call metrics are all derived from the calls values."""
+    n = len(calls)
+    avg = sum(calls) / n
+    std = statistics.stdev(calls) if n > 1 else 0.0
+    return Run(
+        id=run_id,
+        model=MODEL,
+        strategy=STRATEGY,
+        config=Config(seed="AAAAAAA", deck=Deck.RED, stake=Stake.WHITE),
+        run_won=won,
+        run_completed=True,
+        final_ante=3,
+        final_round=final_round,
+        providers=(("OpenAI", n),),
+        stats=Stats(
+            calls_total=n,
+            calls_success=n - 1,
+            calls_error=1,
+            calls_failed=0,
+            tokens_in_total=sum(calls),
+            tokens_out_total=2 * sum(calls),
+            tokens_in_avg=avg,
+            tokens_out_avg=2 * avg,
+            tokens_in_std=std,
+            tokens_out_std=2 * std,
+            time_total_ms=10 * sum(calls),
+            time_avg_ms=10 * avg,
+            time_std_ms=10 * std,
+            cost_total=sum(calls) / 1000,
+            cost_avg=avg / 1000,
+            cost_std=std / 1000,
+        ),
+    )
+
+
+RUN_CALLS = [[100, 120, 90], [300, 280], [50, 60, 70, 80], [200]]
+RUNS = tuple(
+    make_run(f"run-{i}", 5 + 3 * i, calls, won=i % 2 == 0)
+    for i, calls in enumerate(RUN_CALLS)
+)
+
+
+# =============================================================================
+# Moments
+# =============================================================================
+
+
+def test_from_values_matches_statistics() -> None:
+    """from_values gives the mean, total and sample std of the values."""
+    values = [3, 7, 7, 19, 24, 1]
+    moments = Moments.from_values(values)
+
+    assert moments.n == 6
+    assert moments.total == sum(values)
+    assert moments.avg == pytest.approx(statistics.mean(values))
+    assert moments.std() == pytest.approx(statistics.stdev(values))
+
+
+def test_merge_matches_single_pass() -> None:
+    """Merging partials gives the moments of the concatenated values."""
+    values = [float(v) for calls in RUN_CALLS for v in calls]
+    merged = Moments()
+    for calls in RUN_CALLS:
+        merged = merged.merge(Moments.from_values(calls))
+
+    assert merged.n == len(values)
+    assert merged.avg == pytest.approx(statistics.mean(values))
+    assert merged.std() == pytest.approx(statistics.stdev(values))
+
+
+def test_merge_is_associative_and_commutative() -> None:
+    """Grouping and order of merges do not change the result."""
+    a, b, c = (Moments.from_values(calls) for calls in RUN_CALLS[:3])
+    left = a.merge(b).merge(c)
+    right = a.merge(b.merge(c))
+    swapped = c.merge(a).merge(b)
+
+    for other in (right, swapped):
+        assert other.n == left.n
+        assert other.total == left.total
+        assert other.std() == pytest.approx(left.std())
+
+
+def test_empty_and_single_observation() -> None:
+    """Empty partials merge as identity; fewer than two observations give 0 std."""
+    single = Moments.from_values([42])
+
+    assert Moments().avg == 0.0
+    assert Moments().std() == 0.0
+    assert single.std() == 0.0
+    assert Moments().merge(single) == single
+    assert single.merge(Moments()) == single
+
+
+def test_from_summary_keeps_int_totals() -> None:
+    """Integer totals stay integers when merged."""
+    a = Moments.from_summary(3, 10.0, 1.0, 30)
+    b = Moments.from_summary(2, 20.0, 2.0, 40)
+
+    assert Moments().merge(a).merge(b).total == 70
+    assert isinstance(Moments().merge(a).merge(b).total, int)
+
+
+# =============================================================================
+# Stats and leaderboard entries
+# =============================================================================
+
+
+def test_stats_moments_matches_pooled_std() -> None:
+    """Merged Stats equal the statistics of all calls of the runs."""
+    stats = merge_runs(RUNS).stats.to_stats()
+    calls = [call for run_calls in RUN_CALLS for call in run_calls]
+
+    assert stats.calls_total == len(calls)
+    assert stats.tokens_in_total == sum(calls)
+    assert stats.tokens_in_std == pytest.approx(statistics.stdev(calls))
+    assert stats.time_std_ms == pytest.approx(10 * statistics.stdev(calls))
+
+
+def test_stats_moments_round_trip() -> None:
+    """A single run's Stats survive from_stats / to_stats."""
+    stats = RUNS[0].stats
+    result = StatsMoments.from_stats(stats).to_stats()
+
+    assert result.calls_total == stats.calls_total
+    assert result.tokens_in_total == stats.tokens_in_total
+    assert result.tokens_in_avg == pytest.approx(stats.tokens_in_avg)
+    assert result.tokens_in_std == pytest.approx(stats.tokens_in_std)
+    assert result.cost_std == pytest.approx(stats.cost_std)
+
+
+def test_entry_from_split_partials() -> None:
+    """Merging per-shard partials gives the entry of all runs."""
+    full = merge_runs(RUNS).to_entry()
+    split = merge_runs(RUNS[:1]).merge(merge_runs(RUNS[1:])).to_entry()
+
+    assert full.run_count == split.run_count == len(RUNS)
+    assert full.run_wins == split.run_wins == 2
+    assert full.avg_round == pytest.approx(statistics.mean(r.final_round for r in RUNS))
+    assert full.std_round == pytest.approx(
+        statistics.stdev(r.final_round for r in RUNS)
+    )
+    assert split.std_round == pytest.approx(full.std_round)
+    assert split.stats.tokens_out_std == pytest.approx(full.stats.tokens_out_std)
+
+
+def test_entry_moments_empty() -> None:
+    """An empty partial gives a zero entry."""
+    entry = EntryMoments().to_entry()
+
+    assert entry.run_count == 0
+    assert entry.avg_round == 0.0
+    assert entry.stats.calls_total == 0
+
+
+# =============================================================================
+# Prompt cache
+# =============================================================================
+
+
+def make_request(time_ms: int, tokens_cached: int, status: str = "success") -> Request:
+    """Request with 1000 prompt tokens."""
+    return Request(
+        id="request-00001",
+        status=status,  # type: ignore[arg-type]
+        provider="Groq",
+        tokens_in=1000,
+        tokens_out=100,
+        time_ms=time_ms,
+        cost_in=0.0,
+        cost_out=0.0,
+        cost_total=0.0,
+        tokens_cached=tokens_cached,
+    )
+
+
+def test_cache_moments_from_requests() -> None:
+    """Latency is split by cached and uncached successful calls."""
+    cache = CacheMoments.from_requests(
+        [
+            make_request(1000, 512),
+            make_request(2000, 0),
+            make_request(3000, 0),
+            make_request(9000, 512, status="error"),
+        ]
+    )
+
+    assert cache.tokens_cached == 1024
+    assert cache.hit_ratio(4000) == pytest.approx(0.256)
+    assert cache.time_cached.n == 1
+    assert cache.time_cached.avg == 1000
+    assert cache.time_uncached.n == 2
+    assert cache.time_uncached.avg == 2500
+
+
+def test_cache_stats_merge_across_runs() -> None:
+    """Merged cache stats weigh each run by its number of calls."""
+    runs = [
+        replace(
+            RUNS[0],
+            stats=replace(
+                RUNS[0].stats,
+                tokens_cached_total=100,
+                calls_cached=1,
+                calls_uncached=3,
+                time_cached_avg_ms=400.0,
+                time_uncached_avg_ms=1000.0,
+            ),
+        ),
+        replace(
+            RUNS[1],
+            stats=replace(
+                RUNS[1].stats,
+                tokens_cached_total=300,
+                calls_cached=3,
+                calls_uncached=0,
+                time_cached_avg_ms=800.0,
+            ),
+        ),
+    ]
+
+    stats = merge_runs(runs).stats.to_stats()
+
+    assert stats.tokens_cached_total == 400
+    assert stats.cache_hit_ratio == pytest.approx(400 / stats.tokens_in_total)
+    assert stats.calls_cached == 4
+    assert stats.calls_uncached == 3
+    assert stats.time_cached_avg_ms == pytest.approx(700.0)
+    assert stats.time_uncached_avg_ms == pytest.approx(1000.0)
+
+
+# =============================================================================
+# Reasoning and decode throughput
+# =============================================================================
+
+
+def test_decode_moments_from_measured_requests() -> None:
+    """Reasoning counts every successful call, throughput timed calls only."""
+    requests = [
+        replace(make_request(1000, 0), tokens_reasoning=80, tokens_out_per_s=100.0),
+        replace(make_request(500, 0), tokens_reasoning=40, tokens_out_per_s=200.0),
+        replace(make_request(0, 0), tokens_reasoning=30),
+        replace(make_request(800, 0, status="error"), tokens_reasoning=999),
+    ]
+
+    decode = DecodeMoments.from_requests(requests)
+
+    assert decode.tokens_reasoning.n == 3
+    assert decode.tokens_reasoning.total == 150
+    assert decode.tokens_out_per_s.n == 2
+    assert decode.tokens_out_per_s.avg == pytest.approx(150.0)
+    assert decode.tokens_out_per_s.std() == pytest.approx(statistics.stdev([100, 200]))
+
+
+def test_decode_stats_merge_across_runs() -> None:
+    """Merged reasoning and throughput stats pool the measured calls."""
+    values = [[100.0, 120.0, 140.0], [300.0, 260.0]]
+    runs = []
+    for run, per_s in zip(RUNS, values, strict=False):
+        decode = DecodeMoments(
+            tokens_reasoning=Moments.from_values([50] * (len(per_s) + 1)),
+            tokens_out_per_s=Moments.from_values(per_s),
+        )
+        stats = replace(
+            run.stats,
+            calls_reasoning=len(per_s) + 1,
+            calls_measured=len(per_s),
+            tokens_reasoning_total=decode.tokens_reasoning.total,
+            tokens_reasoning_avg=decode.tokens_reasoning.avg,
+            tokens_out_per_s_avg=decode.tokens_out_per_s.avg,
+            tokens_out_per_s_std=decode.tokens_out_per_s.std(),
+        )
+        runs.append(replace(run, stats=stats))
+
+    stats = merge_runs(runs).stats.to_stats()
+
+    all_values = values[0] + values[1]
+    assert stats.calls_reasoning == 7
+    assert stats.calls_measured == 5
+    assert stats.tokens_reasoning_total == 350
+    assert stats.tokens_reasoning_std == pytest.approx(0.0)
+    assert stats.tokens_out_per_s_avg == pytest.approx(statistics.mean(all_values))
+    assert stats.tokens_out_per_s_std == pytest.approx(statistics.stdev(all_values))
@@ -0,0 +1,171 @@
+"""Unit tests for balatrobench.paired module."""
+
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from balatrobench.analyzer import BenchmarkAnalyzer
+from balatrobench.enums import Deck, Stake
+from balatrobench.models import Config, Model, Run, Runs, Stats, Strategy
+from balatrobench.paired import SeedIndex
+from balatrobench.synthetic import CorpusSpec, generate_corpus
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+STRATEGY = Strategy(
+    name="Default",
+    key="default",
+    description="Test strategy",
+    author="Test",
+    version="1.0.0",
+    tags=(),
+)
+STATS = Stats(
+    calls_total=0,
+    calls_success=0,
+    calls_error=0,
+    calls_failed=0,
+    tokens_in_total=0,
+    tokens_out_total=0,
+    tokens_in_avg=0.0,
+    tokens_out_avg=0.0,
+    tokens_in_std=0.0,
+    tokens_out_std=0.0,
+    time_total_ms=0,
+    time_avg_ms=0.0,
+    time_std_ms=0.0,
+    cost_total=0.0,
+    cost_avg=0.0,
+    cost_std=0.0,
+)
+
+
+def make_runs(name: str, rounds: dict[str, list[int]]) -> Runs:
+    """Runs of a model: seed → final rounds of its runs (RED/WHITE)."""
+    model = Model(vendor="openai", name=name)
+    runs = tuple(
+        Run(
+            id=f"{name}-{seed}-{i}",
+            model=model,
+            strategy=STRATEGY,
+            config=Config(seed=seed, deck=Deck.RED, stake=Stake.WHITE),
+            run_won=False,
+            run_completed=True,
+            final_ante=1,
+            final_round=final_round,
+            providers=(),
+            stats=STATS,
+        )
+        for seed, values in rounds.items()
+        for i, final_round in enumerate(values)
+    )
+    return Runs(generated_at=0, model=model, strategy=STRATEGY, runs=runs)
+
+
+RUNS_LIST = [
+    make_runs("a", {"AAAAAAA": [10], "BBBBBBB": [5], "CCCCCCC": [8], "DDDDDDD": [3]}),
+    make_runs("b", {"AAAAAAA": [7], "BBBBBBB": [5], "CCCCCCC": [9, 11]}),
+    make_runs("c", {"EEEEEEE": [20]}),
+]
+
+
+# =============================================================================
+# Index and comparison
+# =============================================================================
+
+
+def test_index_averages_repeated_runs() -> None:
+    """Runs of the same configuration are averaged."""
+    index = SeedIndex.from_runs_list(RUNS_LIST, lambda runs: runs.model.name)
+
+    assert index.competitors == ("a", "b", "c")
+    assert index.rounds["b"][("CCCCCCC", Deck.RED, Stake.WHITE)] == 10
+    assert len(index.rounds["a"]) == 4
+
+
+def test_compare_shared_configs() -> None:
+    """Only shared configurations are paired."""
+    comparison = SeedIndex.from_runs_list(
+        RUNS_LIST, lambda runs: runs.model.name
+    ).compare()
+
+    # a vs b: AAAAAAA +3, BBBBBBB 0, CCCCCCC -2 (8 vs mean of 9 and 11)
+    assert comparison.pairs[0][1] == 3
+    assert comparison.wins[0][1] == 1
+    assert comparison.losses[0][1] == 1
+    assert comparison.ties[0][1] == 1
+    assert comparison.mean_round_diff[0][1] == pytest.approx(1 / 3)
+    assert comparison.std_round_diff[0][1] == pytest.approx(
+        (((3 - 1 / 3) ** 2 + (1 / 3) ** 2 + (-2 - 1 / 3) ** 2) / 2) ** 0.5
+    )
+
+    # c shares no configuration
+    assert comparison.pairs[0][2] == comparison.pairs[2][1] == 0
+    assert comparison.mean_round_diff[2][0] == 0.0
+
+
+def test_compare_mirrors_cells() -> None:
+    """Cell (j, i) is the mirror of cell (i, j)."""
+    comparison = SeedIndex.from_runs_list(
+        RUNS_LIST, lambda runs: runs.model.name
+    ).compare()
+
+    for i in range(3):
+        assert comparison.pairs[i][i] == 0
+        for j in range(3):
+            assert comparison.wins[i][j] == comparison.losses[j][i]
+            assert comparison.ties[i][j] == comparison.ties[j][i]
+            assert comparison.mean_round_diff[i][j] == -comparison.mean_round_diff[j][i]
+
+
+def test_configs_differ_by_deck_and_stake() -> None:
+    """Runs with the same seed on another deck or stake are not paired."""
+    other = make_runs("b", {"AAAAAAA": [7]})
+    other = replace(
+        other,
+        runs=tuple(
+            replace(run, config=replace(run.config, stake=Stake.GOLD))
+            for run in other.runs
+        ),
+    )
+    comparison = SeedIndex.from_runs_list(
+        [RUNS_LIST[0], other], lambda runs: runs.model.name
+    ).compare()
+
+    assert comparison.pairs[0][1] == 0
+
+
+# =============================================================================
+# Analyzer
+# =============================================================================
+
+
+def test_models_paired_on_synthetic_corpus(tmp_path: Path) -> None:
+    """Synthetic models share every configuration of their runs."""
+    spec = CorpusSpec(
+        runs_per_model=5,
+        requests_per_run=3,
+        strategy_chars=500,
+        gamestate_chars=200,
+        decks=(Deck.RED, Deck.BLUE),
+    )
+    version_dir = generate_corpus(tmp_path / "runs", spec)
+    runs_list = BenchmarkAnalyzer().analyze_models(version_dir)["default"]
+
+    result = BenchmarkAnalyzer().create_models_paired(runs_list[0].strategy, runs_list)
+
+    n = len(runs_list)
+    assert result.models == tuple(runs.model for runs in runs_list)
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                assert result.comparison.pairs[i][j] == 5
+                assert (
+                    result.comparison.wins[i][j]
+                    + result.comparison.losses[i][j]
+                    + result.comparison.ties[i][j]
+                    == 5
+                )
@@ -0,0 +1,147 @@
+"""Unit tests for balatrobench.pipeline module."""
+
+import json
+from dataclasses import replace
+from pathlib import Path
+from types import GeneratorType
+
+import pytest
+
+from balatrobench import pipeline as pipeline_module
+from balatrobench.build import build_version
+from balatrobench.pipeline import BenchmarkPipeline, RequestRecord
+from balatrobench.scope import BuildScope
+from balatrobench.writer import BenchmarkWriter
+
+
+def _without_timestamp(data: dict) -> dict:
+    return {k: v for k, v in data.items() if k != "generated_at"}
+
+
+def test_leaderboards_match_build_output(
+    synthetic_version_dir: Path, tmp_path: Path
+) -> None:
+    """Leaderboards equal the ones the CLI build writes to disk."""
+    version = synthetic_version_dir.name
+    build_version(synthetic_version_dir, tmp_path, version, cpu_workers=0)
+
+    pipeline = BenchmarkPipeline(synthetic_version_dir)
+
+    models = pipeline.models_leaderboards()
+    assert sorted(models) == ["default", "strategy-1"]
+    for key, leaderboard in models.items():
+        path = tmp_path / "models" / version / key / "leaderboard.json"
+        assert _without_timestamp(BenchmarkWriter._to_dict(leaderboard)) == (
+            _without_timestamp(json.loads(path.read_text()))
+        )
+    strategies = pipeline.strategies_leaderboards()
+    assert len(strategies) == 4
+    for key, leaderboard in strategies.items():
+        path = tmp_path / "strategies" / version / key / "leaderboard.json"
+        assert _without_timestamp(BenchmarkWriter._to_dict(leaderboard)) == (
+            _without_timestamp(json.loads(path.read_text()))
+        )
+    path = tmp_path / "providers" / version / "leaderboard.json"
+    assert _without_timestamp(
+        BenchmarkWriter._to_dict(pipeline.providers_leaderboard())
+    ) == _without_timestamp(json.loads(path.read_text()))
+
+
+def test_strategies_are_regrouped_from_one_scan(
+    synthetic_version_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Both groupings share a single scan of the run directories."""
+    pipeline = BenchmarkPipeline(synthetic_version_dir)
+    expected = pipeline.analyzer.analyze_strategies(synthetic_version_dir)
+    scans = []
+    analyze_models = pipeline.analyzer.analyze_models
+    monkeypatch.setattr(
+        pipeline.analyzer,
+        "analyze_models",
+        lambda *args: scans.append(args) or analyze_models(*args),
+    )
+
+    pipeline.models_leaderboards()
+    strategies = pipeline.strategies
+
+    assert len(scans) == 1
+    assert {
+        key: [replace(runs, generated_at=0) for runs in runs_list]
+        for key, runs_list in strategies.items()
+    } == {
+        key: [replace(runs, generated_at=0) for runs in runs_list]
+        for key, runs_list in expected.items()
+    }
+
+
+def test_iter_requests_is_lazy(
+    synthetic_version_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Runs are extracted one at a time while iterating."""
+    extracted = []
+    extract_run = pipeline_module.extract_run
+    monkeypatch.setattr(
+        pipeline_module,
+        "extract_run",
+        lambda run_dir, ids=None: (
+            extracted.append(run_dir) or extract_run(run_dir, ids)
+        ),
+    )
+    requests = BenchmarkPipeline(synthetic_version_dir).iter_requests()
+
+    assert isinstance(requests, GeneratorType)
+    assert extracted == []
+    record = next(requests)
+    assert len(extracted) == 1
+    assert isinstance(record, RequestRecord)
+
+
+def test_request_records_match_request_files(version_dir: Path, tmp_path: Path) -> None:
+    """Records hold the content of the written request files."""
+    build_version(version_dir, tmp_path, "v1.0.0", cpu_workers=0)
+
+    records = list(BenchmarkPipeline(version_dir).iter_requests())
+
+    assert records
+    for record in records:
+        run = record.run
+        request_dir = (
+            tmp_path
+            / "models/v1.0.0"
+            / run.strategy.key
+            / run.model.vendor
+            / run.model.name
+            / run.id
+            / record.id.removeprefix("request-")
+        )
+        assert record.strategy_text == (request_dir / "strategy.md").read_text()
+        assert record.gamestate == (request_dir / "gamestate.md").read_text()
+        assert record.memory == (request_dir / "memory.md").read_text()
+        assert record.reasoning == (request_dir / "reasoning.md").read_text()
+        tool_calls = json.loads((request_dir / "tool_call.json").read_text())
+        assert record.tool_calls == tool_calls
+        metadata = json.loads((request_dir / "metadata.json").read_text())
+        assert BenchmarkWriter._to_dict(record.metadata) == metadata
+
+
+def test_scope_filters_runs_and_requests(synthetic_version_dir: Path) -> None:
+    """Scopes restrict the leaderboards, runs and requests."""
+    run_dir = next(synthetic_version_dir.glob("default/openai/model-0/*"))
+    scope = BuildScope(
+        strategies=("default",),
+        models=("openai/model-0",),
+        runs=(run_dir.name,),
+        requests=("request-00002",),
+    )
+
+    pipeline = BenchmarkPipeline(synthetic_version_dir, scope)
+
+    assert list(pipeline.models_leaderboards()) == ["default"]
+    assert [path for path, _ in pipeline.iter_runs()] == [run_dir]
+    assert [record.id for record in pipeline.iter_requests()] == ["request-00002"]
+
+
+def test_missing_version_dir(tmp_path: Path) -> None:
+    """A missing version directory raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        BenchmarkPipeline(tmp_path / "missing")
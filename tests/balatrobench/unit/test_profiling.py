@@ -0,0 +1,144 @@
+"""Unit tests for balatrobench.profiling module."""
+
+import json
+import threading
+from pathlib import Path
+
+from balatrobench.profiling import (
+    BUILD_REPORT_FILENAME,
+    NULL_PROFILER,
+    BuildProfiler,
+    Measurement,
+    measure,
+)
+
+HAS_PROC_IO = Path("/proc/thread-self/io").exists()
+
+
+def test_stage_records_measurements() -> None:
+    """A stage records calls, wall time, CPU time and file counts."""
+    profiler = BuildProfiler()
+
+    with profiler.stage("extract") as stage:
+        sum(range(10_000))
+        stage.files += 3
+
+    stats = profiler.stages["extract"]
+    assert stats.calls == 1
+    assert stats.files == 3
+    assert stats.wall_s > 0
+    assert stats.cpu_s >= 0
+
+
+def test_stage_accumulates_repeated_entries() -> None:
+    """Entering a stage several times accumulates into one entry."""
+    profiler = BuildProfiler()
+
+    for _ in range(3):
+        with profiler.stage("runs") as stage:
+            stage.files += 1
+
+    assert list(profiler.stages) == ["runs"]
+    assert profiler.stages["runs"].calls == 3
+    assert profiler.stages["runs"].files == 3
+
+
+def test_stage_counts_bytes_written(tmp_path: Path) -> None:
+    """Bytes written inside a stage are attributed to it (/proc/thread-self/io)."""
+    profiler = BuildProfiler()
+
+    with profiler.stage("write"):
+        (tmp_path / "out.bin").write_bytes(b"x" * 100_000)
+
+    stats = profiler.stages["write"]
+    if HAS_PROC_IO:
+        assert stats.bytes_written >= 100_000
+
+
+def test_stage_ignores_io_of_other_threads(tmp_path: Path) -> None:
+    """I/O done concurrently by another thread is not counted in a stage."""
+    profiler = BuildProfiler()
+    thread = threading.Thread(
+        target=(tmp_path / "other.bin").write_bytes, args=(b"x" * 100_000,)
+    )
+
+    with profiler.stage("idle"):
+        thread.start()
+        thread.join()
+
+    assert profiler.stages["idle"].bytes_written < 100_000
+
+
+def test_record_adds_measurements() -> None:
+    """Measurements from worker processes add to the stage and peak memory."""
+    profiler = BuildProfiler()
+    measurement = Measurement(
+        wall_s=1.0, cpu_s=0.5, bytes_read=300, bytes_written=200, peak_rss_mb=1e6
+    )
+
+    profiler.record("extract", measurement)
+    profiler.record("extract", measurement, files=2)
+
+    stats = profiler.stages["extract"]
+    assert (stats.calls, stats.files) == (2, 2)
+    assert (stats.bytes_read, stats.bytes_written) == (600, 400)
+    assert stats.wall_s == 2.0
+    assert profiler.report()["peak_rss_mb"] == 1e6
+
+
+def test_measure_profiles_block() -> None:
+    """With profile, the measurement carries the cProfile stats of the block."""
+    with measure(profile=True) as measurement:
+        sorted(range(100))
+
+    assert measurement.profile
+    assert measurement.wall_s >= 0
+
+
+def test_disabled_profiler_records_nothing() -> None:
+    """A disabled profiler is a no-op."""
+    with NULL_PROFILER.stage("scan") as stage:
+        stage.files += 1
+
+    assert NULL_PROFILER.stages == {}
+
+
+def test_write_report(tmp_path: Path) -> None:
+    """Writes build-report.json with extra fields and per-stage entries."""
+    profiler = BuildProfiler()
+    with profiler.stage("scan"):
+        pass
+
+    path = profiler.write_report(tmp_path, version="v1.0.0")
+
+    assert path == tmp_path / BUILD_REPORT_FILENAME
+    report = json.loads(path.read_text())
+    assert report["version"] == "v1.0.0"
+    assert [s["name"] for s in report["stages"]] == ["scan"]
+    assert set(report["stages"][0]) >= {
+        "wall_s",
+        "cpu_s",
+        "files",
+        "bytes_read",
+        "bytes_written",
+    }
+    assert "peak_rss_mb" not in report["stages"][0]
+    assert report["peak_rss_mb"] > 0
+
+
+def test_write_report_dumps_pstats(tmp_path: Path) -> None:
+    """The profiled build and each profiled worker stage get a cProfile dump."""
+    profiler = BuildProfiler(pstats_dir=tmp_path / "pstats")
+    with profiler.profile("build"), profiler.stage("manifests"):
+        sorted(range(100))
+    for _ in range(2):
+        with measure(profile=True) as measurement:
+            sorted(range(100))
+        profiler.record("scan", measurement)
+
+    profiler.write_report(tmp_path)
+
+    assert sorted(p.name for p in (tmp_path / "pstats").iterdir()) == [
+        "build.pstats",
+        "scan.pstats",
+    ]
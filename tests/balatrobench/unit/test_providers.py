@@ -0,0 +1,121 @@
+"""Unit tests for balatrobench.providers module."""
+
+from pathlib import Path
+
+import pytest
+
+from balatrobench.analyzer import BenchmarkAnalyzer
+from balatrobench.models import Model, Request
+from balatrobench.providers import ProviderPartial, group_by_provider, merge_providers
+
+
+def make_request(
+    provider: str,
+    time_ms: int = 1000,
+    tokens_out: int = 100,
+    status: str = "success",
+) -> Request:
+    """Request with 900 input tokens and $0.001 cost."""
+    return Request(
+        id="request-00001",
+        status=status,  # type: ignore[arg-type]
+        provider=provider,
+        tokens_in=900,
+        tokens_out=tokens_out,
+        time_ms=time_ms,
+        cost_in=0.0,
+        cost_out=0.0,
+        cost_total=0.001,
+    )
+
+
+def test_group_by_provider() -> None:
+    """Requests are aggregated per provider."""
+    partials = group_by_provider(
+        [
+            make_request("Groq", time_ms=500, tokens_out=100),
+            make_request("Groq", time_ms=1500, tokens_out=300),
+            make_request("Cerebras"),
+            make_request("Groq", time_ms=0, status="error"),
+        ]
+    )
+
+    assert list(partials) == ["Cerebras", "Groq"]
+    groq = partials["Groq"]
+    assert groq.calls_total == 3
+    assert groq.calls_error == 1
+    assert groq.timed_ms == 2000
+    assert groq.timed_tokens_out == 400
+    assert groq.latency.count == 2
+
+
+def test_entry_metrics() -> None:
+    """Error rate, throughput and cost per 1k tokens of an entry."""
+    partial = group_by_provider(
+        [
+            make_request("Groq", time_ms=500, tokens_out=100),
+            make_request("Groq", time_ms=1500, tokens_out=300),
+            make_request("Groq", time_ms=0, tokens_out=0, status="error"),
+            make_request("Groq", time_ms=0, tokens_out=0, status="error"),
+        ]
+    )["Groq"]
+    model = Model(vendor="openai", name="gpt-oss-120b")
+    entry = partial.to_entry("Groq", model)
+
+    assert entry.model == model
+    assert entry.error_rate == 0.5
+    assert entry.tokens_out_per_s == pytest.approx(200.0)
+    # $0.004 for 3600 + 400 tokens
+    assert entry.cost_per_1k_tokens == pytest.approx(0.001)
+    assert entry.time_ms is not None
+    assert entry.time_ms.p50 == pytest.approx(500, rel=0.01)
+
+
+def test_empty_partial_entry() -> None:
+    """An empty partial has zero rates and no latency percentiles."""
+    entry = ProviderPartial().to_entry("Groq", None)
+
+    assert entry.error_rate == 0.0
+    assert entry.tokens_out_per_s == 0.0
+    assert entry.cost_per_1k_tokens == 0.0
+    assert entry.time_ms is None
+
+
+def test_merge_providers() -> None:
+    """Mappings are merged per provider."""
+    merged = merge_providers(
+        [
+            group_by_provider([make_request("Groq"), make_request("Cerebras")]),
+            group_by_provider([make_request("Groq")]),
+        ]
+    )
+
+    assert merged["Groq"].calls_total == 2
+    assert merged["Groq"].latency.count == 2
+    assert merged["Cerebras"].calls_total == 1
+
+
+def test_providers_leaderboard(synthetic_version_dir: Path) -> None:
+    """The leaderboard covers every call of every run, per provider and model."""
+    analyzer = BenchmarkAnalyzer()
+    runs_list = [
+        runs
+        for runs_list in analyzer.analyze_models(synthetic_version_dir).values()
+        for runs in runs_list
+    ]
+
+    leaderboard = analyzer.create_providers_leaderboard(runs_list)
+
+    calls = sum(
+        count for runs in runs_list for run in runs.runs for _, count in run.providers
+    )
+    assert sum(e.calls_total for e in leaderboard.providers) == calls
+    assert sum(e.calls_total for e in leaderboard.models) == calls
+    assert all(e.model is None for e in leaderboard.providers)
+    assert {e.model for e in leaderboard.models} == {runs.model for runs in runs_list}
+    # Most used provider first
+    totals = [e.calls_total for e in leaderboard.providers]
+    assert totals == sorted(totals, reverse=True)
+    for entry in leaderboard.providers:
+        per_model = [e for e in leaderboard.models if e.provider == entry.provider]
+        assert sum(e.cost_total for e in per_model) == pytest.approx(entry.cost_total)
@@ -0,0 +1,149 @@
+"""Unit tests for balatrobench.scheduler module."""
+
+import os
+import threading
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from balatrobench import tracing
+from balatrobench.profiling import BuildProfiler
+from balatrobench.scheduler import TaskGraph
+from balatrobench.tracing import CollectingExporter
+
+
+def _const(value: int) -> int:
+    return value
+
+
+def _add(*values: int) -> int:
+    return sum(values)
+
+
+def _fail() -> None:
+    raise RuntimeError("boom")
+
+
+def _read(path: Path) -> int:
+    with tracing.span("test.read", path=path.name):
+        return len(path.read_bytes())
+
+
+def test_dependency_results_are_passed_in_order() -> None:
+    """Each task receives its dependencies' results as positional args."""
+    graph = TaskGraph()
+    graph.add("a", partial(_const, 1))
+    graph.add("b", partial(_const, 10))
+    graph.add("pair", lambda a, b: (a, b), ["a", "b"])
+
+    assert graph.run(cpu_workers=0) == {"pair": (1, 10)}
+
+
+def test_tasks_run_after_their_dependencies() -> None:
+    """A task starts only after all of its dependencies finished."""
+    order: list[str] = []
+    lock = threading.Lock()
+
+    def record(name: str, *_: object) -> None:
+        with lock:
+            order.append(name)
+
+    graph = TaskGraph()
+    graph.add("scan", partial(record, "scan"))
+    graph.add("left", partial(record, "left"), ["scan"])
+    graph.add("right", partial(record, "right"), ["scan"])
+    graph.add("join", partial(record, "join"), ["left", "right"])
+    graph.run(cpu_workers=0, io_workers=4)
+
+    assert order[0] == "scan"
+    assert order[-1] == "join"
+    assert set(order[1:3]) == {"left", "right"}
+
+
+def test_run_returns_sink_results() -> None:
+    """Only tasks without dependents are returned."""
+    graph = TaskGraph()
+    graph.add("a", partial(_const, 2))
+    graph.add("b", _add, ["a"])
+    graph.add("c", partial(_const, 5))
+
+    assert graph.run(cpu_workers=0) == {"b": 2, "c": 5}
+
+
+def test_cpu_tasks_run_in_worker_processes() -> None:
+    """cpu tasks run in the process pool and feed io tasks."""
+    graph = TaskGraph()
+    for i in range(4):
+        graph.add(f"cpu-{i}", partial(_const, i), pool="cpu")
+    graph.add("total", _add, [f"cpu-{i}" for i in range(4)])
+
+    assert graph.run(cpu_workers=2) == {"total": 6}
+
+
+def test_cpu_tasks_record_profiler_stage() -> None:
+    """cpu tasks are accounted to their stage, with counted files."""
+    profiler = BuildProfiler()
+    graph = TaskGraph()
+    graph.add("a", partial(_const, 3), pool="cpu", stage="scan", count=int)
+    graph.add("b", partial(_const, 4), pool="cpu", stage="scan", count=int)
+    graph.run(cpu_workers=0, profiler=profiler)
+
+    assert profiler.stages["scan"].files == 7
+
+
+def test_worker_tasks_are_measured_and_traced(tmp_path: Path) -> None:
+    """Measurements and spans of worker processes come back to the parent."""
+    path = tmp_path / "in.bin"
+    path.write_bytes(b"x" * 100_000)
+    profiler = BuildProfiler()
+    exporter = CollectingExporter()
+    graph = TaskGraph()
+    graph.add("read", partial(_read, path), pool="cpu", stage="extract")
+
+    tracing.add_exporter(exporter)
+    try:
+        graph.run(cpu_workers=1, profiler=profiler)
+    finally:
+        tracing.remove_exporter(exporter)
+
+    stats = profiler.stages["extract"]
+    assert stats.calls == 1
+    if Path("/proc/thread-self/io").exists():
+        assert stats.bytes_read >= 100_000
+    [span] = exporter.spans
+    assert span.name == "test.read"
+    assert span.process_id != os.getpid()
+
+
+def test_task_exception_propagates() -> None:
+    """The first task exception is raised from run()."""
+    graph = TaskGraph()
+    graph.add("fail", _fail)
+    graph.add("after", _add, ["fail"])
+
+    with pytest.raises(RuntimeError, match="boom") as info:
+        graph.run(cpu_workers=0)
+    assert info.value.__notes__ == ["In task fail"]
+
+
+def test_add_rejects_duplicate_task() -> None:
+    """Task names are unique."""
+    graph = TaskGraph()
+    graph.add("a", partial(_const, 1))
+
+    with pytest.raises(ValueError, match="Duplicate task"):
+        graph.add("a", partial(_const, 2))
+
+
+def test_add_rejects_unknown_dependency() -> None:
+    """Dependencies must be added before their dependents."""
+    graph = TaskGraph()
+
+    with pytest.raises(ValueError, match="Unknown dependency"):
+        graph.add("b", _add, ["a"])
+
+
+def test_empty_graph() -> None:
+    """Running an empty graph does nothing."""
+    assert TaskGraph().run() == {}
@@ -0,0 +1,46 @@
+"""Unit tests for balatrobench.scope module."""
+
+from pathlib import Path
+
+from balatrobench.scope import FULL_SCOPE, BuildScope
+
+
+def test_full_scope_matches_everything(tmp_path: Path) -> None:
+    """The default scope selects every model and run."""
+    assert FULL_SCOPE.is_full
+    assert FULL_SCOPE.matches_model("default", "openai", "gpt-oss-120b")
+    assert FULL_SCOPE.matches_run("20260109_165752_472_RED_WHITE_BBBBBBB")
+    assert FULL_SCOPE.selects(tmp_path / "default/openai/gpt-oss-120b")
+
+
+def test_filters_combine() -> None:
+    """All non-empty filters must match."""
+    scope = BuildScope(strategies=("default",), vendors=("openai",))
+
+    assert not scope.is_full
+    assert scope.matches_model("default", "openai", "gpt-oss-120b")
+    assert not scope.matches_model("aggressive", "openai", "gpt-oss-120b")
+    assert not scope.matches_model("default", "anthropic", "claude")
+
+
+def test_model_matches_by_name_or_vendor_name() -> None:
+    """Models are selected by name or by vendor/name."""
+    by_name = BuildScope(models=("model-0",))
+    by_key = BuildScope(models=("openai/model-0",))
+
+    assert by_name.matches_model("default", "openai", "model-0")
+    assert by_name.matches_model("default", "anthropic", "model-0")
+    assert by_key.matches_model("default", "openai", "model-0")
+    assert not by_key.matches_model("default", "anthropic", "model-0")
+
+
+def test_selects_requires_selected_run(tmp_path: Path) -> None:
+    """With run filters, a model directory must contain a selected run."""
+    model_dir = tmp_path / "default/openai/model-0"
+    (model_dir / "run-a").mkdir(parents=True)
+    scope = BuildScope(runs=("run-a",))
+
+    assert scope.selects(model_dir)
+    assert not BuildScope(runs=("run-b",)).selects(model_dir)
+    assert scope.matches_run("run-a")
+    assert not scope.matches_run("run-b")
@@ -0,0 +1,69 @@
+"""Unit tests for balatrobench.series module."""
+
+import json
+
+from balatrobench.models import Request
+from balatrobench.series import SERIES_FORMAT, decode_series, encode_series
+
+
+def make_request(custom_id: str, provider: str, time_ms: int) -> Request:
+    """Request with metrics derived from time_ms."""
+    return Request(
+        id=custom_id,
+        status="success",
+        provider=provider,
+        tokens_in=10 * time_ms,
+        tokens_out=time_ms // 10,
+        time_ms=time_ms,
+        cost_in=0.0,
+        cost_out=0.0,
+        cost_total=time_ms / 1e6,
+        tokens_cached=512,
+        tokens_out_per_s=100.0,
+    )
+
+
+METADATA = {
+    "request-00002": make_request("request-00002", "Cerebras", 2000),
+    "request-00001": make_request("request-00001", "Groq", 1000),
+    "request-00010": make_request("request-00010", "Groq", 3000),
+}
+
+
+def test_encode_series_columns() -> None:
+    """Columns are in request order, with provider codes."""
+    data = encode_series(METADATA)
+
+    assert data["format"] == SERIES_FORMAT
+    assert data["request"] == [1, 2, 10]
+    assert data["providers"] == ["Groq", "Cerebras"]
+    assert data["provider"] == [0, 1, 0]
+    assert data["time_ms"] == [1000, 2000, 3000]
+    assert data["tokens_cached"] == [512, 512, 512]
+    assert data["cost"] == [0.001, 0.002, 0.003]
+
+
+def test_decode_series_round_trip() -> None:
+    """Decoded rows hold the metrics of each request."""
+    data = json.loads(json.dumps(encode_series(METADATA)))
+
+    rows = decode_series(data)
+
+    assert [row["request"] for row in rows] == [1, 2, 10]
+    assert rows[1] == {
+        "request": 2,
+        "tokens_in": 20000,
+        "tokens_out": 200,
+        "tokens_cached": 512,
+        "time_ms": 2000,
+        "cost": 0.002,
+        "provider": "Cerebras",
+    }
+
+
+def test_encode_empty_series() -> None:
+    """A run without metadata has empty columns."""
+    data = encode_series({})
+
+    assert data["providers"] == []
+    assert decode_series(data) == []
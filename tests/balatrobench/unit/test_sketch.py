@@ -0,0 +1,161 @@
+"""Unit tests for balatrobench.sketch module."""
+
+import random
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from balatrobench.analyzer import BenchmarkAnalyzer
+from balatrobench.models import Request
+from balatrobench.sketch import DDSketch, RequestSketches
+from balatrobench.writer import BenchmarkWriter
+
+
+def exact_quantile(values: list[float], q: float) -> float:
+    """Lower q-quantile of values (same rank rule as DDSketch)."""
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def make_request(time_ms: int, status: str = "success") -> Request:
+    """Request with metrics derived from time_ms."""
+    return Request(
+        id=f"request-{time_ms:05d}",
+        status=status,  # type: ignore[arg-type]
+        provider="Groq",
+        tokens_in=10 * time_ms,
+        tokens_out=time_ms // 2,
+        time_ms=time_ms,
+        cost_in=0.0,
+        cost_out=0.0,
+        cost_total=time_ms / 1e6,
+    )
+
+
+# =============================================================================
+# DDSketch
+# =============================================================================
+
+
+@pytest.mark.parametrize("q", [0.0, 0.5, 0.9, 0.99, 1.0])
+def test_quantile_relative_accuracy(q: float) -> None:
+    """Estimated quantiles are within the relative accuracy of exact ones."""
+    rng = random.Random(42)
+    values = [rng.lognormvariate(8, 1) for _ in range(5000)]
+    sketch = DDSketch()
+    for value in values:
+        sketch.add(value)
+
+    exact = exact_quantile(values, q)
+    assert sketch.quantile(q) == pytest.approx(exact, rel=sketch.relative_accuracy)
+
+
+def test_merge_equals_single_sketch() -> None:
+    """Merging sketches gives the sketch of all values, in any order."""
+    rng = random.Random(7)
+    parts = [[rng.uniform(1, 10_000) for _ in range(200)] for _ in range(3)]
+    sketches = []
+    for values in parts:
+        sketch = DDSketch()
+        for value in values:
+            sketch.add(value)
+        sketches.append(sketch)
+    whole = DDSketch()
+    for value in (v for values in parts for v in values):
+        whole.add(value)
+
+    merged = sketches[0].merge(sketches[1]).merge(sketches[2])
+    reordered = sketches[2].merge(sketches[0].merge(sketches[1]))
+
+    for sketch in (merged, reordered):
+        assert sketch.bins == whole.bins
+        assert sketch.count == whole.count == 600
+        assert sketch.quantile(0.9) == whole.quantile(0.9)
+    # Merge does not modify its operands
+    assert sketches[0].count == 200
+
+
+def test_zero_and_empty() -> None:
+    """Values <= 0 are estimated as 0; an empty sketch estimates 0."""
+    sketch = DDSketch()
+    assert sketch.quantile(0.5) == 0.0
+
+    for value in (0, 0, 0, 100):
+        sketch.add(value)
+    assert sketch.zero_count == 3
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1.0) == 100
+
+
+def test_invalid_accuracy() -> None:
+    """Accuracy out of range and mismatched merges raise ValueError."""
+    with pytest.raises(ValueError, match="Relative accuracy"):
+        DDSketch(0)
+    with pytest.raises(ValueError, match="different accuracies"):
+        DDSketch(0.01).merge(DDSketch(0.02))
+
+
+# =============================================================================
+# RequestSketches
+# =============================================================================
+
+
+def test_request_sketches_skip_errors() -> None:
+    """Only successful requests are sketched."""
+    requests = [make_request(t) for t in (100, 200, 300)]
+    requests.append(make_request(99_999, status="error"))
+    sketches = RequestSketches.from_requests(requests)
+
+    assert sketches.count == 3
+    percentiles = sketches.to_percentiles()
+    assert percentiles is not None
+    assert percentiles.time_ms.p50 == pytest.approx(200, rel=0.01)
+    assert percentiles.tokens_in.p50 == pytest.approx(2000, rel=0.01)
+
+
+def test_request_sketches_reasoning_without_timestamps() -> None:
+    """Reasoning tokens are sketched for untimed calls, throughput is not."""
+    requests = [
+        replace(make_request(100), tokens_reasoning=10, tokens_out_per_s=50.0),
+        replace(make_request(0), tokens_reasoning=20),
+    ]
+    sketches = RequestSketches.from_requests(requests)
+
+    assert sketches.tokens_reasoning.count == 2
+    assert sketches.tokens_out_per_s.count == 1
+
+
+def test_request_sketches_empty() -> None:
+    """Without requests there are no percentiles."""
+    assert RequestSketches().to_percentiles() is None
+
+
+def test_run_percentiles(sample_run_dir: Path) -> None:
+    """Runs get percentiles from their responses; sketches are not written."""
+    analyzer = BenchmarkAnalyzer()
+    model_dir = sample_run_dir.parent
+    runs = analyzer._compute_runs(model_dir, analyzer._summarize_runs(model_dir))
+    assert runs is not None
+    run = runs.runs[0]
+
+    assert run.sketches is not None
+    assert run.stats.percentiles is not None
+    assert run.stats.percentiles.time_ms.p50 <= run.stats.percentiles.time_ms.p99
+    assert "sketches" not in BenchmarkWriter._to_dict(run)
+    assert "percentiles" in BenchmarkWriter._to_dict(run)["stats"]
+
+
+def test_leaderboard_percentiles_merge_runs(synthetic_version_dir: Path) -> None:
+    """Leaderboard percentiles come from the merged sketches of all runs."""
+    analyzer = BenchmarkAnalyzer()
+    runs_list = analyzer.analyze_models(synthetic_version_dir)["default"]
+    runs = runs_list[0]
+    leaderboard = analyzer.create_models_leaderboard(runs.strategy, runs_list)
+    entry = next(e for e in leaderboard.entries if e.model == runs.model)
+
+    merged = RequestSketches()
+    for run in runs.runs:
+        assert run.sketches is not None
+        merged = merged.merge(run.sketches)
+    assert entry.stats.percentiles == merged.to_percentiles()
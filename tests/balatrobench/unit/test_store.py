@@ -0,0 +1,199 @@
+"""Unit tests for balatrobench.store module."""
+
+import sqlite3
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from balatrobench.extractor import extract_request_metadata
+from balatrobench.models import LeaderboardEntry
+from balatrobench.pipeline import BenchmarkPipeline
+from balatrobench.scope import BuildScope
+from balatrobench.store import (
+    load_version,
+    models_leaderboard,
+    open_store,
+    request_quantile,
+    strategies_leaderboard,
+)
+
+
+@pytest.fixture
+def store(synthetic_version_dir: Path) -> sqlite3.Connection:
+    """In-memory store with the synthetic version loaded."""
+    conn = open_store(":memory:")
+    load_version(conn, synthetic_version_dir)
+    return conn
+
+
+def assert_entries_equal(
+    actual: tuple[LeaderboardEntry, ...], expected: tuple[LeaderboardEntry, ...]
+) -> None:
+    """Entries are equal up to float rounding, without percentiles."""
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected, strict=True):
+        e = replace(e, stats=replace(e.stats, percentiles=None))
+        for name, value in vars(e).items():
+            if name == "stats":
+                for stat, stat_value in vars(value).items():
+                    assert getattr(a.stats, stat) == pytest.approx(stat_value), stat
+            else:
+                assert getattr(a, name) == pytest.approx(value), name
+
+
+# =============================================================================
+# Loading
+# =============================================================================
+
+
+def test_load_counts(store: sqlite3.Connection, synthetic_version_dir: Path) -> None:
+    """Every run and request of the version is loaded."""
+    runs = list(BenchmarkPipeline(synthetic_version_dir).iter_runs())
+    calls = sum(
+        len(extract_request_metadata(run_dir / "responses.jsonl"))
+        for run_dir, _ in runs
+    )
+
+    assert store.execute("SELECT COUNT(*) FROM runs").fetchone() == (len(runs),)
+    assert store.execute("SELECT COUNT(*) FROM requests").fetchone() == (calls,)
+    assert store.execute("SELECT COUNT(*) FROM strategies").fetchone() == (2,)
+
+
+def test_reload_replaces_version(
+    store: sqlite3.Connection, synthetic_version_dir: Path
+) -> None:
+    """Loading a version again does not duplicate its rows."""
+    (before,) = store.execute("SELECT COUNT(*) FROM requests").fetchone()
+    load_version(store, synthetic_version_dir)
+
+    assert store.execute("SELECT COUNT(*) FROM requests").fetchone() == (before,)
+
+
+def test_partial_reload_drops_stale_requests(
+    store: sqlite3.Connection, synthetic_version_dir: Path
+) -> None:
+    """Reloading a run replaces its requests, dropping those gone from disk."""
+    version = synthetic_version_dir.name
+    run_dir, run = next(BenchmarkPipeline(synthetic_version_dir).iter_runs())
+    key = (version, run.model.name, run.id)
+    count_sql = (
+        "SELECT COUNT(*) FROM requests WHERE version = ? AND model = ? AND run_id = ?"
+    )
+    (before,) = store.execute(count_sql, key).fetchone()
+    (total,) = store.execute("SELECT COUNT(*) FROM requests").fetchone()
+
+    # Drop the last response of the run, then reload the run only
+    responses_file = run_dir / "responses.jsonl"
+    lines = responses_file.read_text().splitlines(keepends=True)
+    responses_file.write_text("".join(lines[:-1]))
+    scope = BuildScope(models=(f"{run.model.vendor}/{run.model.name}",), runs=(run.id,))
+    load_version(store, synthetic_version_dir, scope)
+
+    assert store.execute(count_sql, key).fetchone() == (before - 1,)
+    assert store.execute("SELECT COUNT(*) FROM requests").fetchone() == (total - 1,)
+
+    # A request filter only replaces the selected requests
+    (request_id,) = store.execute(
+        "SELECT request_id FROM requests WHERE run_id = ? LIMIT 1", (run.id,)
+    ).fetchone()
+    scope = BuildScope(runs=(run.id,), requests=(request_id,))
+    load_version(store, synthetic_version_dir, scope)
+
+    assert store.execute("SELECT COUNT(*) FROM requests").fetchone() == (total - 1,)
+
+
+def test_indexes(store: sqlite3.Connection) -> None:
+    """Filters on model, config and provider use the indexes."""
+    names = {
+        row[0]
+        for row in store.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert {
+        "runs_model",
+        "runs_config",
+        "requests_model",
+        "requests_config",
+        "requests_provider",
+    } <= names
+
+    plan = store.execute(
+        "EXPLAIN QUERY PLAN SELECT time_ms FROM requests WHERE deck = ? AND stake = ?",
+        ("RED", "GOLD"),
+    ).fetchall()
+    assert "requests_config" in str(plan)
+
+
+# =============================================================================
+# Queries
+# =============================================================================
+
+
+def test_models_leaderboard_matches_pipeline(
+    store: sqlite3.Connection, synthetic_version_dir: Path
+) -> None:
+    """SQL leaderboards equal the analyzer's, except percentiles."""
+    version = synthetic_version_dir.name
+    expected = BenchmarkPipeline(synthetic_version_dir).models_leaderboards()
+
+    for key, leaderboard in expected.items():
+        actual = models_leaderboard(store, version, key)
+        assert actual.strategy == leaderboard.strategy
+        assert [e.model for e in actual.entries] == [
+            e.model for e in leaderboard.entries
+        ]
+        assert_entries_equal(actual.entries, leaderboard.entries)
+
+
+def test_strategies_leaderboard_matches_pipeline(
+    store: sqlite3.Connection, synthetic_version_dir: Path
+) -> None:
+    """Strategies leaderboards equal the analyzer's, except percentiles."""
+    version = synthetic_version_dir.name
+    expected = BenchmarkPipeline(synthetic_version_dir).strategies_leaderboards()
+
+    for key, leaderboard in expected.items():
+        vendor, model = key.split("/", 1)
+        actual = strategies_leaderboard(store, version, vendor, model)
+        assert [e.strategy for e in actual.entries] == [
+            e.strategy for e in leaderboard.entries
+        ]
+        assert_entries_equal(actual.entries, leaderboard.entries)
+
+
+def test_leaderboard_filters(store: sqlite3.Connection) -> None:
+    """Filters restrict the runs of the leaderboard."""
+    version, strategy, stake = store.execute(
+        "SELECT version, strategy, stake FROM runs LIMIT 1"
+    ).fetchone()
+    (count,) = store.execute(
+        "SELECT COUNT(*) FROM runs WHERE strategy = ? AND stake = ?", (strategy, stake)
+    ).fetchone()
+
+    leaderboard = models_leaderboard(store, version, strategy, stake=stake)
+
+    assert sum(e.run_count for e in leaderboard.entries) == count
+    with pytest.raises(ValueError, match="Unknown filter"):
+        models_leaderboard(store, version, strategy, color="red")
+
+
+def test_request_quantile(
+    store: sqlite3.Connection, synthetic_version_dir: Path
+) -> None:
+    """Quantiles are exact over successful requests (lower rank)."""
+    values = sorted(
+        request.time_ms
+        for run_dir, _ in BenchmarkPipeline(synthetic_version_dir).iter_runs()
+        for request in extract_request_metadata(run_dir / "responses.jsonl").values()
+        if request.status == "success"
+    )
+    version = synthetic_version_dir.name
+
+    for q in (0.0, 0.5, 0.95, 1.0):
+        assert (
+            request_quantile(store, version, "time_ms", q)
+            == values[int(q * (len(values) - 1))]
+        )
+    assert request_quantile(store, version, provider="missing") is None
+    with pytest.raises(ValueError, match="numeric"):
+        request_quantile(store, version, "provider")
@@ -0,0 +1,147 @@
+"""Unit tests for balatrobench.summary module."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from balatrobench import extractor, summary
+from balatrobench.analyzer import BenchmarkAnalyzer
+from balatrobench.extractor import extract_request_metadata, extract_run, summarize_run
+from balatrobench.summary import (
+    RequestSummary,
+    load_summary,
+    save_summary,
+    summary_path,
+)
+
+
+@pytest.fixture(autouse=True)
+def summary_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the summaries of a test in its own directory."""
+    path = tmp_path / "summaries"
+    monkeypatch.setattr(summary, "SUMMARY_DIR", path)
+    return path
+
+
+@pytest.fixture
+def run_dir(sample_run_dir: Path, tmp_path: Path) -> Path:
+    """Writable copy of the fixture run directory."""
+    return Path(shutil.copytree(sample_run_dir, tmp_path / sample_run_dir.name))
+
+
+def assert_summaries_equal(actual: RequestSummary, expected: RequestSummary) -> None:
+    """Summaries are equal partial by partial (sketches compared by figures)."""
+    assert actual.sketches.to_percentiles() == expected.sketches.to_percentiles()
+    assert actual.cache == expected.cache
+    assert actual.decode == expected.decode
+    assert actual.providers.keys() == expected.providers.keys()
+    for provider, partial in expected.providers.items():
+        assert actual.providers[provider].to_entry(provider, None) == partial.to_entry(
+            provider, None
+        )
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+
+def test_summary_round_trip(run_dir: Path) -> None:
+    """A saved summary loads back with the same partials."""
+    responses_file = run_dir / "responses.jsonl"
+    expected = RequestSummary.from_requests(
+        extract_request_metadata(responses_file).values()
+    )
+
+    save_summary(responses_file, expected)
+
+    loaded = load_summary(responses_file)
+    assert loaded is not None
+    assert_summaries_equal(loaded, expected)
+
+
+def test_summary_is_stale_when_file_changes(run_dir: Path) -> None:
+    """A changed size or mtime invalidates the cached summary."""
+    responses_file = run_dir / "responses.jsonl"
+    save_summary(responses_file, RequestSummary())
+
+    stat = responses_file.stat()
+    os.utime(responses_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert load_summary(responses_file) is None
+
+
+def test_summary_without_writable_cache(
+    run_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """An unwritable summary directory only disables the cache."""
+    blocker = tmp_path / "blocker"
+    blocker.touch()
+    monkeypatch.setattr(summary, "SUMMARY_DIR", blocker / "summaries")
+
+    save_summary(run_dir / "responses.jsonl", RequestSummary())
+
+    assert load_summary(run_dir / "responses.jsonl") is None
+
+
+# =============================================================================
+# Extraction and scans
+# =============================================================================
+
+
+def test_extract_run_summarizes_metadata(run_dir: Path) -> None:
+    """A whole-run extract carries the summary of its metadata."""
+    extract = extract_run(run_dir)
+
+    assert extract.summary is not None
+    assert_summaries_equal(
+        extract.summary, RequestSummary.from_requests(extract.metadata.values())
+    )
+    assert extract_run(run_dir, sorted(extract.metadata)[:2]).summary is None
+
+
+def test_summarize_run_uses_cache(
+    run_dir: Path, summary_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A summarized run is not decoded again while its responses are unchanged."""
+    expected = summarize_run(run_dir, cache=True)
+    assert summary_path(run_dir / "responses.jsonl").parent == summary_dir
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("responses.jsonl decoded")
+
+    monkeypatch.setattr(extractor, "extract_request_metadata", fail)
+
+    assert_summaries_equal(summarize_run(run_dir, cache=True), expected)
+
+
+def test_analyze_models_writes_no_cache(
+    synthetic_version_dir: Path, summary_dir: Path
+) -> None:
+    """Library scans decode responses without writing summary caches."""
+    runs_list = BenchmarkAnalyzer().analyze_models(synthetic_version_dir)["default"]
+
+    assert all(run.stats.percentiles is not None for run in runs_list[0].runs)
+    assert not summary_dir.exists()
+
+
+def test_summarize_runs_with_warm_cache(
+    synthetic_version_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Cached summaries are loaded instead of decoding responses."""
+    analyzer = BenchmarkAnalyzer()
+    model_dirs = sorted(synthetic_version_dir.glob("*/*/*"))
+    expected = [analyzer._summarize_runs(d, cache=True) for d in model_dirs]
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("responses.jsonl decoded")
+
+    monkeypatch.setattr(extractor, "extract_request_metadata", fail)
+
+    for model_dir, summaries in zip(model_dirs, expected, strict=True):
+        actual = analyzer._summarize_runs(model_dir, cache=True)
+        assert actual.keys() == summaries.keys()
+        for name, expected_summary in summaries.items():
+            assert_summaries_equal(actual[name], expected_summary)
@@ -0,0 +1,174 @@
+"""Unit tests for balatrobench.synthetic module."""
+
+import json
+from pathlib import Path
+
+from balatrobench.analyzer import BenchmarkAnalyzer
+from balatrobench.enums import Deck, Stake
+from balatrobench.extractor import (
+    extract_request_content,
+    extract_request_metadata,
+    extract_response_data,
+)
+from balatrobench.synthetic import (
+    CorpusSpec,
+    generate_corpus,
+    model_keys,
+    run_configs,
+    strategy_keys,
+)
+
+SMALL = CorpusSpec(
+    runs_per_model=2,
+    requests_per_run=4,
+    strategy_chars=1_000,
+    gamestate_chars=300,
+)
+
+
+def _run_dirs(version_dir: Path) -> list[Path]:
+    return sorted(p.parent for p in version_dir.rglob("stats.json"))
+
+
+def test_generate_corpus_layout(tmp_path: Path) -> None:
+    """Creates {version}/{strategy}/{vendor}/{model}/{run} with all source files."""
+    version_dir = generate_corpus(tmp_path, SMALL)
+
+    assert version_dir == tmp_path / "v1.0.0"
+    run_dirs = _run_dirs(version_dir)
+    assert len(run_dirs) == len(model_keys(SMALL)) * SMALL.runs_per_model
+    for run_dir in run_dirs:
+        for name in (
+            "task.json",
+            "strategy.json",
+            "stats.json",
+            "requests.jsonl",
+            "responses.jsonl",
+        ):
+            assert (run_dir / name).exists()
+        assert not (run_dir / "screenshots").exists()
+
+
+def test_generate_corpus_counts_knobs(tmp_path: Path) -> None:
+    """Strategy, vendor, model, run and request counts follow the spec."""
+    spec = CorpusSpec(
+        strategies=3,
+        vendors=2,
+        models_per_vendor=3,
+        runs_per_model=2,
+        requests_per_run=5,
+        strategy_chars=500,
+        gamestate_chars=200,
+    )
+    version_dir = generate_corpus(tmp_path, spec)
+
+    assert sorted(p.name for p in version_dir.iterdir()) == sorted(strategy_keys(spec))
+    assert len(_run_dirs(version_dir)) == 3 * 2 * 3 * 2
+    requests_file = _run_dirs(version_dir)[0] / "requests.jsonl"
+    assert len(requests_file.read_text().splitlines()) == 5
+
+
+def test_generate_corpus_prompt_sizes(tmp_path: Path) -> None:
+    """Strategy and gamestate prompts have the requested sizes; memory grows."""
+    version_dir = generate_corpus(tmp_path, SMALL)
+    run_dir = _run_dirs(version_dir)[0]
+
+    content = extract_request_content(run_dir / "requests.jsonl")
+
+    first, last = content["request-00001"], content["request-00004"]
+    assert len(first["strategy"]) == SMALL.strategy_chars
+    assert len(first["gamestate"]) == SMALL.gamestate_chars
+    assert len(last["memory"]) > len(first["memory"])
+
+
+def test_generate_corpus_screenshots(tmp_path: Path) -> None:
+    """With screenshots enabled, each request gets a PNG."""
+    spec = CorpusSpec(
+        vendors=1,
+        models_per_vendor=1,
+        runs_per_model=1,
+        requests_per_run=3,
+        strategy_chars=100,
+        gamestate_chars=100,
+        screenshots=True,
+    )
+    version_dir = generate_corpus(tmp_path, spec)
+
+    [run_dir] = _run_dirs(version_dir)
+    pngs = sorted((run_dir / "screenshots").iterdir())
+    assert [p.name for p in pngs] == [f"request-0000{i}.png" for i in (1, 2, 3)]
+    assert pngs[0].read_bytes().startswith(b"\x89PNG")
+
+
+def test_generate_corpus_stats_match_responses(tmp_path: Path) -> None:
+    """stats.json totals agree with what the extractor derives from responses."""
+    version_dir = generate_corpus(tmp_path, SMALL)
+
+    for run_dir in _run_dirs(version_dir):
+        stats = json.loads((run_dir / "stats.json").read_text())
+        requests = extract_request_metadata(run_dir / "responses.jsonl").values()
+
+        assert stats["calls_total"] == len(requests)
+        assert stats["calls_error"] == sum(r.status == "error" for r in requests)
+        assert stats["tokens_in_total"] == sum(r.tokens_in for r in requests)
+        assert stats["tokens_out_total"] == sum(r.tokens_out for r in requests)
+        assert stats["time_total_ms"] == sum(r.time_ms for r in requests)
+
+
+def test_generate_corpus_responses_parse(tmp_path: Path) -> None:
+    """Responses carry reasoning and tool calls like balatrollm output."""
+    version_dir = generate_corpus(tmp_path, SMALL)
+    run_dir = _run_dirs(version_dir)[0]
+
+    data = extract_response_data(run_dir / "responses.jsonl")
+
+    assert data
+    for entry in data.values():
+        assert entry["reasoning"]
+        assert entry["tool_call"][0]["function"]["name"]
+
+
+def test_generate_corpus_is_deterministic(tmp_path: Path) -> None:
+    """The same spec produces byte-identical trees."""
+    a = generate_corpus(tmp_path / "a", SMALL)
+    b = generate_corpus(tmp_path / "b", SMALL)
+
+    files_a = sorted(p.relative_to(a) for p in a.rglob("*") if p.is_file())
+    files_b = sorted(p.relative_to(b) for p in b.rglob("*") if p.is_file())
+    assert files_a == files_b
+    for rel in files_a:
+        assert (a / rel).read_bytes() == (b / rel).read_bytes()
+
+
+def test_run_configs_shared_across_models(tmp_path: Path) -> None:
+    """Runs with the same index share seed, deck and stake across models."""
+    spec = CorpusSpec(
+        runs_per_model=4,
+        requests_per_run=1,
+        strategy_chars=100,
+        gamestate_chars=100,
+        decks=(Deck.RED, Deck.BLUE),
+        stakes=(Stake.WHITE, Stake.GOLD),
+    )
+    version_dir = generate_corpus(tmp_path, spec)
+
+    configs_by_model: dict[str, set[tuple[str, str, str]]] = {}
+    for run_dir in _run_dirs(version_dir):
+        task = json.loads((run_dir / "task.json").read_text())
+        key = f"{task['model']['vendor']}/{task['model']['name']}"
+        configs_by_model.setdefault(key, set()).add(
+            (task["seed"], task["deck"], task["stake"])
+        )
+
+    expected = {(seed, str(d), str(s)) for seed, d, s in run_configs(spec)}
+    assert all(configs == expected for configs in configs_by_model.values())
+
+
+def test_synthetic_version_dir_analyzes(synthetic_version_dir: Path) -> None:
+    """The shared fixture corpus is readable by BenchmarkAnalyzer."""
+    analyzer = BenchmarkAnalyzer()
+
+    by_strategy = analyzer.analyze_models(synthetic_version_dir)
+
+    assert set(by_strategy) == {"default", "strategy-1"}
+    assert all(len(runs_list) == 4 for runs_list in by_strategy.values())
@@ -0,0 +1,173 @@
+"""Unit tests for balatrobench.tracing module."""
+
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from balatrobench import tracing
+from balatrobench.extractor import extract_request_metadata
+from balatrobench.tracing import (
+    ChromeTraceExporter,
+    JsonLinesExporter,
+    Span,
+    exporter_for_path,
+    traced,
+)
+
+
+class ListExporter:
+    """Collects spans in memory."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self.closed = False
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def exporter() -> Iterator[ListExporter]:
+    """Register an in-memory exporter for the duration of a test."""
+    exporter = ListExporter()
+    tracing.add_exporter(exporter)
+    yield exporter
+    tracing.remove_exporter(exporter)
+
+
+def test_span_is_noop_without_exporters() -> None:
+    """Spans are not recorded when no exporter is registered."""
+    assert not tracing.is_enabled()
+    with tracing.span("noop", key="value") as attrs:
+        attrs["added"] = 1
+    assert attrs == {"key": "value", "added": 1}
+
+
+def test_span_records_attributes(exporter: ListExporter) -> None:
+    """Finished spans carry initial and late-added attributes."""
+    with tracing.span("work", run_id="run-1") as attrs:
+        attrs["requests"] = 5
+
+    [span] = exporter.spans
+    assert span.name == "work"
+    assert span.attributes == {"run_id": "run-1", "requests": 5}
+    assert span.duration_ns >= 0
+    assert span.parent_id is None
+
+
+def test_span_nesting_sets_parent(exporter: ListExporter) -> None:
+    """Nested spans reference their enclosing span."""
+    with tracing.span("outer"), tracing.span("inner"):
+        pass
+
+    inner, outer = exporter.spans
+    assert inner.parent_id == outer.span_id
+
+
+def test_traced_records_call_and_result_attributes(exporter: ListExporter) -> None:
+    """Decorated functions record a span with argument and result attributes."""
+
+    @traced(
+        "double",
+        attributes=lambda value: {"value": value},
+        result_attributes=lambda result: {"result": result},
+    )
+    def double(value: int) -> int:
+        return 2 * value
+
+    assert double(21) == 42
+    [span] = exporter.spans
+    assert span.name == "double"
+    assert span.attributes == {"value": 21, "result": 42}
+
+
+def test_collected_spans_are_exported_with_new_ids(exporter: ListExporter) -> None:
+    """Spans collected elsewhere keep their links and process ids on export."""
+    with tracing.collect() as spans, tracing.span("outer"), tracing.span("inner"):
+        pass
+    exporter.spans.clear()
+    spans = [replace(s, process_id=1) for s in spans]
+
+    with tracing.span("local"):
+        pass
+    tracing.export_spans(spans)
+
+    local, inner, outer = exporter.spans
+    assert inner.parent_id == outer.span_id
+    assert outer.parent_id is None
+    assert len({local.span_id, inner.span_id, outer.span_id}) == 3
+    assert inner.process_id == outer.process_id == 1
+
+
+def test_remove_exporter_closes_it() -> None:
+    """Removing an exporter disables tracing and closes the exporter."""
+    exporter = ListExporter()
+    tracing.add_exporter(exporter)
+    tracing.remove_exporter(exporter)
+
+    assert exporter.closed
+    assert not tracing.is_enabled()
+
+
+def test_extractor_emits_spans(exporter: ListExporter, sample_run_dir: Path) -> None:
+    """extract_* functions emit spans with request count and bytes."""
+    extract_request_metadata(sample_run_dir / "responses.jsonl")
+
+    [span] = exporter.spans
+    assert span.name == "extractor.request_metadata"
+    assert span.attributes["requests"] == 5
+    assert span.attributes["bytes"] > 0
+
+
+def test_jsonl_exporter(tmp_path: Path) -> None:
+    """JsonLinesExporter writes one JSON object per span."""
+    path = tmp_path / "trace.jsonl"
+    exporter = JsonLinesExporter(path)
+    tracing.add_exporter(exporter)
+    try:
+        with tracing.span("a"):
+            pass
+        with tracing.span("b", n=2):
+            pass
+    finally:
+        tracing.remove_exporter(exporter)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["a", "b"]
+    assert lines[1]["attributes"] == {"n": 2}
+    assert "duration_ns" in lines[0]
+
+
+def test_chrome_trace_exporter(tmp_path: Path) -> None:
+    """ChromeTraceExporter writes complete ("X") trace events on close."""
+    path = tmp_path / "trace.json"
+    exporter = ChromeTraceExporter(path)
+    tracing.add_exporter(exporter)
+    try:
+        with tracing.span("writer.write_json", bytes=10):
+            pass
+    finally:
+        tracing.remove_exporter(exporter)
+
+    trace = json.loads(path.read_text())
+    [event] = trace["traceEvents"]
+    assert event["ph"] == "X"
+    assert event["cat"] == "writer"
+    assert event["args"] == {"bytes": 10}
+    assert event["pid"] == os.getpid()
+    assert event["dur"] >= 0
+
+
+def test_exporter_for_path(tmp_path: Path) -> None:
+    """Picks the exporter from the file suffix."""
+    jsonl = exporter_for_path(tmp_path / "t.jsonl")
+    jsonl.close()
+    assert isinstance(jsonl, JsonLinesExporter)
+    assert isinstance(exporter_for_path(tmp_path / "t.json"), ChromeTraceExporter)
@@ -5,7 +5,9 @@ from pathlib import Path
 
 import pytest
 
+from balatrobench.delta import CONTEXT_FILENAME, decode_context
 from balatrobench.enums import Deck, Stake
+from balatrobench.extractor import extract_run
 from balatrobench.models import (
     Config,
     Model,
@@ -15,6 +17,7 @@ from balatrobench.models import (
     StrategiesLeaderboard,
     Strategy,
 )
+from balatrobench.series import SERIES_FILENAME, decode_series
 from balatrobench.writer import BenchmarkWriter
 
 
@@ -247,6 +250,29 @@ class TestWriteRequestFiles:
         assert request_dir.exists()
         assert request_dir.is_dir()
 
+    def test_write_request_files_returns_written_paths(
+        self, mock_run_dir: Path, tmp_path: Path
+    ) -> None:
+        """Returns the paths of every file written for the run."""
+        output_base = tmp_path / "output"
+        writer = BenchmarkWriter(output_dir=tmp_path)
+
+        written = writer.write_request_files(mock_run_dir, output_base)
+
+        run_dir = output_base / mock_run_dir.name
+        request_dir = run_dir / "00001"
+        assert {p.name for p in written} == {
+            "strategy.md",
+            "gamestate.md",
+            "memory.md",
+            "reasoning.md",
+            "tool_call.json",
+            "metadata.json",
+            "series.json",
+        }
+        assert all(p.exists() for p in written)
+        assert {p.parent for p in written} == {request_dir, run_dir}
+
     def test_write_request_files_writes_strategy_md(
         self, mock_run_dir: Path, tmp_path: Path
     ) -> None:
@@ -394,6 +420,66 @@ class TestWriteRequestFiles:
         # No request directories should be created
         assert not (output_base / run_dir.name).exists()
 
+    def test_write_request_files_delta_context(
+        self, sample_run_dir: Path, tmp_path: Path
+    ) -> None:
+        """delta_context moves gamestate/memory of the run to context.json."""
+        BenchmarkWriter(tmp_path).write_request_files(sample_run_dir, tmp_path / "md")
+        writer = BenchmarkWriter(tmp_path, delta_context=True)
+
+        written = writer.write_request_files(sample_run_dir, tmp_path / "delta")
+
+        md_run = tmp_path / "md" / sample_run_dir.name
+        delta_run = tmp_path / "delta" / sample_run_dir.name
+        context_file = delta_run / CONTEXT_FILENAME
+        assert context_file in written
+        assert not list(delta_run.glob("*/gamestate.md"))
+        assert not list(delta_run.glob("*/memory.md"))
+        context = json.loads(context_file.read_text())
+        request_ids = sorted(p.name for p in md_run.iterdir() if p.is_dir())
+        assert context["requests"] == request_ids
+        for request_id in request_ids:
+            assert decode_context(context, request_id) == {
+                name: (md_run / request_id / f"{name}.md").read_text()
+                for name in ("gamestate", "memory")
+            }
+            assert (delta_run / request_id / "strategy.md").exists()
+
+    def test_write_request_files_series(
+        self, sample_run_dir: Path, tmp_path: Path
+    ) -> None:
+        """series.json holds the metadata of every request, in request order."""
+        writer = BenchmarkWriter(tmp_path)
+
+        writer.write_request_files(sample_run_dir, tmp_path)
+
+        run_dir = tmp_path / sample_run_dir.name
+        rows = decode_series(json.loads((run_dir / SERIES_FILENAME).read_text()))
+        assert [f"{row['request']:05d}" for row in rows] == sorted(
+            p.name for p in run_dir.iterdir() if p.is_dir()
+        )
+        for row in rows:
+            metadata = json.loads(
+                (run_dir / f"{row['request']:05d}" / "metadata.json").read_text()
+            )
+            assert row["tokens_in"] == metadata["tokens_in"]
+            assert row["time_ms"] == metadata["time_ms"]
+            assert row["cost"] == metadata["cost_total"]
+            assert row["provider"] == metadata["provider"]
+
+    def test_write_run_requests_without_series(
+        self, sample_run_dir: Path, tmp_path: Path
+    ) -> None:
+        """series=False skips series.json (partial extracts)."""
+        writer = BenchmarkWriter(tmp_path)
+
+        written = writer.write_run_requests(
+            extract_run(sample_run_dir), [tmp_path], series=False
+        )
+
+        assert written
+        assert not (tmp_path / sample_run_dir.name / SERIES_FILENAME).exists()
+
 
 # =============================================================================
 # write_strategies_leaderboard and write_strategy_runs tests
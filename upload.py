@@ -1,6 +1,7 @@
 # /// script
 # requires-python = ">=3.11"
 # dependencies = [
+#   "brotli",
 #   "httpx",
 #   "tqdm",
 # ]
@@ -8,17 +9,38 @@
 
 import argparse
 import asyncio
+import gzip
+import mimetypes
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import httpx
 from tqdm.asyncio import tqdm_asyncio
 
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip fallback
+    brotli = None
+
 BUNNY_BASE_URL = os.getenv("BUNNY_BASE_URL")
 STORAGE_ZONE = os.getenv("BUNNY_STORAGE_ZONE")
 ACCESS_KEY = os.getenv("BUNNY_API_KEY")
 MAX_CONCURRENT = 100
 
+# By default files are uploaded raw and the pull zone compresses responses
+# itself. Bunny Storage does not keep a Content-Encoding header sent with an
+# upload, so precompressed files would be served without it and break every
+# fetch() of the site: --precompress is only for storage that keeps it.
+# With it, text files are compressed; binaries (webp, png) are sent as is.
+COMPRESSIBLE_SUFFIXES = {".md", ".json", ".jsonl", ".txt"}
+# Below this size the encoding overhead outweighs the savings
+MIN_COMPRESS_SIZE = 512
+
+mimetypes.add_type("text/markdown", ".md")
+mimetypes.add_type("application/x-ndjson", ".jsonl")
+mimetypes.add_type("image/webp", ".webp")
+
 
 def get_files(subdir: str | None = None):
     base_path = Path("site/benchmarks")
@@ -32,16 +54,58 @@ def get_files(subdir: str | None = None):
     return files
 
 
-async def upload_file(client, sem, local_path, remote_path):
+def content_type(path: Path) -> str:
+    """Guess the Content-Type of a file, declaring utf-8 for text formats."""
+    mime, _ = mimetypes.guess_type(path.name)
+    if mime is None:
+        return "application/octet-stream"
+    if mime.startswith("text/") or mime.endswith("json"):
+        return f"{mime}; charset=utf-8"
+    return mime
+
+
+def load_payload(local_path: Path, encoding: str | None) -> tuple[bytes, str | None]:
+    """Read a file and compress it if requested and worthwhile.
+
+    Runs in a worker process. Returns the body to upload and the
+    Content-Encoding to declare (None when the file is sent raw).
+    """
+    content = local_path.read_bytes()
+    if (
+        encoding is None
+        or local_path.suffix not in COMPRESSIBLE_SUFFIXES
+        or len(content) < MIN_COMPRESS_SIZE
+    ):
+        return content, None
+
+    if encoding == "br":
+        compressed = brotli.compress(content, mode=brotli.MODE_TEXT, quality=11)
+    else:
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+
+    if len(compressed) >= len(content):
+        return content, None
+    return compressed, encoding
+
+
+async def upload_file(client, sem, pool, encoding, local_path, remote_path):
     async with sem:
         url = f"https://{BUNNY_BASE_URL}/{STORAGE_ZONE}/benchmarks/{remote_path}"
-        headers = {"AccessKey": ACCESS_KEY, "Content-Type": "application/octet-stream"}
 
-        with open(local_path, "rb") as f:
-            content = f.read()
+        if pool is None:
+            content, content_encoding = local_path.read_bytes(), None
+        else:
+            loop = asyncio.get_running_loop()
+            content, content_encoding = await loop.run_in_executor(
+                pool, load_payload, local_path, encoding
+            )
+
+        headers = {"AccessKey": ACCESS_KEY, "Content-Type": content_type(local_path)}
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
 
         response = await client.put(url, content=content, headers=headers)
-        return response.status_code == 201
+        return response.status_code == 201, len(content)
 
 
 async def main():
@@ -50,23 +114,50 @@ async def main():
         "--subdir",
         help="Subdirectory within site/benchmarks/ to upload (e.g., 'strategies')",
     )
+    parser.add_argument(
+        "--precompress",
+        choices=["br", "gzip"],
+        help="Upload text files compressed, with this Content-Encoding (off by "
+        "default: Bunny Storage drops the header, the CDN compresses instead)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Compression worker processes with --precompress (default: CPU count)",
+    )
     args = parser.parse_args()
 
+    if args.precompress == "br" and brotli is None:
+        parser.error("brotli is not installed; use --precompress gzip")
+
     files = get_files(args.subdir)
 
     if not files:
         print("No files to upload")
         return
 
-    print(f"Uploading {len(files)} files...")
-
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        sem = asyncio.Semaphore(MAX_CONCURRENT)
-        tasks = [upload_file(client, sem, local, remote) for local, remote in files]
-        results = await tqdm_asyncio.gather(*tasks, desc="Uploading", unit="file")
-
-    success = sum(results)
+    raw_bytes = sum(local.stat().st_size for local, _ in files)
+    encoding = args.precompress or "identity"
+    print(f"Uploading {len(files)} files (Content-Encoding: {encoding})...")
+
+    pool = ProcessPoolExecutor(args.workers) if args.precompress else None
+    try:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            sem = asyncio.Semaphore(MAX_CONCURRENT)
+            tasks = [
+                upload_file(client, sem, pool, args.precompress, local, remote)
+                for local, remote in files
+            ]
+            results = await tqdm_asyncio.gather(*tasks, desc="Uploading", unit="file")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    success = sum(ok for ok, _ in results)
+    sent_bytes = sum(size for _, size in results)
     print(f"Done: {success}/{len(files)} uploaded")
+    print(f"Transferred {sent_bytes / 1e6:.1f} MB (raw {raw_bytes / 1e6:.1f} MB)")
 
 
 if __name__ == "__main__":